@@ -1,15 +1,9 @@
 import json
 import os
-import queue
-import threading
-import time as time_module
 import uuid
-from collections import deque
-from datetime import datetime, time
-from time import time
+from datetime import datetime
 
 import pytz
-import requests
 from apscheduler.schedulers.background import BackgroundScheduler
 from flask import (
     Blueprint,
@@ -35,14 +29,15 @@ from database.chartink_db import (
     delete_symbol_mapping,
     get_all_strategies,
     get_strategy,
-    get_strategy_by_webhook_id,
     get_symbol_mappings,
     get_user_strategies,
+    get_webhook_route,
     toggle_strategy,
     update_strategy_times,
 )
 from database.symbol import enhanced_search_symbols
 from limiter import limiter
+from services.webhook_order_scheduler import queue_webhook_order
 from utils.logging import get_logger
 from utils.session import check_session_validity
 
@@ -58,127 +53,9 @@ chartink_bp = Blueprint("chartink_bp", __name__, url_prefix="/chartink")
 scheduler = BackgroundScheduler(timezone=pytz.timezone("Asia/Kolkata"))
 scheduler.start()
 
-# Get base URL from environment or default to localhost
-BASE_URL = os.getenv("HOST_SERVER", "http://127.0.0.1:5000")
-
 # Valid exchanges
 VALID_EXCHANGES = ["NSE", "BSE"]
 
-# Separate queues for different order types
-regular_order_queue = queue.Queue()  # For placeorder (up to 10/sec)
-smart_order_queue = queue.Queue()  # For placesmartorder (1/sec)
-
-# Order processor state
-order_processor_running = False
-order_processor_lock = threading.Lock()
-
-# Rate limiting state for regular orders
-last_regular_orders = deque(maxlen=10)  # Track last 10 regular order timestamps
-
-
-def process_orders():
-    """Background task to process orders from both queues with rate limiting"""
-    global order_processor_running
-
-    while True:
-        try:
-            # Process smart orders first (1 per second)
-            try:
-                smart_order = smart_order_queue.get_nowait()
-                if smart_order is None:  # Poison pill
-                    break
-
-                try:
-                    response = requests.post(
-                        f"{BASE_URL}/api/v1/placesmartorder",
-                        json=smart_order["payload"],
-                        timeout=30,
-                    )
-                    if response.ok:
-                        logger.info(
-                            f"Smart order placed for {smart_order['payload']['symbol']} in strategy {smart_order['payload']['strategy']}"
-                        )
-                    else:
-                        logger.error(
-                            f"Error placing smart order for {smart_order['payload']['symbol']}: {response.text}"
-                        )
-                except Exception as e:
-                    logger.exception(f"Error placing smart order: {str(e)}")
-
-                # Always wait 1 second after smart order
-                time_module.sleep(1)
-                continue  # Start next iteration
-
-            except queue.Empty:
-                pass  # No smart orders, continue to regular orders
-
-            # Process regular orders (up to 10 per second)
-            now = time()
-
-            # Clean up old timestamps
-            while last_regular_orders and now - last_regular_orders[0] > 1:
-                last_regular_orders.popleft()
-
-            # Process regular orders if under rate limit
-            if len(last_regular_orders) < 10:
-                try:
-                    regular_order = regular_order_queue.get_nowait()
-                    if regular_order is None:  # Poison pill
-                        break
-
-                    try:
-                        response = requests.post(
-                            f"{BASE_URL}/api/v1/placeorder",
-                            json=regular_order["payload"],
-                            timeout=30,
-                        )
-                        if response.ok:
-                            logger.info(
-                                f"Regular order placed for {regular_order['payload']['symbol']} in strategy {regular_order['payload']['strategy']}"
-                            )
-                            last_regular_orders.append(now)
-                        else:
-                            logger.error(
-                                f"Error placing regular order for {regular_order['payload']['symbol']}: {response.text}"
-                            )
-                    except Exception as e:
-                        logger.exception(f"Error placing regular order: {str(e)}")
-
-                except queue.Empty:
-                    time_module.sleep(0.1)  # No orders to process
-            else:
-                # Rate limit hit, wait until next second
-                time_module.sleep(0.1)
-
-        except Exception as e:
-            logger.exception(f"Error in order processor: {str(e)}")
-            time_module.sleep(0.1)  # Prevent tight loop on error
-
-    with order_processor_lock:
-        order_processor_running = False
-
-
-def ensure_order_processor():
-    """Ensure order processor is running"""
-    global order_processor_running
-
-    with order_processor_lock:
-        if not order_processor_running:
-            order_processor_running = True
-            thread = threading.Thread(target=process_orders, daemon=True)
-            thread.start()
-
-
-def queue_order(endpoint, payload):
-    """Add order to appropriate processing queue"""
-    ensure_order_processor()
-
-    if endpoint == "placesmartorder":
-        smart_order_queue.put({"endpoint": endpoint, "payload": payload})
-    else:  # placeorder
-        regular_order_queue.put({"endpoint": endpoint, "payload": payload})
-
-
 def validate_strategy_times(start_time, end_time, squareoff_time):
     """Validate strategy time settings"""
     try:
@@ -278,7 +155,7 @@ def squareoff_positions(strategy_id):
             }
 
             # Queue the order instead of executing directly
-            queue_order("placesmartorder", payload)
+            queue_webhook_order("placesmartorder", payload)
 
     except Exception as e:
         logger.exception(f"Error in squareoff_positions for strategy {strategy_id}: {str(e)}")
@@ -791,8 +668,8 @@ def api_toggle_strategy(strategy_id):
 def webhook(webhook_id):
     """Handle webhook from Chartink"""
     try:
-        # Get strategy by webhook ID
-        strategy = get_strategy_by_webhook_id(webhook_id)
+        # Routing snapshot: strategy, time windows, mappings and API key
+        strategy = get_webhook_route(webhook_id)
         if not strategy:
             logger.error(f"Strategy not found for webhook ID: {webhook_id}")
             return jsonify({"status": "error", "error": "Invalid webhook ID"}), 404
@@ -836,10 +713,10 @@ def webhook(webhook_id):
         if strategy.is_intraday:
             current_time = datetime.now(pytz.timezone("Asia/Kolkata")).time()
 
-            # Convert strategy times to time objects
-            start_time = datetime.strptime(strategy.start_time, "%H:%M").time()
-            end_time = datetime.strptime(strategy.end_time, "%H:%M").time()
-            squareoff_time = datetime.strptime(strategy.squareoff_time, "%H:%M").time()
+            # Strategy times, parsed once when the route was built
+            start_time = strategy.start_at
+            end_time = strategy.end_at
+            squareoff_time = strategy.squareoff_at
 
             # Check if before start time for all orders
             if current_time < start_time:
@@ -872,16 +749,13 @@ def webhook(webhook_id):
             logger.error("No symbols received in webhook")
             return jsonify({"status": "error", "error": "No symbols received"}), 400
 
-        # Get symbol mappings
-        mappings = get_symbol_mappings(strategy.id)
-        if not mappings:
+        # Symbol mappings, keyed by Chartink symbol
+        mapping_dict = strategy.mappings
+        if not mapping_dict:
             logger.error(f"No symbol mappings found for strategy {strategy.id}")
             return jsonify({"status": "error", "error": "No symbol mappings configured"}), 400
 
-        mapping_dict = {m.chartink_symbol: m for m in mappings}
-
-        # Get API key from database
-        api_key = get_api_key_for_tradingview(strategy.user_id)
+        api_key = strategy.api_key
         if not api_key:
             logger.error(f"No API key found for user {strategy.user_id}")
             return jsonify({"status": "error", "error": "No API key found"}), 401
@@ -902,7 +776,7 @@ def webhook(webhook_id):
             payload = {
                 "apikey": api_key,
                 "strategy": strategy.name,
-                "symbol": mapping.chartink_symbol,
+                "symbol": mapping.symbol,
                 "exchange": mapping.exchange,
                 "action": action,
                 "product": mapping.product_type,
@@ -937,7 +811,7 @@ def webhook(webhook_id):
             )
 
             # Queue the order instead of executing directly
-            queue_order(endpoint, payload)
+            queue_webhook_order(endpoint, payload)
             processed_symbols.append(symbol)
 
         if processed_symbols:
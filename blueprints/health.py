@@ -21,7 +21,9 @@ from flask import Blueprint, Response, jsonify, request
 
 from database.health_db import HealthAlert, HealthMetric, health_session
 from limiter import limiter
+from services.webhook_order_scheduler import webhook_order_stats
 from utils.health_monitor import check_db_connectivity, get_cached_health_status
+from utils.log_sink import sink_stats
 from utils.logging import get_logger
 from utils.session import check_session_validity
 
@@ -126,6 +128,14 @@ def detailed_health_check():
                 "observedValue": 156,
                 "observedUnit": "count"
             }],
+            "logs:sink": [{
+                "componentId": "traffic_logs",
+                "status": "pass"|"warn",
+                "observedValue": 3,
+                "observedUnit": "count",
+                "dropped": 0,
+                ...
+            }],
             ...
         }
     }
@@ -199,6 +209,50 @@ def detailed_health_check():
         except Exception:
             pass
 
+        # Batched log writers: queue depth plus drop/failure counters. A sink
+        # that has dropped or failed records warns, but logs are best-effort,
+        # so it does not degrade the overall status.
+        sinks = sink_stats()
+        if sinks:
+            checks["logs:sink"] = [
+                {
+                    "componentId": name,
+                    "status": "warn" if stats["dropped"] or stats["failed"] else "pass",
+                    "observedValue": stats["pending"],
+                    "observedUnit": "count",
+                    "capacity": stats["capacity"],
+                    "highWater": stats["high_water"],
+                    "written": stats["written"],
+                    "dropped": stats["dropped"],
+                    "failed": stats["failed"],
+                    "batches": stats["batches"],
+                    "largestBatch": stats["largest_batch"],
+                    "time": datetime.utcnow().isoformat() + "Z",
+                }
+                for name, stats in sinks.items()
+            ]
+
+        # TradingView/Chartink webhook order queues. Warns when an order has
+        # been queued for over 10s, i.e. alerts arrive faster than the pacing.
+        webhook_queues = webhook_order_stats()
+        if webhook_queues:
+            checks["webhooks:orders"] = [
+                {
+                    "componentId": name,
+                    "status": "warn" if stats["oldest_wait_ms"] > 10_000 else "pass",
+                    "observedValue": stats["pending"],
+                    "observedUnit": "count",
+                    "highWater": stats["high_water"],
+                    "placed": stats["placed"],
+                    "failed": stats["failed"],
+                    "rateLimit": stats["rate_limit"],
+                    "avgWaitMs": stats["avg_wait_ms"],
+                    "maxWaitMs": stats["max_wait_ms"],
+                    "time": datetime.utcnow().isoformat() + "Z",
+                }
+                for name, stats in webhook_queues.items()
+            ]
+
         # Overall status (worst of all checks)
         overall_status = "pass"
         if db_check["status"] == "fail":
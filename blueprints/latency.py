@@ -8,7 +8,7 @@ import pytz
 from flask import Blueprint, Response, jsonify, render_template, request, session
 from sqlalchemy import func
 
-from database.latency_db import OrderLatency, latency_session
+from database.latency_db import LatencyDigest, OrderLatency, latency_session
 from limiter import limiter
 from utils.logging import get_logger
 from utils.session import check_session_validity
@@ -36,32 +36,37 @@ def format_ist_time(timestamp):
 
 
 def get_histogram_data(broker=None):
-    """Get histogram data for RTT distribution"""
-    try:
-        query = OrderLatency.query
-        if broker:
-            query = query.filter_by(broker=broker)
+    """Get histogram data for RTT distribution over the percentile window.
 
-        # Get all RTT values
-        rtts = [r[0] for r in query.with_entities(OrderLatency.rtt_ms).all()]
+    Built from the latency_digest RTT sketches rather than every rtt_ms value;
+    each sketch bucket's representative value is within 1% of the values it
+    holds, so bin counts can only differ for values within 1% of a bin edge.
+    """
+    try:
+        distribution = LatencyDigest.rtt_distribution(broker)
+        pairs = distribution["sketch"].values()
 
-        if not rtts:
+        if not pairs:
             return {"bins": [], "counts": [], "avg_rtt": 0, "min_rtt": 0, "max_rtt": 0}
 
-        # Calculate statistics
-        avg_rtt = sum(rtts) / len(rtts)
-        min_rtt = min(rtts)
-        max_rtt = max(rtts)
+        min_rtt = distribution["min_rtt"]
+        max_rtt = distribution["max_rtt"]
 
         # Create histogram bins
         bin_count = 30  # Number of bins
-        bin_width = (max_rtt - min_rtt) / bin_count if max_rtt > min_rtt else 1
 
-        # Create histogram using numpy
-        counts, bins = np.histogram(rtts, bins=bin_count, range=(min_rtt, max_rtt))
+        # Create histogram using numpy, one weighted sample per sketch bucket;
+        # clip so a representative just past min/max stays in the end bins
+        values = np.clip([value for value, _ in pairs], min_rtt, max_rtt)
+        counts, bins = np.histogram(
+            values,
+            bins=bin_count,
+            range=(min_rtt, max_rtt),
+            weights=[n for _, n in pairs],
+        )
 
         # Convert to list for JSON serialization
-        counts = counts.tolist()
+        counts = [int(c) for c in counts]
         bins = bins.tolist()
 
         # Create bin labels (use the start of each bin)
@@ -70,7 +75,7 @@ def get_histogram_data(broker=None):
         data = {
             "bins": bin_labels,
             "counts": counts,
-            "avg_rtt": float(avg_rtt),
+            "avg_rtt": distribution["avg_rtt"],
             "min_rtt": float(min_rtt),
             "max_rtt": float(max_rtt),
         }
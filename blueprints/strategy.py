@@ -1,14 +1,8 @@
-import atexit
 import json
 import os
-import queue
 import re
-import threading
-import time as time_module
 import uuid
-from collections import deque
-from datetime import datetime, time
-from time import time
+from datetime import datetime
 
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -36,14 +30,15 @@ from database.strategy_db import (
     delete_symbol_mapping,
     get_all_strategies,
     get_strategy,
-    get_strategy_by_webhook_id,
     get_symbol_mappings,
     get_user_strategies,
+    get_webhook_route,
     toggle_strategy,
     update_strategy_times,
 )
 from database.symbol import enhanced_search_symbols
 from limiter import limiter
+from services.webhook_order_scheduler import queue_webhook_order
 from utils.logging import get_logger
 from utils.session import check_session_validity, is_session_valid
 
@@ -62,9 +57,6 @@ scheduler = BackgroundScheduler(
 )
 scheduler.start()
 
-# Get base URL from environment or default to localhost
-BASE_URL = os.getenv("HOST_SERVER", "http://127.0.0.1:5000")
-
 # Valid exchanges
 VALID_EXCHANGES = ["NSE", "BSE", "NFO", "CDS", "BFO", "BCD", "MCX", "NCDEX"]
 
@@ -84,130 +76,6 @@ EXCHANGE_PRODUCTS = {
 DEFAULT_EXCHANGE = "NSE"
 DEFAULT_PRODUCT = "MIS"
 
-# Separate queues for different order types
-regular_order_queue = queue.Queue()  # For placeorder (up to 10/sec)
-smart_order_queue = queue.Queue()  # For placesmartorder (1/sec)
-
-# Order processor state
-order_processor_running = False
-order_processor_lock = threading.Lock()
-_order_processor_thread = None
-
-# Rate limiting state for regular orders
-last_regular_orders = deque(maxlen=10)  # Track last 10 regular order timestamps
-
-
-def process_orders():
-    """Background task to process orders from both queues with rate limiting"""
-    global order_processor_running
-
-    while True:
-        try:
-            # Process smart orders first (1 per second)
-            try:
-                smart_order = smart_order_queue.get_nowait()
-                if smart_order is None:  # Poison pill
-                    break
-
-                try:
-                    from utils.httpx_client import get_httpx_client
-                    response = get_httpx_client().post(
-                        f"{BASE_URL}/api/v1/placesmartorder", json=smart_order["payload"]
-                    )
-                    if response.is_success:
-                        logger.info(
-                            f"Smart order placed for {smart_order['payload']['symbol']} in strategy {smart_order['payload']['strategy']}"
-                        )
-                    else:
-                        logger.error(
-                            f"Error placing smart order for {smart_order['payload']['symbol']}: {response.text}"
-                        )
-                except Exception as e:
-                    logger.exception(f"Error placing smart order: {str(e)}")
-
-                # Always wait 1 second after smart order
-                time_module.sleep(1)
-                continue  # Start next iteration
-
-            except queue.Empty:
-                pass  # No smart orders, continue to regular orders
-
-            # Process regular orders (up to 10 per second)
-            now = time()
-
-            # Clean up old timestamps
-            while last_regular_orders and now - last_regular_orders[0] > 1:
-                last_regular_orders.popleft()
-
-            # Process regular orders if under rate limit
-            if len(last_regular_orders) < 10:
-                try:
-                    regular_order = regular_order_queue.get_nowait()
-                    if regular_order is None:  # Poison pill
-                        break
-
-                    try:
-                        from utils.httpx_client import get_httpx_client
-                        response = get_httpx_client().post(
-                            f"{BASE_URL}/api/v1/placeorder", json=regular_order["payload"]
-                        )
-                        if response.is_success:
-                            logger.info(
-                                f"Regular order placed for {regular_order['payload']['symbol']} in strategy {regular_order['payload']['strategy']}"
-                            )
-                            last_regular_orders.append(now)
-                        else:
-                            logger.error(
-                                f"Error placing regular order for {regular_order['payload']['symbol']}: {response.text}"
-                            )
-                    except Exception as e:
-                        logger.exception(f"Error placing regular order: {str(e)}")
-
-                except queue.Empty:
-                    pass  # No regular orders
-
-            # Small sleep to prevent CPU spinning
-            time_module.sleep(0.1)
-
-        except Exception as e:
-            logger.exception(f"Error in order processor: {str(e)}")
-            time_module.sleep(1)  # Sleep on error to prevent rapid retries
-
-
-def _shutdown_order_processor():
-    """Drain remaining orders before process exit"""
-    if _order_processor_thread and _order_processor_thread.is_alive():
-        pending = smart_order_queue.qsize() + regular_order_queue.qsize()
-        if pending:
-            logger.info(f"Shutting down order processor, draining {pending} pending orders...")
-        # Only poison the regular queue — smart orders drain first via the loop,
-        # then the regular queue processes all remaining orders before hitting the pill
-        regular_order_queue.put(None)
-        _order_processor_thread.join(timeout=30)
-
-
-atexit.register(_shutdown_order_processor)
-
-
-def ensure_order_processor():
-    """Ensure the order processor is running"""
-    global order_processor_running, _order_processor_thread
-    with order_processor_lock:
-        if not order_processor_running:
-            _order_processor_thread = threading.Thread(target=process_orders, daemon=True)
-            _order_processor_thread.start()
-            order_processor_running = True
-
-
-def queue_order(endpoint, payload):
-    """Add order to appropriate queue"""
-    ensure_order_processor()
-    if endpoint == "placesmartorder":
-        smart_order_queue.put({"payload": payload})
-    else:
-        regular_order_queue.put({"payload": payload})
-
-
 def validate_strategy_times(start_time, end_time, squareoff_time):
     """Validate strategy time settings"""
     try:
@@ -324,7 +192,7 @@ def squareoff_positions(strategy_id):
             }
 
             # Queue the order instead of executing directly
-            queue_order("placesmartorder", payload)
+            queue_webhook_order("placesmartorder", payload)
 
     except Exception as e:
         logger.exception(f"Error in squareoff_positions for strategy {strategy_id}: {str(e)}")
@@ -871,7 +739,8 @@ def api_toggle_strategy(strategy_id):
 def webhook(webhook_id):
     """Handle webhook from trading platform"""
     try:
-        strategy = get_strategy_by_webhook_id(webhook_id)
+        # Routing snapshot: strategy, time windows, mappings and API key
+        strategy = get_webhook_route(webhook_id)
         if not strategy:
             return jsonify({"error": "Invalid webhook ID"}), 404
 
@@ -965,14 +834,11 @@ def webhook(webhook_id):
             use_smart_order = position_size == 0
 
         # Get symbol mapping
-        mapping = next(
-            (m for m in get_symbol_mappings(strategy.id) if m.symbol == data["symbol"]), None
-        )
+        mapping = strategy.mappings.get(data["symbol"])
         if not mapping:
             return jsonify({"error": f"No mapping found for symbol {data['symbol']}"}), 400
 
-        # Get API key from database
-        api_key = get_api_key_for_tradingview(strategy.user_id)
+        api_key = strategy.api_key
         if not api_key:
             logger.error(f"No API key found for user {strategy.user_id}")
             return jsonify({"error": "No API key found"}), 401
@@ -1025,7 +891,7 @@ def webhook(webhook_id):
                 endpoint = "placeorder"
 
         # Queue the order
-        queue_order(endpoint, payload)
+        queue_webhook_order(endpoint, payload)
         return jsonify({"message": f"Order queued successfully for {data['symbol']}"}), 200
 
     except Exception as e:
@@ -3,7 +3,6 @@
 import gzip
 import os
 import shutil
-from datetime import datetime
 
 import pandas as pd
 import requests
@@ -12,6 +11,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from database.engine_factory import create_db_engine
+from database.master_contract_normalize import format_expiry
+from database.master_contract_sync import sync_master_contract
 from extensions import socketio  # Import SocketIO
 from utils.logging import get_logger
 
@@ -50,38 +51,6 @@ def init_db():
     Base.metadata.create_all(bind=engine)
 
 
-def delete_symtoken_table():
-    logger.info("Deleting Symtoken Table")
-    SymToken.query.delete()
-    db_session.commit()
-
-
-def copy_from_dataframe(df):
-    logger.info("Performing Bulk Insert")
-    # Convert DataFrame to a list of dictionaries
-    data_dict = df.to_dict(orient="records")
-
-    # Retrieve existing tokens to filter them out from the insert
-    existing_tokens = {result.token for result in db_session.query(SymToken.token).all()}
-
-    # Filter out data_dict entries with tokens that already exist
-    filtered_data_dict = [row for row in data_dict if row["token"] not in existing_tokens]
-
-    # Insert in bulk the filtered records
-    try:
-        if filtered_data_dict:  # Proceed only if there's anything to insert
-            db_session.bulk_insert_mappings(SymToken, filtered_data_dict)
-            db_session.commit()
-            logger.info(
-                f"Bulk insert completed successfully with {len(filtered_data_dict)} new records."
-            )
-        else:
-            logger.info("No new records to insert.")
-    except Exception as e:
-        logger.error(f"Error during bulk insert: {e}")
-        db_session.rollback()
-
-
 def download_json_angel_data(url, output_path):
     """
     Downloads a JSON file from the specified URL and saves it to the specified path.
@@ -116,15 +85,6 @@ def reformat_symbol(row):
     return symbol
 
 
-def convert_date(date_str):
-    # Convert from '19MAR2024' to '19-MAR-24'
-    try:
-        return datetime.strptime(date_str, "%d%b%Y").strftime("%d-%b-%y")
-    except ValueError:
-        # Return the original date if it doesn't match the format
-        return date_str
-
-
 def process_angel_json(path):
     """
     Processes the Angel JSON file to fit the existing database schema.
@@ -168,8 +128,7 @@ def process_angel_json(path):
     df["symbol"] = df["symbol"].str.replace("-EQ|-BE|-MF|-SG", "", regex=True)
 
     # Assuming the 'expiry' field in the JSON is in the format '19MAR2024'
-    df["expiry"] = df["expiry"].apply(lambda x: convert_date(x) if pd.notnull(x) else x)
-    df["expiry"] = df["expiry"].str.upper()
+    df["expiry"] = format_expiry(df["expiry"], format="%d%b%Y", keep_unparsed=True)
 
     # Convert 'strike' to float, 'lotsize' to int, and 'tick_size' to float as per the database schema
     df["strike"] = df["strike"].astype(float) / 100
@@ -401,8 +360,7 @@ def master_contract_download():
 
         # token_df = token_df.drop_duplicates(subset='symbol', keep='first')
 
-        delete_symtoken_table()  # Consider the implications of this action
-        copy_from_dataframe(token_df)
+        sync_master_contract(token_df, SymToken, db_session)
 
         return socketio.emit(
             "master_contract_download", {"status": "success", "message": "Successfully Downloaded"}
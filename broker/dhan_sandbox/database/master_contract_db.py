@@ -16,6 +16,7 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 
 from database.auth_db import get_auth_token
 from database.engine_factory import create_db_engine
+from database.master_contract_sync import sync_master_contract
 from extensions import socketio  # Import SocketIO
 from utils.logging import get_logger
 
@@ -54,38 +55,6 @@ def init_db():
     Base.metadata.create_all(bind=engine)
 
 
-def delete_symtoken_table():
-    logger.info("Deleting Symtoken Table")
-    SymToken.query.delete()
-    db_session.commit()
-
-
-def copy_from_dataframe(df):
-    logger.info("Performing Bulk Insert")
-    # Convert DataFrame to a list of dictionaries
-    data_dict = df.to_dict(orient="records")
-
-    # Retrieve existing tokens to filter them out from the insert
-    existing_tokens = {result.token for result in db_session.query(SymToken.token).all()}
-
-    # Filter out data_dict entries with tokens that already exist
-    filtered_data_dict = [row for row in data_dict if row["token"] not in existing_tokens]
-
-    # Insert in bulk the filtered records
-    try:
-        if filtered_data_dict:  # Proceed only if there's anything to insert
-            db_session.bulk_insert_mappings(SymToken, filtered_data_dict)
-            db_session.commit()
-            logger.info(
-                f"Bulk insert completed successfully with {len(filtered_data_dict)} new records."
-            )
-        else:
-            logger.info("No new records to insert.")
-    except Exception as e:
-        logger.exception(f"Error during bulk insert: {e}")
-        db_session.rollback()
-
-
 def download_csv_dhan_data(output_path):
     logger.info("Downloading Master Contract CSV Files")
     # URLs of the CSV files to be downloaded
@@ -375,9 +344,8 @@ def master_contract_download():
     output_path = "tmp"
     try:
         download_csv_dhan_data(output_path)
-        delete_symtoken_table()
         token_df = process_dhan_csv(output_path)
-        copy_from_dataframe(token_df)
+        sync_master_contract(token_df, SymToken, db_session)
         delete_dhan_temp_data(output_path)
         # token_df['token'] = pd.to_numeric(token_df['token'], errors='coerce').fillna(-1).astype(int)
 
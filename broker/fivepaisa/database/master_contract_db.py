@@ -13,6 +13,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from database.engine_factory import create_db_engine
+from database.master_contract_normalize import fno_symbols, format_expiry, format_strikes
+from database.master_contract_sync import sync_master_contract
 from extensions import socketio  # Import SocketIO
 from utils.httpx_client import get_httpx_client
 from utils.logging import get_logger
@@ -52,38 +54,6 @@ def init_db():
     Base.metadata.create_all(bind=engine)
 
 
-def delete_symtoken_table():
-    logger.info("Deleting Symtoken Table")
-    SymToken.query.delete()
-    db_session.commit()
-
-
-def copy_from_dataframe(df):
-    logger.info("Performing Bulk Insert")
-    # Convert DataFrame to a list of dictionaries
-    data_dict = df.to_dict(orient="records")
-
-    # Retrieve existing tokens to filter them out from the insert
-    existing_tokens = {result.token for result in db_session.query(SymToken.token).all()}
-
-    # Filter out data_dict entries with tokens that already exist
-    filtered_data_dict = [row for row in data_dict if row["token"] not in existing_tokens]
-
-    # Insert in bulk the filtered records
-    try:
-        if filtered_data_dict:  # Proceed only if there's anything to insert
-            db_session.bulk_insert_mappings(SymToken, filtered_data_dict)
-            db_session.commit()
-            logger.info(
-                f"Bulk insert completed successfully with {len(filtered_data_dict)} new records."
-            )
-        else:
-            logger.info("No new records to insert.")
-    except Exception as e:
-        logger.error(f"Error during bulk insert: {e}")
-        db_session.rollback()
-
-
 def download_csv_5paisa_data(url, output_path):
     """
     Downloads a CSV file from the specified URL and saves it to the specified path using shared httpx client.
@@ -178,17 +148,15 @@ def process_5paisa_csv(path):
         # Add other mappings as needed
     }
 
-    # Function to map Exch and ExchType to exchange names with additional conditions
-    def map_exchange(row):
-        if row["Exch"] == "N" and row["ExchType"] == "C":
-            return "NSE_INDEX" if row["ScripCode"] > 999900 else "NSE"
-        elif row["Exch"] == "B" and row["ExchType"] == "C":
-            return "BSE_INDEX" if row["ScripCode"] > 999900 else "BSE"
-        else:
-            return exchange_mapping.get((row["Exch"], row["ExchType"]), "Unknown")
-
-    # Apply the function to create the exchange column
-    df["exchange"] = df.apply(map_exchange, axis=1)
+    # Map Exch and ExchType to exchange names; cash scrip codes above 999900
+    # are indices
+    pairs = df["Exch"].astype(str) + ":" + df["ExchType"].astype(str)
+    df["exchange"] = pairs.map(
+        {f"{exch}:{exch_type}": name for (exch, exch_type), name in exchange_mapping.items()}
+    ).fillna("Unknown")
+    is_index = df["ScripCode"] > 999900
+    df.loc[(pairs == "N:C") & is_index, "exchange"] = "NSE_INDEX"
+    df.loc[(pairs == "B:C") & is_index, "exchange"] = "BSE_INDEX"
 
     # Filter the DataFrame for Series 'EQ', 'BE', 'XX'
     filtered_df = df[df["Series"].isin(["EQ", "BE", "XX", "  "])].copy()
@@ -197,45 +165,21 @@ def process_5paisa_csv(path):
 
     # filtered_df.loc[filtered_df['Series'] == 'XX', 'Series'] = 'FUT'
 
-    # Convert 'Expiry' to datetime format
-    filtered_df["Expiry"] = pd.to_datetime(filtered_df["Expiry"])
-
     # Format 'Expiry' to 'DD-MMM-YY'
-    filtered_df["Expiry"] = filtered_df["Expiry"].dt.strftime("%d-%b-%y").str.upper()
-
-    # Function to format StrikeRate
-    def format_strike(strike):
-        # Convert strike to string first
-        strike_str = str(strike)
-        # Check if the string ends with '.0' and remove it
-        if strike_str.endswith(".0"):
-            # Remove the last two characters '.0'
-            return strike_str[:-2]
-        elif strike_str.endswith(".00"):
-            # Remove the last three characters '.00'
-            return strike_str[:-3]
-        # Return the original string if it does not end with '.0'
-        return strike_str
-
-    # Apply the function to the StrikeRate column
-    filtered_df["StrikeRate"] = filtered_df["StrikeRate"].apply(format_strike)
-
-    # Convert the Expiry column to strings and strip '-'
-    filtered_df["Expiry1"] = filtered_df["Expiry"].astype(str).str.replace("-", "")
-
-    # Apply the conditions
-    def create_trading_symbol(row):
-        if row["Series"] in ["BE", "EQ"]:
-            return row["SymbolRoot"]
-        elif row["Series"] == "XX":
-            return row["SymbolRoot"] + row["Expiry1"] + "FUT"
-        elif row["Series"] == "CE":
-            return row["SymbolRoot"] + row["Expiry1"] + str(row["StrikeRate"]) + "CE"
-        elif row["Series"] == "PE":
-            return row["SymbolRoot"] + row["Expiry1"] + str(row["StrikeRate"]) + "PE"
-        return row["SymbolRoot"]
-
-    filtered_df["TradingSymbol"] = filtered_df.apply(create_trading_symbol, axis=1)
+    filtered_df["Expiry"] = format_expiry(filtered_df["Expiry"])
+
+    # StrikeRate as symbols embed it (22000, 187.5)
+    filtered_df["StrikeRate"] = format_strikes(filtered_df["StrikeRate"])
+
+    # Equity series keep the root; futures (Series XX) and options are built
+    # as ROOT+DDMMMYY+FUT and ROOT+DDMMMYY+STRIKE+CE/PE
+    filtered_df["TradingSymbol"] = fno_symbols(
+        filtered_df["SymbolRoot"],
+        filtered_df["Series"].replace({"XX": "FUT"}),
+        filtered_df["SymbolRoot"],
+        filtered_df["Expiry"],
+        filtered_df["StrikeRate"],
+    )
 
     # Create a new DataFrame in OpenAlgo format
     new_df = pd.DataFrame()
@@ -418,10 +362,9 @@ def master_contract_download():
         # Clean up temporary files
         delete_5paisa_temp_data(output_path)
 
-        # Clear existing data and insert new data
+        # Apply only what changed since the last download
         logger.info("Updating database with new symbols...")
-        delete_symtoken_table()  # Clear existing table
-        copy_from_dataframe(token_df)
+        sync_master_contract(token_df, SymToken, db_session)
 
         logger.info("Master contract download completed successfully")
         # Notify UI through Socket.IO
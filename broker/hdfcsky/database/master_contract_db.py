@@ -45,6 +45,7 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 
 from broker.hdfcsky.api.baseurl import SECURITY_MASTER_URL, USER_AGENT
 from database.engine_factory import create_db_engine
+from database.master_contract_sync import sync_master_contract
 from extensions import socketio
 from utils.httpx_client import get_httpx_client
 from utils.logging import get_logger
@@ -85,31 +86,6 @@ def init_db():
     Base.metadata.create_all(bind=engine)
 
 
-def delete_symtoken_table():
-    logger.info("Deleting Symtoken Table")
-    SymToken.query.delete()
-    db_session.commit()
-
-
-def copy_from_dataframe(df):
-    logger.info("Performing Bulk Insert")
-    data_dict = df.to_dict(orient="records")
-
-    existing_tokens = {result.token for result in db_session.query(SymToken.token).all()}
-    filtered = [row for row in data_dict if row["token"] not in existing_tokens]
-
-    try:
-        if filtered:
-            db_session.bulk_insert_mappings(SymToken, filtered)
-            db_session.commit()
-            logger.info(f"Bulk insert completed with {len(filtered)} new records.")
-        else:
-            logger.info("No new records to insert.")
-    except Exception as e:
-        logger.error(f"Error during bulk insert: {e}")
-        db_session.rollback()
-
-
 # --- download -----------------------------------------------------------
 
 
@@ -488,8 +464,7 @@ def master_contract_download():
         raw = download_security_master()
         token_df = process_security_master(raw)
 
-        delete_symtoken_table()
-        copy_from_dataframe(token_df)
+        sync_master_contract(token_df, SymToken, db_session)
 
         return socketio.emit(
             "master_contract_download",
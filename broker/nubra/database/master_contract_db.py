@@ -11,6 +11,7 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 from broker.nubra.api.baseurl import INDEX_MASTER_PATH, get_nubra_headers, get_url
 from database.auth_db import Auth, get_auth_token
 from database.engine_factory import create_db_engine
+from database.master_contract_sync import sync_master_contract
 from extensions import socketio
 from utils.httpx_client import get_httpx_client
 from utils.logging import get_logger
@@ -46,35 +47,6 @@ def init_db():
     logger.info("Initializing Master Contract DB")
     Base.metadata.create_all(bind=engine)
 
-def delete_symtoken_table():
-    logger.info("Deleting Symtoken Table")
-    SymToken.query.delete()
-    db_session.commit()
-
-def copy_from_dataframe(df):
-    logger.info("Performing Bulk Insert")
-    # Convert DataFrame to a list of dictionaries
-    data_dict = df.to_dict(orient='records')
-
-    # Retrieve existing tokens to filter them out from the insert
-    existing_tokens = {result.token for result in db_session.query(SymToken.token).all()}
-
-    # Filter out data_dict entries with tokens that already exist
-    filtered_data_dict = [row for row in data_dict if row['token'] not in existing_tokens]
-
-    # Insert in bulk the filtered records
-    try:
-        if filtered_data_dict:
-            db_session.bulk_insert_mappings(SymToken, filtered_data_dict)
-            db_session.commit()
-            logger.info(f"Bulk insert completed successfully with {len(filtered_data_dict)} new records.")
-        else:
-            logger.info("No new records to insert.")
-    except Exception as e:
-        logger.error(f"Error during bulk insert: {e}")
-        db_session.rollback()
-
-
 def download_nubra_instruments(output_path):
     """
     Downloads instrument data from Nubra API for NSE, BSE and MCX exchanges.
@@ -425,9 +397,8 @@ def master_contract_download():
         # Combine both dataframes
         combined_df = pd.concat([instruments_df, indexes_df], ignore_index=True)
 
-        # Clear existing data and insert combined data
-        delete_symtoken_table()
-        copy_from_dataframe(combined_df)
+        # Apply only what changed since the last download
+        sync_master_contract(combined_df, SymToken, db_session)
 
         return socketio.emit('master_contract_download', {'status': 'success', 'message': 'Successfully Downloaded'})
 
@@ -10,6 +10,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from database.engine_factory import create_db_engine
+from database.master_contract_sync import sync_master_contract
 from extensions import socketio
 from utils.logging import get_logger
 
@@ -46,33 +47,6 @@ def init_db():
     Base.metadata.create_all(bind=engine)
 
 
-def delete_symtoken_table():
-    logger.info("Deleting Symtoken Table")
-    SymToken.query.delete()
-    db_session.commit()
-
-
-def copy_from_dataframe(df):
-    logger.info("Performing Bulk Insert")
-    data_dict = df.to_dict(orient="records")
-
-    existing_tokens = {result.token for result in db_session.query(SymToken.token).all()}
-    filtered_data_dict = [row for row in data_dict if row["token"] not in existing_tokens]
-
-    try:
-        if filtered_data_dict:
-            db_session.bulk_insert_mappings(SymToken, filtered_data_dict)
-            db_session.commit()
-            logger.info(
-                f"Bulk insert completed successfully with {len(filtered_data_dict)} new records."
-            )
-        else:
-            logger.info("No new records to insert.")
-    except Exception as e:
-        logger.error(f"Error during bulk insert: {e}")
-        db_session.rollback()
-
-
 def get_index_data():
     """
     Returns a DataFrame with index data for Samco.
@@ -768,8 +742,7 @@ def master_contract_download():
             os.remove(output_path)
             logger.info(f"Deleted temporary file {output_path}")
 
-        delete_symtoken_table()
-        copy_from_dataframe(token_df)
+        sync_master_contract(token_df, SymToken, db_session)
 
         return socketio.emit(
             "master_contract_download", {"status": "success", "message": "Successfully Downloaded"}
@@ -14,6 +14,15 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 
 from database.auth_db import get_auth_token
 from database.engine_factory import create_db_engine
+from database.master_contract_normalize import (
+    BSE_INDEX_SYMBOLS,
+    NSE_INDEX_SYMBOLS,
+    fno_symbols,
+    format_expiry,
+    join_spaced_symbols,
+    map_index_symbols,
+)
+from database.master_contract_sync import sync_master_contract
 from extensions import socketio  # Import SocketIO
 from utils.httpx_client import get_httpx_client
 from utils.logging import get_logger
@@ -52,35 +61,6 @@ def init_db():
     logger.info("Initializing Master Contract DB")
     Base.metadata.create_all(bind=engine)
 
-def delete_symtoken_table():
-    logger.info("Deleting Symtoken Table")
-    SymToken.query.delete()
-    db_session.commit()
-
-def copy_from_dataframe(df):
-    logger.info("Performing Bulk Insert")
-    # Convert DataFrame to a list of dictionaries
-    data_dict = df.to_dict(orient='records')
-
-    # Retrieve existing tokens to filter them out from the insert
-    existing_tokens = {result.token for result in db_session.query(SymToken.token).all()}
-
-    # Filter out data_dict entries with tokens that already exist
-    filtered_data_dict = [row for row in data_dict if row['token'] not in existing_tokens]
-
-    # Insert in bulk the filtered records
-    try:
-        if filtered_data_dict:  # Proceed only if there's anything to insert
-            db_session.bulk_insert_mappings(SymToken, filtered_data_dict)
-            db_session.commit()
-            logger.info(f"Bulk insert completed successfully with {len(filtered_data_dict)} new records.")
-        else:
-            logger.info("No new records to insert.")
-    except Exception as e:
-        logger.error(f"Error during bulk insert: {e}")
-        db_session.rollback()
-
-
 def download_csv_zerodha_data(output_path):
     """
     Downloads the CSV file from Zerodha using Auth Credentials, saves it to the specified path and convert.
@@ -134,27 +114,6 @@ def download_csv_zerodha_data(output_path):
         raise
 
 
-def reformat_symbol(row):
-    symbol = row['symbol']
-    instrument_type = row['instrumenttype']
-
-    if instrument_type == 'FUT':
-        # For FUT, remove the spaces and append 'FUT' at the end
-        parts = symbol.split(' ')
-        if len(parts) == 5:  # Make sure the symbol has the correct format
-            symbol = parts[0] + parts[2] + parts[3] + parts[4] + parts[1]
-    elif instrument_type in ['CE', 'PE']:
-        # For CE/PE, rearrange the parts and remove spaces
-        parts = symbol.split(' ')
-        if len(parts) == 6:  # Make sure the symbol has the correct format
-            symbol = parts[0] + parts[3] + parts[4] + parts[5] + parts[1] + parts[2]
-    else:
-        symbol = symbol  # No change for other instrument types
-
-    return symbol
-
-
-
 def process_zerodha_csv(path):
     """
     Processes the Zerodha CSV file to fit the existing database schema and performs exchange name mapping.
@@ -194,7 +153,7 @@ def process_zerodha_csv(path):
     df.loc[(df['segment'] == 'INDICES') & (df['exchange'] == 'CDS'), 'exchange'] = 'CDS_INDEX'
 
     # Format expiry date
-    df['expiry'] = pd.to_datetime(df['expiry']).dt.strftime('%d-%b-%y').str.upper()
+    df['expiry'] = format_expiry(df['expiry'])
 
     # Combine instrument_token and exchange_token
     df['token'] = df['instrument_token'].astype(str) + '::::' + df['exchange_token'].astype(str)
@@ -214,135 +173,21 @@ def process_zerodha_csv(path):
     })
 
     df['brsymbol'] = df['symbol']
-    df['symbol'] = df.apply(reformat_symbol, axis=1)
+    df['symbol'] = join_spaced_symbols(df['symbol'], df['instrumenttype'])
     df['brexchange'] = df['_kite_exchange']
     df = df.drop(columns=['_kite_exchange'])
 
     # Fill NaN values in the 'expiry' column with an empty string
     df['expiry'] = df['expiry'].fillna('')
 
-    # Futures Symbol Update
-    df.loc[(df['instrumenttype'] == 'FUT'), 'symbol'] = df['name'] + df['expiry'].str.replace('-', '', regex=False) + 'FUT'
-
-    # Options Symbol Update
-
-    def format_strike(strike):
-        # Convert to float, then to int only if it's a whole number (e.g., 190 -> "190")
-        # Preserve decimal strikes (e.g., 187.5 -> "187.5")
-        val = float(strike)
-        return str(int(val)) if val == int(val) else str(val)
-
-
-    df.loc[(df['instrumenttype'] == 'CE'), 'symbol'] = df['name'] + df['expiry'].str.replace('-', '', regex=False) + df['strike'].apply(format_strike) + df['instrumenttype']
-    df.loc[(df['instrumenttype'] == 'PE'), 'symbol'] = df['name'] + df['expiry'].str.replace('-', '', regex=False) + df['strike'].apply(format_strike) + df['instrumenttype']
-
-    # NSE Index Symbol Mapping (Zerodha tradingsymbol → OpenAlgo format)
-    df['symbol'] = df['symbol'].replace({
-        # Major NSE Indices
-        'NIFTY 50': 'NIFTY',
-        'NIFTY NEXT 50': 'NIFTYNXT50',
-        'NIFTY FIN SERVICE': 'FINNIFTY',
-        'NIFTY BANK': 'BANKNIFTY',
-        'NIFTY MID SELECT': 'MIDCPNIFTY',
-        'INDIA VIX': 'INDIAVIX',
-        'HANGSENG BEES NAV': 'HANGSENGBEESNAV',
-        # Broad Market Indices
-        'NIFTY 100': 'NIFTY100',
-        'NIFTY 200': 'NIFTY200',
-        'NIFTY 500': 'NIFTY500',
-        # Sectoral Indices
-        'NIFTY ALPHA 50': 'NIFTYALPHA50',
-        'NIFTY AUTO': 'NIFTYAUTO',
-        'NIFTY COMMODITIES': 'NIFTYCOMMODITIES',
-        'NIFTY CONSUMPTION': 'NIFTYCONSUMPTION',
-        'NIFTY CPSE': 'NIFTYCPSE',
-        'NIFTY DIV OPPS 50': 'NIFTYDIVOPPS50',
-        'NIFTY ENERGY': 'NIFTYENERGY',
-        'NIFTY FMCG': 'NIFTYFMCG',
-        'NIFTY GROWSECT 15': 'NIFTYGROWSECT15',
-        'NIFTY INFRA': 'NIFTYINFRA',
-        'NIFTY IT': 'NIFTYIT',
-        'NIFTY MEDIA': 'NIFTYMEDIA',
-        'NIFTY METAL': 'NIFTYMETAL',
-        'NIFTY MNC': 'NIFTYMNC',
-        'NIFTY PHARMA': 'NIFTYPHARMA',
-        'NIFTY PSE': 'NIFTYPSE',
-        'NIFTY PSU BANK': 'NIFTYPSUBANK',
-        'NIFTY PVT BANK': 'NIFTYPVTBANK',
-        'NIFTY REALTY': 'NIFTYREALTY',
-        'NIFTY SERV SECTOR': 'NIFTYSERVSECTOR',
-        # Market Cap Indices
-        'NIFTY MID LIQ 15': 'NIFTYMIDLIQ15',
-        'NIFTY MIDCAP 50': 'NIFTYMIDCAP50',
-        'NIFTY MIDCAP 100': 'NIFTYMIDCAP100',
-        'NIFTY MIDCAP 150': 'NIFTYMIDCAP150',
-        'NIFTY MIDSML 400': 'NIFTYMIDSML400',
-        'NIFTY SMLCAP 50': 'NIFTYSMLCAP50',
-        'NIFTY SMLCAP 100': 'NIFTYSMLCAP100',
-        'NIFTY SMLCAP 250': 'NIFTYSMLCAP250',
-        # Strategy Indices
-        'NIFTY100 EQL WGT': 'NIFTY100EQLWGT',
-        'NIFTY100 LIQ 15': 'NIFTY100LIQ15',
-        'NIFTY100 LOWVOL30': 'NIFTY100LOWVOL30',
-        'NIFTY100 QUALTY30': 'NIFTY100QUALTY30',
-        'NIFTY200 QUALTY30': 'NIFTY200QUALTY30',
-        'NIFTY50 DIV POINT': 'NIFTY50DIVPOINT',
-        'NIFTY50 EQL WGT': 'NIFTY50EQLWGT',
-        'NIFTY50 PR 1X INV': 'NIFTY50PR1XINV',
-        'NIFTY50 PR 2X LEV': 'NIFTY50PR2XLEV',
-        'NIFTY50 TR 1X INV': 'NIFTY50TR1XINV',
-        'NIFTY50 TR 2X LEV': 'NIFTY50TR2XLEV',
-        'NIFTY50 VALUE 20': 'NIFTY50VALUE20',
-        # Government Securities Indices
-        'NIFTY GS 10YR': 'NIFTYGS10YR',
-        'NIFTY GS 10YR CLN': 'NIFTYGS10YRCLN',
-        'NIFTY GS 11 15YR': 'NIFTYGS1115YR',
-        'NIFTY GS 15YRPLUS': 'NIFTYGS15YRPLUS',
-        'NIFTY GS 4 8YR': 'NIFTYGS48YR',
-        'NIFTY GS 8 13YR': 'NIFTYGS813YR',
-        'NIFTY GS COMPSITE': 'NIFTYGSCOMPSITE',
-    })
+    # Futures and options in the OpenAlgo format
+    df['symbol'] = fno_symbols(df['symbol'], df['instrumenttype'], df['name'], df['expiry'], df['strike'])
 
-    # BSE Index Symbol Mapping (applied only to BSE_INDEX rows to avoid
-    # conflicts with equity symbols that may share short names like AUTO, METAL)
-    bse_idx_mask = df['exchange'] == 'BSE_INDEX'
-    df.loc[bse_idx_mask, 'symbol'] = df.loc[bse_idx_mask, 'symbol'].replace({
-        'SNSX50': 'SENSEX50',
-        'SNXT50': 'BSESENSEXNEXT50',
-        'MID150': 'BSE150MIDCAPINDEX',
-        'LMI250': 'BSE250LARGEMIDCAPINDEX',
-        'MSL400': 'BSE400MIDSMALLCAPINDEX',
-        'AUTO': 'BSEAUTO',
-        'BSE CG': 'BSECAPITALGOODS',
-        'CARBON': 'BSECARBONEX',
-        'BSE CD': 'BSECONSUMERDURABLES',
-        'CPSE': 'BSECPSE',
-        'DOL100': 'BSEDOLLEX100',
-        'DOL200': 'BSEDOLLEX200',
-        'DOL30': 'BSEDOLLEX30',
-        'ENERGY': 'BSEENERGY',
-        'BSEFMC': 'BSEFASTMOVINGCONSUMERGOODS',
-        'FINSER': 'BSEFINANCIALSERVICES',
-        'GREENX': 'BSEGREENEX',
-        'BSE HC': 'BSEHEALTHCARE',
-        'INFRA': 'BSEINDIAINFRASTRUCTUREINDEX',
-        'INDSTR': 'BSEINDUSTRIALS',
-        'BSE IT': 'BSEINFORMATIONTECHNOLOGY',
-        'BSEIPO': 'BSEIPO',
-        'LRGCAP': 'BSELARGECAP',
-        'METAL': 'BSEMETAL',
-        'MIDCAP': 'BSEMIDCAP',
-        'MIDSEL': 'BSEMIDCAPSELECTINDEX',
-        'OILGAS': 'BSEOIL&GAS',
-        'POWER': 'BSEPOWER',
-        'BSEPSU': 'BSEPSU',
-        'REALTY': 'BSEREALTY',
-        'SMLCAP': 'BSESMALLCAP',
-        'SMLSEL': 'BSESMALLCAPSELECTINDEX',
-        'SMEIPO': 'BSESMEIPO',
-        'TECK': 'BSETECK',
-        'TELCOM': 'BSETELECOM',
-    })
+    # Index Symbol Mapping (Zerodha tradingsymbol → OpenAlgo format). The BSE
+    # codes apply only to BSE_INDEX rows to avoid conflicts with equity
+    # symbols that may share short names like AUTO, METAL
+    df['symbol'] = map_index_symbols(df['symbol'], NSE_INDEX_SYMBOLS)
+    df['symbol'] = map_index_symbols(df['symbol'], BSE_INDEX_SYMBOLS, df['exchange'] == 'BSE_INDEX')
 
     # GLOBAL_INDEX symbol normalisation (currently the lone NSE-IFSC GIFT NIFTY
     # row, which Zerodha ships with a literal space in the tradingsymbol).
@@ -381,8 +226,7 @@ def master_contract_download():
 
         #token_df = token_df.drop_duplicates(subset='symbol', keep='first')
 
-        delete_symtoken_table()  # Consider the implications of this action
-        copy_from_dataframe(token_df)
+        sync_master_contract(token_df, SymToken, db_session)
 
         return socketio.emit('master_contract_download', {'status': 'success', 'message': 'Successfully Downloaded'})
 
@@ -12,6 +12,7 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import NullPool
 from sqlalchemy.sql import func
 
+from utils.log_sink import get_sink
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -85,12 +86,25 @@ def init_db():
     init_db_with_logging(Base, engine, "Analyzer DB", logger)
 
 
-# Executor for asynchronous tasks
+# Executor for asynchronous tasks. Callers still submit async_log_analyzer
+# here; the row itself is committed by the batched log sink below.
 executor = ThreadPoolExecutor(10)  # Increased from 2 to 10 for better concurrency
 
 
+def _write_analyzer_logs(rows):
+    """Insert a batch of analyzer logs in one transaction. Runs on the log sink thread."""
+    try:
+        db_session.add_all([AnalyzerLog(**row) for row in rows])
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    finally:
+        db_session.remove()
+
+
 def async_log_analyzer(request_data, response_data, api_type="placeorder"):
-    """Asynchronously log analyzer request"""
+    """Queue an analyzer log entry; the ``analyzer_logs`` log sink commits it"""
     try:
         # Serialize JSON data for storage
         request_json = json.dumps(request_data)
@@ -100,16 +114,13 @@ def async_log_analyzer(request_data, response_data, api_type="placeorder"):
         ist = pytz.timezone("Asia/Kolkata")
         now_ist = datetime.now(ist)
 
-        analyzer_log = AnalyzerLog(
-            api_type=api_type,
-            request_data=request_json,
-            response_data=response_json,
-            created_at=now_ist,
+        get_sink("analyzer_logs", _write_analyzer_logs).submit(
+            {
+                "api_type": api_type,
+                "request_data": request_json,
+                "response_data": response_json,
+                "created_at": now_ist,
+            }
         )
-        db_session.add(analyzer_log)
-        db_session.commit()
     except Exception as e:
         logger.exception(f"Error saving analyzer log: {e}")
-        db_session.rollback()
-    finally:
-        db_session.remove()
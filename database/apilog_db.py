@@ -12,6 +12,7 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import NullPool
 from sqlalchemy.sql import func
 
+from utils.log_sink import get_sink
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -54,17 +55,29 @@ def init_db():
     init_db_with_logging(Base, engine, "API Log DB", logger)
 
 
-# Executor for asynchronous tasks
+# Executor for asynchronous tasks. Callers still submit async_log_order here;
+# the row itself is committed by the batched log sink below.
 executor = ThreadPoolExecutor(10)  # Increased from 2 to 10 for better concurrency
 
 
+def _write_order_logs(rows):
+    """Insert a batch of order logs in one transaction. Runs on the log sink thread."""
+    try:
+        db_session.add_all([OrderLog(**row) for row in rows])
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    finally:
+        db_session.remove()
+
+
 def async_log_order(api_type, request_data, response_data):
-    """Persist an API order log entry to the database.
+    """Queue an API order log entry for the database.
 
-    Note: Despite its name, this function executes **synchronously**.
-    It is designed to be submitted to a ``ThreadPoolExecutor`` by
-    callers so that the database write does not block the main
-    request thread.
+    The entry is serialized here and committed by the ``order_logs`` log sink
+    together with the others queued around it, so this never touches the
+    database and returns at once. Callers may still submit it to ``executor``.
 
     Args:
         api_type: The type of API call. Reserved values include:
@@ -89,15 +102,13 @@ def async_log_order(api_type, request_data, response_data):
         ist = pytz.timezone("Asia/Kolkata")
         now_ist = datetime.now(ist)
 
-        order_log = OrderLog(
-            api_type=api_type,
-            request_data=request_json,
-            response_data=response_json,
-            created_at=now_ist,
+        get_sink("order_logs", _write_order_logs).submit(
+            {
+                "api_type": api_type,
+                "request_data": request_json,
+                "response_data": response_json,
+                "created_at": now_ist,
+            }
         )
-        db_session.add(order_log)
-        db_session.commit()
     except Exception as e:
         logger.exception(f"Error saving order log: {e}")
-    finally:
-        db_session.remove()
@@ -1,6 +1,8 @@
 # database/auth_db.py
 
 import base64
+import hashlib
+import hmac
 import os
 
 from argon2 import PasswordHasher
@@ -25,6 +27,7 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import NullPool
 from sqlalchemy.sql import func
 
+from database.webhook_route_cache import invalidate_webhook_routes
 from utils.logging import get_logger
 
 # Initialize logger
@@ -214,6 +217,9 @@ class ApiKeys(Base):
     user_id = Column(String, nullable=False, unique=True)
     api_key_hash = Column(Text, nullable=False)  # For verification
     api_key_encrypted = Column(Text, nullable=False)  # For retrieval
+    # HMAC-SHA256(PEPPER, api_key): finds the one row to Argon2-verify.
+    # NULL for keys stored before the column existed until they are backfilled.
+    api_key_fingerprint = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), default=func.now())
     order_mode = Column(String(20), default="auto")  # 'auto' or 'semi_auto'
 
@@ -221,6 +227,7 @@ class ApiKeys(Base):
     __table_args__ = (
         Index("idx_api_keys_order_mode", "order_mode"),  # Speeds up filtering by order mode
         Index("idx_api_keys_created_at", "created_at"),  # Speeds up time-based queries
+        Index("idx_api_keys_fingerprint", "api_key_fingerprint"),  # verify_api_key lookup
     )
 
 
@@ -430,6 +437,38 @@ def init_db():
     from database.db_init_helper import init_db_with_logging
 
     init_db_with_logging(Base, engine, "Auth DB", logger)
+    try:
+        _ensure_api_key_fingerprint_column()
+    except Exception:
+        logger.exception("Auth DB: api_key_fingerprint migration failed (continuing)")
+
+
+def _ensure_api_key_fingerprint_column():
+    """Add api_keys.api_key_fingerprint to a table created before it existed.
+
+    create_all does not add columns to existing tables, and every ApiKeys query
+    selects the column, so an install that has not run
+    upgrade/migrate_api_key_fingerprint.py would otherwise fail to verify any
+    key. Existing rows stay NULL; verify_api_key backfills them on first use.
+    SQLite only, like the other boot-time column migrations.
+    """
+    if "sqlite" not in (DATABASE_URL or ""):
+        return
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        existing = {row[1] for row in conn.execute(text("PRAGMA table_info(api_keys)"))}
+        if "api_key_fingerprint" in existing:
+            return
+        logger.info("Auth DB: adding missing column api_keys.api_key_fingerprint")
+        conn.execute(text("ALTER TABLE api_keys ADD COLUMN api_key_fingerprint VARCHAR(64)"))
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_api_keys_fingerprint "
+                "ON api_keys (api_key_fingerprint)"
+            )
+        )
+        conn.commit()
 
 
 def safe_decrypt_token(value):
@@ -817,9 +856,20 @@ def invalidate_user_cache(user_id):
     verified_api_key_cache.clear()
     invalid_api_key_cache.clear()
     order_mode_cache.clear()
+    # Webhook routes carry the user's decrypted API key
+    invalidate_webhook_routes()
     logger.info(f"Cleared all caches for user_id: {user_id}")
 
 
+def api_key_fingerprint(api_key):
+    """Lookup key for an API key: HMAC-SHA256 keyed with the pepper.
+
+    Not a secret on its own (without PEPPER it cannot be checked against a
+    guess), it only tells verify_api_key which stored Argon2 hash to verify.
+    """
+    return hmac.new(PEPPER.encode(), api_key.encode(), hashlib.sha256).hexdigest()
+
+
 def upsert_api_key(user_id, api_key):
     """Store both hashed and encrypted API key"""
     # Hash with Argon2 for verification
@@ -828,14 +878,19 @@ def upsert_api_key(user_id, api_key):
 
     # Encrypt for retrieval
     encrypted_key = encrypt_token(api_key)
+    fingerprint = api_key_fingerprint(api_key)
 
     api_key_obj = ApiKeys.query.filter_by(user_id=user_id).first()
     if api_key_obj:
         api_key_obj.api_key_hash = hashed_key
         api_key_obj.api_key_encrypted = encrypted_key
+        api_key_obj.api_key_fingerprint = fingerprint
     else:
         api_key_obj = ApiKeys(
-            user_id=user_id, api_key_hash=hashed_key, api_key_encrypted=encrypted_key
+            user_id=user_id,
+            api_key_hash=hashed_key,
+            api_key_encrypted=encrypted_key,
+            api_key_fingerprint=fingerprint,
         )
         db_session.add(api_key_obj)
     db_session.commit()
@@ -926,22 +981,28 @@ def verify_api_key(provided_api_key):
         logger.debug(f"API key verified from cache for user_id: {user_id}")
         return user_id
 
-    # Step 3: Cache miss - perform expensive Argon2 verification
+    # Step 3: Cache miss - one Argon2 verification against the row whose
+    # fingerprint matches; rows stored before fingerprints existed are
+    # verified in turn and backfilled when one matches
     peppered_key = provided_api_key + PEPPER
+    fingerprint = api_key_fingerprint(provided_api_key)
     try:
-        # Query all API keys
-        api_keys = ApiKeys.query.all()
+        candidates = ApiKeys.query.filter_by(api_key_fingerprint=fingerprint).all()
+        legacy = not candidates
+        if legacy:
+            candidates = ApiKeys.query.filter(ApiKeys.api_key_fingerprint.is_(None)).all()
 
-        # Try to verify against each stored hash
-        for api_key_obj in api_keys:
+        for api_key_obj in candidates:
             try:
                 ph.verify(api_key_obj.api_key_hash, peppered_key)
-                # Valid key found - cache it
-                verified_api_key_cache[cache_key] = api_key_obj.user_id
-                logger.debug(f"API key verified and cached for user_id: {api_key_obj.user_id}")
-                return api_key_obj.user_id
             except VerifyMismatchError:
                 continue
+            if legacy:
+                _backfill_api_key_fingerprint(api_key_obj, fingerprint)
+            # Valid key found - cache it
+            verified_api_key_cache[cache_key] = api_key_obj.user_id
+            logger.debug(f"API key verified and cached for user_id: {api_key_obj.user_id}")
+            return api_key_obj.user_id
 
         # If we reach here, the API key is invalid
         # Cache the invalid result to prevent repeated expensive verifications
@@ -971,6 +1032,17 @@ def verify_api_key(provided_api_key):
         return None
 
 
+def _backfill_api_key_fingerprint(api_key_obj, fingerprint):
+    """Record the fingerprint of a key stored before fingerprints existed."""
+    try:
+        api_key_obj.api_key_fingerprint = fingerprint
+        db_session.commit()
+        logger.info(f"Backfilled API key fingerprint for user_id: {api_key_obj.user_id}")
+    except Exception as e:
+        db_session.rollback()
+        logger.warning(f"Could not backfill API key fingerprint: {e}")
+
+
 def get_username_by_apikey(provided_api_key):
     """Get username for a given API key"""
     return verify_api_key(provided_api_key)
@@ -31,7 +31,8 @@ def restore_symbol_cache() -> dict:
     Restore symbol cache from database on startup.
 
     Loads all symbols from the symtoken table into the in-memory
-    BrokerSymbolCache for fast O(1) lookups.
+    BrokerSymbolCache for fast O(1) lookups, mapping the cache's on-disk
+    snapshot instead when it matches the current master contract.
 
     Returns:
         dict: Statistics about the restoration
@@ -7,6 +7,13 @@ from sqlalchemy.orm import relationship, scoped_session, sessionmaker
 from sqlalchemy.pool import NullPool
 from sqlalchemy.sql import func
 
+from database.webhook_route_cache import (
+    SymbolRoute,
+    WebhookRoute,
+    WebhookRouteCache,
+    invalidate_webhook_routes,
+)
+
 logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -90,6 +97,7 @@ def create_strategy(
         )
         db_session.add(strategy)
         db_session.commit()
+        invalidate_webhook_routes()
         return strategy
     except Exception as e:
         logger.exception(f"Error creating strategy: {str(e)}")
@@ -140,6 +148,7 @@ def delete_strategy(strategy_id):
         if strategy:
             db_session.delete(strategy)
             db_session.commit()
+            invalidate_webhook_routes()
             return True
         return False
     except Exception as e:
@@ -155,6 +164,7 @@ def toggle_strategy(strategy_id):
         if strategy:
             strategy.is_active = not strategy.is_active
             db_session.commit()
+            invalidate_webhook_routes()
             return strategy
         return None
     except Exception as e:
@@ -175,6 +185,7 @@ def update_strategy_times(strategy_id, start_time=None, end_time=None, squareoff
             if squareoff_time is not None:
                 strategy.squareoff_time = squareoff_time
             db_session.commit()
+            invalidate_webhook_routes()
             return strategy
         return None
     except Exception as e:
@@ -195,6 +206,7 @@ def add_symbol_mapping(strategy_id, chartink_symbol, exchange, quantity, product
         )
         db_session.add(mapping)
         db_session.commit()
+        invalidate_webhook_routes()
         return mapping
     except Exception as e:
         logger.exception(f"Error adding symbol mapping: {str(e)}")
@@ -215,6 +227,7 @@ def bulk_add_symbol_mappings(strategy_id, mappings):
             )
             db_session.add(mapping)
         db_session.commit()
+        invalidate_webhook_routes()
         return True
     except Exception as e:
         logger.exception(f"Error bulk adding symbol mappings: {str(e)}")
@@ -238,9 +251,55 @@ def delete_symbol_mapping(mapping_id):
         if mapping:
             db_session.delete(mapping)
             db_session.commit()
+            invalidate_webhook_routes()
             return True
         return False
     except Exception as e:
         logger.exception(f"Error deleting symbol mapping {mapping_id}: {str(e)}")
         db_session.rollback()
         return False
+
+
+def _load_webhook_route(webhook_id):
+    """Build the WebhookRoute for a webhook id; None if there is no such strategy"""
+    from database.auth_db import get_api_key_for_tradingview
+
+    try:
+        strategy = ChartinkStrategy.query.filter_by(webhook_id=webhook_id).first()
+        if not strategy:
+            return None
+
+        mappings = {
+            m.chartink_symbol: SymbolRoute(
+                m.chartink_symbol, m.exchange, m.quantity, m.product_type
+            )
+            for m in ChartinkSymbolMapping.query.filter_by(strategy_id=strategy.id)
+            .order_by(ChartinkSymbolMapping.id)
+            .all()
+        }
+
+        return WebhookRoute(
+            id=strategy.id,
+            name=strategy.name,
+            user_id=strategy.user_id,
+            is_active=bool(strategy.is_active),
+            is_intraday=bool(strategy.is_intraday),
+            trading_mode="",  # Chartink alerts carry their own action
+            start_time=strategy.start_time,
+            end_time=strategy.end_time,
+            squareoff_time=strategy.squareoff_time,
+            mappings=mappings,
+            api_key=get_api_key_for_tradingview(strategy.user_id),
+        )
+    except Exception as e:
+        logger.exception(f"Error loading webhook route {webhook_id}: {str(e)}")
+        return None
+
+
+# Webhook routing snapshots, rebuilt after any strategy or mapping edit
+webhook_routes = WebhookRouteCache(_load_webhook_route)
+
+
+def get_webhook_route(webhook_id):
+    """Get the cached routing snapshot for a webhook: strategy, windows, mappings and API key"""
+    return webhook_routes.get(webhook_id)
@@ -0,0 +1,138 @@
+"""
+F&O filter columns and option-chain slices for BrokerSymbolCache.
+
+fno_search_symbols used to walk every row of an exchange in Python, testing
+the underlying, expiry, symbol suffix and strike of each one, and an option
+chain was put together from one such walk (or one database query) per strike.
+
+FnoChainIndex keeps what those filters need as NumPy columns aligned with the
+store's rows -- the instrument kind from the symbol suffix and a PERPFUT flag
+-- next to the store's own underlying/expiry codes and strikes, so a filter is
+a few vectorized comparisons. It also groups every option row by (exchange,
+underlying, expiry), sorted by strike and then CE before PE. A chain, or any
+strike window of it, is then a dict lookup, two binary searches and a slice.
+
+Everything here is derived from the store in one pass, so it is rebuilt on
+load and on snapshot restore rather than saved.
+"""
+
+import sys
+
+import numpy as np
+
+# Instrument kind by OpenAlgo symbol suffix, as fno_search_symbols filters it.
+KIND_OTHER = 0
+KIND_CE = 1
+KIND_PE = 2
+KIND_FUT = 3
+
+_KINDS = {"CE": KIND_CE, "PE": KIND_PE, "FUT": KIND_FUT}
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def symbol_kind(symbol: str) -> int:
+    """KIND_* for a symbol: CE/PE/FUT suffix, case-insensitive."""
+    tail = symbol[-3:].upper()
+    if tail.endswith("CE"):
+        return KIND_CE
+    if tail.endswith("PE"):
+        return KIND_PE
+    if tail == "FUT":
+        return KIND_FUT
+    return KIND_OTHER
+
+
+class FnoChainIndex:
+    """Kind columns and strike-sorted option chains over a finished SymbolStore."""
+
+    def __init__(self, store):
+        self.kinds = np.fromiter(
+            (symbol_kind(s) for s in store.symbol), dtype=np.int8, count=len(store)
+        )
+        perpetual = self._by_code(
+            store.instrumenttype, lambda v: bool(v) and v.upper() == "PERPFUT"
+        )
+        self.perpetual = perpetual[store.instrumenttype.codes]
+
+        # Option rows that belong to a chain: an underlying, an expiry and a strike
+        has_underlying = self._by_code(store.underlying, bool)
+        has_expiry = self._by_code(store.expiry, bool)
+        rows = np.flatnonzero(
+            ((self.kinds == KIND_CE) | (self.kinds == KIND_PE))
+            & has_underlying[store.underlying.codes]
+            & has_expiry[store.expiry.codes]
+            & ~np.isnan(store.strike)
+        )
+
+        exchanges = store.exchange.codes[rows]
+        underlyings = store.underlying.codes[rows]
+        expiries = store.expiry.codes[rows]
+        strikes = store.strike[rows]
+        # Last key is the primary one; rows tied on everything keep load order
+        order = np.lexsort((rows, self.kinds[rows], strikes, expiries, underlyings, exchanges))
+        self.chain_rows = rows[order].astype(np.int32)
+        self.chain_strikes = strikes[order]
+
+        self._chains: dict[tuple[str, str, str], tuple[int, int]] = {}
+        if len(rows):
+            exchanges, underlyings, expiries = exchanges[order], underlyings[order], expiries[order]
+            changed = (
+                (exchanges[1:] != exchanges[:-1])
+                | (underlyings[1:] != underlyings[:-1])
+                | (expiries[1:] != expiries[:-1])
+            )
+            starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+            ends = np.append(starts[1:], len(rows))
+            for start, end in zip(starts.tolist(), ends.tolist(), strict=True):
+                key = (
+                    store.exchange.values[exchanges[start]],
+                    store.underlying.values[underlyings[start]],
+                    store.expiry.values[expiries[start]],
+                )
+                self._chains[key] = (start, end)
+
+    @staticmethod
+    def _by_code(column, predicate) -> np.ndarray:
+        """``predicate`` of each distinct value of an interned column, by code."""
+        return np.array([predicate(v) for v in column.values], dtype=bool)
+
+    def chain(
+        self,
+        exchange: str,
+        underlying: str,
+        expiry: str,
+        strike_min: float | None = None,
+        strike_max: float | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Row ids and strikes of one chain, by strike then CE before PE.
+
+        Empty arrays if the exchange has no such underlying and expiry.
+        """
+        bounds = self._chains.get((exchange, underlying, expiry))
+        if bounds is None:
+            return _EMPTY, np.empty(0, dtype=np.float64)
+        start, end = bounds
+        strikes = self.chain_strikes[start:end]
+        lo = 0 if strike_min is None else int(np.searchsorted(strikes, strike_min, "left"))
+        hi = len(strikes) if strike_max is None else int(np.searchsorted(strikes, strike_max, "right"))
+        return self.chain_rows[start + lo : start + hi], strikes[lo:hi]
+
+    def kind_mask(self, rows: np.ndarray, inst_type: str) -> np.ndarray | None:
+        """Which ``rows`` have instrument type ``inst_type`` ("CE", "PE", "FUT" or
+        "PERPFUT"); None for any other type, which does not filter."""
+        if inst_type == "PERPFUT":
+            return self.perpetual[rows]
+        kind = _KINDS.get(inst_type)
+        if kind is None:
+            return None
+        return self.kinds[rows] == kind
+
+    def memory_bytes(self) -> int:
+        return (
+            self.kinds.nbytes
+            + self.perpetual.nbytes
+            + self.chain_rows.nbytes
+            + self.chain_strikes.nbytes
+            + sys.getsizeof(self._chains)
+            + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self._chains.items())
+        )
@@ -6,7 +6,10 @@ High-performance columnar storage for historical market data.
 Optimized for backtesting and analytical queries.
 """
 
+import atexit
 import os
+import threading
+import time
 from contextlib import contextmanager
 from datetime import date, datetime
 from pathlib import Path
@@ -45,13 +48,172 @@ def ensure_db_directory():
         logger.info(f"Created database directory: {db_dir}")
 
 
+class _ConnectionManager:
+    """Process-wide DuckDB handle for Historify.
+
+    Opening the file on every call paid connection setup each time and, once
+    the last connection closed, threw away DuckDB's buffer cache - every chart
+    load started cold. The database is now opened once. Writers share one
+    cursor behind a lock, so download jobs and schedules apply their writes one
+    at a time; readers each get their own cursor on the same database and run
+    concurrently with each other and with the writer.
+
+    DuckDB refuses a second read_only open of a file this process already
+    holds read-write, so the read side is cursors rather than separate
+    read-only connections. They share the buffer cache, which is the point.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._writer = None
+        self._open_lock = threading.Lock()
+        # Reentrant: a write helper may call another one on the same thread.
+        self._write_lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "opens": 0,
+            "writes": 0,
+            "write_wait_total": 0.0,
+            "write_wait_max": 0.0,
+            "reads": 0,
+            "active_reads": 0,
+        }
+
+    def _get_root(self, max_retries: int, retry_delay: float):
+        """Open the database on first use, with the Windows file-lock retry."""
+        if self._root is not None:
+            return self._root
+
+        with self._open_lock:
+            if self._root is not None:
+                return self._root
+
+            ensure_db_directory()
+            db_path = get_db_path()
+            last_error = None
+
+            for attempt in range(max_retries):
+                try:
+                    import duckdb
+
+                    self._root = duckdb.connect(db_path)
+                    with self._stats_lock:
+                        self._stats["opens"] += 1
+                    return self._root
+                except Exception as e:
+                    last_error = e
+                    if attempt < max_retries - 1:
+                        logger.debug(
+                            f"DuckDB connection attempt {attempt + 1} failed, retrying: {e}"
+                        )
+                        time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
+                    else:
+                        logger.exception(
+                            f"Failed to connect to DuckDB after {max_retries} attempts: {e}"
+                        )
+
+            raise last_error or Exception("Failed to connect to DuckDB")
+
+    def _cursor(self, max_retries: int, retry_delay: float):
+        root = self._get_root(max_retries, retry_delay)
+        # Creating a cursor touches the root connection, which is not safe to
+        # share between threads unguarded; using the cursor afterwards is.
+        with self._open_lock:
+            return root.cursor()
+
+    def _discard_if_invalidated(self, error: Exception):
+        """Drop the handle after a fatal error so the next call reopens it.
+
+        DuckDB invalidates a database after e.g. a failed checkpoint or a full
+        disk, and every later statement on it fails the same way.
+        """
+        if "invalidated" in str(error).lower():
+            logger.error(f"Historify database invalidated, reopening on next use: {error}")
+            self.close()
+
+    @contextmanager
+    def write(self, max_retries: int, retry_delay: float):
+        start = time.perf_counter()
+        with self._write_lock:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self._stats["writes"] += 1
+                self._stats["write_wait_total"] += waited
+                self._stats["write_wait_max"] = max(self._stats["write_wait_max"], waited)
+
+            if self._writer is None:
+                self._writer = self._cursor(max_retries, retry_delay)
+            try:
+                yield self._writer
+            except Exception as e:
+                # The writer cursor outlives this call; never hand the next
+                # caller a transaction this one left open.
+                try:
+                    self._writer.execute("ROLLBACK")
+                except Exception:
+                    pass
+                self._discard_if_invalidated(e)
+                raise
+
+    @contextmanager
+    def read(self, max_retries: int, retry_delay: float):
+        cursor = self._cursor(max_retries, retry_delay)
+        with self._stats_lock:
+            self._stats["reads"] += 1
+            self._stats["active_reads"] += 1
+        try:
+            yield cursor
+        except Exception as e:
+            self._discard_if_invalidated(e)
+            raise
+        finally:
+            with self._stats_lock:
+                self._stats["active_reads"] -= 1
+            cursor.close()
+
+    def close(self):
+        """Close the database. The next get_connection() reopens it."""
+        with self._write_lock, self._open_lock:
+            for conn in (self._writer, self._root):
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            self._writer = None
+            self._root = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        writes = stats.pop("writes")
+        total = stats.pop("write_wait_total")
+        return {
+            "open": self._root is not None,
+            "opens": stats["opens"],
+            "writes": writes,
+            "write_wait_avg_ms": round(total * 1000 / writes, 3) if writes else 0.0,
+            "write_wait_max_ms": round(stats["write_wait_max"] * 1000, 3),
+            "reads": stats["reads"],
+            "active_reads": stats["active_reads"],
+        }
+
+
+_manager = _ConnectionManager()
+atexit.register(_manager.close)
+
+
 @contextmanager
 def get_connection(max_retries: int = 3, retry_delay: float = 0.5):
     """
-    Get a DuckDB connection with proper resource management and retry logic.
+    Get the Historify write connection.
+
+    Writes are serialized: the caller holds the process-wide write lock for the
+    duration of the ``with`` block, so keep it to the statements that write.
+    Read-only callers should use get_read_connection() instead.
 
-    DuckDB uses exclusive file locking on Windows. This function includes retry
-    logic to handle temporary file access conflicts in concurrent scenarios.
+    DuckDB uses exclusive file locking on Windows. Opening the database retries
+    to handle temporary file access conflicts; it happens once per process.
 
     Args:
         max_retries: Maximum number of connection attempts (default: 3)
@@ -59,36 +221,36 @@ def get_connection(max_retries: int = 3, retry_delay: float = 0.5):
 
     Usage:
         with get_connection() as conn:
-            result = conn.execute("SELECT * FROM market_data").fetchdf()
+            conn.execute("DELETE FROM watchlist WHERE symbol = ?", [symbol])
     """
-    import time
-
-    ensure_db_directory()
-    db_path = get_db_path()
-    conn = None
-    last_error = None
+    with _manager.write(max_retries, retry_delay) as conn:
+        yield conn
 
-    for attempt in range(max_retries):
-        try:
-            import duckdb
 
-            conn = duckdb.connect(db_path)
-            break
-        except Exception as e:
-            last_error = e
-            if attempt < max_retries - 1:
-                logger.debug(f"DuckDB connection attempt {attempt + 1} failed, retrying: {e}")
-                time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-            else:
-                logger.exception(f"Failed to connect to DuckDB after {max_retries} attempts: {e}")
+@contextmanager
+def get_read_connection(max_retries: int = 3, retry_delay: float = 0.5):
+    """
+    Get a read connection (a cursor on the shared database).
 
-    if conn is None:
-        raise last_error or Exception("Failed to connect to DuckDB")
+    Reads do not wait for each other or for a running write, and share DuckDB's
+    buffer cache, so repeated chart loads stay warm.
 
-    try:
+    Usage:
+        with get_read_connection() as conn:
+            result = conn.execute("SELECT * FROM market_data").fetchdf()
+    """
+    with _manager.read(max_retries, retry_delay) as conn:
         yield conn
-    finally:
-        conn.close()
+
+
+def get_connection_stats() -> dict[str, Any]:
+    """Connection manager metrics: write lock wait times and read counts."""
+    return _manager.stats()
+
+
+def close_connections():
+    """Close the shared database handle, e.g. before replacing the file."""
+    _manager.close()
 
 
 def init_database():
@@ -240,6 +402,38 @@ def init_database():
             )
         """)
 
+        # Materialized higher-timeframe rollups of 1m data (see ROLLUP_INTERVALS).
+        # No primary key: rows are only ever replaced by delete-then-insert
+        # under the write lock, and DuckDB's key checks make that slower.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS market_data_rollup (
+                symbol VARCHAR NOT NULL,
+                exchange VARCHAR NOT NULL,
+                interval VARCHAR NOT NULL,
+                market_open_seconds INTEGER NOT NULL,
+                timestamp BIGINT NOT NULL,
+                open DOUBLE NOT NULL,
+                high DOUBLE NOT NULL,
+                low DOUBLE NOT NULL,
+                close DOUBLE NOT NULL,
+                volume BIGINT NOT NULL,
+                oi BIGINT DEFAULT 0
+            )
+        """)
+
+        # One row per materialized rollup. A row here means the rollup is
+        # complete for all of the symbol's 1m data at that candle alignment.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_catalog (
+                symbol VARCHAR NOT NULL,
+                exchange VARCHAR NOT NULL,
+                interval VARCHAR NOT NULL,
+                market_open_seconds INTEGER NOT NULL,
+                built_at TIMESTAMP DEFAULT current_timestamp,
+                PRIMARY KEY (symbol, exchange, interval)
+            )
+        """)
+
         # Create indexes for common query patterns
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_market_data_timestamp
@@ -280,7 +474,7 @@ def init_database():
 
 def get_watchlist() -> list[dict[str, Any]]:
     """Get all symbols in the watchlist."""
-    with get_connection() as conn:
+    with get_read_connection() as conn:
         result = conn.execute("""
             SELECT id, symbol, exchange, display_name, added_at
             FROM watchlist
@@ -573,6 +767,15 @@ def upsert_market_data(df: pd.DataFrame, symbol: str, exchange: str, interval: s
                     oi = EXCLUDED.oi
             """)
 
+            if interval == "1m":
+                _refresh_rollups(
+                    conn,
+                    symbol.upper(),
+                    exchange.upper(),
+                    int(df["timestamp"].min()),
+                    int(df["timestamp"].max()),
+                )
+
             # Update catalog - check if exists first due to multiple constraints
             existing = conn.execute(
                 """
@@ -664,6 +867,13 @@ INTERVAL_MINUTES = {
     "1h": 60,
 }
 
+# Computed intervals kept as materialized rollups, maintained by
+# upsert_market_data. Custom intervals (25m, 2h, ...) still aggregate on the
+# fly. Every rollup interval must divide a day evenly: the candle grid is then
+# the same on every day, which is what lets a touched range be refreshed alone.
+ROLLUP_INTERVALS = COMPUTED_INTERVALS
+HISTORIFY_ROLLUPS_ENABLED = os.getenv("HISTORIFY_ROLLUPS", "true").lower() == "true"
+
 
 def parse_interval(interval: str) -> dict[str, Any] | None:
     """
@@ -857,7 +1067,7 @@ def get_ohlcv(
 
         query += " ORDER BY timestamp ASC"
 
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute(query, params).fetchdf()
 
         return result
@@ -953,59 +1163,34 @@ def _get_aggregated_ohlcv(
         # Get market open time for this exchange (in seconds from midnight)
         market_open_seconds = _get_market_open_seconds(exchange)
 
-        # IST timezone offset from UTC (5 hours 30 minutes = 19800 seconds)
-        # We need this because timestamps are in UTC epoch
-        ist_offset = 19800
-
-        # Candle alignment algorithm:
-        # 1. Convert UTC timestamp to IST by adding ist_offset
-        # 2. Get seconds from midnight: (timestamp + ist_offset) % 86400
-        # 3. Get trading seconds: seconds_from_midnight - market_open_seconds
-        # 4. Calculate bucket: (trading_seconds / interval_seconds) * interval_seconds
-        # 5. Candle start = day_start + market_open_seconds + bucket
-        #
-        # In SQL:
-        # day_start_utc = ((timestamp + ist_offset) / 86400) * 86400 - ist_offset
-        # seconds_from_midnight_ist = (timestamp + ist_offset) % 86400
-        # trading_seconds = seconds_from_midnight_ist - market_open_seconds
-        # bucket_offset = (trading_seconds / interval_seconds) * interval_seconds
-        # candle_timestamp = day_start_utc + market_open_seconds + bucket_offset
-
-        # Use FLOOR() to ensure proper integer division for candle alignment
-        # Without FLOOR(), floating-point division can cause incorrect bucketing
-        query = f"""
-            SELECT
-                (FLOOR((timestamp + {ist_offset}) / 86400) * 86400 - {ist_offset}) +
-                {market_open_seconds} +
-                FLOOR((((timestamp + {ist_offset}) % 86400) - {market_open_seconds}) / {interval_seconds}) * {interval_seconds}
-                as timestamp,
-                FIRST(open ORDER BY timestamp) as open,
-                MAX(high) as high,
-                MIN(low) as low,
-                LAST(close ORDER BY timestamp) as close,
-                SUM(volume) as volume,
-                LAST(oi ORDER BY timestamp) as oi
-            FROM market_data
-            WHERE symbol = ? AND exchange = ? AND interval = '1m'
-        """
-        params = [symbol.upper(), exchange.upper()]
-
-        if start_timestamp:
-            query += " AND timestamp >= ?"
-            params.append(start_timestamp)
-
-        if end_timestamp:
-            query += " AND timestamp <= ?"
-            params.append(end_timestamp)
+        if HISTORIFY_ROLLUPS_ENABLED and target_interval in ROLLUP_INTERVALS:
+            try:
+                return _get_rollup_ohlcv(
+                    symbol.upper(),
+                    exchange.upper(),
+                    target_interval,
+                    interval_seconds,
+                    market_open_seconds,
+                    start_timestamp,
+                    end_timestamp,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Rollup read failed for {symbol}:{exchange}:{target_interval}, "
+                    f"aggregating on the fly: {e}"
+                )
 
-        query += f"""
-            GROUP BY (FLOOR((timestamp + {ist_offset}) / 86400) * 86400 - {ist_offset}) +
-                     {market_open_seconds} +
-                     FLOOR((((timestamp + {ist_offset}) % 86400) - {market_open_seconds}) / {interval_seconds}) * {interval_seconds}
-            ORDER BY timestamp ASC
-        """
+        query, params = _aggregate_1m_sql(
+            symbol.upper(),
+            exchange.upper(),
+            interval_seconds,
+            market_open_seconds,
+            start_timestamp,
+            end_timestamp,
+        )
+        query += " ORDER BY timestamp ASC"
 
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute(query, params).fetchdf()
 
         return result
@@ -1015,6 +1200,275 @@ def _get_aggregated_ohlcv(
         return pd.DataFrame()
 
 
+# IST timezone offset from UTC (5 hours 30 minutes = 19800 seconds)
+IST_OFFSET_SECONDS = 19800
+
+
+def _bucket_sql(interval_seconds: int, market_open_seconds: int) -> str:
+    """SQL expression for the start of the candle a 1m ``timestamp`` falls in.
+
+    Candle alignment algorithm:
+    1. Convert UTC timestamp to IST by adding ist_offset
+    2. Get seconds from midnight: (timestamp + ist_offset) % 86400
+    3. Get trading seconds: seconds_from_midnight - market_open_seconds
+    4. Calculate bucket: (trading_seconds / interval_seconds) * interval_seconds
+    5. Candle start = day_start + market_open_seconds + bucket
+
+    Uses FLOOR() to ensure proper integer division for candle alignment.
+    Without FLOOR(), floating-point division can cause incorrect bucketing.
+    """
+    ist_offset = IST_OFFSET_SECONDS
+    return f"""(FLOOR((timestamp + {ist_offset}) / 86400) * 86400 - {ist_offset}) +
+                {market_open_seconds} +
+                FLOOR((((timestamp + {ist_offset}) % 86400) - {market_open_seconds}) / {interval_seconds}) * {interval_seconds}"""
+
+
+def _aggregate_1m_sql(
+    symbol: str,
+    exchange: str,
+    interval_seconds: int,
+    market_open_seconds: int,
+    start_timestamp: int | None = None,
+    end_timestamp: int | None = None,
+) -> tuple[str, list]:
+    """Aggregate-on-the-fly query over 1m data, without ORDER BY."""
+    bucket = _bucket_sql(interval_seconds, market_open_seconds)
+    query = f"""
+        SELECT
+            {bucket} as timestamp,
+            FIRST(open ORDER BY timestamp) as open,
+            MAX(high) as high,
+            MIN(low) as low,
+            LAST(close ORDER BY timestamp) as close,
+            SUM(volume) as volume,
+            LAST(oi ORDER BY timestamp) as oi
+        FROM market_data
+        WHERE symbol = ? AND exchange = ? AND interval = '1m'
+    """
+    params = [symbol, exchange]
+
+    if start_timestamp:
+        query += " AND timestamp >= ?"
+        params.append(start_timestamp)
+
+    if end_timestamp:
+        query += " AND timestamp <= ?"
+        params.append(end_timestamp)
+
+    query += f" GROUP BY {bucket}"
+    return query, params
+
+
+def _bucket_start(timestamp: int, interval_seconds: int, market_open_seconds: int) -> int:
+    """Python twin of _bucket_sql, valid when interval_seconds divides a day."""
+    return timestamp - (timestamp + IST_OFFSET_SECONDS - market_open_seconds) % interval_seconds
+
+
+def _insert_rollup_rows(
+    conn,
+    symbol: str,
+    exchange: str,
+    interval: str,
+    market_open_seconds: int,
+    start_timestamp: int | None = None,
+    end_timestamp: int | None = None,
+):
+    """Aggregate 1m rows in [start, end] into market_data_rollup."""
+    interval_seconds = INTERVAL_MINUTES[interval] * 60
+    select, params = _aggregate_1m_sql(
+        symbol, exchange, interval_seconds, market_open_seconds, start_timestamp, end_timestamp
+    )
+    conn.execute(
+        f"""
+        INSERT INTO market_data_rollup
+        (symbol, exchange, interval, market_open_seconds,
+         timestamp, open, high, low, close, volume, oi)
+        SELECT ?, ?, ?, ?, CAST(timestamp AS BIGINT), open, high, low, close, volume, oi
+        FROM ({select})
+    """,
+        [symbol, exchange, interval, market_open_seconds] + params,
+    )
+
+
+def _drop_rollups(conn, symbol: str, exchange: str):
+    """Forget every rollup of a symbol; the next read rebuilds what it needs."""
+    conn.execute(
+        "DELETE FROM market_data_rollup WHERE symbol = ? AND exchange = ?", [symbol, exchange]
+    )
+    conn.execute(
+        "DELETE FROM rollup_catalog WHERE symbol = ? AND exchange = ?", [symbol, exchange]
+    )
+
+
+def _refresh_rollups(conn, symbol: str, exchange: str, first_ts: int, last_ts: int):
+    """Re-aggregate only the candles an upsert of 1m data touched.
+
+    Called by upsert_market_data on the write connection. Only rollups that
+    already exist are maintained; the rest are built on first read. If the
+    refresh fails the symbol's rollups are dropped rather than left stale.
+    """
+    rollups = conn.execute(
+        """
+        SELECT interval, market_open_seconds FROM rollup_catalog
+        WHERE symbol = ? AND exchange = ?
+    """,
+        [symbol, exchange],
+    ).fetchall()
+    if not rollups:
+        return
+
+    try:
+        conn.execute("BEGIN TRANSACTION")
+        for interval, market_open_seconds in rollups:
+            interval_seconds = INTERVAL_MINUTES[interval] * 60
+            first_bucket = _bucket_start(first_ts, interval_seconds, market_open_seconds)
+            last_bucket = _bucket_start(last_ts, interval_seconds, market_open_seconds)
+            conn.execute(
+                """
+                DELETE FROM market_data_rollup
+                WHERE symbol = ? AND exchange = ? AND interval = ?
+                  AND market_open_seconds = ? AND timestamp BETWEEN ? AND ?
+            """,
+                [symbol, exchange, interval, market_open_seconds, first_bucket, last_bucket],
+            )
+            _insert_rollup_rows(
+                conn,
+                symbol,
+                exchange,
+                interval,
+                market_open_seconds,
+                first_bucket,
+                last_bucket + interval_seconds - 1,
+            )
+        conn.execute("COMMIT")
+    except Exception as e:
+        try:
+            conn.execute("ROLLBACK")
+        except Exception:
+            pass
+        logger.exception(f"Rollup refresh failed for {symbol}:{exchange}, dropping rollups: {e}")
+        _drop_rollups(conn, symbol, exchange)
+
+
+def _ensure_rollup(symbol: str, exchange: str, interval: str, market_open_seconds: int):
+    """Build the rollup on first use, or after the market open time changed."""
+    with get_read_connection() as conn:
+        built = conn.execute(
+            """
+            SELECT 1 FROM rollup_catalog
+            WHERE symbol = ? AND exchange = ? AND interval = ? AND market_open_seconds = ?
+        """,
+            [symbol, exchange, interval, market_open_seconds],
+        ).fetchone()
+    if built:
+        return
+
+    with get_connection() as conn:
+        # Re-check under the write lock: another request may have built it.
+        built = conn.execute(
+            """
+            SELECT 1 FROM rollup_catalog
+            WHERE symbol = ? AND exchange = ? AND interval = ? AND market_open_seconds = ?
+        """,
+            [symbol, exchange, interval, market_open_seconds],
+        ).fetchone()
+        if built:
+            return
+
+        conn.execute("BEGIN TRANSACTION")
+        conn.execute(
+            "DELETE FROM market_data_rollup WHERE symbol = ? AND exchange = ? AND interval = ?",
+            [symbol, exchange, interval],
+        )
+        conn.execute(
+            "DELETE FROM rollup_catalog WHERE symbol = ? AND exchange = ? AND interval = ?",
+            [symbol, exchange, interval],
+        )
+        _insert_rollup_rows(conn, symbol, exchange, interval, market_open_seconds)
+        conn.execute(
+            """
+            INSERT INTO rollup_catalog (symbol, exchange, interval, market_open_seconds)
+            VALUES (?, ?, ?, ?)
+        """,
+            [symbol, exchange, interval, market_open_seconds],
+        )
+        conn.execute("COMMIT")
+    logger.info(f"Built {interval} rollup for {symbol}:{exchange}")
+
+
+def _get_rollup_ohlcv(
+    symbol: str,
+    exchange: str,
+    interval: str,
+    interval_seconds: int,
+    market_open_seconds: int,
+    start_timestamp: int | None,
+    end_timestamp: int | None,
+) -> pd.DataFrame:
+    """Serve a standard interval from its rollup, matching on-the-fly output.
+
+    On-the-fly aggregation filters 1m rows before grouping, so a range that
+    starts or ends mid-candle yields a partial first or last candle. Those two
+    edge candles are still aggregated from 1m here (a few minutes of rows);
+    every complete candle in between comes from the rollup.
+    """
+    _ensure_rollup(symbol, exchange, interval, market_open_seconds)
+
+    parts = []
+    params = []
+
+    rollup_query = """
+        SELECT CAST(timestamp AS DOUBLE) as timestamp, open, high, low, close,
+               CAST(volume AS HUGEINT) as volume, oi
+        FROM market_data_rollup
+        WHERE symbol = ? AND exchange = ? AND interval = ? AND market_open_seconds = ?
+    """
+    rollup_params = [symbol, exchange, interval, market_open_seconds]
+
+    head_bucket = None
+    if start_timestamp:
+        head_bucket = _bucket_start(start_timestamp, interval_seconds, market_open_seconds)
+        if head_bucket < start_timestamp:
+            head_end = head_bucket + interval_seconds - 1
+            if end_timestamp:
+                head_end = min(head_end, end_timestamp)
+            head_query, head_params = _aggregate_1m_sql(
+                symbol, exchange, interval_seconds, market_open_seconds, start_timestamp, head_end
+            )
+            parts.append(head_query)
+            params += head_params
+            rollup_query += " AND timestamp >= ?"
+            rollup_params.append(head_bucket + interval_seconds)
+        else:
+            rollup_query += " AND timestamp >= ?"
+            rollup_params.append(start_timestamp)
+
+    if end_timestamp:
+        tail_bucket = _bucket_start(end_timestamp, interval_seconds, market_open_seconds)
+        if tail_bucket + interval_seconds - 1 > end_timestamp:
+            if tail_bucket != head_bucket or head_bucket == start_timestamp:
+                tail_start = tail_bucket
+                if start_timestamp:
+                    tail_start = max(tail_start, start_timestamp)
+                tail_query, tail_params = _aggregate_1m_sql(
+                    symbol, exchange, interval_seconds, market_open_seconds, tail_start, end_timestamp
+                )
+                parts.append(tail_query)
+                params += tail_params
+            rollup_query += " AND timestamp < ?"
+            rollup_params.append(tail_bucket)
+        else:
+            rollup_query += " AND timestamp <= ?"
+            rollup_params.append(tail_bucket)
+
+    parts.insert(0, rollup_query)
+    params = rollup_params + params
+    query = "SELECT * FROM (" + " UNION ALL ".join(parts) + ") ORDER BY timestamp ASC"
+
+    with get_read_connection() as conn:
+        return conn.execute(query, params).fetchdf()
+
+
 def _get_daily_aggregated_ohlcv(
     symbol: str,
     exchange: str,
@@ -1130,7 +1584,7 @@ def _get_daily_aggregated_ohlcv(
             ORDER BY timestamp ASC
         """
 
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute(query, params).fetchdf()
 
         return result
@@ -1148,7 +1602,7 @@ def get_data_catalog() -> list[dict[str, Any]]:
         List of dictionaries with symbol, exchange, interval, and data range info
     """
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute("""
                 SELECT
                     symbol, exchange, interval,
@@ -1176,7 +1630,7 @@ def get_available_symbols() -> list[dict[str, str]]:
         List of dictionaries with symbol and exchange
     """
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute("""
                 SELECT DISTINCT symbol, exchange
                 FROM data_catalog
@@ -1202,7 +1656,7 @@ def get_data_range(symbol: str, exchange: str, interval: str) -> dict[str, Any]
         or None if no data exists
     """
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute(
                 """
                 SELECT first_timestamp, last_timestamp, record_count
@@ -1254,6 +1708,8 @@ def delete_market_data(symbol: str, exchange: str, interval: str | None = None)
                 """,
                     [symbol.upper(), exchange.upper(), interval],
                 )
+                if interval == "1m":
+                    _drop_rollups(conn, symbol.upper(), exchange.upper())
                 msg = f"Deleted {symbol}:{exchange}:{interval} data"
             else:
                 conn.execute(
@@ -1270,6 +1726,7 @@ def delete_market_data(symbol: str, exchange: str, interval: str | None = None)
                 """,
                     [symbol.upper(), exchange.upper()],
                 )
+                _drop_rollups(conn, symbol.upper(), exchange.upper())
                 msg = f"Deleted all {symbol}:{exchange} data"
 
         logger.info(msg)
@@ -1329,6 +1786,7 @@ def bulk_delete_market_data(
                         """,
                         [symbol, exchange],
                     )
+                    _drop_rollups(conn, symbol, exchange)
 
                     if rows_deleted > 0:
                         deleted += 1
@@ -1422,7 +1880,7 @@ def export_to_csv(
         if not abs_output.startswith(os.path.abspath(temp_dir)):
             return False, "Invalid output path: must be within temp directory"
 
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             # Always use parameterized query and pandas to_csv for safety
             df = conn.execute(query, params).fetchdf()
             df.to_csv(output_path, index=False)
@@ -1477,7 +1935,7 @@ def get_database_stats() -> dict[str, Any]:
         db_path = get_db_path()
         db_size = os.path.getsize(db_path) if os.path.exists(db_path) else 0
 
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             total_records = conn.execute("SELECT COUNT(*) FROM market_data").fetchone()[0]
             total_symbols = conn.execute(
                 "SELECT COUNT(DISTINCT symbol || exchange) FROM market_data"
@@ -1490,6 +1948,7 @@ def get_database_stats() -> dict[str, Any]:
             "total_records": total_records,
             "total_symbols": total_symbols,
             "watchlist_count": watchlist_count,
+            "connections": get_connection_stats(),
         }
 
     except Exception as e:
@@ -1870,7 +2329,7 @@ def _safe_timestamp(val) -> str | None:
 def get_download_job(job_id: str) -> dict[str, Any] | None:
     """Get a download job by ID."""
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute(
                 """
                 SELECT id, job_type, status, total_symbols, completed_symbols,
@@ -1909,7 +2368,7 @@ def get_download_job(job_id: str) -> dict[str, Any] | None:
 def get_all_download_jobs(status: str = None, limit: int = 50) -> list[dict[str, Any]]:
     """Get all download jobs, optionally filtered by status."""
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             if status:
                 result = conn.execute(
                     """
@@ -1956,7 +2415,7 @@ def get_all_download_jobs(status: str = None, limit: int = 50) -> list[dict[str,
 def get_job_items(job_id: str, status: str = None) -> list[dict[str, Any]]:
     """Get all items for a job, optionally filtered by status."""
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             if status:
                 result = conn.execute(
                     """
@@ -2193,7 +2652,7 @@ def upsert_symbol_metadata(symbols: list[dict[str, Any]]) -> int:
 def get_symbol_metadata(symbol: str, exchange: str) -> dict[str, Any] | None:
     """Get metadata for a specific symbol."""
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute(
                 """
                 SELECT symbol, exchange, name, expiry, strike, lotsize,
@@ -2231,7 +2690,7 @@ def get_catalog_with_metadata() -> list[dict[str, Any]]:
         List of catalog entries with metadata joined
     """
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute("""
                 SELECT
                     c.symbol, c.exchange, c.interval,
@@ -2344,7 +2803,7 @@ def export_to_parquet(
         skipped_intervals: list[str] = []
         frames: list[pd.DataFrame] = []
 
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             # Resolve symbol list — explicit, or every symbol in the catalog
             if symbols and len(symbols) > 0:
                 symbols_list = [(s["symbol"].upper(), s["exchange"].upper()) for s in symbols]
@@ -2599,7 +3058,7 @@ def export_to_txt(
             ORDER BY symbol, exchange, interval, timestamp
         """
 
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             df = conn.execute(query, params).fetchdf()
 
             if df.empty:
@@ -2670,7 +3129,7 @@ def export_to_zip(
         ist_offset = 19800
 
         with zipfile.ZipFile(abs_output, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
-            with get_connection() as conn:
+            with get_read_connection() as conn:
                 # Get symbols to export
                 if symbols and len(symbols) > 0:
                     symbols_list = [(s["symbol"].upper(), s["exchange"].upper()) for s in symbols]
@@ -2966,7 +3425,7 @@ def export_bulk_csv(
             ORDER BY symbol, exchange, interval, timestamp
         """
 
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             df = conn.execute(query, params).fetchdf()
 
             if df.empty:
@@ -3036,7 +3495,7 @@ def get_export_preview(
             WHERE {where_clause}
         """
 
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute(query, params).fetchone()
 
             if result[0] == 0:
@@ -3185,7 +3644,7 @@ def _clean_schedule_record(record: dict[str, Any]) -> dict[str, Any]:
 def get_schedule(schedule_id: str) -> dict[str, Any] | None:
     """Get a schedule by ID."""
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute(
                 """
                 SELECT id, name, description, schedule_type, interval_value,
@@ -3213,7 +3672,7 @@ def get_schedule(schedule_id: str) -> dict[str, Any] | None:
 def get_all_schedules() -> list[dict[str, Any]]:
     """Get all schedules."""
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute("""
                 SELECT id, name, description, schedule_type, interval_value,
                        interval_unit, time_of_day, download_source, data_interval,
@@ -3479,7 +3938,7 @@ def update_schedule_execution(
 def get_schedule_executions(schedule_id: str, limit: int = 20) -> list[dict[str, Any]]:
     """Get execution history for a schedule."""
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute(
                 """
                 SELECT id, schedule_id, download_job_id, status,
@@ -3508,7 +3967,7 @@ def get_schedule_executions(schedule_id: str, limit: int = 20) -> list[dict[str,
 def get_active_schedules() -> list[dict[str, Any]]:
     """Get all enabled and non-paused schedules."""
     try:
-        with get_connection() as conn:
+        with get_read_connection() as conn:
             result = conn.execute("""
                 SELECT id, name, description, schedule_type, interval_value,
                        interval_unit, time_of_day, download_source, data_interval,
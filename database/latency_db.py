@@ -3,12 +3,14 @@ import os
 from datetime import datetime, timedelta
 
 from cachetools import TTLCache
-from sqlalchemy import JSON, Column, DateTime, Float, Integer, String, create_engine
+from sqlalchemy import JSON, Column, Date, DateTime, Float, Index, Integer, String, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import NullPool
 from sqlalchemy.sql import func
 
+from database.latency_sketch import LatencySketch
+
 logger = logging.getLogger(__name__)
 
 # Use a separate database for latency logs
@@ -30,10 +32,10 @@ latency_session = scoped_session(
     sessionmaker(autocommit=False, autoflush=False, bind=latency_engine)
 )
 
-# Percentiles need raw values in Python (numpy), so those queries are bounded
-# to a recent window — order latency rows are kept forever and an unbounded
-# fetch grows with the install's lifetime. Aggregates (counts/averages/SLA)
-# remain all-time SQL aggregations.
+# Percentiles and the RTT histogram are read from the latency_digest sketches
+# of this many recent days; counts/averages/SLA are all-time. Either way the
+# cost depends on days x brokers x order types, not on how many orders there
+# were.
 PERCENTILE_WINDOW_DAYS = 30
 
 # The dashboard polls stats; cache the computed result briefly so polling
@@ -73,6 +75,47 @@ class OrderLatency(LatencyBase):
     status = Column(String(20))  # SUCCESS, FAILED, PARTIAL
     error = Column(String(500))  # Error message if any
 
+    @staticmethod
+    def build(
+        order_id,
+        user_id,
+        broker,
+        symbol,
+        order_type,
+        latencies,
+        request_body,
+        response_body,
+        status,
+        error=None,
+    ):
+        """An unsaved OrderLatency row for one order execution"""
+        # The error column is a String, but callers may hand us a non-string
+        # payload — e.g. a failed request's response "message" can be a
+        # marshmallow validation-errors dict ({'symbol': ['Missing data...']}).
+        # SQLite cannot bind a dict/list to a text column, so coerce any
+        # non-string error to str and bound it to the column width.
+        if error is not None and not isinstance(error, str):
+            error = str(error)
+        if isinstance(error, str) and len(error) > 500:
+            error = error[:500]
+
+        return OrderLatency(
+            order_id=order_id,
+            user_id=user_id,
+            broker=broker,
+            symbol=symbol,
+            order_type=order_type,
+            rtt_ms=latencies.get("rtt", 0),
+            validation_latency_ms=latencies.get("validation", 0),
+            response_latency_ms=latencies.get("broker_response", 0),
+            overhead_ms=latencies.get("overhead", 0),
+            total_latency_ms=latencies.get("total", 0),
+            request_body=request_body,
+            response_body=response_body,
+            status=status,
+            error=error,
+        )
+
     @staticmethod
     def log_latency(
         order_id,
@@ -88,33 +131,20 @@ class OrderLatency(LatencyBase):
     ):
         """Log order execution latency"""
         try:
-            # The error column is a String, but callers may hand us a non-string
-            # payload — e.g. a failed request's response "message" can be a
-            # marshmallow validation-errors dict ({'symbol': ['Missing data...']}).
-            # SQLite cannot bind a dict/list to a text column, so coerce any
-            # non-string error to str and bound it to the column width.
-            if error is not None and not isinstance(error, str):
-                error = str(error)
-            if isinstance(error, str) and len(error) > 500:
-                error = error[:500]
-
-            log = OrderLatency(
-                order_id=order_id,
-                user_id=user_id,
-                broker=broker,
-                symbol=symbol,
-                order_type=order_type,
-                rtt_ms=latencies.get("rtt", 0),
-                validation_latency_ms=latencies.get("validation", 0),
-                response_latency_ms=latencies.get("broker_response", 0),
-                overhead_ms=latencies.get("overhead", 0),
-                total_latency_ms=latencies.get("total", 0),
-                request_body=request_body,
-                response_body=response_body,
-                status=status,
-                error=error,
+            log = OrderLatency.build(
+                order_id,
+                user_id,
+                broker,
+                symbol,
+                order_type,
+                latencies,
+                request_body,
+                response_body,
+                status,
+                error,
             )
             latency_session.add(log)
+            LatencyDigest.record([log])
             latency_session.commit()
             return True
         except Exception as e:
@@ -122,6 +152,18 @@ class OrderLatency(LatencyBase):
             latency_session.rollback()
             return False
 
+    @staticmethod
+    def log_latencies(records):
+        """Log a batch of records (dicts of build's arguments) in one transaction"""
+        try:
+            logs = [OrderLatency.build(**record) for record in records]
+            latency_session.add_all(logs)
+            LatencyDigest.record(logs)
+            latency_session.commit()
+        except Exception:
+            latency_session.rollback()
+            raise
+
     @staticmethod
     def get_recent_logs(limit=100):
         """Get recent latency logs ordered by timestamp"""
@@ -133,153 +175,90 @@ class OrderLatency(LatencyBase):
 
     @staticmethod
     def get_latency_stats():
-        """Get latency statistics - optimized with minimal database queries"""
+        """Get latency statistics from the latency_digest table"""
         cached = _stats_cache.get("stats")
         if cached is not None:
             return cached
 
         try:
-            import numpy as np
-            from sqlalchemy import case, func
-
-            percentile_cutoff = datetime.utcnow() - timedelta(days=PERCENTILE_WINDOW_DAYS)
-
-            # OPTIMIZED: Single query for all overall stats using CASE statements
-            # This replaces 9 separate queries with 1
-            overall_stats = latency_session.query(
-                func.count(OrderLatency.id).label("total"),
-                func.sum(case((OrderLatency.status == "FAILED", 1), else_=0)).label("failed"),
-                func.avg(OrderLatency.rtt_ms).label("avg_rtt"),
-                func.avg(OrderLatency.overhead_ms).label("avg_overhead"),
-                func.avg(OrderLatency.total_latency_ms).label("avg_total"),
-                func.sum(case((OrderLatency.total_latency_ms < 100, 1), else_=0)).label(
-                    "under_100"
-                ),
-                func.sum(case((OrderLatency.total_latency_ms < 150, 1), else_=0)).label(
-                    "under_150"
-                ),
-                func.sum(case((OrderLatency.total_latency_ms < 200, 1), else_=0)).label(
-                    "under_200"
-                ),
-            ).first()
-
-            total_orders = overall_stats.total or 0
-            failed_orders = overall_stats.failed or 0
-            avg_rtt = overall_stats.avg_rtt or 0
-            avg_overhead = overall_stats.avg_overhead or 0
-            avg_total = overall_stats.avg_total or 0
-            orders_under_100ms = overall_stats.under_100 or 0
-            orders_under_150ms = overall_stats.under_150 or 0
-            orders_under_200ms = overall_stats.under_200 or 0
-
-            # Calculate SLA percentages
-            sla_100ms = (orders_under_100ms / total_orders * 100) if total_orders else 0
-            sla_150ms = (orders_under_150ms / total_orders * 100) if total_orders else 0
-            sla_200ms = (orders_under_200ms / total_orders * 100) if total_orders else 0
-
-            # OPTIMIZED: Single query for percentiles, one column only, bounded
-            # to the recent window so the fetch cannot grow without limit
-            p50_total = p90_total = p95_total = p99_total = 0
-            if total_orders > 0:
-                total_latencies = [
-                    row[0]
-                    for row in latency_session.query(OrderLatency.total_latency_ms)
-                    .filter(
-                        OrderLatency.total_latency_ms.isnot(None),
-                        OrderLatency.timestamp >= percentile_cutoff,
-                    )
-                    .all()
-                ]
-
-                if total_latencies:
-                    p50_total = float(np.percentile(total_latencies, 50))
-                    p90_total = float(np.percentile(total_latencies, 90))
-                    p95_total = float(np.percentile(total_latencies, 95))
-                    p99_total = float(np.percentile(total_latencies, 99))
-
-            # OPTIMIZED: Single GROUP BY query for all broker stats
-            # This replaces N x 7 queries (where N = number of brokers) with just 1
+            from sqlalchemy import func
+
+            # All-time aggregates: one GROUP BY over the digest rows
             broker_agg = (
                 latency_session.query(
-                    OrderLatency.broker,
-                    func.count(OrderLatency.id).label("total"),
-                    func.sum(case((OrderLatency.status == "FAILED", 1), else_=0)).label("failed"),
-                    func.avg(OrderLatency.rtt_ms).label("avg_rtt"),
-                    func.avg(OrderLatency.overhead_ms).label("avg_overhead"),
-                    func.avg(OrderLatency.total_latency_ms).label("avg_total"),
-                    func.sum(case((OrderLatency.total_latency_ms < 150, 1), else_=0)).label(
-                        "under_150"
-                    ),
+                    LatencyDigest.broker,
+                    func.sum(LatencyDigest.count).label("total"),
+                    func.sum(LatencyDigest.failed).label("failed"),
+                    func.sum(LatencyDigest.sum_rtt).label("sum_rtt"),
+                    func.sum(LatencyDigest.sum_overhead).label("sum_overhead"),
+                    func.sum(LatencyDigest.sum_total).label("sum_total"),
+                    func.sum(LatencyDigest.under_100).label("under_100"),
+                    func.sum(LatencyDigest.under_150).label("under_150"),
+                    func.sum(LatencyDigest.under_200).label("under_200"),
                 )
-                .filter(OrderLatency.broker.isnot(None))
-                .group_by(OrderLatency.broker)
+                .group_by(LatencyDigest.broker)
                 .all()
             )
 
-            # Build broker stats dict from aggregated results
-            broker_stats = {}
+            total_orders = sum(row.total or 0 for row in broker_agg)
+            failed_orders = sum(row.failed or 0 for row in broker_agg)
 
-            # For percentiles, we need per-broker latency values
-            # OPTIMIZED: Single query to get all latencies grouped by broker
-            broker_latencies = {}
-            if broker_agg:
-                broker_names = [b.broker for b in broker_agg]
-                latency_rows = (
-                    latency_session.query(OrderLatency.broker, OrderLatency.total_latency_ms)
-                    .filter(
-                        OrderLatency.broker.in_(broker_names),
-                        OrderLatency.total_latency_ms.isnot(None),
-                        OrderLatency.timestamp >= percentile_cutoff,
-                    )
-                    .all()
-                )
+            def _share(value, total):
+                return (value / total * 100) if total else 0
+
+            def _mean(value, total):
+                return (value / total) if total else 0
+
+            # Percentiles: merge the recent days' sketches, overall and per broker
+            overall = LatencySketch()
+            per_broker = {}
+            for broker, sketch in LatencyDigest.recent_sketches("total_sketch"):
+                overall.merge(sketch)
+                per_broker.setdefault(broker, LatencySketch()).merge(sketch)
 
-                # Group latencies by broker
-                for row in latency_rows:
-                    if row.broker not in broker_latencies:
-                        broker_latencies[row.broker] = []
-                    broker_latencies[row.broker].append(row.total_latency_ms)
-
-            # Build final broker stats
-            for broker_row in broker_agg:
-                broker = broker_row.broker
-                broker_total = broker_row.total or 0
-                broker_under_150 = broker_row.under_150 or 0
-                broker_sla = (broker_under_150 / broker_total * 100) if broker_total else 0
-
-                # Calculate percentiles for this broker
-                broker_p50 = broker_p99 = 0
-                if broker in broker_latencies and broker_latencies[broker]:
-                    broker_p50 = float(np.percentile(broker_latencies[broker], 50))
-                    broker_p99 = float(np.percentile(broker_latencies[broker], 99))
-
-                broker_stats[broker] = {
+            broker_stats = {}
+            for row in broker_agg:
+                # Records without a broker count overall but get no entry,
+                # as before (their digest rows carry broker "")
+                if not row.broker:
+                    continue
+                broker_total = row.total or 0
+                sketch = per_broker.get(row.broker, LatencySketch())
+                broker_stats[row.broker] = {
                     "total_orders": broker_total,
-                    "failed_orders": broker_row.failed or 0,
-                    "avg_rtt": float(broker_row.avg_rtt or 0),
-                    "avg_overhead": float(broker_row.avg_overhead or 0),
-                    "avg_total": float(broker_row.avg_total or 0),
-                    "p50_total": broker_p50,
-                    "p99_total": broker_p99,
-                    "sla_150ms": broker_sla,
+                    "failed_orders": row.failed or 0,
+                    "avg_rtt": float(_mean(row.sum_rtt or 0, broker_total)),
+                    "avg_overhead": float(_mean(row.sum_overhead or 0, broker_total)),
+                    "avg_total": float(_mean(row.sum_total or 0, broker_total)),
+                    "p50_total": sketch.quantile(0.50),
+                    "p99_total": sketch.quantile(0.99),
+                    "sla_150ms": _share(row.under_150 or 0, broker_total),
                 }
 
             stats = {
                 "total_orders": total_orders,
                 "failed_orders": failed_orders,
-                "success_rate": ((total_orders - failed_orders) / total_orders * 100)
-                if total_orders
-                else 0,
-                "avg_rtt": float(avg_rtt),
-                "avg_overhead": float(avg_overhead),
-                "avg_total": float(avg_total),
-                "p50_total": float(p50_total),
-                "p90_total": float(p90_total),
-                "p95_total": float(p95_total),
-                "p99_total": float(p99_total),
-                "sla_100ms": float(sla_100ms),
-                "sla_150ms": float(sla_150ms),
-                "sla_200ms": float(sla_200ms),
+                "success_rate": _share(total_orders - failed_orders, total_orders),
+                "avg_rtt": float(_mean(sum(r.sum_rtt or 0 for r in broker_agg), total_orders)),
+                "avg_overhead": float(
+                    _mean(sum(r.sum_overhead or 0 for r in broker_agg), total_orders)
+                ),
+                "avg_total": float(
+                    _mean(sum(r.sum_total or 0 for r in broker_agg), total_orders)
+                ),
+                "p50_total": overall.quantile(0.50),
+                "p90_total": overall.quantile(0.90),
+                "p95_total": overall.quantile(0.95),
+                "p99_total": overall.quantile(0.99),
+                "sla_100ms": float(
+                    _share(sum(r.under_100 or 0 for r in broker_agg), total_orders)
+                ),
+                "sla_150ms": float(
+                    _share(sum(r.under_150 or 0 for r in broker_agg), total_orders)
+                ),
+                "sla_200ms": float(
+                    _share(sum(r.under_200 or 0 for r in broker_agg), total_orders)
+                ),
                 "broker_stats": broker_stats,
             }
             _stats_cache["stats"] = stats
@@ -304,6 +283,170 @@ class OrderLatency(LatencyBase):
             }
 
 
+class LatencyDigest(LatencyBase):
+    """Running latency aggregates per UTC day, broker and order type.
+
+    Updated in the same transaction that inserts the order_latency rows, so
+    the dashboard's counts, averages, SLA shares and percentiles never scan
+    order_latency itself. ``total_sketch`` and ``rtt_sketch`` are
+    LatencySketch.to_dict() of total_latency_ms and rtt_ms.
+    """
+
+    __tablename__ = "latency_digest"
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    broker = Column(String(50), nullable=False, default="")  # "" when unknown
+    order_type = Column(String(20), nullable=False, default="")
+
+    count = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    under_100 = Column(Integer, nullable=False, default=0)
+    under_150 = Column(Integer, nullable=False, default=0)
+    under_200 = Column(Integer, nullable=False, default=0)
+    sum_rtt = Column(Float, nullable=False, default=0)
+    sum_overhead = Column(Float, nullable=False, default=0)
+    sum_total = Column(Float, nullable=False, default=0)
+    min_rtt = Column(Float)
+    max_rtt = Column(Float)
+    total_sketch = Column(JSON)
+    rtt_sketch = Column(JSON)
+
+    __table_args__ = (
+        Index("idx_latency_digest_key", "day", "broker", "order_type", unique=True),
+    )
+
+    @staticmethod
+    def empty(day, broker, order_type):
+        """A new digest row with zeroed counters (column defaults apply only on flush)"""
+        return LatencyDigest(
+            day=day,
+            broker=broker,
+            order_type=order_type,
+            count=0,
+            failed=0,
+            under_100=0,
+            under_150=0,
+            under_200=0,
+            sum_rtt=0.0,
+            sum_overhead=0.0,
+            sum_total=0.0,
+        )
+
+    def fold(self, logs):
+        """Add OrderLatency rows to this digest"""
+        total_sketch = LatencySketch.from_dict(self.total_sketch)
+        rtt_sketch = LatencySketch.from_dict(self.rtt_sketch)
+        for log in logs:
+            total = log.total_latency_ms or 0
+            rtt = log.rtt_ms or 0
+            self.count += 1
+            self.failed += log.status == "FAILED"
+            self.under_100 += total < 100
+            self.under_150 += total < 150
+            self.under_200 += total < 200
+            self.sum_rtt += rtt
+            self.sum_overhead += log.overhead_ms or 0
+            self.sum_total += total
+            self.min_rtt = rtt if self.min_rtt is None else min(self.min_rtt, rtt)
+            self.max_rtt = rtt if self.max_rtt is None else max(self.max_rtt, rtt)
+            total_sketch.add(total)
+            rtt_sketch.add(rtt)
+        # Assigned, not mutated in place, so the JSON columns are marked dirty
+        self.total_sketch = total_sketch.to_dict()
+        self.rtt_sketch = rtt_sketch.to_dict()
+
+    @staticmethod
+    def record(logs):
+        """Fold new, not yet committed OrderLatency rows into today's digests.
+
+        Runs in the caller's latency_session transaction; the caller commits.
+        """
+        # order_latency.timestamp defaults to the database's CURRENT_TIMESTAMP,
+        # which is UTC
+        day = datetime.utcnow().date()
+        groups = {}
+        for log in logs:
+            groups.setdefault((log.broker or "", log.order_type or ""), []).append(log)
+        for (broker, order_type), members in groups.items():
+            digest = (
+                latency_session.query(LatencyDigest)
+                .filter_by(day=day, broker=broker, order_type=order_type)
+                .first()
+            )
+            if digest is None:
+                digest = LatencyDigest.empty(day, broker, order_type)
+                latency_session.add(digest)
+            digest.fold(members)
+
+    @staticmethod
+    def recent_sketches(column, broker=None, days=PERCENTILE_WINDOW_DAYS):
+        """(broker, LatencySketch) for each digest row of the last ``days`` days"""
+        since = (datetime.utcnow() - timedelta(days=days)).date()
+        query = latency_session.query(LatencyDigest.broker, getattr(LatencyDigest, column)).filter(
+            LatencyDigest.day >= since
+        )
+        if broker:
+            query = query.filter(LatencyDigest.broker == broker)
+        return [(row[0], LatencySketch.from_dict(row[1])) for row in query.all()]
+
+    @staticmethod
+    def rtt_distribution(broker=None, days=PERCENTILE_WINDOW_DAYS):
+        """Merged RTT sketch plus min, max and mean RTT over the last ``days`` days"""
+        from sqlalchemy import func
+
+        since = (datetime.utcnow() - timedelta(days=days)).date()
+        query = latency_session.query(
+            func.min(LatencyDigest.min_rtt),
+            func.max(LatencyDigest.max_rtt),
+            func.sum(LatencyDigest.sum_rtt),
+            func.sum(LatencyDigest.count),
+        ).filter(LatencyDigest.day >= since)
+        if broker:
+            query = query.filter(LatencyDigest.broker == broker)
+        min_rtt, max_rtt, sum_rtt, count = query.first()
+
+        sketch = LatencySketch()
+        for _, part in LatencyDigest.recent_sketches("rtt_sketch", broker, days):
+            sketch.merge(part)
+        return {
+            "sketch": sketch,
+            "min_rtt": float(min_rtt or 0),
+            "max_rtt": float(max_rtt or 0),
+            "avg_rtt": float(sum_rtt / count) if count else 0.0,
+        }
+
+
+def rebuild_latency_digests():
+    """Recompute latency_digest from every order_latency row.
+
+    Run once when the table is introduced (init_latency_db does it when the
+    digests are empty but latency rows exist). Streams the rows, so memory is
+    bounded by the number of (day, broker, order type) groups.
+    """
+    try:
+        digests = {}
+        rows = latency_session.query(OrderLatency).order_by(OrderLatency.id).yield_per(5000)
+        for log in rows:
+            day = (log.timestamp or datetime.utcnow()).date()
+            key = (day, log.broker or "", log.order_type or "")
+            digest = digests.get(key)
+            if digest is None:
+                digest = digests[key] = LatencyDigest.empty(*key)
+            digest.fold([log])
+
+        latency_session.query(LatencyDigest).delete(synchronize_session=False)
+        latency_session.add_all(digests.values())
+        latency_session.commit()
+        _stats_cache.clear()
+        logger.info(f"Rebuilt {len(digests)} latency digest rows")
+        return len(digests)
+    except Exception as e:
+        logger.exception(f"Error rebuilding latency digests: {str(e)}")
+        latency_session.rollback()
+        return 0
+
+
 def init_latency_db():
     """Initialize the latency database"""
     # Extract directory from database URL and create if it doesn't exist
@@ -316,6 +459,17 @@ def init_latency_db():
 
     init_db_with_logging(LatencyBase, latency_engine, "Latency DB", logger)
 
+    # Installs upgraded from before latency_digest have latency rows but no
+    # digests; build them once so the dashboard reports all-time figures.
+    try:
+        if (
+            latency_session.query(LatencyDigest.id).first() is None
+            and latency_session.query(OrderLatency.id).first() is not None
+        ):
+            rebuild_latency_digests()
+    finally:
+        latency_session.remove()
+
 
 def purge_old_data_logs(days=7):
     """
@@ -352,6 +506,12 @@ def purge_old_data_logs(days=7):
             .filter(OrderLatency.timestamp < cutoff, ~OrderLatency.order_type.in_(ORDER_TYPES))
             .delete(synchronize_session=False)
         )
+        # And their digests. Digests are per day, so the cutoff day itself is
+        # kept whole until the next purge.
+        latency_session.query(LatencyDigest).filter(
+            LatencyDigest.day < cutoff.date(), ~LatencyDigest.order_type.in_(ORDER_TYPES)
+        ).delete(synchronize_session=False)
+        _stats_cache.clear()
 
         latency_session.commit()
         logger.debug(f"Purged {deleted} old data endpoint latency logs (older than {days} days)")
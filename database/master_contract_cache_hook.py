@@ -83,6 +83,10 @@ def hook_into_master_contract_download(broker: str):
     Hook function to be called after master contract download completes
     This should be integrated into the existing master contract download flow
 
+    The cache's on-disk snapshot is keyed by the download time, so a new
+    download never matches the old snapshot: the load below reads symtoken
+    and replaces it.
+
     Args:
         broker: The broker name for which master contract was downloaded
     """
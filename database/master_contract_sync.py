@@ -0,0 +1,247 @@
+"""
+Diff-based refresh of the symtoken table after a master contract download.
+
+Broker loaders used to delete symtoken and insert every contract again on each
+download (the rows turned into dicts one by one, after a full SELECT of tokens
+to dedupe), and the symbol cache then read the whole table back through the
+ORM. From one day to the next most contracts do not change: a few expire, a
+few are listed, the odd lot or tick size moves.
+
+sync_master_contract compares the downloaded DataFrame with the rows already
+in the table, vectorized in pandas, and writes only the difference: one
+executemany DELETE by id for contracts that are gone, UPDATE for those whose
+fields changed and INSERT for new ones, in a single transaction. The same
+difference is then applied to the in-memory symbol cache
+(token_db_enhanced.apply_master_contract_diff) so it does not read the table
+back either.
+
+Rows are matched on exchange and token plus their occurrence number within
+that pair, so a master that lists a token twice still ends up with both rows,
+exactly as the full insert left it. Derivative names are normalized to the
+underlying root before comparing (see symbol.normalize_derivative_underlyings),
+otherwise every derivative would differ from yesterday's normalized row.
+
+When the table is empty, or most of it changed, the table is replaced in full
+with the same executemany INSERT and the cache reloads as before.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, select
+
+from utils.constants import FNO_EXCHANGES
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+KEY_COLUMNS = ["exchange", "token"]
+# Occurrence of a row within its (exchange, token) pair
+_OCCURRENCE = "_occurrence"
+_NUMERIC_COLUMNS = {"strike", "lotsize", "tick_size", "contract_value"}
+
+# Replace the table outright when more than this share of its rows changed
+FULL_REPLACE_RATIO = 0.5
+# Ids per DELETE ... WHERE id IN (...), under SQLite's bound parameter limit
+_DELETE_CHUNK = 500
+
+
+@dataclass
+class MasterContractDiff:
+    """What a download changed in symtoken.
+
+    ``removed`` and ``changed`` carry the key columns plus the occurrence
+    number of the rows they replace; ``changed`` and ``added`` hold the new
+    values of the downloaded columns.
+    """
+
+    columns: list[str]
+    previous_rows: int
+    removed: pd.DataFrame
+    changed: pd.DataFrame
+    added: pd.DataFrame
+    unchanged: int
+    full_replace: bool = False
+    removed_ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    @property
+    def changes(self) -> int:
+        return len(self.removed) + len(self.changed) + len(self.added)
+
+    def changed_records(self) -> list[dict]:
+        return _records(self.changed, self.columns)
+
+    def added_records(self) -> list[dict]:
+        return _records(self.added, self.columns)
+
+    def summary(self) -> str:
+        if self.full_replace:
+            return f"replaced all {len(self.added)} rows"
+        return (
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {self.unchanged} unchanged"
+        )
+
+
+def _with_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Add string match keys and the occurrence number within each pair."""
+    keyed = df.copy()
+    for column in KEY_COLUMNS:
+        keyed[f"_{column}"] = df[column].astype(object).where(df[column].notna(), "").astype(str)
+    keyed[_OCCURRENCE] = keyed.groupby([f"_{c}" for c in KEY_COLUMNS], sort=False).cumcount()
+    return keyed
+
+
+def _same(old: pd.Series, new: pd.Series, numeric: bool) -> np.ndarray:
+    """Element-wise equality with NULL equal to NULL."""
+    if numeric:
+        a = pd.to_numeric(old, errors="coerce").to_numpy(dtype=np.float64)
+        b = pd.to_numeric(new, errors="coerce").to_numpy(dtype=np.float64)
+        return (a == b) | (np.isnan(a) & np.isnan(b))
+    a_null = old.isna().to_numpy()
+    b_null = new.isna().to_numpy()
+    equal = old.astype(str).to_numpy() == new.astype(str).to_numpy()
+    return (equal & ~a_null & ~b_null) | (a_null & b_null)
+
+
+def normalize_underlying_names(df: pd.DataFrame) -> pd.DataFrame:
+    """Set ``name`` to the underlying root on derivative rows, as
+    normalize_derivative_underlyings does to the table after a download."""
+    if not {"symbol", "exchange", "name"} <= set(df.columns):
+        return df
+    from database.token_db_enhanced import extract_underlying_from_symbol
+
+    fno = df["exchange"].isin(FNO_EXCHANGES).to_numpy()
+    if not fno.any():
+        return df
+    derived = [
+        extract_underlying_from_symbol(symbol, exchange)
+        for symbol, exchange in zip(
+            df["symbol"].to_numpy()[fno], df["exchange"].to_numpy()[fno], strict=True
+        )
+    ]
+    names = df["name"].astype(object).to_numpy(copy=True)
+    fno_names = names[fno]
+    fno_names[:] = [d if d else n for d, n in zip(derived, fno_names, strict=True)]
+    names[fno] = fno_names
+    df = df.copy()
+    df["name"] = names
+    return df
+
+
+def diff_master_contract(current: pd.DataFrame, new: pd.DataFrame) -> MasterContractDiff:
+    """Compare the table's rows (``current``, with ``id``) with a download."""
+    columns = [c for c in new.columns if c != "id"]
+    if current.empty:
+        return MasterContractDiff(
+            columns, 0, new.iloc[:0], new.iloc[:0], new, 0, full_replace=True
+        )
+
+    old = _with_keys(current)
+    fresh = _with_keys(new)
+    keys = [f"_{c}" for c in KEY_COLUMNS] + [_OCCURRENCE]
+    merged = old[keys + ["id"] + columns].merge(
+        fresh[keys + columns], on=keys, how="outer", suffixes=("_old", ""), indicator=True
+    )
+
+    both = merged[merged["_merge"] == "both"]
+    same = np.ones(len(both), dtype=bool)
+    for column in columns:
+        same &= _same(both[f"{column}_old"], both[column], column in _NUMERIC_COLUMNS)
+
+    removed = merged[merged["_merge"] == "left_only"]
+    changed = both[~same]
+    added = merged[merged["_merge"] == "right_only"]
+
+    def frame(rows: pd.DataFrame, with_id: bool) -> pd.DataFrame:
+        kept = keys + columns + (["id"] if with_id else [])
+        return rows[kept].reset_index(drop=True)
+
+    diff = MasterContractDiff(
+        columns=columns,
+        previous_rows=len(current),
+        removed=frame(removed, True),
+        changed=frame(changed, True),
+        added=frame(added, False),
+        unchanged=int(same.sum()),
+    )
+    diff.removed_ids = diff.removed["id"].to_numpy(dtype=np.int64)
+    diff.changed["id"] = diff.changed["id"].astype(np.int64)
+    if diff.changes > FULL_REPLACE_RATIO * max(len(current), len(new)):
+        return MasterContractDiff(
+            columns, len(current), new.iloc[:0], new.iloc[:0], new, 0, full_replace=True
+        )
+    return diff
+
+
+def _records(df: pd.DataFrame, columns: list[str]) -> list[dict]:
+    """Rows as dicts of plain Python values, NaN as None."""
+    frame = df[columns].astype(object)
+    return frame.where(frame.notna(), None).to_dict(orient="records")
+
+
+def sync_master_contract(df: pd.DataFrame, model, session) -> MasterContractDiff | None:
+    """
+    Bring symtoken in line with a downloaded master contract.
+
+    Args:
+        df: The broker's processed master contract, one row per contract
+        model: The broker's SymToken model (its columns decide what is written)
+        session: The scoped session bound to that model
+
+    Returns:
+        The applied MasterContractDiff, or None if nothing could be written
+    """
+    from database.token_db_enhanced import apply_master_contract_diff
+
+    table = model.__table__
+    columns = [c.name for c in table.columns if c.name != "id" and c.name in df.columns]
+    new = normalize_underlying_names(df[columns].reset_index(drop=True))
+
+    try:
+        if not set(KEY_COLUMNS) <= set(columns):
+            raise ValueError(f"master contract has no {' / '.join(KEY_COLUMNS)} column")
+        rows = session.execute(select(table.c.id, *(table.c[c] for c in columns))).all()
+        current = pd.DataFrame(rows, columns=["id", *columns])
+        diff = diff_master_contract(current, new)
+    except Exception as e:
+        logger.warning(f"Could not diff the master contract, replacing it in full: {e}")
+        diff = MasterContractDiff(
+            columns, -1, new.iloc[:0], new.iloc[:0], new, 0, full_replace=True
+        )
+
+    try:
+        if diff.full_replace:
+            session.execute(table.delete())
+        else:
+            ids = diff.removed_ids.tolist()
+            for start in range(0, len(ids), _DELETE_CHUNK):
+                chunk = ids[start : start + _DELETE_CHUNK]
+                session.execute(table.delete().where(table.c.id.in_(chunk)))
+            if len(diff.changed):
+                statement = (
+                    table.update()
+                    .where(table.c.id == bindparam("_id"))
+                    .values({c: bindparam(f"_{c}") for c in columns})
+                )
+                ids = diff.changed["id"].tolist()
+                session.execute(
+                    statement,
+                    [
+                        {"_id": row_id, **{f"_{c}": v for c, v in row.items()}}
+                        for row_id, row in zip(ids, diff.changed_records(), strict=True)
+                    ],
+                )
+        if len(diff.added):
+            session.execute(table.insert(), diff.added_records())
+        session.commit()
+    except Exception as e:
+        logger.exception(f"Error applying the master contract to symtoken: {e}")
+        session.rollback()
+        return None
+
+    logger.info(f"Master contract refreshed: {diff.summary()}")
+    if not diff.full_replace:
+        apply_master_contract_diff(diff)
+    return diff
@@ -8,6 +8,13 @@ from sqlalchemy.orm import relationship, scoped_session, sessionmaker
 from sqlalchemy.pool import NullPool
 from sqlalchemy.sql import func
 
+from database.webhook_route_cache import (
+    SymbolRoute,
+    WebhookRoute,
+    WebhookRouteCache,
+    invalidate_webhook_routes,
+)
+
 logger = logging.getLogger(__name__)
 
 # Strategy caches - 5 minute TTL for webhook lookups (high frequency)
@@ -110,6 +117,7 @@ def create_strategy(
         )
         db_session.add(strategy)
         db_session.commit()
+        invalidate_webhook_routes()
 
         # Invalidate user strategies cache
         user_cache_key = f"user_{user_id}"
@@ -191,6 +199,7 @@ def delete_strategy(strategy_id):
 
         db_session.delete(strategy)
         db_session.commit()
+        invalidate_webhook_routes()
 
         # Clear from caches
         if webhook_id in _strategy_webhook_cache:
@@ -215,6 +224,7 @@ def toggle_strategy(strategy_id):
 
         strategy.is_active = not strategy.is_active
         db_session.commit()
+        invalidate_webhook_routes()
         return strategy
     except Exception as e:
         logger.exception(f"Error toggling strategy {strategy_id}: {str(e)}")
@@ -234,6 +244,7 @@ def update_strategy_times(strategy_id, start_time=None, end_time=None, squareoff
             if squareoff_time is not None:
                 strategy.squareoff_time = squareoff_time
             db_session.commit()
+            invalidate_webhook_routes()
             return True
         return False
     except Exception as e:
@@ -254,6 +265,7 @@ def add_symbol_mapping(strategy_id, symbol, exchange, quantity, product_type):
         )
         db_session.add(mapping)
         db_session.commit()
+        invalidate_webhook_routes()
         return mapping
     except Exception as e:
         logger.exception(f"Error adding symbol mapping: {str(e)}")
@@ -268,6 +280,7 @@ def bulk_add_symbol_mappings(strategy_id, mappings):
             mapping = StrategySymbolMapping(strategy_id=strategy_id, **mapping_data)
             db_session.add(mapping)
         db_session.commit()
+        invalidate_webhook_routes()
         return True
     except Exception as e:
         logger.exception(f"Error bulk adding symbol mappings: {str(e)}")
@@ -291,6 +304,7 @@ def delete_symbol_mapping(mapping_id):
         if mapping:
             db_session.delete(mapping)
             db_session.commit()
+            invalidate_webhook_routes()
             return True
         return False
     except Exception as e:
@@ -306,4 +320,53 @@ def clear_strategy_cache():
     """
     _strategy_webhook_cache.clear()
     _user_strategies_cache.clear()
+    webhook_routes.clear()
     logger.info("Strategy cache cleared")
+
+
+def _load_webhook_route(webhook_id):
+    """Build the WebhookRoute for a webhook id; None if there is no such strategy"""
+    from database.auth_db import get_api_key_for_tradingview
+
+    try:
+        strategy = Strategy.query.filter_by(webhook_id=webhook_id).first()
+        if not strategy:
+            return None
+
+        mappings = {}
+        rows = (
+            StrategySymbolMapping.query.filter_by(strategy_id=strategy.id)
+            .order_by(StrategySymbolMapping.id)
+            .all()
+        )
+        for m in rows:
+            # First mapping wins for a symbol mapped twice, as the webhook's scan did
+            mappings.setdefault(
+                m.symbol, SymbolRoute(m.symbol, m.exchange, m.quantity, m.product_type)
+            )
+
+        return WebhookRoute(
+            id=strategy.id,
+            name=strategy.name,
+            user_id=strategy.user_id,
+            is_active=bool(strategy.is_active),
+            is_intraday=bool(strategy.is_intraday),
+            trading_mode=strategy.trading_mode or "LONG",
+            start_time=strategy.start_time,
+            end_time=strategy.end_time,
+            squareoff_time=strategy.squareoff_time,
+            mappings=mappings,
+            api_key=get_api_key_for_tradingview(strategy.user_id),
+        )
+    except Exception as e:
+        logger.exception(f"Error loading webhook route {webhook_id}: {str(e)}")
+        return None
+
+
+# Webhook routing snapshots, rebuilt after any strategy or mapping edit
+webhook_routes = WebhookRouteCache(_load_webhook_route)
+
+
+def get_webhook_route(webhook_id):
+    """Get the cached routing snapshot for a webhook: strategy, windows, mappings and API key"""
+    return webhook_routes.get(webhook_id)
@@ -0,0 +1,193 @@
+"""
+Trigram index for BrokerSymbolCache.search_symbols.
+
+search_symbols matches a term when it is a substring of a contract's symbol,
+brsymbol, name or token, or when a numeric term equals its strike. Checking
+that row by row meant upper-casing four strings for every one of 150k+
+contracts on every keypress.
+
+This index keeps, for every 3-byte sequence (trigram) that occurs in those
+fields, the sorted row ids containing it, plus the row ids for every strike.
+A term of three or more characters can then only match rows holding all of
+its trigrams (or its strike), so a query's candidates are a few posting-list
+intersections. Candidates are a superset: search_symbols still runs its exact
+per-row check on them, so results do not change, only how many rows it looks
+at. Terms shorter than three characters cannot narrow anything and are only
+checked per row.
+
+Postings are stored flat (CSR): one int32 array of row ids grouped by
+trigram, plus the sorted trigram codes and their offsets. That is about 4
+bytes per distinct trigram per row, versus a Python list entry and int object
+per posting.
+"""
+
+import numpy as np
+
+#: Shortest term the index can narrow.
+MIN_TERM_LENGTH = 3
+
+# Row ids are packed under the trigram code into one int64 sort key.
+_ROW_BITS = 31
+_ROW_MASK = (1 << _ROW_BITS) - 1
+# Rows encoded per batch while building, to bound the temporary matrices.
+_BUILD_CHUNK = 20_000
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Intersect two sorted unique id arrays, binary-searching the smaller."""
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a):
+        return _EMPTY
+    idx = np.searchsorted(b, a)
+    idx[idx == len(b)] = 0
+    return a[b[idx] == a]
+
+
+def _searchable_text(symbol, brsymbol, name, token) -> bytes:
+    """The fields search_symbols matches on, upper-cased and NUL-separated."""
+    return f"{symbol}\0{brsymbol}\0{name or ''}\0{token or ''}".upper().encode("utf-8")
+
+
+class SymbolSearchIndex:
+    """Trigram and strike postings over the rows of a symbol master.
+
+    The field sequences are aligned by row id; ``strikes`` is a float array
+    with NaN for rows without a strike.
+    """
+
+    def __init__(self, symbols, brsymbols, names, tokens, strikes: np.ndarray):
+        n = len(symbols)
+        if n > _ROW_MASK:
+            raise ValueError(f"too many rows for the search index: {n}")
+
+        keys = []
+        for lo in range(0, n, _BUILD_CHUNK):
+            hi = lo + _BUILD_CHUNK
+            texts = np.array(
+                [
+                    _searchable_text(*fields)
+                    for fields in zip(
+                        symbols[lo:hi], brsymbols[lo:hi], names[lo:hi], tokens[lo:hi], strict=True
+                    )
+                ]
+            )
+            width = texts.dtype.itemsize
+            if width < MIN_TERM_LENGTH:
+                continue
+            # Fixed-width byte matrix, zero-padded; every trigram touching a
+            # NUL (padding or field separator) is dropped below.
+            mat = texts.view(np.uint8).reshape(len(texts), width).astype(np.int64)
+            first, second, third = mat[:, :-2], mat[:, 1:-1], mat[:, 2:]
+            codes = (first << 16) | (second << 8) | third
+            valid = (first != 0) & (second != 0) & (third != 0)
+            row_ids = np.arange(lo, lo + len(texts), dtype=np.int64)[:, None]
+            packed = (codes << _ROW_BITS) | row_ids
+            keys.append(packed[valid])
+
+        # Sort, then drop repeats of a trigram within a row.
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+        keys.sort()
+        if len(keys):
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+
+        codes = keys >> _ROW_BITS
+        self._postings = (keys & _ROW_MASK).astype(np.int32)
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        self._starts = np.concatenate(([0], boundaries)).astype(np.int64)
+        self._ends = np.append(boundaries, len(codes)).astype(np.int64)
+        self._codes = codes[self._starts] if len(codes) else codes
+
+        # Row ids per strike, for rows whose strike is set and non-zero.
+        struck = np.flatnonzero((strikes != 0) & ~np.isnan(strikes)).astype(np.int32)
+        self._strike_rows = struck[np.argsort(strikes[struck], kind="stable")]
+        self._strike_values, self._strike_starts = np.unique(
+            strikes[self._strike_rows], return_index=True
+        )
+        self._map_strikes()
+
+    _ARRAYS = (
+        "_postings",
+        "_codes",
+        "_starts",
+        "_ends",
+        "_strike_rows",
+        "_strike_values",
+        "_strike_starts",
+    )
+
+    def _map_strikes(self) -> None:
+        # Not strict: with no strikes at all np.split still returns one
+        # (empty) piece, which pairs with nothing
+        self._by_strike = dict(
+            zip(
+                self._strike_values.tolist(),
+                np.split(self._strike_rows, self._strike_starts[1:]),
+                strict=False,
+            )
+        )
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """The index as plain arrays, for from_arrays."""
+        return {name.lstrip("_"): getattr(self, name) for name in self._ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "SymbolSearchIndex":
+        """Rebuild an index without re-tokenizing; arrays may be read-only maps."""
+        index = cls.__new__(cls)
+        for name in cls._ARRAYS:
+            setattr(index, name, arrays[name.lstrip("_")])
+        index._map_strikes()
+        return index
+
+    def _gram_rows(self, code: int) -> np.ndarray:
+        pos = np.searchsorted(self._codes, code)
+        if pos == len(self._codes) or self._codes[pos] != code:
+            return _EMPTY
+        return self._postings[self._starts[pos] : self._ends[pos]]
+
+    def _term_rows(self, term: str) -> np.ndarray | None:
+        """Rows that can match ``term``, or None if the term cannot narrow."""
+        data = term.encode("utf-8")
+        if len(data) < MIN_TERM_LENGTH:
+            return None
+
+        codes = {
+            (data[i] << 16) | (data[i + 1] << 8) | data[i + 2] for i in range(len(data) - 2)
+        }
+        lists = sorted((self._gram_rows(code) for code in codes), key=len)
+        rows = lists[0]
+        for other in lists[1:]:
+            if not len(rows):
+                break
+            rows = _intersect(rows, other)
+
+        try:
+            strike_rows = self._by_strike.get(float(term))
+        except ValueError:
+            strike_rows = None
+        if strike_rows is not None:
+            rows = np.union1d(rows, strike_rows)
+        return rows
+
+    def candidates(self, terms: list[str]) -> np.ndarray | None:
+        """Sorted row ids that may match every term (upper-cased).
+
+        None when no term is long enough to narrow the search; the caller
+        then checks every row, as before.
+        """
+        narrowing = [rows for rows in map(self._term_rows, terms) if rows is not None]
+        if not narrowing:
+            return None
+        narrowing.sort(key=len)
+        result = narrowing[0]
+        for rows in narrowing[1:]:
+            if not len(result):
+                break
+            result = _intersect(result, rows)
+        return result
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the postings, for cache monitoring."""
+        return int(sum(getattr(self, name).nbytes for name in self._ARRAYS))
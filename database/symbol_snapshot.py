@@ -0,0 +1,122 @@
+"""
+On-disk snapshot of the in-memory symbol cache.
+
+Loading the cache means reading every symtoken row through the ORM and
+building the store, lookup maps and search index -- many seconds on a large
+F&O master, during which token lookups fall back to the database. The master
+contract only changes when it is downloaded again, so after a load the cache
+is written out as plain .npy arrays and the next start maps them instead.
+
+A snapshot is a directory named after the broker, the master contract's
+download time and SNAPSHOT_VERSION, so a new download or a format change
+simply never matches an old one. Directories are written under a temporary
+name and renamed into place, and writing one removes every other snapshot.
+
+Numeric columns and the search index postings are memory-mapped read-only and
+used as they are; the per-row strings are decoded in one pass because the
+lookup maps need them as dict keys.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump whenever the arrays a snapshot holds, or their meaning, change.
+SNAPSHOT_VERSION = 1
+
+SYMBOL_CACHE_SNAPSHOT_ENABLED = os.getenv("SYMBOL_CACHE_SNAPSHOT", "true").lower() == "true"
+SNAPSHOT_DIR = os.getenv("SYMBOL_CACHE_SNAPSHOT_DIR", "db/symbol_cache")
+
+_META_FILE = "meta.json"
+
+
+def get_snapshot_dir() -> str:
+    """Absolute snapshot directory; relative paths are under the openalgo directory."""
+    if os.path.isabs(SNAPSHOT_DIR):
+        return SNAPSHOT_DIR
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, SNAPSHOT_DIR)
+
+
+def snapshot_key(broker: str, download_time: datetime) -> str:
+    """Directory name for a broker's master contract downloaded at ``download_time``."""
+    safe_broker = re.sub(r"[^A-Za-z0-9_-]", "_", broker)
+    return f"{safe_broker}-{download_time:%Y%m%dT%H%M%S%f}-v{SNAPSHOT_VERSION}"
+
+
+def write_snapshot(key: str, arrays: dict[str, np.ndarray], meta: dict) -> bool:
+    """Save ``arrays`` as snapshot ``key`` and drop every other snapshot."""
+    base = get_snapshot_dir()
+    try:
+        os.makedirs(base, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=base)
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+            with open(os.path.join(tmp, _META_FILE), "w") as f:
+                json.dump({**meta, "version": SNAPSHOT_VERSION, "arrays": sorted(arrays)}, f)
+
+            target = os.path.join(base, key)
+            if os.path.isdir(target):
+                shutil.rmtree(target, ignore_errors=True)
+            os.replace(tmp, target)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+    except Exception as e:
+        logger.warning(f"Could not write symbol cache snapshot {key}: {e}")
+        return False
+
+    remove_snapshots(keep=key)
+    return True
+
+
+def read_snapshot(key: str) -> tuple[dict[str, np.ndarray], dict] | None:
+    """Memory-map snapshot ``key``; None if it is missing, partial or another version."""
+    path = os.path.join(get_snapshot_dir(), key)
+    try:
+        with open(os.path.join(path, _META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("version") != SNAPSHOT_VERSION:
+            return None
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+            for name in meta["arrays"]
+        }
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable symbol cache snapshot {key}: {e}")
+        return None
+    return arrays, meta
+
+
+def remove_snapshots(keep: str | None = None) -> None:
+    """Delete every snapshot except ``keep``.
+
+    A snapshot still mapped by this process cannot be deleted on Windows; it
+    is left behind and removed by a later call.
+    """
+    base = get_snapshot_dir()
+    try:
+        entries = os.listdir(base)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry == keep:
+            continue
+        path = os.path.join(base, entry)
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+        except OSError as e:
+            logger.debug(f"Could not remove old symbol cache snapshot {entry}: {e}")
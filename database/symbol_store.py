@@ -0,0 +1,275 @@
+"""
+Columnar storage for the in-memory symbol master.
+
+BrokerSymbolCache used to hold one SymbolData object per contract, with every
+index pointing at those objects. A dataclass instance with its own attribute
+dict costs several hundred bytes before its strings, and a 200k-row F&O
+master repeats the same few exchange, name, expiry and instrument-type strings
+on every row.
+
+SymbolStore keeps one column per field instead and addresses rows by integer
+id:
+
+- symbol, brsymbol and token are lists of str. They are the only per-row
+  strings, and the cache's lookup dicts use the same objects as keys.
+- name, exchange, brexchange, expiry, instrumenttype and underlying are
+  interned: a table of distinct values plus an int32 code per row.
+- strike, lotsize, tick_size and contract_value are NumPy columns, and the
+  expiry is also kept as a yyyymmdd int for range filters.
+
+SymbolData objects are only built for the rows a lookup or search returns.
+to_arrays/from_arrays turn a store into plain NumPy arrays and back, which is
+what the on-disk snapshot (database/symbol_snapshot.py) saves and maps.
+"""
+
+import sys
+from datetime import datetime
+
+import numpy as np
+
+# Stand-ins for NULL in the numeric columns.
+NO_LOTSIZE = np.iinfo(np.int64).min
+NO_EXPIRY = 0
+
+_EXPIRY_FORMATS = ("%d-%b-%y", "%d-%b-%Y")
+
+
+def expiry_to_int(expiry: str | None) -> int:
+    """yyyymmdd for a master-contract expiry ("26-DEC-24"), NO_EXPIRY if unparseable."""
+    if not expiry:
+        return NO_EXPIRY
+    for fmt in _EXPIRY_FORMATS:
+        try:
+            parsed = datetime.strptime(expiry, fmt)
+        except ValueError:
+            continue
+        return parsed.year * 10000 + parsed.month * 100 + parsed.day
+    return NO_EXPIRY
+
+
+def pack_strings(values) -> tuple[np.ndarray, np.ndarray]:
+    """NUL-joined UTF-8 bytes plus a None mask, for saving a string column."""
+    values = list(values)
+    joined = "\0".join("" if v is None else v for v in values)
+    if len(values) and joined.count("\0") != len(values) - 1:
+        raise ValueError("string column contains NUL characters")
+    blob = np.frombuffer(joined.encode("utf-8"), dtype=np.uint8)
+    return blob, np.array([v is None for v in values], dtype=bool)
+
+
+def unpack_strings(blob: np.ndarray, nulls: np.ndarray) -> list:
+    """Inverse of pack_strings."""
+    if not len(nulls):
+        return []
+    values = blob.tobytes().decode("utf-8").split("\0")
+    for row in np.flatnonzero(nulls).tolist():
+        values[row] = None
+    return values
+
+
+class InternedColumn:
+    """A low-cardinality column: distinct values and an int32 code per row."""
+
+    def __init__(self):
+        self.values: list = []
+        self._codes: dict = {}
+        self._pending: list[int] = []
+        self.codes = np.empty(0, dtype=np.int32)
+
+    def append(self, value) -> None:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        self._pending.append(code)
+
+    def finish(self) -> None:
+        pending = np.asarray(self._pending, dtype=np.int32)
+        self.codes = np.concatenate((self.codes, pending)) if len(self.codes) else pending
+        self._pending = []
+
+    @classmethod
+    def from_arrays(cls, values: list, codes: np.ndarray) -> "InternedColumn":
+        column = cls()
+        column.values = values
+        column._codes = {value: code for code, value in enumerate(values)}
+        column.codes = codes
+        return column
+
+    def subset(self, rows: np.ndarray) -> "InternedColumn":
+        """A column of just ``rows``, with a copy of this value table."""
+        return InternedColumn.from_arrays(list(self.values), self.codes[rows])
+
+    def code_of(self, value) -> int:
+        """Code for ``value``, or -1 if no row has it."""
+        return self._codes.get(value, -1)
+
+    def __getitem__(self, row: int):
+        return self.values[self.codes[row]]
+
+    def take(self, rows: np.ndarray) -> list:
+        """Values for several rows, as a list aligned with ``rows``."""
+        values = self.values
+        return [values[code] for code in self.codes[rows].tolist()]
+
+    def memory_bytes(self) -> int:
+        return (
+            self.codes.nbytes
+            + sys.getsizeof(self.values)
+            + sys.getsizeof(self._codes)
+            + sum(sys.getsizeof(v) for v in self.values if v is not None)
+        )
+
+
+class SymbolStore:
+    """Column-per-field symbol master. Rows are appended once, then frozen."""
+
+    INTERNED = ("name", "exchange", "brexchange", "expiry", "instrumenttype", "underlying")
+    NUMERIC = ("strike", "lotsize", "tick_size", "contract_value", "expiry_date")
+
+    def __init__(self):
+        self.symbol: list[str] = []
+        self.brsymbol: list[str] = []
+        self.token: list[str] = []
+
+        self.name = InternedColumn()
+        self.exchange = InternedColumn()
+        self.brexchange = InternedColumn()
+        self.expiry = InternedColumn()
+        self.instrumenttype = InternedColumn()
+        self.underlying = InternedColumn()
+
+        self.strike = np.empty(0, dtype=np.float64)
+        self.lotsize = np.empty(0, dtype=np.int64)
+        self.tick_size = np.empty(0, dtype=np.float64)
+        self.contract_value = np.empty(0, dtype=np.float64)
+        self.expiry_date = np.empty(0, dtype=np.int32)
+
+        self._numeric: list[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.symbol)
+
+    def append(self, record, underlying: str | None) -> int:
+        """Add a SymToken-like record and return its row id."""
+        row = len(self.symbol)
+        self.symbol.append(record.symbol)
+        self.brsymbol.append(record.brsymbol)
+        self.token.append(record.token)
+        self.name.append(record.name)
+        self.exchange.append(record.exchange)
+        self.brexchange.append(record.brexchange)
+        self.expiry.append(record.expiry)
+        self.instrumenttype.append(record.instrumenttype)
+        self.underlying.append(underlying)
+        self._numeric.append(
+            (
+                record.strike,
+                record.lotsize,
+                record.tick_size,
+                getattr(record, "contract_value", None),
+            )
+        )
+        return row
+
+    def finish(self) -> None:
+        """Convert the appended rows into their final column arrays."""
+        for name in self.INTERNED:
+            getattr(self, name).finish()
+
+        def floats(values):
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+        if self._numeric:
+            strikes, lotsizes, tick_sizes, contract_values = zip(*self._numeric, strict=True)
+        else:
+            strikes = lotsizes = tick_sizes = contract_values = ()
+        # Rows appended after a previous finish (see subset) extend the columns
+        self.strike = np.concatenate((self.strike, floats(strikes)))
+        lotsizes = np.array([NO_LOTSIZE if v is None else v for v in lotsizes], dtype=np.int64)
+        self.lotsize = np.concatenate((self.lotsize, lotsizes))
+        self.tick_size = np.concatenate((self.tick_size, floats(tick_sizes)))
+        self.contract_value = np.concatenate((self.contract_value, floats(contract_values)))
+        self._numeric = []
+
+        # Parse each distinct expiry once, then spread it over the rows.
+        dates = np.array([expiry_to_int(e) for e in self.expiry.values], dtype=np.int32)
+        self.expiry_date = dates[self.expiry.codes] if len(dates) else dates
+
+    def subset(self, rows: np.ndarray) -> "SymbolStore":
+        """A finished store of just ``rows``, in that order.
+
+        More rows can be appended to it and finished again; that is how the
+        symbol cache applies a master contract diff without a full reload.
+        """
+        store = SymbolStore()
+        rows = np.asarray(rows, dtype=np.int64)
+        row_list = rows.tolist()
+        for name in ("symbol", "brsymbol", "token"):
+            column = getattr(self, name)
+            setattr(store, name, [column[row] for row in row_list])
+        for name in self.INTERNED:
+            setattr(store, name, getattr(self, name).subset(rows))
+        for name in self.NUMERIC:
+            setattr(store, name, getattr(self, name)[rows])
+        return store
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Every column as a NumPy array, for from_arrays."""
+        arrays = {}
+        for name in ("symbol", "brsymbol", "token"):
+            arrays[f"{name}.blob"], arrays[f"{name}.nulls"] = pack_strings(getattr(self, name))
+        for name in self.INTERNED:
+            column = getattr(self, name)
+            arrays[f"{name}.blob"], arrays[f"{name}.nulls"] = pack_strings(column.values)
+            arrays[f"{name}.codes"] = column.codes
+        for name in self.NUMERIC:
+            arrays[name] = getattr(self, name)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "SymbolStore":
+        """Rebuild a finished store. Numeric columns and codes are used as given
+        (they may be read-only memory maps); strings are decoded."""
+        store = cls()
+        for name in ("symbol", "brsymbol", "token"):
+            setattr(store, name, unpack_strings(arrays[f"{name}.blob"], arrays[f"{name}.nulls"]))
+        for name in cls.INTERNED:
+            values = unpack_strings(arrays[f"{name}.blob"], arrays[f"{name}.nulls"])
+            setattr(store, name, InternedColumn.from_arrays(values, arrays[f"{name}.codes"]))
+        for name in cls.NUMERIC:
+            setattr(store, name, arrays[name])
+        return store
+
+    def record(self, row: int) -> dict:
+        """Field values of one row, as SymbolData keyword arguments."""
+        strike = self.strike[row]
+        lotsize = self.lotsize[row]
+        tick_size = self.tick_size[row]
+        contract_value = self.contract_value[row]
+        return {
+            "symbol": self.symbol[row],
+            "brsymbol": self.brsymbol[row],
+            "name": self.name[row],
+            "exchange": self.exchange[row],
+            "brexchange": self.brexchange[row],
+            "token": self.token[row],
+            "expiry": self.expiry[row],
+            "strike": None if np.isnan(strike) else float(strike),
+            "lotsize": None if lotsize == NO_LOTSIZE else int(lotsize),
+            "instrumenttype": self.instrumenttype[row],
+            "tick_size": None if np.isnan(tick_size) else float(tick_size),
+            "underlying": self.underlying[row],
+            "contract_value": None if np.isnan(contract_value) else float(contract_value),
+        }
+
+    def memory_bytes(self) -> dict[str, int]:
+        """Measured footprint by kind of column."""
+        strings = 0
+        for column in (self.symbol, self.brsymbol, self.token):
+            strings += sys.getsizeof(column) + sum(sys.getsizeof(s) for s in column)
+        return {
+            "string_columns": strings,
+            "interned_columns": sum(getattr(self, name).memory_bytes() for name in self.INTERNED),
+            "numeric_columns": sum(getattr(self, name).nbytes for name in self.NUMERIC),
+        }
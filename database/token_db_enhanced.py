@@ -5,14 +5,25 @@ Optimized for zero-config deployment with configurable session reset time (SESSI
 
 import heapq
 import re
+import sys
 import time
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pytz
 
+from database.fno_chain_index import KIND_CE, KIND_FUT, KIND_PE, FnoChainIndex
+from database.symbol_search_index import SymbolSearchIndex
+from database.symbol_snapshot import (
+    SYMBOL_CACHE_SNAPSHOT_ENABLED,
+    read_snapshot,
+    snapshot_key,
+    write_snapshot,
+)
+from database.symbol_store import NO_EXPIRY, SymbolStore
 from utils.constants import CRYPTO_EXCHANGES, FNO_EXCHANGES
 from utils.logging import get_logger
 
@@ -136,28 +147,48 @@ class SymbolData:
     contract_value: float | None = None  # Contract multiplier (e.g. 0.001 for BTCUSD.P)
 
 
-class BrokerSymbolCache:
+class _CacheState:
     """
-    High-performance in-memory cache for broker symbols
-    Designed to handle 100,000+ symbols with minimal memory footprint
+    One generation of the loaded symbol master: the store and every map and
+    index over its row ids. A state is built whole and published by a single
+    assignment to BrokerSymbolCache._state, so a reader that takes the state
+    once never resolves a row id of one generation against another's columns.
     """
 
-    def __init__(self):
-        # Active broker context
-        self.active_broker: str | None = None
-        self.cache_loaded: bool = False
+    __slots__ = (
+        "store",
+        "symbol_ids",
+        "token_ids",
+        "brsymbol_ids",
+        "ids_by_token",
+        "ids_by_exchange",
+        "expiries_by_exchange",
+        "underlyings_by_exchange",
+        "tradable_underlyings_by_exchange",
+        "expiries_by_exchange_underlying",
+        "unique_ids",
+        "search_order",
+        "search_index",
+        "fno_index",
+        "memory",
+    )
 
-        # Primary storage - all symbols in memory
-        self.symbols: dict[str, SymbolData] = {}
+    def __init__(self, store: SymbolStore | None = None):
+        # Primary storage - all symbols in memory, one column per field.
+        # Everything below refers to rows by their integer id in the store.
+        self.store = store if store is not None else SymbolStore()
 
-        # Multi-index maps for O(1) lookups
-        self.by_symbol_exchange: dict[tuple[str, str], SymbolData] = {}
-        self.by_token_exchange: dict[tuple[str, str], SymbolData] = {}
-        self.by_brsymbol_exchange: dict[tuple[str, str], SymbolData] = {}
-        self.by_token: dict[str, SymbolData] = {}
+        # Multi-index maps for O(1) lookups, partitioned by exchange:
+        # exchange -> symbol / token / brsymbol -> row id
+        self.symbol_ids: dict[str, dict[str, int]] = {}
+        self.token_ids: dict[str, dict[str, int]] = {}
+        self.brsymbol_ids: dict[str, dict[str, int]] = {}
+        # token -> row id across exchanges; a later row with the same token wins
+        self.ids_by_token: dict[str, int] = {}
 
         # Pre-computed indexes for FNO filter performance (O(1) lookups)
-        self.by_exchange: dict[str, list[SymbolData]] = defaultdict(list)
+        # exchange -> row ids in load order
+        self.ids_by_exchange: dict[str, np.ndarray] = {}
         self.expiries_by_exchange: dict[str, set[str]] = defaultdict(set)
         # Options-only: underlyings that have at least one CE/PE row. Used by
         # option-chain / IV-chart / GEX dropdowns where futures-only commodities
@@ -170,6 +201,65 @@ class BrokerSymbolCache:
         self.tradable_underlyings_by_exchange: dict[str, set[str]] = defaultdict(set)
         self.expiries_by_exchange_underlying: dict[tuple[str, str], set[str]] = defaultdict(set)
 
+        # Rows an unfiltered search covers (the ids_by_token values, in that
+        # order), and each row's position in it or -1.
+        self.unique_ids = np.empty(0, dtype=np.int64)
+        self.search_order = np.empty(0, dtype=np.int64)
+        # Trigram index for search_symbols. None until symbols are loaded, or
+        # if building it failed -- search then scans.
+        self.search_index: SymbolSearchIndex | None = None
+        # Kind columns and strike-sorted option chains for fno_search_symbols
+        # and get_option_chain. None until symbols are loaded.
+        self.fno_index: FnoChainIndex | None = None
+        self.memory: dict = {}
+
+
+def _state_field(name: str, writable: bool = False) -> property:
+    """Cache attribute read from (and for ``writable`` written to) the current state."""
+
+    def fget(self):
+        return getattr(self._state, name)
+
+    def fset(self, value):
+        setattr(self._state, name, value)
+
+    return property(fget, fset if writable else None, doc=f"Current state's {name}")
+
+
+class BrokerSymbolCache:
+    """
+    High-performance in-memory cache for broker symbols
+    Designed to handle 100,000+ symbols with minimal memory footprint
+
+    The store and its indexes live in one _CacheState that loads and refreshes
+    replace wholesale; the attributes below read the current one. A method
+    that uses more than one of them takes ``self._state`` once instead.
+    """
+
+    store = _state_field("store")
+    symbol_ids = _state_field("symbol_ids")
+    token_ids = _state_field("token_ids")
+    brsymbol_ids = _state_field("brsymbol_ids")
+    ids_by_token = _state_field("ids_by_token")
+    ids_by_exchange = _state_field("ids_by_exchange")
+    expiries_by_exchange = _state_field("expiries_by_exchange")
+    underlyings_by_exchange = _state_field("underlyings_by_exchange")
+    tradable_underlyings_by_exchange = _state_field("tradable_underlyings_by_exchange")
+    expiries_by_exchange_underlying = _state_field("expiries_by_exchange_underlying")
+    search_index = _state_field("search_index", writable=True)
+    fno_index = _state_field("fno_index")
+
+    def __init__(self):
+        # Active broker context
+        self.active_broker: str | None = None
+        self.cache_loaded: bool = False
+
+        # The loaded symbol master and every index over it
+        self._state = _CacheState()
+        # Set when a master contract diff was applied in place, so the load
+        # that follows the download has nothing to read
+        self._refreshed_in_place = False
+
         # Cache statistics
         self.stats = CacheStats()
 
@@ -185,116 +275,33 @@ class BrokerSymbolCache:
         This is called once after master contract download
         """
         try:
-            from database.symbol import SymToken
-
             start_time = time.time()
             logger.debug(f"Loading all symbols for broker: {broker}")
 
-            # Clear existing cache
-            self.clear_cache()
-
-            # Query all symbols from database
-            symbols = SymToken.query.all()
-
-            if not symbols:
-                logger.warning(f"No symbols found in database for broker: {broker}")
-                return False
-
-            # Today (IST) for the live-future check on the tradable underlyings index.
-            # Computed once per cache load — cache invalidates at the daily session
-            # reset (3 AM IST default), so a fresh `today` is picked up each day.
-            ist_today = datetime.now(pytz.timezone("Asia/Kolkata")).date()
-            # Tiny memo for repeated expiry strings (~thousands of FUT rows share
-            # a few dozen distinct dates); strptime is cheap but not free.
-            _expiry_date_cache: dict[str, "datetime.date | None"] = {}
-
-            def _exp_to_date(exp_str):
-                if not exp_str:
-                    return None
-                cached = _expiry_date_cache.get(exp_str)
-                if cached is not None or exp_str in _expiry_date_cache:
-                    return cached
-                parsed = None
-                for fmt in ("%d-%b-%y", "%d-%b-%Y"):
-                    try:
-                        parsed = datetime.strptime(exp_str, fmt).date()
-                        break
-                    except ValueError:
-                        continue
-                _expiry_date_cache[exp_str] = parsed
-                return parsed
-
-            # Build in-memory structures
-            for sym in symbols:
-                # Extract underlying from OpenAlgo symbol format for FNO exchanges
-                underlying = None
-                if sym.exchange in FNO_EXCHANGES:
-                    underlying = extract_underlying_from_symbol(sym.symbol, sym.exchange)
-
-                # Create lightweight data object
-                symbol_data = SymbolData(
-                    symbol=sym.symbol,
-                    brsymbol=sym.brsymbol,
-                    name=sym.name,
-                    exchange=sym.exchange,
-                    brexchange=sym.brexchange,
-                    token=sym.token,
-                    expiry=sym.expiry,
-                    strike=sym.strike,
-                    lotsize=sym.lotsize,
-                    instrumenttype=sym.instrumenttype,
-                    tick_size=sym.tick_size,
-                    underlying=underlying,
-                    contract_value=getattr(sym, 'contract_value', None),
-                )
-
-                # Store in primary dict
-                self.symbols[sym.token] = symbol_data
-
-                # Build indexes
-                self.by_symbol_exchange[(sym.symbol, sym.exchange)] = symbol_data
-                self.by_token_exchange[(sym.token, sym.exchange)] = symbol_data
-                self.by_brsymbol_exchange[(sym.brsymbol, sym.exchange)] = symbol_data
-                self.by_token[sym.token] = symbol_data
-
-                # Build FNO filter indexes for O(1) lookups
-                self.by_exchange[sym.exchange].append(symbol_data)
-                if sym.expiry:
-                    self.expiries_by_exchange[sym.exchange].add(sym.expiry)
-                    # Use extracted underlying for index (more reliable than broker's name field)
-                    if underlying:
-                        self.expiries_by_exchange_underlying[(sym.exchange, underlying)].add(sym.expiry)
-                # Use extracted underlying for underlyings index.
-                # `underlyings_by_exchange` is options-only — option-chain/IV-chart
-                # dropdowns must not show futures-only commodities (dead-ends).
-                # `tradable_underlyings_by_exchange` is the union (options OR live
-                # futures) — used by the generic search/token UI where every
-                # tradable contract should be discoverable.
-                sym_upper = sym.symbol.upper()
-                if underlying:
-                    if sym_upper.endswith("CE") or sym_upper.endswith("PE"):
-                        self.underlyings_by_exchange[sym.exchange].add(underlying)
-                        self.tradable_underlyings_by_exchange[sym.exchange].add(underlying)
-                    elif sym_upper.endswith("FUT"):
-                        exp_date = _exp_to_date(sym.expiry)
-                        if exp_date and exp_date >= ist_today:
-                            self.tradable_underlyings_by_exchange[sym.exchange].add(underlying)
+            key = self._snapshot_key(broker) if SYMBOL_CACHE_SNAPSHOT_ENABLED else None
+            if self.cache_loaded and self._refreshed_in_place:
+                # The download's diff was already applied to this cache
+                # (apply_master_contract_diff); only the snapshot is stale
+                self._refreshed_in_place = False
+                source = "incremental refresh"
+                if key:
+                    self._write_snapshot(key, broker)
+            else:
+                # Clear existing cache
+                self.clear_cache()
+                source = self._load_from_snapshot_or_database(key, broker)
+                if source is None:
+                    return False
 
             # Update cache metadata
             self.active_broker = broker
             self.cache_loaded = True
-            self.stats.total_symbols = len(symbols)
             self.stats.cache_loads += 1
             self.stats.last_loaded = datetime.now(pytz.timezone("Asia/Kolkata"))
 
-            # Calculate memory usage (rough estimate)
-            self.stats.memory_usage_mb = (
-                len(self.symbols) * 500  # ~500 bytes per symbol
-            ) / (1024 * 1024)
-
             load_time = time.time() - start_time
             logger.debug(
-                f"Successfully loaded {self.stats.total_symbols} symbols "
+                f"Successfully loaded {self.stats.total_symbols} symbols from {source} "
                 f"in {load_time:.2f} seconds. "
                 f"Memory usage: {self.stats.memory_usage_mb:.2f} MB"
             )
@@ -308,6 +315,329 @@ class BrokerSymbolCache:
             logger.exception(f"Error loading symbols into cache: {e}")
             return False
 
+    def _load_from_snapshot_or_database(self, key: str | None, broker: str) -> str | None:
+        """Fill the empty cache; returns where from, or None if symtoken is empty.
+
+        Maps the on-disk snapshot of this master contract if there is one,
+        otherwise queries all symbols from database and writes one.
+        """
+        from database.symbol import SymToken
+
+        snapshot = read_snapshot(key) if key else None
+        if snapshot is not None and self._restore_snapshot(snapshot[0]):
+            return "snapshot"
+
+        symbols = SymToken.query.all()
+        if not symbols:
+            logger.warning(f"No symbols found in database for broker: {broker}")
+            return None
+
+        self._load_records(symbols)
+        if key:
+            self._write_snapshot(key, broker)
+        return "database"
+
+    def _load_records(self, records) -> None:
+        """Build the store and every index from SymToken-like records."""
+        store = SymbolStore()
+        for sym in records:
+            store.append(sym, self._underlying_of(sym))
+        store.finish()
+
+        self._publish(self._index_store(store))
+
+    @staticmethod
+    def _underlying_of(sym) -> str | None:
+        """Extract underlying from OpenAlgo symbol format for FNO exchanges"""
+        if sym.exchange in FNO_EXCHANGES:
+            return extract_underlying_from_symbol(sym.symbol, sym.exchange)
+        return None
+
+    def apply_master_contract_diff(self, diff) -> bool:
+        """
+        Patch the loaded cache with the rows a master contract refresh changed
+        in symtoken (see database/master_contract_sync.py) instead of reading
+        the table back.
+
+        Rows keep the table's order: unchanged rows stay put, changed rows are
+        replaced where they were and added rows go last, as their new ids do.
+        The derived indexes are then rebuilt from the columns.
+
+        Returns:
+            False, leaving the cache untouched, when it is not loaded or does
+            not hold the rows the diff was taken against
+        """
+        store = self._state.store
+        if not self.cache_loaded or len(store) != diff.previous_rows:
+            return False
+
+        start_time = time.time()
+        # (exchange, token, occurrence) -> row, the way the diff keys rows
+        positions = {}
+        seen: dict[tuple[str, str], int] = defaultdict(int)
+        exchanges = store.exchange.take(np.arange(len(store)))
+        for row, (exchange, token) in enumerate(zip(exchanges, store.token, strict=True)):
+            pair = ("" if exchange is None else exchange, "" if token is None else str(token))
+            positions[(*pair, seen[pair])] = row
+            seen[pair] += 1
+
+        def rows_of(frame) -> list[int] | None:
+            keys = zip(
+                frame["_exchange"], frame["_token"], frame["_occurrence"].tolist(), strict=True
+            )
+            rows = [positions.get(key) for key in keys]
+            return None if None in rows else rows
+
+        removed_rows = rows_of(diff.removed)
+        changed_rows = rows_of(diff.changed)
+        if removed_rows is None or changed_rows is None:
+            logger.info("Symbol cache does not match symtoken, it will be reloaded")
+            return False
+
+        fields = SymbolData.__dataclass_fields__
+        dropped = np.zeros(len(store), dtype=bool)
+        dropped[removed_rows] = True
+        dropped[changed_rows] = True
+        kept = np.flatnonzero(~dropped)
+        patched = store.subset(kept)
+        # A changed row keeps whatever the broker's columns do not cover
+        records = [
+            {**store.record(row), **values}
+            for row, values in zip(changed_rows, diff.changed_records(), strict=True)
+        ]
+        records += [dict.fromkeys(fields) | values for values in diff.added_records()]
+        for values in records:
+            values = {name: value for name, value in values.items() if name in fields}
+            if values["token"] is not None:
+                values["token"] = str(values["token"])
+            sym = SymbolData(**values)
+            patched.append(sym, self._underlying_of(sym))
+        patched.finish()
+
+        # Back into table order: each row where its id puts it
+        changed = np.asarray(changed_rows, dtype=np.int64)
+        order = np.concatenate((kept, changed, len(store) + np.arange(len(diff.added))))
+        self._publish(self._index_store(patched.subset(np.argsort(order, kind="stable"))))
+        self._refreshed_in_place = True
+
+        logger.debug(
+            f"Applied master contract diff to the symbol cache ({diff.summary()}) "
+            f"in {time.time() - start_time:.2f} seconds"
+        )
+        return True
+
+    def _index_store(
+        self, store: SymbolStore, search_index: SymbolSearchIndex | None = None
+    ) -> _CacheState:
+        """Build a new state holding ``store`` and every map and index over it.
+
+        Nothing is published; the current state keeps serving until the caller
+        hands the result to _publish. ``search_index`` is reused when given
+        (restored from a snapshot), otherwise it is built.
+        """
+        state = _CacheState(store)
+
+        all_ids = np.arange(len(store))
+        exchanges = store.exchange.take(all_ids)
+        expiries = store.expiry.take(all_ids)
+        underlyings = store.underlying.take(all_ids)
+        expiry_dates = store.expiry_date.tolist()
+        state.fno_index = FnoChainIndex(store)
+        kinds = state.fno_index.kinds.tolist()
+
+        # Today (IST) for the live-future check on the tradable underlyings index.
+        # Computed once per cache load — cache invalidates at the daily session
+        # reset (3 AM IST default), so a fresh `today` is picked up each day.
+        ist_today = datetime.now(pytz.timezone("Asia/Kolkata")).date()
+        today = ist_today.year * 10000 + ist_today.month * 100 + ist_today.day
+
+        symbol_ids: dict[str, dict[str, int]] = defaultdict(dict)
+        token_ids: dict[str, dict[str, int]] = defaultdict(dict)
+        brsymbol_ids: dict[str, dict[str, int]] = defaultdict(dict)
+        ids_by_token = state.ids_by_token
+
+        rows = zip(
+            store.symbol, store.token, store.brsymbol, exchanges, expiries, underlyings, strict=True
+        )
+        for row, (symbol, token, brsymbol, exchange, expiry, underlying) in enumerate(rows):
+            # Build indexes; they key on the store's own string objects
+            symbol_ids[exchange][symbol] = row
+            token_ids[exchange][token] = row
+            brsymbol_ids[exchange][brsymbol] = row
+            ids_by_token[token] = row
+
+            # Build FNO filter indexes for O(1) lookups
+            if expiry:
+                state.expiries_by_exchange[exchange].add(expiry)
+                # Use extracted underlying for index (more reliable than broker's name field)
+                if underlying:
+                    state.expiries_by_exchange_underlying[(exchange, underlying)].add(expiry)
+            # Use extracted underlying for underlyings index.
+            # `underlyings_by_exchange` is options-only — option-chain/IV-chart
+            # dropdowns must not show futures-only commodities (dead-ends).
+            # `tradable_underlyings_by_exchange` is the union (options OR live
+            # futures) — used by the generic search/token UI where every
+            # tradable contract should be discoverable.
+            if underlying:
+                kind = kinds[row]
+                if kind == KIND_CE or kind == KIND_PE:
+                    state.underlyings_by_exchange[exchange].add(underlying)
+                    state.tradable_underlyings_by_exchange[exchange].add(underlying)
+                elif kind == KIND_FUT:
+                    exp_date = expiry_dates[row]
+                    if exp_date != NO_EXPIRY and exp_date >= today:
+                        state.tradable_underlyings_by_exchange[exchange].add(underlying)
+
+        state.symbol_ids = dict(symbol_ids)
+        state.token_ids = dict(token_ids)
+        state.brsymbol_ids = dict(brsymbol_ids)
+        state.ids_by_exchange = {
+            exchange: np.flatnonzero(store.exchange.codes == code).astype(np.int32)
+            for code, exchange in enumerate(store.exchange.values)
+        }
+
+        state.unique_ids = np.fromiter(
+            ids_by_token.values(), dtype=np.int64, count=len(ids_by_token)
+        )
+        state.search_order = np.full(len(store), -1, dtype=np.int64)
+        state.search_order[state.unique_ids] = np.arange(len(state.unique_ids))
+        if search_index is not None:
+            state.search_index = search_index
+        else:
+            state.search_index = self._build_search_index(store)
+
+        state.memory = self._measure_memory(state)
+        return state
+
+    def _publish(self, state: _CacheState) -> None:
+        """Make ``state`` the one lookups read, in a single assignment."""
+        self._state = state
+        self.stats.total_symbols = len(state.store)
+        self.stats.memory_usage_mb = state.memory.get("total_mb", 0.0)
+
+    def _snapshot_key(self, broker: str) -> str | None:
+        """Snapshot key for the master contract now in symtoken, if it is known.
+
+        symtoken holds whichever broker downloaded last, so a snapshot is only
+        keyed (and trusted) for that broker.
+        """
+        from database.master_contract_status_db import (
+            get_last_download_time,
+            get_last_downloaded_broker,
+        )
+
+        if get_last_downloaded_broker() != broker:
+            return None
+        download_time = get_last_download_time(broker)
+        return snapshot_key(broker, download_time) if download_time else None
+
+    def _write_snapshot(self, key: str, broker: str) -> None:
+        state = self._state
+        arrays = state.store.to_arrays()
+        if state.search_index is not None:
+            for name, array in state.search_index.to_arrays().items():
+                arrays[f"search.{name}"] = array
+        write_snapshot(key, arrays, {"broker": broker, "rows": len(state.store)})
+
+    def _restore_snapshot(self, arrays: dict[str, np.ndarray]) -> bool:
+        """Load the cache from a mapped snapshot; False leaves it empty."""
+        try:
+            store = SymbolStore.from_arrays(arrays)
+            search = {
+                name[len("search.") :]: array
+                for name, array in arrays.items()
+                if name.startswith("search.")
+            }
+            search_index = SymbolSearchIndex.from_arrays(search) if search else None
+            self._publish(self._index_store(store, search_index))
+            return True
+        except Exception as e:
+            logger.exception(f"Error restoring symbol cache snapshot, loading from database: {e}")
+            self.clear_cache()
+            return False
+
+    @staticmethod
+    def _build_search_index(store: SymbolStore) -> SymbolSearchIndex | None:
+        """Index ``store`` for search_symbols. On failure (None) search scans as before."""
+        try:
+            start_time = time.time()
+            index = SymbolSearchIndex(
+                store.symbol,
+                store.brsymbol,
+                store.name.take(np.arange(len(store))),
+                store.token,
+                store.strike,
+            )
+        except Exception as e:
+            logger.exception(f"Error building symbol search index, search will scan: {e}")
+            return None
+
+        logger.debug(
+            f"Built symbol search index over {len(store)} rows in "
+            f"{time.time() - start_time:.2f} seconds "
+            f"({index.memory_bytes() / (1024 * 1024):.1f} MB)"
+        )
+        return index
+
+    @staticmethod
+    def _search_ids(state: _CacheState, terms: list[str], exchange: str | None) -> np.ndarray:
+        """Row ids search_symbols checks, in scan order.
+
+        The rows of ``exchange`` (or one row per token without it), narrowed
+        to those the search index cannot rule out when any term is long
+        enough for it.
+        """
+        by_exchange = bool(exchange) and exchange in state.ids_by_exchange
+        candidates = None
+        if state.search_index is not None:
+            candidates = state.search_index.candidates(terms)
+        if candidates is None:
+            return state.ids_by_exchange[exchange] if by_exchange else state.unique_ids
+
+        if by_exchange:
+            code = state.store.exchange.code_of(exchange)
+            return candidates[state.store.exchange.codes[candidates] == code]
+        order = state.search_order[candidates]
+        keep = order >= 0
+        return candidates[keep][np.argsort(order[keep], kind="stable")]
+
+    @staticmethod
+    def _row(store: SymbolStore, row: int) -> SymbolData:
+        """Materialize one stored row."""
+        return SymbolData(**store.record(row))
+
+    @staticmethod
+    def _find(index: dict[str, dict[str, int]], key: str, exchange: str) -> int | None:
+        ids = index.get(exchange)
+        return ids.get(key) if ids else None
+
+    @staticmethod
+    def _measure_memory(state: _CacheState) -> dict:
+        """Measured footprint of a built state, for get_cache_info."""
+        store = state.store
+        sizes = store.memory_bytes()
+        sizes["lookup_indexes"] = (
+            sum(
+                sys.getsizeof(ids)
+                for index in (state.symbol_ids, state.token_ids, state.brsymbol_ids)
+                for ids in index.values()
+            )
+            + sys.getsizeof(state.ids_by_token)
+            + sum(ids.nbytes for ids in state.ids_by_exchange.values())
+            # One int object per row id, shared by every map
+            + len(store) * sys.getsizeof(1 << 20)
+        )
+        sizes["search_index"] = state.unique_ids.nbytes + state.search_order.nbytes
+        if state.search_index is not None:
+            sizes["search_index"] += state.search_index.memory_bytes()
+        sizes["fno_index"] = state.fno_index.memory_bytes() if state.fno_index is not None else 0
+
+        total = sum(sizes.values())
+        report = {f"{name}_mb": round(size / (1024 * 1024), 2) for name, size in sizes.items()}
+        report["total_mb"] = round(total / (1024 * 1024), 2)
+        report["bytes_per_symbol"] = round(total / len(store)) if len(store) else 0
+        return report
+
     def _set_session_timing(self):
         """Set session start and next reset time from SESSION_EXPIRY_TIME env variable"""
         import os
@@ -343,10 +673,11 @@ class BrokerSymbolCache:
 
     def get_token(self, symbol: str, exchange: str) -> str | None:
         """Get token for symbol and exchange - O(1) lookup"""
+        state = self._state
         self.stats.hits += 1
-        key = (symbol, exchange)
-        if key in self.by_symbol_exchange:
-            return self.by_symbol_exchange[key].token
+        row = self._find(state.symbol_ids, symbol, exchange)
+        if row is not None:
+            return state.store.token[row]
 
         self.stats.hits -= 1
         self.stats.misses += 1
@@ -354,10 +685,11 @@ class BrokerSymbolCache:
 
     def get_symbol(self, token: str, exchange: str) -> str | None:
         """Get symbol for token and exchange - O(1) lookup"""
+        state = self._state
         self.stats.hits += 1
-        key = (token, exchange)
-        if key in self.by_token_exchange:
-            return self.by_token_exchange[key].symbol
+        row = self._find(state.token_ids, token, exchange)
+        if row is not None:
+            return state.store.symbol[row]
 
         self.stats.hits -= 1
         self.stats.misses += 1
@@ -365,10 +697,11 @@ class BrokerSymbolCache:
 
     def get_br_symbol(self, symbol: str, exchange: str) -> str | None:
         """Get broker symbol for symbol and exchange - O(1) lookup"""
+        state = self._state
         self.stats.hits += 1
-        key = (symbol, exchange)
-        if key in self.by_symbol_exchange:
-            return self.by_symbol_exchange[key].brsymbol
+        row = self._find(state.symbol_ids, symbol, exchange)
+        if row is not None:
+            return state.store.brsymbol[row]
 
         self.stats.hits -= 1
         self.stats.misses += 1
@@ -376,10 +709,11 @@ class BrokerSymbolCache:
 
     def get_oa_symbol(self, brsymbol: str, exchange: str) -> str | None:
         """Get OpenAlgo symbol for broker symbol and exchange - O(1) lookup"""
+        state = self._state
         self.stats.hits += 1
-        key = (brsymbol, exchange)
-        if key in self.by_brsymbol_exchange:
-            return self.by_brsymbol_exchange[key].symbol
+        row = self._find(state.brsymbol_ids, brsymbol, exchange)
+        if row is not None:
+            return state.store.symbol[row]
 
         self.stats.hits -= 1
         self.stats.misses += 1
@@ -387,10 +721,11 @@ class BrokerSymbolCache:
 
     def get_brexchange(self, symbol: str, exchange: str) -> str | None:
         """Get broker exchange for symbol and exchange - O(1) lookup"""
+        state = self._state
         self.stats.hits += 1
-        key = (symbol, exchange)
-        if key in self.by_symbol_exchange:
-            return self.by_symbol_exchange[key].brexchange
+        row = self._find(state.symbol_ids, symbol, exchange)
+        if row is not None:
+            return state.store.brexchange[row]
 
         self.stats.hits -= 1
         self.stats.misses += 1
@@ -398,10 +733,11 @@ class BrokerSymbolCache:
 
     def get_symbol_info(self, symbol: str, exchange: str) -> SymbolData | None:
         """Get full symbol data for symbol and exchange - O(1) lookup"""
+        state = self._state
         self.stats.hits += 1
-        key = (symbol, exchange)
-        if key in self.by_symbol_exchange:
-            return self.by_symbol_exchange[key]
+        row = self._find(state.symbol_ids, symbol, exchange)
+        if row is not None:
+            return self._row(state.store, row)
 
         self.stats.hits -= 1
         self.stats.misses += 1
@@ -409,9 +745,11 @@ class BrokerSymbolCache:
 
     def get_symbol_data(self, token: str) -> SymbolData | None:
         """Get complete symbol data by token - O(1) lookup"""
+        state = self._state
         self.stats.hits += 1
-        if token in self.by_token:
-            return self.by_token[token]
+        row = state.ids_by_token.get(token)
+        if row is not None:
+            return self._row(state.store, row)
 
         self.stats.hits -= 1
         self.stats.misses += 1
@@ -424,11 +762,13 @@ class BrokerSymbolCache:
         """
         self.stats.bulk_queries += 1
         results = []
+        state = self._state
+        tokens = state.store.token
 
         for symbol, exchange in symbol_exchange_pairs:
-            key = (symbol, exchange)
-            if key in self.by_symbol_exchange:
-                results.append(self.by_symbol_exchange[key].token)
+            row = self._find(state.symbol_ids, symbol, exchange)
+            if row is not None:
+                results.append(tokens[row])
                 self.stats.hits += 1
             else:
                 results.append(None)
@@ -442,11 +782,13 @@ class BrokerSymbolCache:
         """
         self.stats.bulk_queries += 1
         results = []
+        state = self._state
+        symbols = state.store.symbol
 
         for token, exchange in token_exchange_pairs:
-            key = (token, exchange)
-            if key in self.by_token_exchange:
-                results.append(self.by_token_exchange[key].symbol)
+            row = self._find(state.token_ids, token, exchange)
+            if row is not None:
+                results.append(symbols[row])
                 self.stats.hits += 1
             else:
                 results.append(None)
@@ -487,11 +829,14 @@ class BrokerSymbolCache:
             except ValueError:
                 pass
 
-        # Use exchange index if available - significantly faster
-        if exchange and exchange in self.by_exchange:
-            symbols_to_search = self.by_exchange[exchange]
-        else:
-            symbols_to_search = self.symbols.values()
+        # Use exchange index if available, narrowed by the trigram index;
+        # every row is still checked below.
+        state = self._state
+        ids = self._search_ids(state, terms, exchange)
+        store = state.store
+        symbols, brsymbols, tokens = store.symbol, store.brsymbol, store.token
+        names = store.name.take(ids)
+        strikes = store.strike[ids].tolist()
 
         # (score, length, symbol, tie-break sequence, row) — 0 = exact symbol
         # match, 1 = symbol starts with the query, 2 = query is a substring of
@@ -499,10 +844,10 @@ class BrokerSymbolCache:
         # symbols before longer ones at the same score, so "NIFTY" and
         # "NIFTY50" sort ahead of a 20-character option contract that merely
         # happens to start with the same letters.
-        scored: list[tuple[int, int, str, int, SymbolData]] = []
+        scored: list[tuple[int, int, str, int, int]] = []
         seq = 0
-        for symbol_data in symbols_to_search:
-            symbol_upper = symbol_data.symbol.upper()
+        for row, name, strike in zip(ids.tolist(), names, strikes, strict=True):
+            symbol_upper = symbols[row].upper()
 
             all_match = True
             symbol_term_match = True
@@ -510,14 +855,14 @@ class BrokerSymbolCache:
                 term_in_symbol = term in symbol_upper
                 term_match = (
                     term_in_symbol
-                    or term in symbol_data.brsymbol.upper()
-                    or (symbol_data.name and term in symbol_data.name.upper())
-                    or (symbol_data.token and term in symbol_data.token)
+                    or term in brsymbols[row].upper()
+                    or (name and term in name.upper())
+                    or (tokens[row] and term in tokens[row])
                 )
-                # Also check numeric terms against strike
-                if not term_match and num_terms and symbol_data.strike:
+                # Also check numeric terms against strike (NaN when unset)
+                if not term_match and num_terms and strike:
                     try:
-                        if float(term) == symbol_data.strike:
+                        if float(term) == strike:
                             term_match = True
                     except ValueError:
                         pass
@@ -540,10 +885,10 @@ class BrokerSymbolCache:
                 score = 3
 
             seq += 1
-            scored.append((score, len(symbol_upper), symbol_upper, seq, symbol_data))
+            scored.append((score, len(symbol_upper), symbol_upper, seq, row))
 
-        top = heapq.nsmallest(limit, scored, key=lambda row: row[:4])
-        return [row[4] for row in top]
+        top = heapq.nsmallest(limit, scored, key=lambda entry: entry[:4])
+        return [self._row(store, entry[4]) for entry in top]
 
     def fno_search_symbols(
         self,
@@ -558,7 +903,8 @@ class BrokerSymbolCache:
     ) -> list[SymbolData]:
         """
         FNO-specific search with advanced filters - in-memory cache search
-        Optimized to use exchange index for O(n/exchanges) instead of O(n) iteration
+        Column filters run vectorized over the exchange's rows; a single option
+        chain (exchange + underlying + expiry + CE/PE) is a strike-sorted slice
 
         Args:
             query: Optional search query string
@@ -573,7 +919,6 @@ class BrokerSymbolCache:
         Returns:
             List of matching SymbolData objects
         """
-        matches = []
         query_upper = query.upper() if query else None
         underlying_upper = underlying.strip().upper() if underlying else None
         expiry_stripped = expiry.strip() if expiry else None
@@ -592,24 +937,30 @@ class BrokerSymbolCache:
                     except ValueError:
                         pass
 
-        # Use exchange index if available - significantly faster for FNO searches
-        if exchange and exchange in self.by_exchange:
-            symbols_to_search = self.by_exchange[exchange]
+        state = self._state
+        store, fno_index = state.store, state.fno_index
+        if fno_index is None:
+            return []
+        by_exchange = bool(exchange) and exchange in state.ids_by_exchange
+
+        if by_exchange and underlying_upper and expiry_stripped and inst_type in ("CE", "PE"):
+            # One option chain: a strike-sorted slice, back in load order
+            ids, _ = fno_index.chain(
+                exchange, underlying_upper, expiry_stripped, strike_min, strike_max
+            )
+            ids = np.sort(ids[fno_index.kind_mask(ids, inst_type)])
         else:
+            # Use exchange index if available - significantly faster for FNO searches
             # Fallback to all symbols if no exchange filter
-            symbols_to_search = self.symbols.values()
+            ids = state.ids_by_exchange[exchange] if by_exchange else state.unique_ids
 
-        for symbol_data in symbols_to_search:
+            # Column filters over every candidate row at once
+            keep = np.ones(len(ids), dtype=bool)
             # Underlying filter (use extracted underlying from OpenAlgo symbol format)
-            if underlying_upper and (
-                not symbol_data.underlying or symbol_data.underlying != underlying_upper
-            ):
-                continue
-
-            # Expiry filter
-            if expiry_stripped and symbol_data.expiry != expiry_stripped:
-                continue
-
+            if underlying_upper:
+                keep &= store.underlying.codes[ids] == store.underlying.code_of(underlying_upper)
+            if expiry_stripped:
+                keep &= store.expiry.codes[ids] == store.expiry.code_of(expiry_stripped)
             # Instrument type filter.
             # All exchanges (including CRYPTO) use canonical suffix conventions:
             #   CE      → symbol ends with "CE"  (e.g. BTC28FEB2580000CE)
@@ -617,94 +968,122 @@ class BrokerSymbolCache:
             #   FUT     → symbol ends with "FUT" (e.g. BTC28FEB25FUT)
             #   PERPFUT → stored instrumenttype field (e.g. BTCUSD.P)
             if inst_type:
-                symbol_upper = symbol_data.symbol.upper()
-                if inst_type == "FUT" and not symbol_upper.endswith("FUT"):
-                    continue
-                elif inst_type == "CE" and not symbol_upper.endswith("CE"):
-                    continue
-                elif inst_type == "PE" and not symbol_upper.endswith("PE"):
-                    continue
-                elif inst_type == "PERPFUT" and (
-                    not symbol_data.instrumenttype
-                    or symbol_data.instrumenttype.upper() != "PERPFUT"
-                ):
-                    continue
-
-            # Strike range filter
-            if strike_min is not None and (
-                symbol_data.strike is None or symbol_data.strike < strike_min
-            ):
-                continue
-            if strike_max is not None and (
-                symbol_data.strike is None or symbol_data.strike > strike_max
-            ):
-                continue
+                kind_mask = fno_index.kind_mask(ids, inst_type)
+                if kind_mask is not None:
+                    keep &= kind_mask
+            # Strike range filter (NaN when the row has no strike, which fails both)
+            if strike_min is not None or strike_max is not None:
+                strikes = store.strike[ids]
+                if strike_min is not None:
+                    keep &= strikes >= strike_min
+                if strike_max is not None:
+                    keep &= strikes <= strike_max
+            ids = ids[keep]
 
+        matches = []
+        for row in ids.tolist():
             # Query text search (if provided)
             if query_terms:
+                symbol = store.symbol[row]
+                strike = store.strike[row]
                 # All terms must match
                 all_match = True
+                name = store.name[row]
+                token = store.token[row]
                 for term in query_terms:
                     term_match = (
-                        term in symbol_data.symbol.upper()
-                        or term in symbol_data.brsymbol.upper()
-                        or (symbol_data.name and term in symbol_data.name.upper())
-                        or (symbol_data.token and term in symbol_data.token)
+                        term in symbol.upper()
+                        or term in store.brsymbol[row].upper()
+                        or (name and term in name.upper())
+                        or (token and term in token)
                     )
                     if not term_match:
                         all_match = False
                         break
 
                 # Also check numeric terms against strike
-                if not all_match and query_nums and symbol_data.strike:
+                if not all_match and query_nums and strike:
                     for num in query_nums:
-                        if symbol_data.strike == num:
+                        if strike == num:
                             all_match = True
                             break
 
                 if not all_match:
                     continue
 
-            matches.append(symbol_data)
-
+            matches.append(row)
         # Smart sorting: prioritize exact underlying matches, then alphabetical
         # Extract the primary search term (first term) for relevance scoring
         primary_term = query_terms[0] if query_terms else None
 
-        def sort_key(s):
+        def sort_key(row):
             """Sort FNO results by relevance: exact underlying, prefix match, then alphabetical."""
+            s_symbol = store.symbol[row]
+            s_underlying = store.underlying[row]
+
             # Priority 1: Exact match on underlying (e.g., "NIFTY" matches underlying="NIFTY" exactly)
             underlying_exact = (
-                0 if (primary_term and s.underlying and s.underlying == primary_term) else 1
+                0 if (primary_term and s_underlying and s_underlying == primary_term) else 1
             )
 
             # Priority 2: Underlying starts with search term (e.g., "NIFTY" before "BANKNIFTY")
             underlying_starts = (
-                0 if (primary_term and s.underlying and s.underlying.startswith(primary_term)) else 1
+                0 if (primary_term and s_underlying and s_underlying.startswith(primary_term)) else 1
             )
 
             # Priority 3: Symbol starts with search term
-            symbol_starts = 0 if (primary_term and s.symbol.upper().startswith(primary_term)) else 1
+            symbol_starts = 0 if (primary_term and s_symbol.upper().startswith(primary_term)) else 1
 
             # Priority 4: Alphabetical by symbol
-            return (underlying_exact, underlying_starts, symbol_starts, s.symbol)
+            return (underlying_exact, underlying_starts, symbol_starts, s_symbol)
 
         matches.sort(key=sort_key)
-        return matches[:limit]
+        return [self._row(store, row) for row in matches[:limit]]
+
+    def get_option_chain(
+        self,
+        underlying: str,
+        expiry: str,
+        exchange: str,
+        strike_min: float | None = None,
+        strike_max: float | None = None,
+    ) -> list[dict]:
+        """
+        Whole option chain for an underlying and expiry in one call
+
+        Args:
+            underlying: Underlying symbol name (e.g., "NIFTY")
+            expiry: Expiry date (e.g., "26-DEC-24")
+            exchange: Options exchange (NFO, BFO, MCX, CDS, ...)
+            strike_min: Minimum strike price
+            strike_max: Maximum strike price
+
+        Returns:
+            One dict per strike, ascending: {"strike", "ce", "pe"} where ce/pe
+            are SymbolData or None when that side is not listed
+        """
+        state = self._state
+        if state.fno_index is None:
+            return []
+        rows, strikes = state.fno_index.chain(
+            exchange, underlying.strip().upper(), expiry.strip(), strike_min, strike_max
+        )
+        kinds = state.fno_index.kinds[rows].tolist()
+
+        chain = []
+        for row, strike, kind in zip(rows.tolist(), strikes.tolist(), kinds, strict=True):
+            if not chain or chain[-1]["strike"] != strike:
+                chain.append({"strike": strike, "ce": None, "pe": None})
+            side = "ce" if kind == KIND_CE else "pe"
+            # Rows of a strike come CE first, then PE, each in load order
+            if chain[-1][side] is None:
+                chain[-1][side] = self._row(state.store, row)
+        return chain
 
     def clear_cache(self):
         """Clear all cached data"""
-        self.symbols.clear()
-        self.by_symbol_exchange.clear()
-        self.by_token_exchange.clear()
-        self.by_brsymbol_exchange.clear()
-        self.by_token.clear()
-        # Clear FNO filter indexes
-        self.by_exchange.clear()
-        self.expiries_by_exchange.clear()
-        self.underlyings_by_exchange.clear()
-        self.tradable_underlyings_by_exchange.clear()
-        self.expiries_by_exchange_underlying.clear()
+        self._state = _CacheState()
+        self._refreshed_in_place = False
         self.cache_loaded = False
         self.active_broker = None
         logger.debug("Cache cleared")
@@ -719,6 +1098,7 @@ class BrokerSymbolCache:
             "session_start": self.session_start.isoformat() if self.session_start else None,
             "next_reset": self.next_reset_time.isoformat() if self.next_reset_time else None,
             "stats": self.stats.to_dict(),
+            "memory": self._state.memory,
         }
 
 
@@ -1131,6 +1511,57 @@ def fno_search_symbols(
         return []
 
 
+def apply_master_contract_diff(diff) -> bool:
+    """
+    Apply a symtoken refresh to the global cache, if it is loaded
+
+    The load after the download then keeps the patched cache instead of
+    reading the table again.
+
+    Args:
+        diff: MasterContractDiff applied to symtoken
+
+    Returns:
+        True if the cache was patched
+    """
+    cache = get_cache()
+    try:
+        return cache.apply_master_contract_diff(diff)
+    except Exception as e:
+        # Possibly half-patched: drop it so the next load reads symtoken
+        logger.exception(f"Error applying master contract diff to the symbol cache: {e}")
+        cache.clear_cache()
+        return False
+
+
+def get_option_chain_cached(
+    underlying: str,
+    expiry: str,
+    exchange: str,
+    strike_min: float | None = None,
+    strike_max: float | None = None,
+) -> list[dict] | None:
+    """
+    Whole option chain for an underlying and expiry from the cache
+
+    Args:
+        underlying: Underlying symbol name (e.g., "NIFTY")
+        expiry: Expiry date (e.g., "26-DEC-24")
+        exchange: Options exchange (NFO, BFO, MCX, CDS, ...)
+        strike_min: Minimum strike price
+        strike_max: Maximum strike price
+
+    Returns:
+        One dict per strike, ascending: {"strike", "ce", "pe"} with SymbolData
+        or None per side. None if the cache is not loaded, so the caller can
+        query the database instead.
+    """
+    cache = get_cache()
+    if not (cache.cache_loaded and cache.is_cache_valid()):
+        return None
+    return cache.get_option_chain(underlying, expiry, exchange, strike_min, strike_max)
+
+
 def get_distinct_expiries_cached(
     exchange: str | None = None,
     underlying: str | None = None,
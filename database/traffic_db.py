@@ -111,6 +111,16 @@ class TrafficLog(LogBase):
             logs_session.rollback()
             return False
 
+    @staticmethod
+    def log_requests(entries):
+        """Log a batch of requests (dicts of log_request's arguments) in one transaction"""
+        try:
+            logs_session.add_all([TrafficLog(**entry) for entry in entries])
+            logs_session.commit()
+        except Exception:
+            logs_session.rollback()
+            raise
+
     @staticmethod
     def get_recent_logs(limit=100):
         """Get recent traffic logs ordered by timestamp"""
@@ -0,0 +1,134 @@
+# database/webhook_route_cache.py
+"""Versioned in-memory routing data for the TradingView and Chartink webhooks.
+
+Every alert needs the same few things: the strategy behind the webhook id, its
+trading windows, the mapping for each alerted symbol and the user's decrypted
+API key. Looked up per alert that is two queries, a linear scan of the
+strategy's mappings and a Fernet decrypt - repeated work during the burst of
+alerts at market open. A ``WebhookRoute`` holds all of it, built once per
+webhook id and served from memory.
+
+Routes are immutable snapshots, safe to share between request threads. Any
+write to a strategy, its mappings or a user's API key calls
+``invalidate_webhook_routes()``, which bumps a global version. A route built
+under an older version is rebuilt on its next lookup, including one whose
+build raced with the write, so an edit takes effect on the next alert. The
+TTL is only a backstop.
+"""
+
+import threading
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from datetime import time as dt_time
+from types import MappingProxyType
+from typing import Any
+
+from cachetools import TTLCache
+
+_version = 0
+_version_lock = threading.Lock()
+
+
+def invalidate_webhook_routes() -> None:
+    """Make every cached route stale. Call after committing a routing change."""
+    global _version
+    with _version_lock:
+        _version += 1
+
+
+def routes_version() -> int:
+    return _version
+
+
+def parse_hhmm(value: str | None) -> dt_time | None:
+    """``"09:15"`` -> ``time(9, 15)``; None for an unset or malformed time."""
+    try:
+        return datetime.strptime(value, "%H:%M").time() if value else None
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class SymbolRoute:
+    """What a webhook symbol places: the mapped contract, quantity and product."""
+
+    symbol: str
+    exchange: str
+    quantity: int
+    product_type: str
+
+
+@dataclass(frozen=True)
+class WebhookRoute:
+    """A strategy as the webhook handlers need it, with its mappings by symbol.
+
+    Time windows are kept both as the stored ``"HH:MM"`` strings and parsed.
+    """
+
+    id: int
+    name: str
+    user_id: str
+    is_active: bool
+    is_intraday: bool
+    trading_mode: str
+    start_time: str | None
+    end_time: str | None
+    squareoff_time: str | None
+    mappings: Mapping[str, SymbolRoute]
+    api_key: str | None = field(default=None, repr=False)
+    start_at: dt_time | None = field(init=False)
+    end_at: dt_time | None = field(init=False)
+    squareoff_at: dt_time | None = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "mappings", MappingProxyType(dict(self.mappings)))
+        object.__setattr__(self, "start_at", parse_hhmm(self.start_time))
+        object.__setattr__(self, "end_at", parse_hhmm(self.end_time))
+        object.__setattr__(self, "squareoff_at", parse_hhmm(self.squareoff_time))
+
+
+class WebhookRouteCache:
+    """Routes by webhook id, built by ``loader`` and rebuilt when the version moves.
+
+    ``loader(webhook_id)`` returns a WebhookRoute, or None for an unknown id.
+    Unknown ids are not cached, so a newly created strategy is found at once.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], WebhookRoute | None],
+        maxsize: int = 5000,
+        ttl: float = 300,
+    ):
+        self._loader = loader
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, webhook_id: str) -> WebhookRoute | None:
+        version = _version
+        with self._lock:
+            entry = self._cache.get(webhook_id)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Built outside the lock; a concurrent miss builds it twice, harmlessly.
+        # Tagged with the version read before the build, so a route that raced
+        # with an invalidation is already stale.
+        route = self._loader(webhook_id)
+        if route is not None:
+            with self._lock:
+                self._cache[webhook_id] = (version, route)
+        return route
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._cache), "hits": self.hits, "misses": self.misses}
@@ -173,7 +173,7 @@ def _closes_from_duckdb(
     per-bar Python objects in between, which is where the service path spends
     its time.
     """
-    from database.historify_db import get_connection
+    from database.historify_db import get_read_connection
 
     pairs = list(dict.fromkeys(zip(symbols, exchanges, strict=True)))
     where = " or ".join("(symbol = ? and exchange = ?)" for _ in pairs)
@@ -193,7 +193,7 @@ def _closes_from_duckdb(
         order by symbol, timestamp
     """
 
-    with get_connection() as conn:
+    with get_read_connection() as conn:
         frame = conn.execute(sql, params).df()
 
     if frame.empty:
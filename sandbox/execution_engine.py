@@ -13,10 +13,12 @@ Features:
 
 import os
 import sys
+import threading
 import time
 import uuid
 from datetime import datetime
 from decimal import Decimal
+from functools import partial
 
 import pytz
 
@@ -70,11 +72,29 @@ def quote_looks_stale(quote) -> bool:
 class ExecutionEngine:
     """Executes pending orders based on market data"""
 
+    # One lock per (user, symbol, exchange, product). A fill reads the position
+    # row, then inserts or updates it, so two fills on one position - the
+    # concurrent legs of an analyze-mode split or basket order - must not
+    # interleave, or both insert and unique_position rejects one. Class-level
+    # like FundManager's lock, because every placement builds its own engine.
+    _position_locks: dict[tuple, threading.RLock] = {}
+    _position_locks_guard = threading.Lock()
+
     def __init__(self):
         # Read rate limits from .env (same as API protection)
         self.order_rate_limit = int(os.getenv("ORDER_RATE_LIMIT", "10 per second").split()[0])
         self.api_rate_limit = int(os.getenv("API_RATE_LIMIT", "50 per second").split()[0])
         self.batch_delay = 1.0  # 1 second between batches
+        # Apply every fill of a polling cycle in one transaction instead of
+        # several commits per order. Only check_and_execute_pending_orders uses
+        # it; fills at placement and from the WebSocket engine stay per-order.
+        self.batch_fills = os.getenv("SANDBOX_BATCH_FILLS", "true").lower() == "true"
+        # Set for the duration of a unit of work: post-commit callbacks (event
+        # publishes, position-feed notifies, margin checks) queued in order.
+        # None means per-order mode - commit and publish immediately.
+        self._deferred = None
+        # Position locks a unit of work holds until it commits or rolls back
+        self._held_position_locks = []
 
     def check_and_execute_pending_orders(self):
         """
@@ -135,20 +155,18 @@ class ExecutionEngine:
             # stranded more orders, which slowed the next one. Measured on the
             # old code, one order's time-to-fill went 4.6s -> 34.8s as the
             # backlog grew from 0 to 150.
-            orders_processed = 0
-            for position, order in enumerate(pending_orders, start=1):
+            work = []
+            for order in pending_orders:
                 quote = quote_cache.get((order.symbol, order.exchange))
                 if quote:
-                    self._process_order(order, quote)
-                    orders_processed += 1
+                    work.append((order, quote))
 
-                # Yield to the hub periodically. Under gunicorn's eventlet
-                # worker this loop shares one green thread with request
-                # handling, so a long backlog must not hold it uninterrupted.
-                if position % self.order_rate_limit == 0:
-                    time.sleep(0)
+            if self.batch_fills:
+                self._process_orders_batch(work)
+            else:
+                self._process_orders_individually(work)
 
-            logger.info(f"Processed {orders_processed} orders")
+            logger.info(f"Processed {len(work)} orders")
 
         except Exception as e:
             logger.exception(f"Error in execution engine: {e}")
@@ -161,6 +179,100 @@ class ExecutionEngine:
         except Exception as e:
             logger.exception(f"Error checking pending GTTs: {e}")
 
+    def _process_orders_individually(self, work):
+        """Process ``(order, quote)`` pairs, each fill committing on its own."""
+        for position, (order, quote) in enumerate(work, start=1):
+            self._process_order(order, quote)
+
+            # Yield to the hub periodically. Under gunicorn's eventlet
+            # worker this loop shares one green thread with request
+            # handling, so a long backlog must not hold it uninterrupted.
+            if position % self.order_rate_limit == 0:
+                time.sleep(0)
+
+    def _process_orders_batch(self, work):
+        """Process ``(order, quote)`` pairs as one unit of work.
+
+        Per-order mode costs several SQLite transactions per fill - the trade
+        and order, the position, each margin release - so a cycle filling 150
+        orders ran 300+ commits against sandbox.db, each one an fsync. Here the
+        fills only flush and the cycle commits once.
+
+        Events are unchanged from the caller's point of view: every fill still
+        publishes its own SandboxOrderFilledEvent and OrderUpdateEvent, in
+        fill order. They are queued and published after the commit, so nothing
+        is announced that is not yet durable. The position-feed notify and the
+        margin consistency check run once per touched position, not per fill.
+
+        All or nothing. If any fill raises, or the commit fails, the whole
+        batch is rolled back, its queued events are dropped and the cycle is
+        replayed per order - so a bad order is rejected on its own, exactly as
+        before, instead of taking the other fills down with it.
+        """
+        if not work:
+            return
+
+        self._deferred = []
+        self._held_position_locks = []
+        try:
+            # No periodic yield here, unlike per-order mode: once the first
+            # fill flushes, this transaction holds sandbox.db's write lock.
+            # Under eventlet a yield lets another greenthread write sandbox.db,
+            # and it blocks in SQLite's busy handler, which never yields back
+            # to the hub - the whole process stalls until "database is locked".
+            for order, quote in work:
+                self._process_order(order, quote)
+            db_session.commit()
+            deferred = self._deferred
+        except Exception as e:
+            db_session.rollback()
+            logger.exception(
+                f"Batched fill of {len(work)} orders failed, replaying per order: {e}"
+            )
+            deferred = None
+        finally:
+            self._deferred = None
+            for lock in self._held_position_locks:
+                lock.release()
+            self._held_position_locks = []
+
+        if deferred is None:
+            self._process_orders_individually(work)
+            return
+
+        self._run_deferred(deferred)
+
+    def _run_deferred(self, deferred):
+        """Run post-commit callbacks, deduplicating the position upkeep."""
+        seen = set()
+        for callback in deferred:
+            if callback.func == self._after_position_update:
+                if callback.args in seen:
+                    continue
+                seen.add(callback.args)
+            try:
+                callback()
+            except Exception:
+                logger.debug("Deferred fill callback failed (non-fatal)", exc_info=True)
+
+    def _commit(self):
+        """Commit now, or only flush when inside a unit of work.
+
+        The flush matters: the session does not autoflush, and a second fill on
+        the same position in one batch must find the row the first one added.
+        """
+        if self._deferred is None:
+            db_session.commit()
+        else:
+            db_session.flush()
+
+    def _emit(self, func, *args, **kwargs):
+        """Call ``func`` now, or after the unit of work commits."""
+        if self._deferred is None:
+            func(*args, **kwargs)
+        else:
+            self._deferred.append(partial(func, *args, **kwargs))
+
     def _check_pending_gtts(self):
         """Fire any GTT leg whose trigger the market has crossed.
 
@@ -375,13 +487,14 @@ class ExecutionEngine:
                     order.filled_quantity = order.quantity
                     order.pending_quantity = 0
                     order.update_timestamp = datetime.now(pytz.timezone("Asia/Kolkata"))
-                    db_session.commit()
+                    self._commit()
                     logger.info(
                         f"Updated order {order.orderid} status to complete (was in race condition)"
                     )
                     # Race-condition cleanup transitions an order to complete
                     # without going through _execute_order, so emit here too.
-                    self._publish_fill_event(
+                    self._emit(
+                        self._publish_fill_event,
                         orderid=order.orderid,
                         tradeid=existing_trade.tradeid,
                         symbol=order.symbol,
@@ -482,6 +595,8 @@ class ExecutionEngine:
                 self._execute_order(order, execution_price)
 
         except Exception as e:
+            if self._deferred is not None:
+                raise
             logger.exception(f"Error processing order {order.orderid}: {e}")
 
     def _process_trigger_pending_order(self, order, ltp):
@@ -541,10 +656,12 @@ class ExecutionEngine:
             )
             order.order_status = "open"
             order.update_timestamp = datetime.now(pytz.timezone("Asia/Kolkata"))
-            db_session.commit()
-            self._publish_order_update_event(order, order_status="open")
+            self._commit()
+            self._emit(self._publish_order_update_event, order, order_status="open")
 
         except Exception as e:
+            if self._deferred is not None:
+                raise
             logger.exception(f"Error processing trigger-pending order {order.orderid}: {e}")
 
     def _execute_order(self, order, execution_price):
@@ -583,7 +700,7 @@ class ExecutionEngine:
             order.pending_quantity = 0
             order.update_timestamp = datetime.now(pytz.timezone("Asia/Kolkata"))
 
-            db_session.commit()
+            self._commit()
 
             # Update position
             self._update_position(order, execution_price)
@@ -594,7 +711,8 @@ class ExecutionEngine:
             # Engine-internal fills don't go through the service layer, so the
             # service-layer publish points (place_order_service etc.) never see
             # them — without this the analyzer UI sits stale until manual refresh.
-            self._publish_fill_event(
+            self._emit(
+                self._publish_fill_event,
                 orderid=order.orderid,
                 tradeid=tradeid,
                 symbol=order.symbol,
@@ -610,6 +728,10 @@ class ExecutionEngine:
             )
 
         except Exception as e:
+            # Inside a unit of work the batch owns the rollback and replays
+            # this order on its own, which is where it gets rejected.
+            if self._deferred is not None:
+                raise
             db_session.rollback()
             logger.exception(f"Error executing order {order.orderid}: {e}")
 
@@ -658,7 +780,34 @@ class ExecutionEngine:
         except Exception as pub_err:
             logger.debug(f"Failed to publish OrderUpdateEvent for {order.orderid}: {pub_err}")
 
+    @classmethod
+    def _position_lock(cls, order):
+        """The lock serializing fills on ``order``'s position."""
+        key = (order.user_id, order.symbol, order.exchange, order.product)
+        with cls._position_locks_guard:
+            lock = cls._position_locks.get(key)
+            if lock is None:
+                lock = cls._position_locks[key] = threading.RLock()
+            return lock
+
     def _update_position(self, order, execution_price):
+        """Apply a fill to its position, one fill per position at a time.
+
+        Inside a unit of work the position row is only flushed, so the lock is
+        held until the batch commits or rolls back; otherwise a fill from
+        another thread would read the position as it was before the batch.
+        """
+        lock = self._position_lock(order)
+        lock.acquire()
+        if self._deferred is not None:
+            self._held_position_locks.append(lock)
+            return self._apply_fill_to_position(order, execution_price)
+        try:
+            return self._apply_fill_to_position(order, execution_price)
+        finally:
+            lock.release()
+
+    def _apply_fill_to_position(self, order, execution_price):
         """
         Update or create position after trade execution
         Handle netting for opposite positions
@@ -768,8 +917,11 @@ class ExecutionEngine:
                     )
 
                     if margin_to_release > 0:
-                        fund_manager.release_margin(
-                            margin_to_release, realized_pnl, f"Position closed: {order.symbol}"
+                        self._release_margin(
+                            fund_manager,
+                            margin_to_release,
+                            realized_pnl,
+                            f"Position closed: {order.symbol}",
                         )
                         logger.info(
                             f"Released exact margin ₹{margin_to_release} for closed position (from position.margin_blocked)"
@@ -865,8 +1017,11 @@ class ExecutionEngine:
                         margin_to_release = Decimal("0.00")
 
                     if margin_to_release > 0:
-                        fund_manager.release_margin(
-                            margin_to_release, realized_pnl, f"Position reduced: {order.symbol}"
+                        self._release_margin(
+                            fund_manager,
+                            margin_to_release,
+                            realized_pnl,
+                            f"Position reduced: {order.symbol}",
                         )
                         logger.info(
                             f"Released proportional margin ₹{margin_to_release} for reduced position ({reduction_proportion * 100:.1f}% of ₹{current_margin})"
@@ -917,56 +1072,62 @@ class ExecutionEngine:
                         f"Partial close: {order.symbol}, New qty: {final_quantity}, Realized P&L: ₹{realized_pnl}"
                     )
 
-            db_session.commit()
+            self._commit()
 
-            # Event-driven MTM: keep the WS engine's position-feed refs in
-            # sync with the position book. After any fill, either the symbol
-            # has open quantity (subscribe so MarketDataService stays warm and
-            # the MTM loop reads ticks instead of REST) or it just went flat
-            # (release the subscription). Never allowed to break a fill.
-            try:
-                from sandbox.websocket_execution_engine import (
-                    get_websocket_execution_engine,
-                )
-
-                ws_engine = get_websocket_execution_engine()
-                if ws_engine is not None:
-                    has_open = (
-                        SandboxPositions.query.filter_by(
-                            user_id=order.user_id,
-                            symbol=order.symbol,
-                            exchange=order.exchange,
-                        )
-                        .filter(SandboxPositions.quantity != 0)
-                        .count()
-                        > 0
-                    )
-                    if has_open:
-                        ws_engine.notify_position_opened(
-                            order.user_id, order.symbol, order.exchange
-                        )
-                    else:
-                        ws_engine.notify_position_closed(
-                            order.user_id, order.symbol, order.exchange
-                        )
-            except Exception:
-                logger.debug("Position feed notify failed (non-fatal)", exc_info=True)
-
-            # Validate margin consistency after position update
-            is_consistent, discrepancy = validate_margin_consistency(order.user_id)
-            if not is_consistent:
-                logger.warning(
-                    f"Margin inconsistency detected after position update for {order.symbol}: "
-                    f"discrepancy={discrepancy}. Auto-reconciling..."
-                )
-                # Auto-reconcile to prevent margin leaks
-                reconcile_margin(order.user_id, auto_fix=True)
+            self._emit(self._after_position_update, order.user_id, order.symbol, order.exchange)
 
         except Exception as e:
             db_session.rollback()
             logger.exception(f"Error updating position for order {order.orderid}: {e}")
             raise
 
+    def _release_margin(self, fund_manager, amount, realized_pnl, description):
+        """Release margin on a fill, staged rather than committed in a unit of work."""
+        if self._deferred is None:
+            return fund_manager.release_margin(amount, realized_pnl, description)
+        return fund_manager.stage_margin_release(amount, realized_pnl, description)
+
+    def _after_position_update(self, user_id, symbol, exchange):
+        """Post-commit upkeep after a fill changed a position."""
+        # Event-driven MTM: keep the WS engine's position-feed refs in
+        # sync with the position book. After any fill, either the symbol
+        # has open quantity (subscribe so MarketDataService stays warm and
+        # the MTM loop reads ticks instead of REST) or it just went flat
+        # (release the subscription). Never allowed to break a fill.
+        try:
+            from sandbox.websocket_execution_engine import (
+                get_websocket_execution_engine,
+            )
+
+            ws_engine = get_websocket_execution_engine()
+            if ws_engine is not None:
+                has_open = (
+                    SandboxPositions.query.filter_by(
+                        user_id=user_id,
+                        symbol=symbol,
+                        exchange=exchange,
+                    )
+                    .filter(SandboxPositions.quantity != 0)
+                    .count()
+                    > 0
+                )
+                if has_open:
+                    ws_engine.notify_position_opened(user_id, symbol, exchange)
+                else:
+                    ws_engine.notify_position_closed(user_id, symbol, exchange)
+        except Exception:
+            logger.debug("Position feed notify failed (non-fatal)", exc_info=True)
+
+        # Validate margin consistency after position update
+        is_consistent, discrepancy = validate_margin_consistency(user_id)
+        if not is_consistent:
+            logger.warning(
+                f"Margin inconsistency detected after position update for {symbol}: "
+                f"discrepancy={discrepancy}. Auto-reconciling..."
+            )
+            # Auto-reconcile to prevent margin leaks
+            reconcile_margin(user_id, auto_fix=True)
+
     def _calculate_realized_pnl(self, old_quantity, avg_price, close_quantity, close_price, contract_value=1.0):
         """Calculate realized P&L for closed positions, multiplied by contract_value (e.g. 0.01 for ETHUSD.P)."""
         try:
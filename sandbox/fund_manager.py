@@ -26,7 +26,7 @@ import pytz
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import update
+from sqlalchemy import func, update
 
 from database.sandbox_db import (
     SandboxFunds,
@@ -404,6 +404,65 @@ class FundManager:
                 logger.exception(f"Error releasing margin for user {self.user_id}: {e}")
                 return False, f"Error releasing margin: {str(e)}"
 
+    def stage_margin_release(self, amount, realized_pnl=0, description=""):
+        """release_margin WITHOUT committing, for a caller that applies many
+        fills in one transaction (the execution engine's batched cycle).
+
+        Computed in SQL for the same reason as stage_margin_delta: the class
+        lock is released long before the caller commits, so reading the row
+        and writing a Python total would lose updates made in between. The
+        over-release guard from release_margin is part of the WHERE clause.
+
+        Returns:
+            ``(ok, message)``. Nothing is committed here.
+        """
+        try:
+            if not self._ensure_funds_initialized():
+                return False, "Funds not initialized"
+
+            amount = Decimal(str(amount))
+            realized_pnl = Decimal(str(realized_pnl))
+
+            if amount < 0:
+                return False, f"Release amount cannot be negative, got {amount}"
+
+            # Right-hand sides read the pre-update row, so total_pnl is the
+            # old realized P&L plus this fill's, plus unrealized.
+            stmt = (
+                update(SandboxFunds)
+                .where(SandboxFunds.user_id == self.user_id)
+                .where(SandboxFunds.used_margin >= amount)
+                .values(
+                    used_margin=SandboxFunds.used_margin - amount,
+                    available_balance=SandboxFunds.available_balance + amount + realized_pnl,
+                    realized_pnl=SandboxFunds.realized_pnl + realized_pnl,
+                    today_realized_pnl=func.coalesce(SandboxFunds.today_realized_pnl, 0)
+                    + realized_pnl,
+                    total_pnl=SandboxFunds.realized_pnl
+                    + realized_pnl
+                    + SandboxFunds.unrealized_pnl,
+                )
+            )
+            result = db_session.execute(stmt, execution_options={"synchronize_session": False})
+
+            if result.rowcount != 1:
+                logger.error(
+                    f"Refusing to release ₹{amount} for user {self.user_id}: more than "
+                    f"is reserved. {description}"
+                )
+                return False, f"Cannot release ₹{amount}: more than the reserved margin"
+
+            db_session.expire(self._ensure_funds_initialized())
+
+            logger.info(
+                f"Staged release of ₹{amount} margin for user {self.user_id}. "
+                f"Realized P&L: ₹{realized_pnl}. {description}"
+            )
+            return True, f"Margin release staged: ₹{amount}, P&L: ₹{realized_pnl}"
+        except Exception as e:
+            logger.exception(f"Error staging margin release for user {self.user_id}: {e}")
+            return False, f"Error staging margin release: {str(e)}"
+
     def transfer_margin_to_holdings(self, amount, description=""):
         """
         Transfer margin to holdings during T+1 settlement
@@ -483,6 +483,8 @@ class GTTManager:
                 raise
 
             logger.info(f"Sandbox GTT {trigger_id} modified; margin now {new_blocked}")
+            # The engine indexes legs by trigger price; re-key them.
+            _notify_websocket_engine(gtt)
             return True, {"status": "success", "mode": "analyze", "trigger_id": trigger_id}, 200
 
         except Exception as e:
@@ -1076,6 +1078,7 @@ def _notify_websocket_engine(gtt: SandboxGTT) -> None:
 
     The engine's index is built at startup, so a GTT placed while it runs would
     otherwise never be ticked - inert until a restart or a fallback to polling.
+    After a modify the same call re-keys the legs at their new trigger prices.
     A no-op when the polling engine is active, which scans the table directly.
     """
     try:
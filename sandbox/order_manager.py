@@ -881,6 +881,18 @@ class OrderManager:
 
             logger.info(f"Order modified: {orderid}")
 
+            # The WebSocket engine indexes resting orders by price; re-key it.
+            try:
+                from sandbox.websocket_execution_engine import (
+                    get_websocket_execution_engine,
+                    is_websocket_execution_engine_running,
+                )
+
+                if is_websocket_execution_engine_running():
+                    get_websocket_execution_engine().notify_order_modified(order)
+            except Exception as e:
+                logger.debug(f"WebSocket execution engine notification skipped: {e}")
+
             return (
                 True,
                 {
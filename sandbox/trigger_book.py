@@ -0,0 +1,122 @@
+# sandbox/trigger_book.py
+"""
+Price-sorted trigger index for the WebSocket execution engine.
+
+Every resting order and GTT leg fires on one side of a single price level:
+
+- BELOW: fires when LTP <= level (LIMIT BUY, SL/SL-M SELL, "below" GTT legs)
+- ABOVE: fires when LTP >= level (LIMIT SELL, SL/SL-M BUY, "above" GTT legs)
+- ALWAYS: no usable level (MARKET, or a missing price) - checked on every tick
+
+A TriggerBook keeps the BELOW and ABOVE levels of one symbol in sorted lists,
+so a tick finds every crossed entry with one bisect per side instead of
+loading every resting order and leg from the database.
+
+The book is only a pre-filter. Levels are floats, and float conversion is
+monotonic, so the book never misses an entry the exact Decimal check would
+fire. The authoritative check is still ExecutionEngine._process_order or
+gtt_manager.leg_is_triggered_by. An open SL order is indexed at its trigger
+and then re-checked against its limit there.
+"""
+
+from bisect import bisect_left, bisect_right
+
+BELOW = "below"
+ABOVE = "above"
+ALWAYS = "always"
+
+
+def _level(value) -> float | None:
+    try:
+        level = float(value)
+    except (TypeError, ValueError):
+        return None
+    return level if level > 0 else None
+
+
+def order_trigger(order) -> tuple[str, float | None]:
+    """(side, level) at which a resting sandbox order can execute."""
+    buy = order.action == "BUY"
+    if order.order_status == "trigger pending" or order.price_type in ("SL", "SL-M"):
+        # Stop-Loss book, or an SL released to the regular book: the trigger
+        # must (still) be crossed before the limit is even considered.
+        level = _level(order.trigger_price)
+        side = ABOVE if buy else BELOW
+    elif order.price_type == "LIMIT":
+        level = _level(order.price)
+        side = BELOW if buy else ABOVE
+    else:
+        return ALWAYS, None
+    if level is None:
+        return ALWAYS, None
+    return side, level
+
+
+def leg_trigger(direction: str, trigger_price) -> tuple[str, float | None]:
+    """(side, level) for a GTT leg, matching gtt_manager.leg_is_triggered_by."""
+    level = _level(trigger_price)
+    if level is None:
+        return ALWAYS, None
+    return (ABOVE if (direction or "").lower() == "above" else BELOW), level
+
+
+class TriggerBook:
+    """Resting triggers of one symbol, sorted by price.
+
+    Entries are opaque hashable refs (the engine uses ("order", orderid) and
+    ("leg", leg_id)). Not thread-safe: the engine guards it with its lock.
+    """
+
+    __slots__ = ("_levels", "_refs", "_always", "_where")
+
+    def __init__(self):
+        # side -> sorted levels, and the refs in the same order
+        self._levels = {BELOW: [], ABOVE: []}
+        self._refs = {BELOW: [], ABOVE: []}
+        self._always: dict = {}  # insertion-ordered set
+        self._where: dict = {}  # ref -> (side, level)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, ref) -> bool:
+        return ref in self._where
+
+    def add(self, ref, side: str, level: float | None = None):
+        """Index ref at (side, level), replacing any previous position."""
+        self.remove(ref)
+        if side == ALWAYS or level is None:
+            self._always[ref] = None
+            self._where[ref] = (ALWAYS, None)
+            return
+        levels = self._levels[side]
+        i = bisect_right(levels, level)
+        levels.insert(i, level)
+        self._refs[side].insert(i, ref)
+        self._where[ref] = (side, level)
+
+    def remove(self, ref) -> bool:
+        where = self._where.pop(ref, None)
+        if where is None:
+            return False
+        side, level = where
+        if side == ALWAYS:
+            del self._always[ref]
+            return True
+        levels = self._levels[side]
+        refs = self._refs[side]
+        for i in range(bisect_left(levels, level), bisect_right(levels, level)):
+            if refs[i] == ref:
+                del levels[i]
+                del refs[i]
+                break
+        return True
+
+    def crossed(self, ltp: float) -> list:
+        """Refs whose trigger this LTP has reached (inclusive), plus ALWAYS refs."""
+        below = self._refs[BELOW][bisect_left(self._levels[BELOW], ltp) :]
+        above = self._refs[ABOVE][: bisect_right(self._levels[ABOVE], ltp)]
+        return below + above + list(self._always)
+
+    def refs(self) -> list:
+        return list(self._where)
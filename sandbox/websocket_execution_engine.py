@@ -6,6 +6,7 @@ Features:
 - Real-time order execution using WebSocket market data
 - Subscribes to MarketDataService for LTP updates
 - Immediate execution when price conditions are met (sub-second latency)
+- Price-sorted trigger books: a tick only touches orders/legs it crossed
 - Automatic fallback to polling engine if WebSocket data is stale
 - Thread-safe order index management
 """
@@ -21,6 +22,7 @@ from typing import Dict, List, Optional, Set
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.sandbox_db import SandboxOrders, db_session
+from sandbox.trigger_book import TriggerBook, leg_trigger, order_trigger
 from services.market_data_service import get_market_data_service
 from services.websocket_service import subscribe_to_symbols, unsubscribe_from_symbols
 from utils.logging import get_logger
@@ -49,6 +51,15 @@ class WebSocketExecutionEngine:
         # pair can have its two legs crossed by the same tick.
         self._pending_gtt_index: dict[str, list[int]] = {}
 
+        # Price-sorted view of both indexes: symbol_key -> TriggerBook of
+        # ("order", orderid) / ("leg", leg_id) refs. A tick only evaluates the
+        # refs whose limit/trigger it crossed.
+        self._trigger_books: dict[str, TriggerBook] = {}
+
+        # In-memory state of watched GTT legs, so the non-firing path never
+        # reads the database: leg_id -> (symbol_key, direction, trigger_price, user_id)
+        self._gtt_legs: dict[int, tuple[str, str, Decimal, str | None]] = {}
+
         # Track symbols we're monitoring
         self._monitored_symbols: set[str] = set()
 
@@ -67,6 +78,9 @@ class WebSocketExecutionEngine:
         # Fallback settings
         self.fallback_enabled = os.getenv("SANDBOX_ENGINE_FALLBACK", "true").lower() == "true"
         self.stale_data_threshold = 30  # seconds
+        # How often the health monitor re-syncs the trigger books with the
+        # database, dropping orders/GTTs cancelled or filled by other paths.
+        self.reconcile_interval = int(os.getenv("SANDBOX_TRIGGER_RECONCILE_INTERVAL", "30"))
         self._fallback_thread: threading.Thread | None = None
         self._fallback_running = False
 
@@ -134,6 +148,8 @@ class WebSocketExecutionEngine:
         with self._lock:
             self._pending_orders_index.clear()
             self._pending_gtt_index.clear()
+            self._trigger_books.clear()
+            self._gtt_legs.clear()
             self._monitored_symbols.clear()
             self._user_symbol_refcounts.clear()
             self._position_refs.clear()
@@ -172,6 +188,7 @@ class WebSocketExecutionEngine:
                     if symbol_key not in self._pending_orders_index:
                         self._pending_orders_index[symbol_key] = []
                     self._pending_orders_index[symbol_key].append(order.orderid)
+                    self._index_order(symbol_key, order)
                     self._monitored_symbols.add(symbol_key)
                     self._increment_user_symbol_refcount(order.user_id, symbol_key)
 
@@ -184,6 +201,7 @@ class WebSocketExecutionEngine:
                 for leg, gtt in gtt_legs:
                     symbol_key = f"{gtt.exchange}:{gtt.symbol}"
                     self._pending_gtt_index.setdefault(symbol_key, []).append(leg.id)
+                    self._index_leg(symbol_key, leg, gtt.user_id)
                     self._monitored_symbols.add(symbol_key)
                     self._increment_user_symbol_refcount(gtt.user_id, symbol_key)
 
@@ -253,6 +271,7 @@ class WebSocketExecutionEngine:
                 self._pending_orders_index[symbol_key].append(order.orderid)
                 self._monitored_symbols.add(symbol_key)
                 logger.debug(f"Added order {order.orderid} to index for {symbol_key}")
+            self._index_order(symbol_key, order)
 
             # Increment refcount and decide if we need to subscribe
             if self._increment_user_symbol_refcount(order.user_id, symbol_key):
@@ -273,6 +292,7 @@ class WebSocketExecutionEngine:
                 if order_id in self._pending_orders_index[symbol_key]:
                     self._pending_orders_index[symbol_key].remove(order_id)
                     logger.debug(f"Removed order {order_id} from index for {symbol_key}")
+                self._unindex(symbol_key, ("order", order_id))
 
                 # Clean up empty symbol entries
                 if not self._pending_orders_index[symbol_key]:
@@ -292,6 +312,19 @@ class WebSocketExecutionEngine:
             exchange, symbol = unsubscribe_symbol.split(":", 1)
             self._unsubscribe_ws_symbols(unsubscribe_user, [(symbol, exchange)])
 
+    def notify_order_modified(self, order):
+        """Re-key a watched order after its price or trigger price changed.
+
+        The trigger book indexes an order at its limit/trigger price, so a
+        modify that is not reflected here would leave the order waiting for
+        the old level. Orders not in the index are ignored.
+        """
+        symbol_key = f"{order.exchange}:{order.symbol}"
+        with self._lock:
+            if order.orderid in self._pending_orders_index.get(symbol_key, ()):
+                self._index_order(symbol_key, order)
+                logger.debug(f"Re-indexed modified order {order.orderid} for {symbol_key}")
+
     def notify_position_opened(self, user_id: str, symbol: str, exchange: str):
         """Hold a feed subscription for an open position (event-driven MTM).
 
@@ -366,22 +399,30 @@ class WebSocketExecutionEngine:
 
             symbol_key = f"{exchange}:{symbol}"
 
-            # Snapshot both indexes under one lock, then work outside it: firing
-            # re-enters this engine via notify_order_* and would deadlock.
+            # Collect only the crossed refs under the lock, then work outside
+            # it: firing re-enters this engine via notify_order_* and would
+            # deadlock. A tick nowhere near any trigger stops here, with no
+            # database access.
             with self._lock:
-                order_ids = self._pending_orders_index.get(symbol_key, []).copy()
-                leg_ids = self._pending_gtt_index.get(symbol_key, []).copy()
+                book = self._trigger_books.get(symbol_key)
+                crossed = book.crossed(float(ltp)) if book is not None else None
+            if not crossed:
+                return
+
+            order_ids = [ref_id for kind, ref_id in crossed if kind == "order"]
+            leg_ids = [ref_id for kind, ref_id in crossed if kind == "leg"]
+            price = Decimal(str(ltp))
 
             for order_id in order_ids:
                 try:
-                    self._check_and_execute_order(order_id, Decimal(str(ltp)))
+                    self._check_and_execute_order(order_id, price)
                 except Exception as e:
                     logger.exception(f"Error processing order {order_id}: {e}")
 
             # Checked even when there are no pending orders: a GTT is often the
             # only thing resting for this symbol.
             if leg_ids:
-                self._check_gtt_legs(symbol_key, leg_ids, Decimal(str(ltp)))
+                self._check_gtt_legs(symbol_key, leg_ids, price)
 
         except Exception as e:
             logger.exception(f"Error in market data callback: {e}")
@@ -391,46 +432,39 @@ class WebSocketExecutionEngine:
 
         The claim is what keeps this safe next to the polling engine and the
         catch-up scan: all three can see the same tick, and only the claim
-        winner places an order.
+        winner places an order. The trigger is checked against the in-memory
+        leg state; the database is only touched once a leg has been crossed.
         """
         from database.sandbox_db import SandboxGTTLeg
         from sandbox import gtt_manager
 
         for leg_id in leg_ids:
             try:
-                leg = SandboxGTTLeg.query.filter_by(id=leg_id).first()
-                if leg is None or leg.leg_status != "pending":
-                    # Resolved by another evaluator since the index was built.
-                    self._drop_gtt_leg(symbol_key, leg_id, self._leg_user_id(leg))
-                    continue
+                state = self._gtt_legs.get(leg_id)
+                if state is None:
+                    continue  # Dropped since the tick's snapshot
+                _, direction, trigger_price, user_id = state
 
-                if not gtt_manager.leg_is_triggered_by(leg.trigger_direction, leg.trigger_price, ltp):
+                if not gtt_manager.leg_is_triggered_by(direction, trigger_price, ltp):
                     continue
 
                 if gtt_manager.try_claim_trigger(leg_id):
-                    user_id = self._leg_user_id(leg)
                     # Only stop watching a leg that actually fired. A failed
                     # fire reverts the leg to pending, so dropping it here
                     # regardless left the GTT live in the database but inert -
                     # unsubscribed and unindexed until a restart.
                     if gtt_manager.fire_leg(leg_id, execution_price=float(ltp)):
                         self._drop_gtt_leg(symbol_key, leg_id, user_id)
+                    continue
+
+                # Claim refused: another evaluator won, or the leg/GTT was
+                # resolved or cancelled since it was indexed.
+                leg = SandboxGTTLeg.query.filter_by(id=leg_id).first()
+                if leg is None or leg.leg_status != "pending":
+                    self._drop_gtt_leg(symbol_key, leg_id, user_id)
             except Exception as e:
                 logger.exception(f"Error evaluating GTT leg {leg_id}: {e}")
 
-    @staticmethod
-    def _leg_user_id(leg):
-        """Owner of a leg, for refcounting. None when the leg is already gone."""
-        if leg is None:
-            return None
-        try:
-            from database.sandbox_db import SandboxGTT
-
-            parent = SandboxGTT.query.filter_by(gtt_id=leg.gtt_id).first()
-            return parent.user_id if parent else None
-        except Exception:
-            return None
-
     def _drop_gtt_leg(self, symbol_key: str, leg_id: int, user_id: str | None = None):
         """Stop watching a leg that is no longer pending, and unsubscribe if last.
 
@@ -442,6 +476,8 @@ class WebSocketExecutionEngine:
         unsubscribe_symbol = None
 
         with self._lock:
+            self._unindex(symbol_key, ("leg", leg_id))
+            self._gtt_legs.pop(leg_id, None)
             legs = self._pending_gtt_index.get(symbol_key)
             if legs and leg_id in legs:
                 legs.remove(leg_id)
@@ -464,6 +500,9 @@ class WebSocketExecutionEngine:
         The startup rebuild only sees GTTs that already existed, so without this
         a GTT placed while the engine is running would never receive a tick -
         it would sit inert until a restart or a fallback to polling.
+
+        Also called after a modify: legs already watched are re-keyed at their
+        new trigger price without taking another subscription ref.
         """
         symbol_key = f"{gtt.exchange}:{gtt.symbol}"
         subscribe_user = None
@@ -472,10 +511,14 @@ class WebSocketExecutionEngine:
             for leg in gtt.legs:
                 if leg.leg_status != "pending":
                     continue
+                known = leg.id in self._gtt_legs
                 legs = self._pending_gtt_index.setdefault(symbol_key, [])
                 if leg.id not in legs:
                     legs.append(leg.id)
+                self._index_leg(symbol_key, leg, gtt.user_id)
                 self._monitored_symbols.add(symbol_key)
+                if known:
+                    continue
                 # One ref per leg, matching the per-leg decrement on resolve.
                 if self._increment_user_symbol_refcount(gtt.user_id, symbol_key):
                     subscribe_user = gtt.user_id
@@ -523,18 +566,116 @@ class WebSocketExecutionEngine:
             # order - and its symbol subscription - in the index.
             # Refresh the order to check status
             db_session.refresh(order)
+            symbol_key = f"{order.exchange}:{order.symbol}"
             if order.order_status not in ("open", "trigger pending"):
-                symbol_key = f"{order.exchange}:{order.symbol}"
                 self.notify_order_completed(order_id, symbol_key, order.user_id)
+            else:
+                # Still resting (possibly moved from the Stop-Loss book to the
+                # regular book): keep its trigger-book entry in step.
+                self.notify_order_modified(order)
 
         except Exception as e:
             logger.exception(f"Error checking/executing order {order_id}: {e}")
 
+    def _index_order(self, symbol_key: str, order):
+        """Place an order in its symbol's trigger book. Caller holds self._lock."""
+        book = self._trigger_books.get(symbol_key)
+        if book is None:
+            book = self._trigger_books[symbol_key] = TriggerBook()
+        book.add(("order", order.orderid), *order_trigger(order))
+
+    def _index_leg(self, symbol_key: str, leg, user_id: str | None):
+        """Remember a GTT leg and place it in the trigger book. Caller holds self._lock."""
+        trigger_price = Decimal(str(leg.trigger_price)) if leg.trigger_price is not None else None
+        self._gtt_legs[leg.id] = (symbol_key, leg.trigger_direction, trigger_price, user_id)
+        book = self._trigger_books.get(symbol_key)
+        if book is None:
+            book = self._trigger_books[symbol_key] = TriggerBook()
+        book.add(("leg", leg.id), *leg_trigger(leg.trigger_direction, leg.trigger_price))
+
+    def _unindex(self, symbol_key: str, ref):
+        """Remove a ref from a trigger book. Caller holds self._lock."""
+        book = self._trigger_books.get(symbol_key)
+        if book is not None:
+            book.remove(ref)
+            if not len(book):
+                del self._trigger_books[symbol_key]
+
+    def _reconcile_trigger_books(self):
+        """Re-sync the trigger books with the database.
+
+        Cancels, cancel-all, square-off and polling fills do not notify this
+        engine. Before the trigger books every tick re-read every watched order,
+        so such orders dropped out on the next tick; now they would linger until
+        the price reached them, holding a feed subscription. This periodic sweep
+        drops them and re-keys anything whose price changed behind our back.
+        """
+        from database.sandbox_db import SandboxGTT, SandboxGTTLeg
+
+        try:
+            with self._lock:
+                order_keys = {
+                    order_id: symbol_key
+                    for symbol_key, order_ids in self._pending_orders_index.items()
+                    for order_id in order_ids
+                }
+                watched_legs = dict(self._gtt_legs)
+
+            if order_keys:
+                rows = SandboxOrders.query.filter(
+                    SandboxOrders.orderid.in_(list(order_keys))
+                ).all()
+                found = {row.orderid: row for row in rows}
+                for order_id, symbol_key in order_keys.items():
+                    row = found.get(order_id)
+                    if row is None:
+                        self.notify_order_completed(order_id, "", None)
+                    elif row.order_status not in ("open", "trigger pending"):
+                        self.notify_order_completed(order_id, symbol_key, row.user_id)
+                    else:
+                        self.notify_order_modified(row)
+
+            if watched_legs:
+                # Not gtt_manager.get_active_legs(): it returns [] on a database
+                # error, which here would drop every watched leg.
+                active = {
+                    leg.id: leg
+                    for leg in SandboxGTTLeg.query.join(
+                        SandboxGTT, SandboxGTTLeg.gtt_id == SandboxGTT.gtt_id
+                    )
+                    .filter(
+                        SandboxGTTLeg.id.in_(list(watched_legs)),
+                        SandboxGTTLeg.leg_status == "pending",
+                        SandboxGTT.gtt_status == "active",
+                    )
+                    .all()
+                }
+                for leg_id, (symbol_key, _, _, user_id) in watched_legs.items():
+                    leg = active.get(leg_id)
+                    if leg is None:
+                        self._drop_gtt_leg(symbol_key, leg_id, user_id)
+                    else:
+                        with self._lock:
+                            if leg_id in self._gtt_legs:
+                                self._index_leg(symbol_key, leg, user_id)
+        except Exception as e:
+            logger.exception(f"Error reconciling trigger books: {e}")
+        finally:
+            db_session.remove()
+
     def _start_health_monitor(self):
         """Start a thread to monitor WebSocket health and trigger fallback if needed"""
 
         def monitor():
+            last_reconcile = time.time()
             while self._running:
+                if (
+                    self.reconcile_interval > 0
+                    and time.time() - last_reconcile >= self.reconcile_interval
+                ):
+                    last_reconcile = time.time()
+                    self._reconcile_trigger_books()
+
                 try:
                     # Check if market data is fresh
                     is_fresh = self.market_data_service.is_data_fresh(
@@ -634,6 +775,7 @@ class WebSocketExecutionEngine:
         for symbol_key, order_ids in self._pending_orders_index.items():
             if order_id in order_ids:
                 order_ids.remove(order_id)
+                self._unindex(symbol_key, ("order", order_id))
                 logger.debug(f"Removed order {order_id} from index for {symbol_key} (fallback)")
                 if not order_ids:
                     to_cleanup.append(symbol_key)
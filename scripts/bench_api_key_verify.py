@@ -0,0 +1,73 @@
+"""Cold verify_api_key latency, fingerprint lookup vs scanning every hash.
+
+Creates a throwaway SQLite auth database with one API key per user (500 by
+default), then times uncached verification of a valid key and of an invalid
+one twice: with api_key_fingerprint populated (one indexed lookup, at most one
+Argon2 check) and with it cleared, which makes verify_api_key try every
+stored hash the way it did before the column existed.
+
+    uv run python scripts/bench_api_key_verify.py [users]
+
+Needs no broker session. Creating the keys runs one Argon2 hash per user, so
+setup takes a while on its own.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DB = os.path.join(tempfile.mkdtemp(prefix="bench_api_key_"), "auth.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB}"
+os.environ.setdefault("API_KEY_PEPPER", "b" * 64)
+
+
+def _cold(auth_db, api_key):
+    auth_db.verified_api_key_cache.clear()
+    auth_db.invalid_api_key_cache.clear()
+    start = time.perf_counter()
+    user_id = auth_db.verify_api_key(api_key)
+    return user_id, (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    import database.auth_db as auth_db
+    import database.traffic_db as traffic_db
+
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    # Invalid attempts are tracked in the traffic DB; not what is measured here
+    traffic_db.InvalidAPIKeyTracker.track_invalid_api_key = staticmethod(lambda *a, **k: None)
+
+    auth_db.init_db()
+    start = time.perf_counter()
+    for n in range(users):
+        auth_db.upsert_api_key(f"user{n:04d}", f"key-{n:04d}")
+    print(f"{users} API keys created in {time.perf_counter() - start:.1f}s\n")
+
+    last = f"key-{users - 1:04d}"
+    rows = []
+    for label in ("fingerprint", "scan"):
+        if label == "scan":
+            auth_db.ApiKeys.query.update({auth_db.ApiKeys.api_key_fingerprint: None})
+            auth_db.db_session.commit()
+        valid_user, valid_ms = _cold(auth_db, last)
+        invalid_user, invalid_ms = _cold(auth_db, "not-a-key")
+        assert valid_user == f"user{users - 1:04d}" and invalid_user is None
+        rows.append((label, valid_ms, invalid_ms))
+        if label == "scan":
+            # verify_api_key backfilled the key it found; clear it again
+            auth_db.ApiKeys.query.update({auth_db.ApiKeys.api_key_fingerprint: None})
+            auth_db.db_session.commit()
+
+    print(f"{'lookup':<14}{'valid key':>12}{'invalid key':>14}")
+    for label, valid_ms, invalid_ms in rows:
+        print(f"{label:<14}{valid_ms:>10.1f}ms{invalid_ms:>12.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Dynamic ATM straddle history: per-strike sequential fetch vs one batch.
+
+Builds a synthetic 1m underlying and the CE/PE candles of every strike its ATM
+passes through, then times the straddle chart's fetch and merge both ways:
+
+- "sequential": get_history for each strike's CE then PE, lookups built with
+  iterrows, then a per-candle merge loop, as straddle_chart_service did;
+- "batched": fetch_history_frames for all legs at once, then a reindex join.
+
+Broker calls go through the real get_history, including its ~3 per second
+history rate limit; the broker itself is a stub that answers after a fixed
+latency, so the numbers show how much of each call's latency the batch hides.
+
+    uv run python scripts/bench_history_batch.py [strikes] [latency_ms] [days]
+
+Needs no broker session.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("API_KEY_PEPPER", "b" * 64)
+
+# 2026-01-05 09:15 IST
+T0 = 1767584700
+
+
+def _candles(count: int, base: float, step: float) -> list[dict]:
+    return [
+        {"timestamp": T0 + 60 * n, "close": base + step * n, "oi": 0}
+        for n in range(count)
+    ]
+
+
+def _sequential(history, legs, underlying_rows):
+    import pandas as pd
+
+    from services.strategy_chart_service import _convert_timestamp_to_ist as to_ist
+
+    strike_data = {}
+    for strike, (ce_symbol, pe_symbol) in legs.items():
+        lookups = []
+        for symbol in (ce_symbol, pe_symbol):
+            _, response, _ = history(symbol=symbol, exchange="NFO")
+            df = to_ist(pd.DataFrame(response["data"]))
+            lookups.append({ts: float(row["close"]) for ts, row in df.iterrows()})
+        strike_data[strike] = {"ce": lookups[0], "pe": lookups[1]}
+
+    series = []
+    for ts, row in underlying_rows.iterrows():
+        sd = strike_data[row["atm_strike"]]
+        ce, pe = sd["ce"].get(ts), sd["pe"].get(ts)
+        if ce is not None and pe is not None:
+            series.append((int(ts.timestamp()), round(ce + pe, 2)))
+    return series
+
+
+def _batched(fetch, legs, underlying_rows):
+    import pandas as pd
+
+    symbols = {(symbol, "NFO") for pair in legs.values() for symbol in pair}
+    frames, _ = fetch(list(symbols))
+    row_keys = pd.MultiIndex.from_arrays([underlying_rows["atm_strike"], underlying_rows.index])
+    prices = {}
+    for side, position in (("ce", 0), ("pe", 1)):
+        closes = {strike: frames[(pair[position], "NFO")]["close"] for strike, pair in legs.items()}
+        prices[side] = pd.concat(closes).reindex(row_keys).to_numpy()
+    merged = underlying_rows.assign(**prices).dropna(subset=["ce", "pe"])
+    return [
+        (int(ts.timestamp()), round(ce + pe, 2))
+        for ts, ce, pe in zip(
+            merged.index, merged["ce"].tolist(), merged["pe"].tolist(), strict=True
+        )
+    ]
+
+
+def main() -> None:
+    import services.history_batch_service as batch
+    import services.history_service as history_service
+
+    strike_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 400) / 1000
+    days = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    candles = 375 * days
+
+    # Underlying drifting up through strike_count strikes 50 apart
+    strikes = [23000.0 + 50 * n for n in range(strike_count)]
+    data = {"NIFTY": _candles(candles, strikes[0], 50 * (strike_count - 1) / candles)}
+    legs = {}
+    for strike in strikes:
+        legs[strike] = (f"NIFTY27JAN26{int(strike)}CE", f"NIFTY27JAN26{int(strike)}PE")
+        data[legs[strike][0]] = _candles(candles, 120.0, 0.01)
+        data[legs[strike][1]] = _candles(candles, 110.0, -0.01)
+
+    def broker_history(auth, feed, broker, symbol, exchange, interval, start, end):
+        time.sleep(latency)
+        return True, {"status": "success", "data": data[symbol]}, 200
+
+    history_service.get_auth_token_broker = lambda api_key, include_feed_token: ("t", "f", "stub")
+    history_service.get_history_with_auth = broker_history
+    batch.HISTORY_BATCH_USE_HISTORIFY = False
+
+    def history(symbol, exchange):
+        return history_service.get_history(symbol, exchange, "1m", "2026-01-01", "2026-01-05", "k")
+
+    def fetch(keys):
+        return batch.fetch_history_frames(keys, "1m", "2026-01-01", "2026-01-05", "k")
+
+    frames, _ = fetch([("NIFTY", "NSE_INDEX")])
+    underlying_rows = frames[("NIFTY", "NSE_INDEX")]
+    underlying_rows["atm_strike"] = batch.nearest_strikes(
+        underlying_rows["close"].to_numpy(), strikes
+    )
+
+    print(
+        f"{strike_count} strikes ({2 * strike_count} option requests), {candles} candles, "
+        f"{latency * 1000:.0f}ms broker latency, {batch.HISTORY_BATCH_WORKERS} workers\n"
+    )
+    results = {}
+    for label, run in (
+        ("sequential", lambda: _sequential(history, legs, underlying_rows)),
+        ("batched", lambda: _batched(fetch, legs, underlying_rows)),
+    ):
+        start = time.perf_counter()
+        results[label] = run()
+        print(f"{label:<12}{time.perf_counter() - start:>8.2f}s")
+    assert results["sequential"] == results["batched"]
+
+
+if __name__ == "__main__":
+    main()
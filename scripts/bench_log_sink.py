@@ -0,0 +1,84 @@
+"""API order log writes, one commit per row vs the batched log sink.
+
+Creates a throwaway SQLite database and writes the same order_logs rows twice:
+one transaction per row from 10 executor threads (how async_log_order ran
+before) and through async_log_order now, which queues them for the
+``order_logs`` log sink to commit in batches. Reports the time until every row
+is on disk and the number of commits each needed.
+
+    uv run python scripts/bench_log_sink.py [rows]
+
+Needs no broker session.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DB = os.path.join(tempfile.mkdtemp(prefix="bench_log_sink_"), "openalgo.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB}"
+
+
+def _per_row(apilog_db, rows):
+    """The pre-sink async_log_order body: add, commit, remove."""
+
+    def write(n):
+        try:
+            apilog_db.db_session.add(
+                apilog_db.OrderLog(
+                    api_type="placeorder", request_data=f'{{"n": {n}}}', response_data="{}"
+                )
+            )
+            apilog_db.db_session.commit()
+        finally:
+            apilog_db.db_session.remove()
+
+    with ThreadPoolExecutor(10) as pool:
+        list(pool.map(write, range(rows)))
+
+
+def _batched(apilog_db, rows):
+    from utils.log_sink import get_sink
+
+    for n in range(rows):
+        apilog_db.async_log_order("placeorder", {"n": n}, {})
+    get_sink("order_logs", apilog_db._write_order_logs).flush(timeout=600)
+
+
+def main() -> None:
+    from sqlalchemy import event
+
+    import database.apilog_db as apilog_db
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    apilog_db.init_db()
+
+    commits = []
+    event.listen(apilog_db.engine, "commit", lambda conn: commits.append(1))
+
+    print(f"{rows:,} order log rows\n")
+    print(f"{'writer':<12}{'time':>10}{'commits':>10}")
+    for label, fn in (("per-row", _per_row), ("log sink", _batched)):
+        apilog_db.OrderLog.query.delete()
+        apilog_db.db_session.commit()
+        apilog_db.db_session.remove()
+        commits.clear()
+
+        start = time.perf_counter()
+        fn(apilog_db, rows)
+        elapsed = time.perf_counter() - start
+
+        assert apilog_db.OrderLog.query.count() == rows
+        apilog_db.db_session.remove()
+        print(f"{label:<12}{elapsed:>9.2f}s{len(commits):>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Contention benchmark for the MarketDataService tick cache.
+
+N writer threads push ticks through MarketDataService.process_market_data
+while M reader threads hammer get_ltp / get_multiple_ltps, as the strategy,
+sandbox and Flow readers do. Reports write and read throughput per second;
+run it on the previous revision of services/market_data_service.py for the
+single-lock baseline.
+
+    uv run python scripts/bench_market_data_contention.py [writers] [readers] [seconds]
+
+Needs no broker session or database.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_SYMBOLS = 2_000
+READ_BATCH = 20
+
+
+def _ticks(writer_id: int, n_writers: int) -> list[dict]:
+    return [
+        {
+            "symbol": f"SYM{i}",
+            "exchange": "NFO",
+            "mode": 1,
+            "data": {"ltp": 100.0 + i % 7, "volume": 1000, "timestamp": 1760000000000},
+        }
+        for i in range(writer_id, N_SYMBOLS, n_writers)
+    ]
+
+
+def run(cache, n_writers: int, n_readers: int, seconds: float) -> tuple[int, int]:
+    stop = threading.Event()
+    writes = [0] * n_writers
+    reads = [0] * n_readers
+    lookups = [{"symbol": f"SYM{i}", "exchange": "NFO"} for i in range(N_SYMBOLS)]
+
+    def writer(idx):
+        ticks = _ticks(idx, n_writers)
+        process = cache.process_market_data
+        count = 0
+        while not stop.is_set():
+            for tick in ticks:
+                process(tick)
+            count += len(ticks)
+        writes[idx] = count
+
+    def reader(idx):
+        count = 0
+        i = idx
+        while not stop.is_set():
+            cache.get_ltp(f"SYM{i % N_SYMBOLS}", "NFO")
+            start = i % (N_SYMBOLS - READ_BATCH)
+            cache.get_multiple_ltps(lookups[start : start + READ_BATCH])
+            count += 1 + READ_BATCH
+            i += 7
+        reads[idx] = count
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(n_writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(n_readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(writes), sum(reads)
+
+
+def main():
+    n_writers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    n_readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    import logging
+
+    from services.market_data_service import MarketDataService
+
+    # The validator logs every large-move warning at debug; keep the run quiet.
+    logging.getLogger("services.market_data_service").setLevel(logging.WARNING)
+
+    service = MarketDataService()
+    # Warm the cache so readers hit populated entries from the first second.
+    for tick in _ticks(0, 1):
+        service.process_market_data(tick)
+
+    print(f"{N_SYMBOLS:,} symbols, {seconds:.1f}s per run")
+    for writers, readers in ((n_writers, 0), (0, n_readers), (n_writers, n_readers)):
+        writes, reads = run(service, writers, readers, seconds)
+        print(
+            f"  {writers:>2} writers {readers:>2} readers   "
+            f"writes {writes / seconds:>12,.0f}/s   reads {reads / seconds:>12,.0f}/s"
+        )
+    print(f"  cache metrics: {service.get_cache_metrics()}")
+
+
+if __name__ == "__main__":
+    main()
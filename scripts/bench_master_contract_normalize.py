@@ -0,0 +1,166 @@
+"""Symbol normalization of a master contract, per-row vs vectorized.
+
+Builds a synthetic Zerodha-style instrument dump (~250k rows, mostly option
+contracts with space-separated tradingsymbols) and runs the symbol steps of a
+broker's process function twice: the per-row code the brokers used
+(``df.apply(reformat_symbol, axis=1)``, a strike lambda per row, Series.replace
+for index names) and database.master_contract_normalize. Both produce
+identical columns; the script checks that before reporting.
+
+    uv run python scripts/bench_master_contract_normalize.py [rows]
+
+Needs no database or broker session.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+
+def _dump(rows: int) -> pd.DataFrame:
+    """A raw instrument dump: expiry as yyyy-mm-dd, symbols with spaces."""
+    rng = np.random.default_rng(7)
+    expiries = pd.date_range("2024-03-28", periods=26, freq="7D")
+    underlyings = ["NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY"] + [
+        f"STOCK{i:04d}" for i in range(200)
+    ]
+
+    n = rows - 2000
+    expiry = expiries[rng.integers(0, len(expiries), n)]
+    name = np.array(underlyings, dtype=object)[rng.integers(0, len(underlyings), n)]
+    kind = np.array(["CE", "PE", "FUT"], dtype=object)[rng.choice(3, n, p=[0.48, 0.48, 0.04])]
+    strike = np.where(kind == "FUT", 0.0, 100 + rng.integers(0, 4000, n) * 12.5)
+    strike_text = pd.Series(strike).map(lambda s: str(int(s)) if s == int(s) else str(s))
+    year = expiry.strftime("%y").to_numpy(dtype=object)
+    month = expiry.strftime("%b").str.upper().to_numpy(dtype=object)
+    day = expiry.strftime("%d").to_numpy(dtype=object)
+    symbol = np.where(
+        kind == "FUT",
+        name + " " + year + " " + month + " " + day + " FUT",
+        name + " " + year + " " + month + " " + day + " " + strike_text.to_numpy(dtype=object)
+        + " " + kind,
+    )
+    derivatives = pd.DataFrame(
+        {
+            "symbol": symbol,
+            "instrumenttype": kind,
+            "name": name,
+            "expiry": expiry.strftime("%Y-%m-%d"),
+            "strike": strike,
+            "exchange": "NFO",
+        }
+    )
+
+    cash = [f"EQ{i:04d}" for i in range(2000 - 100)] + list(
+        np.random.default_rng(1).choice(list_indices(), 100)
+    )
+    equities = pd.DataFrame(
+        {
+            "symbol": cash,
+            "instrumenttype": "EQ",
+            "name": cash,
+            "expiry": None,
+            "strike": 0.0,
+            "exchange": ["NSE"] * (len(cash) - 100) + ["BSE_INDEX"] * 100,
+        }
+    )
+    return pd.concat([derivatives, equities], ignore_index=True)
+
+
+def list_indices() -> list[str]:
+    from database.master_contract_normalize import BSE_INDEX_SYMBOLS, NSE_INDEX_SYMBOLS
+
+    return list(NSE_INDEX_SYMBOLS) + list(BSE_INDEX_SYMBOLS)
+
+
+def _per_row(df: pd.DataFrame) -> pd.DataFrame:
+    """The symbol steps as Zerodha's process_zerodha_csv ran them."""
+    from database.master_contract_normalize import BSE_INDEX_SYMBOLS, NSE_INDEX_SYMBOLS
+
+    def reformat_symbol(row):
+        symbol = row["symbol"]
+        if row["instrumenttype"] == "FUT":
+            parts = symbol.split(" ")
+            if len(parts) == 5:
+                symbol = parts[0] + parts[2] + parts[3] + parts[4] + parts[1]
+        elif row["instrumenttype"] in ["CE", "PE"]:
+            parts = symbol.split(" ")
+            if len(parts) == 6:
+                symbol = parts[0] + parts[3] + parts[4] + parts[5] + parts[1] + parts[2]
+        return symbol
+
+    def format_strike(strike):
+        val = float(strike)
+        return str(int(val)) if val == int(val) else str(val)
+
+    df = df.copy()
+    df["expiry"] = pd.to_datetime(df["expiry"]).dt.strftime("%d-%b-%y").str.upper()
+    df["symbol"] = df.apply(reformat_symbol, axis=1)
+    df["expiry"] = df["expiry"].fillna("")
+    compact = df["expiry"].str.replace("-", "", regex=False)
+    df.loc[df["instrumenttype"] == "FUT", "symbol"] = df["name"] + compact + "FUT"
+    for kind in ("CE", "PE"):
+        df.loc[df["instrumenttype"] == kind, "symbol"] = (
+            df["name"] + compact + df["strike"].apply(format_strike) + df["instrumenttype"]
+        )
+    df["symbol"] = df["symbol"].replace(NSE_INDEX_SYMBOLS)
+    bse = df["exchange"] == "BSE_INDEX"
+    df.loc[bse, "symbol"] = df.loc[bse, "symbol"].replace(BSE_INDEX_SYMBOLS)
+    return df
+
+
+def _vectorized(df: pd.DataFrame) -> pd.DataFrame:
+    from database.master_contract_normalize import (
+        BSE_INDEX_SYMBOLS,
+        NSE_INDEX_SYMBOLS,
+        fno_symbols,
+        format_expiry,
+        join_spaced_symbols,
+        map_index_symbols,
+    )
+
+    df = df.copy()
+    df["expiry"] = format_expiry(df["expiry"])
+    df["symbol"] = join_spaced_symbols(df["symbol"], df["instrumenttype"])
+    df["expiry"] = df["expiry"].fillna("")
+    df["symbol"] = fno_symbols(
+        df["symbol"], df["instrumenttype"], df["name"], df["expiry"], df["strike"]
+    )
+    df["symbol"] = map_index_symbols(df["symbol"], NSE_INDEX_SYMBOLS)
+    df["symbol"] = map_index_symbols(df["symbol"], BSE_INDEX_SYMBOLS, df["exchange"] == "BSE_INDEX")
+    return df
+
+
+def _time(fn, df, rounds=3):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 250_000
+    df = _dump(rows)
+
+    expected, per_row_s = _time(_per_row, df)
+    result, vectorized_s = _time(_vectorized, df)
+    for column in ("symbol", "expiry"):
+        assert expected[column].tolist() == result[column].tolist(), column
+
+    print(f"{len(df):,} contracts, best of 3\n")
+    print(f"{'per-row':<12}{per_row_s:>8.2f}s")
+    print(f"{'vectorized':<12}{vectorized_s:>8.2f}s   {per_row_s / vectorized_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
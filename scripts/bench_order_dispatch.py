@@ -0,0 +1,60 @@
+"""Multi-leg order latency, sequential placement vs the concurrent dispatcher.
+
+Places N simulated child orders, half BUY and half SELL, each taking a fixed
+broker round trip, twice: one after another with no pause (how sandbox
+basket, split and options multi-orders placed them before; live split orders
+also slept 1/rate between orders) and through
+utils.order_dispatcher.dispatch with the BUY group ahead of the SELL group and
+the broker's ORDER_RATE_LIMIT bucket applied. Reports the wall time per leg
+count. The rate limit, not the dispatcher, sets the floor once a request has
+more legs than the bucket holds.
+
+    uv run python scripts/bench_order_dispatch.py [round_trip_ms]
+
+Needs no broker session.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LEG_COUNTS = (1, 2, 4, 6, 10, 20, 40)
+
+
+def main() -> None:
+    import utils.order_dispatcher as order_dispatcher
+
+    round_trip = (float(sys.argv[1]) if len(sys.argv) > 1 else 150.0) / 1000
+    rate = os.getenv("ORDER_RATE_LIMIT", "10 per second")
+
+    def place():
+        time.sleep(round_trip)
+        return {"status": "success"}
+
+    print(f"broker round trip {round_trip * 1000:.0f} ms, ORDER_RATE_LIMIT={rate!r}, "
+          f"ORDER_DISPATCH_CONCURRENCY={order_dispatcher.ORDER_DISPATCH_CONCURRENCY}\n")
+    print(f"{'legs':>5}{'sequential':>13}{'dispatch':>11}{'speedup':>10}")
+    for legs in LEG_COUNTS:
+        start = time.perf_counter()
+        for _ in range(legs):
+            place()
+        sequential = time.perf_counter() - start
+
+        # A fresh, full bucket per row, as for a broker idle since its last request
+        order_dispatcher._buckets.clear()
+        buys = [place] * ((legs + 1) // 2)
+        sells = [place] * (legs // 2)
+        start = time.perf_counter()
+        order_dispatcher.dispatch([buys, sells], rate_key="bench")
+        concurrent = time.perf_counter() - start
+
+        print(f"{legs:>5}{sequential:>12.2f}s{concurrent:>10.2f}s{sequential / concurrent:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
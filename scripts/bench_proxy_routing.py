@@ -0,0 +1,167 @@
+"""Replay synthetic ticks through WebSocketProxy.zmq_listener.
+
+Reports the per-tick cost of topic routing before (legacy: split + exchange
+detection + normalize_mode_or_none + a fresh recipient dict over modes 1..N on
+every tick) and after (routing.TopicRouter: one dict lookup), and the
+end-to-end per-tick cost of the listener (MarketDataService feed, serialize-once
+fan-out and per-client send queues) with fake client sockets, against the
+100k ticks/s expiry-day target.
+
+    uv run python scripts/bench_proxy_routing.py [ticks] [symbols] [clients]
+
+Needs no broker session: the ZMQ socket and the browser websockets are
+replaced with in-memory fakes. Binds the proxy on free local ports.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TARGET_TICKS_PER_SEC = 100_000
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def legacy_route(proxy, topic: bytes):
+    """The pre-routing-table per-tick work, kept verbatim for comparison."""
+    from websocket_proxy.mode_utils import normalize_mode_or_none
+
+    topic_str = topic.decode("utf-8")
+    if topic_str.startswith("CACHE_INVALIDATE") or topic_str.endswith(
+        ("_orders", "_positions", "_margins")
+    ):
+        return None
+    parts = topic_str.split("_")
+    mode_str = parts[-1]
+    remaining = parts[:-1]
+    prefixes = (("NSE", "INDEX"), ("BSE", "INDEX"), ("MCX", "INDEX"), ("GLOBAL", "INDEX"))
+    if len(remaining) >= 2 and (remaining[0], remaining[1]) in prefixes:
+        exchange = f"{remaining[0]}_{remaining[1]}"
+        symbol = "_".join(remaining[2:])
+    else:
+        exchange = remaining[0]
+        symbol = "_".join(remaining[1:])
+    mode, _ = normalize_mode_or_none(mode_str)
+    all_client_modes = {}
+    for m in range(1, mode + 1):
+        for cid in proxy.subscription_index.get((symbol, exchange, m), set()):
+            all_client_modes[cid] = m
+    return all_client_modes
+
+
+def new_route(proxy, topic: bytes):
+    router = proxy.topic_router
+    route = router.lookup(topic)
+    if route is None:
+        route = router.add(topic, topic.decode("utf-8"))
+    return router.recipients(route)
+
+
+class _FakeWebSocket:
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, message):
+        self.sent += 1
+
+
+class _ReplaySocket:
+    """Stands in for the proxy's zmq.asyncio SUB socket."""
+
+    def __init__(self, proxy, frames):
+        self.proxy = proxy
+        self.frames = frames
+        self.pos = 0
+
+    async def recv_multipart(self):
+        if self.pos >= len(self.frames):
+            self.proxy.running = False
+            return [b"X_positions", b"{}"]
+        frame = self.frames[self.pos]
+        self.pos += 1
+        return frame
+
+    def close(self, linger=0):
+        pass
+
+
+def main():
+    n_ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    n_clients = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    os.environ["ZMQ_PORT"] = str(_free_port())
+
+    from websocket_proxy.server import WebSocketProxy
+
+    proxy = WebSocketProxy(host="127.0.0.1", port=_free_port())
+    proxy.socket.close(linger=0)
+
+    symbols = [f"NIFTY28OCT26{24000 + 50 * (i // 2)}{'CE' if i % 2 else 'PE'}" for i in range(n_symbols)]
+    websockets_by_client = {cid: _FakeWebSocket() for cid in range(n_clients)}
+    for cid, ws in websockets_by_client.items():
+        proxy.clients[cid] = ws
+        proxy.user_mapping[cid] = "bench"
+        for sym in symbols[cid::n_clients]:
+            proxy.subscription_index[(sym, "NFO", 2)].add(cid)
+    proxy.user_broker_mapping["bench"] = "bench"
+
+    topics = [f"NFO_{sym}_QUOTE".encode() for sym in symbols]
+    payload = json.dumps({"ltp": 101.5, "volume": 1000, "open": 100.0, "high": 102.0,
+                          "low": 99.5, "close": 100.5, "timestamp": 1760000000000}).encode()
+    stream = [topics[i % len(topics)] for i in range(n_ticks)]
+
+    print(f"Replaying {n_ticks:,} ticks over {n_symbols:,} topics, {n_clients} clients")
+
+    for name, fn in (("legacy parse per tick", legacy_route), ("routing table", new_route)):
+        t0 = time.perf_counter()
+        for topic in stream:
+            fn(proxy, topic)
+        per_tick_us = (time.perf_counter() - t0) / n_ticks * 1e6
+        print(f"  routing only  {name:<22} {per_tick_us:8.3f} us/tick")
+
+    async def replay() -> float:
+        for cid, ws in websockets_by_client.items():
+            proxy._attach_client_queue(cid, ws)
+        proxy.socket = _ReplaySocket(proxy, [[t, payload] for t in stream])
+        proxy.running = True
+        t0 = time.perf_counter()
+        await proxy.zmq_listener()
+        # Let the per-client writer tasks drain what the listener queued.
+        while any(q.depth for q in proxy.client_queues.values()):
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - t0
+        for q in proxy.client_queues.values():
+            q.close()
+        return elapsed
+
+    elapsed = asyncio.run(replay())
+    per_tick_us = elapsed / n_ticks * 1e6
+    rate = n_ticks / elapsed
+    verdict = "meets" if rate >= TARGET_TICKS_PER_SEC else "below"
+    print(f"  full listener (MDS feed + fan-out)   {per_tick_us:8.3f} us/tick "
+          f"= {rate:,.0f} ticks/s ({verdict} {TARGET_TICKS_PER_SEC:,}/s target)")
+    print(f"  routing stats: {proxy.topic_router.stats()}")
+    performance = proxy.get_health_stats()["performance"]
+    print(f"  fan-out stats: {performance['fanout']}")
+    print(f"  conflation stats (WS_CONFLATE_MS): {performance['conflation']}")
+    proxy.context.term()
+
+
+if __name__ == "__main__":
+    main()
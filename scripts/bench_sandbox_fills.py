@@ -0,0 +1,116 @@
+"""Time-to-fill for a sandbox polling cycle with a fillable backlog.
+
+Seeds N resting LIMIT orders that all cross on the cycle's quote, runs one
+ExecutionEngine.check_and_execute_pending_orders and reports how long the
+cycle took and how many commits it made - per-order (SANDBOX_BATCH_FILLS
+off, the old path) against the batched unit of work. Each mode starts from a
+fresh database, so the two runs do the same work.
+
+    uv run python scripts/bench_sandbox_fills.py [orders] [symbols]
+
+Needs no broker session: quotes are faked and the sandbox database is a
+throwaway SQLite file, so the commit cost (an fsync each) is real.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP = tempfile.mkdtemp(prefix="bench_sandbox_fills_")
+# Must be set before database.sandbox_db is imported; load_dotenv does not
+# override variables that are already in the environment.
+os.environ["SANDBOX_DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'sandbox.db')}"
+
+
+def _reset(n_orders: int, n_symbols: int) -> None:
+    from datetime import datetime
+    from decimal import Decimal
+
+    import pytz
+
+    from database.sandbox_db import Base, SandboxOrders, db_session, engine, init_db
+    from sandbox.fund_manager import FundManager
+
+    db_session.remove()
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+
+    now = datetime.now(pytz.timezone("Asia/Kolkata"))
+    FundManager("bench-user").initialize_funds()
+    for i in range(n_orders):
+        db_session.add(
+            SandboxOrders(
+                orderid=f"BENCH{i:08d}",
+                user_id="bench-user",
+                symbol=f"SYM{i % n_symbols}",
+                exchange="NSE",
+                action="BUY",
+                quantity=1,
+                price=101,
+                trigger_price=0,
+                price_type="LIMIT",
+                product="MIS",
+                order_status="open",
+                average_price=0,
+                filled_quantity=0,
+                pending_quantity=1,
+                margin_blocked=Decimal("0"),
+                order_timestamp=now,
+                update_timestamp=now,
+            )
+        )
+    db_session.commit()
+
+
+def run(batch: bool, n_orders: int, n_symbols: int) -> tuple[float, int, int]:
+    from sqlalchemy import event
+
+    from database.sandbox_db import SandboxOrders, db_session, engine
+    from sandbox.execution_engine import ExecutionEngine
+
+    _reset(n_orders, n_symbols)
+
+    eng = ExecutionEngine()
+    eng.batch_fills = batch
+    eng._fetch_quotes_batch = lambda syms: {s: {"ltp": 100, "bid": 0, "ask": 0} for s in syms}
+    eng._check_pending_gtts = lambda: None
+    eng._publish_fill_event = lambda **kwargs: None
+
+    commits = [0]
+
+    def _on_commit(_conn):
+        commits[0] += 1
+
+    event.listen(engine, "commit", _on_commit)
+    try:
+        start = time.perf_counter()
+        eng.check_and_execute_pending_orders()
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "commit", _on_commit)
+
+    db_session.remove()
+    filled = SandboxOrders.query.filter_by(order_status="complete").count()
+    return elapsed, commits[0], filled
+
+
+def main() -> None:
+    n_orders = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print(f"{n_orders} fillable orders over {n_symbols} symbols, one cycle\n")
+    print(f"{'mode':<12}{'seconds':>10}{'commits':>10}{'filled':>10}{'ms/fill':>10}")
+    for label, batch in (("per-order", False), ("batched", True)):
+        elapsed, commits, filled = run(batch, n_orders, n_symbols)
+        per_fill = elapsed * 1000 / filled if filled else float("nan")
+        print(f"{label:<12}{elapsed:>10.2f}{commits:>10}{filled:>10}{per_fill:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
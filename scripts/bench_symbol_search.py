@@ -0,0 +1,137 @@
+"""Latency of BrokerSymbolCache.search_symbols, scan vs trigram index.
+
+Builds a synthetic master contract the size of a full NSE/BSE/NFO/MCX load
+(~125k rows, mostly option contracts), loads it into a BrokerSymbolCache and
+times typical search-box queries with the search index on and off. Both runs
+return identical results; the script checks that before timing.
+
+    uv run python scripts/bench_symbol_search.py [rounds]
+
+Needs no database or broker session.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import time
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUERIES = [
+    ("NIFTY 24000 CE", None),
+    ("NIFTY", None),
+    ("BANKNIFTY 25APR", "NFO"),
+    ("RELIANCE", None),
+    ("reliance fut", "NFO"),
+    ("24000", None),
+    ("CRUDEOIL 6500", "MCX"),
+    ("TATA", "NSE"),
+    ("CE", "NFO"),  # too short for the index: scans either way
+]
+
+
+def _master():
+    from database.token_db_enhanced import SymbolData
+
+    rows = []
+    token = 100000
+
+    def add(symbol, name, exchange, strike=None, expiry=None):
+        nonlocal token
+        rows.append(
+            SymbolData(
+                symbol=symbol,
+                brsymbol=symbol.lower(),
+                name=name,
+                exchange=exchange,
+                brexchange=exchange,
+                token=str(token),
+                strike=strike,
+                expiry=expiry,
+            )
+        )
+        token += 1
+
+    equities = [f"STOCK{i:04d}" for i in range(2500)] + ["RELIANCE", "TATAMOTORS", "TATASTEEL"]
+    for name in equities:
+        add(name, name, "NSE")
+        add(name, name, "BSE")
+
+    expiries = ["28MAR24", "04APR24", "11APR24", "18APR24", "25APR24", "30MAY24"]
+    for underlying, base, step, count in (
+        ("NIFTY", 22000, 50, 160),
+        ("BANKNIFTY", 46000, 100, 160),
+        ("FINNIFTY", 21000, 50, 120),
+        ("MIDCPNIFTY", 10000, 25, 100),
+    ):
+        for expiry in expiries:
+            add(f"{underlying}{expiry}FUT", underlying, "NFO", expiry=expiry)
+            for k in range(count):
+                strike = base + k * step
+                for kind in ("CE", "PE"):
+                    add(f"{underlying}{expiry}{strike}{kind}", underlying, "NFO", float(strike), expiry)
+
+    for name in equities[::4]:
+        for expiry in ("28MAR24", "25APR24", "30MAY24"):
+            add(f"{name}{expiry}FUT", name, "NFO", expiry=expiry)
+            for k in range(30):
+                strike = 1000 + k * 20
+                for kind in ("CE", "PE"):
+                    add(f"{name}{expiry}{strike}{kind}", name, "NFO", float(strike), expiry)
+
+    for expiry in ("17APR24", "17MAY24"):
+        for k in range(80):
+            strike = 6000 + k * 50
+            for kind in ("CE", "PE"):
+                add(f"CRUDEOIL{expiry}{strike}{kind}", "CRUDEOIL", "MCX", float(strike), expiry)
+    return rows
+
+
+def _time(cache, query, exchange, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        cache.search_symbols(query, exchange, limit=50)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main() -> None:
+    from database.token_db_enhanced import BrokerSymbolCache
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    rows = _master()
+    cache = BrokerSymbolCache()
+    start = time.perf_counter()
+    cache._load_records(rows)
+    load_s = time.perf_counter() - start
+    index = cache.search_index
+    memory = cache.get_cache_info()["memory"]
+
+    print(
+        f"{len(rows):,} symbols loaded in {load_s:.2f}s, "
+        f"{memory['total_mb']} MB ({memory['bytes_per_symbol']} bytes/symbol, "
+        f"search index {memory['search_index_mb']} MB), {rounds} rounds per query\n"
+    )
+    print(f"{'query':<24}{'exchange':<10}{'hits':>7}{'scan p50':>10}{'p99':>8}{'index p50':>11}{'p99':>8}")
+    for query, exchange in QUERIES:
+        cache.search_index = None
+        expected = cache.search_symbols(query, exchange, limit=50)
+        scan = _time(cache, query, exchange, rounds)
+        cache.search_index = index
+        assert cache.search_symbols(query, exchange, limit=50) == expected, query
+        indexed = _time(cache, query, exchange, rounds)
+        print(
+            f"{query:<24}{exchange or '-':<10}{len(expected):>7}"
+            f"{scan[0]:>10.2f}{scan[1]:>8.2f}{indexed[0]:>11.2f}{indexed[1]:>8.2f}"
+        )
+    print("\nlatencies in ms")
+
+
+if __name__ == "__main__":
+    main()
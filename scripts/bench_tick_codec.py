@@ -0,0 +1,87 @@
+"""
+Microbenchmark: JSON vs msgpack tick payloads on the adapter -> proxy ZMQ bus.
+
+Measures encode (adapter side), decode (proxy side) and payload size for a
+representative LTP, QUOTE and DEPTH tick. No broker, database or running
+proxy is needed.
+
+Usage:
+    uv run python scripts/bench_tick_codec.py [iterations]
+"""
+import importlib.util
+import pathlib
+import sys
+import time
+
+_CODEC_PATH = pathlib.Path(__file__).resolve().parent.parent / "websocket_proxy" / "tick_codec.py"
+_spec = importlib.util.spec_from_file_location("_tick_codec", _CODEC_PATH)
+codec = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(codec)
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+LTP = {
+    "symbol": "NIFTY28OCT2625000CE",
+    "exchange": "NFO",
+    "mode": "ltp",
+    "ltp": 123.45,
+    "timestamp": 1760000000000,
+}
+QUOTE = {
+    **LTP,
+    "mode": "quote",
+    "open": 110.0,
+    "high": 130.5,
+    "low": 100.25,
+    "close": 115.0,
+    "volume": 1234567,
+    "last_quantity": 75,
+    "average_price": 120.12,
+    "total_buy_quantity": 45000,
+    "total_sell_quantity": 52000,
+    "oi": 3400000,
+}
+DEPTH = {
+    **QUOTE,
+    "mode": "full",
+    "depth": {
+        "buy": [{"price": 123.40 - i * 0.05, "quantity": 75 * i, "orders": i} for i in range(1, 6)],
+        "sell": [{"price": 123.50 + i * 0.05, "quantity": 75 * i, "orders": i} for i in range(1, 6)],
+    },
+}
+CASES = (("NFO_NIFTY28OCT2625000CE_LTP", LTP), ("NFO_NIFTY28OCT2625000CE_QUOTE", QUOTE),
+         ("NFO_NIFTY28OCT2625000CE_DEPTH", DEPTH))
+
+
+def bench(topic: str, data: dict, wire_format: str) -> tuple[float, float, int]:
+    payload = codec.encode_tick(topic, data, wire_format)
+    assert codec.decode_tick(payload) == data
+
+    t0 = time.perf_counter()
+    for _ in range(ITERATIONS):
+        codec.encode_tick(topic, data, wire_format)
+    enc_us = (time.perf_counter() - t0) / ITERATIONS * 1e6
+
+    t0 = time.perf_counter()
+    for _ in range(ITERATIONS):
+        codec.decode_tick(payload)
+    dec_us = (time.perf_counter() - t0) / ITERATIONS * 1e6
+    return enc_us, dec_us, len(payload)
+
+
+def main():
+    if not codec.binary_available():
+        sys.exit("msgpack is not installed; only the JSON path is available.")
+    print(f"Tick codec microbenchmark ({ITERATIONS:,} iterations per case)")
+    print(f"{'mode':<7}{'format':<9}{'encode us':>11}{'decode us':>11}{'bytes':>8}{'speedup':>9}")
+    for topic, data in CASES:
+        mode = topic.rsplit("_", 1)[1]
+        j_enc, j_dec, j_len = bench(topic, data, codec.WIRE_JSON)
+        m_enc, m_dec, m_len = bench(topic, data, codec.WIRE_MSGPACK)
+        speedup = (j_enc + j_dec) / (m_enc + m_dec)
+        print(f"{mode:<7}{'json':<9}{j_enc:>11.2f}{j_dec:>11.2f}{j_len:>8}{'':>9}")
+        print(f"{mode:<7}{'msgpack':<9}{m_enc:>11.2f}{m_dec:>11.2f}{m_len:>8}{speedup:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""TradingView and Chartink webhook throughput, cold routing vs cached routes.
+
+Creates a throwaway SQLite database with one TradingView and one Chartink
+strategy (50 symbol mappings each by default) and the owner's API key, then
+posts alerts to both webhooks through a Flask test client and reports
+alerts/sec end to end: JSON parse, routing, validation and payload build, with
+the order queue stubbed out. "cold" invalidates the route cache before every
+alert, so each one queries the strategy and its mappings and decrypts the API
+key as every alert did before; "cached" serves them from the route cache.
+
+    uv run python scripts/bench_webhook_routing.py [alerts] [mappings]
+
+Needs no broker session.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+# Runnable from anywhere, including scripts/ itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DB = os.path.join(tempfile.mkdtemp(prefix="bench_webhook_"), "openalgo.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB}"
+os.environ.setdefault("API_KEY_PEPPER", "b" * 64)
+
+
+def _run(client, url, bodies, cold):
+    from database.webhook_route_cache import invalidate_webhook_routes
+
+    start = time.perf_counter()
+    for body in bodies:
+        if cold:
+            invalidate_webhook_routes()
+        response = client.post(url, json=body)
+        assert response.status_code == 200, response.get_json()
+    return len(bodies) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    from flask import Flask
+
+    # The API schemas package has to load before the order services it imports
+    import restx_api  # noqa: F401
+
+    # isort: split
+    import blueprints.chartink as chartink_bp_module
+    import blueprints.strategy as strategy_bp_module
+    import database.auth_db as auth_db
+    import database.chartink_db as chartink_db
+    import database.strategy_db as strategy_db
+
+    alerts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    mapping_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    # Measure routing, not order placement
+    for module in (strategy_bp_module, chartink_bp_module):
+        module.queue_webhook_order = lambda endpoint, payload: True
+
+    auth_db.init_db()
+    strategy_db.init_db()
+    chartink_db.init_db()
+    auth_db.upsert_api_key("bench", "bench-api-key")
+
+    symbols = [f"SYM{n:03d}" for n in range(mapping_count)]
+    tv_webhook, ck_webhook = str(uuid.uuid4()), str(uuid.uuid4())
+    tv = strategy_db.create_strategy("bench", tv_webhook, "bench", is_intraday=False)
+    strategy_db.bulk_add_symbol_mappings(
+        tv.id,
+        [
+            {"symbol": s, "exchange": "NSE", "quantity": 1, "product_type": "CNC"}
+            for s in symbols
+        ],
+    )
+    ck = chartink_db.create_strategy("bench", ck_webhook, "bench", is_intraday=False)
+    chartink_db.bulk_add_symbol_mappings(
+        ck.id,
+        [
+            {"chartink_symbol": s, "exchange": "NSE", "quantity": 1, "product_type": "CNC"}
+            for s in symbols
+        ],
+    )
+
+    app = Flask(__name__)
+    app.register_blueprint(strategy_bp_module.strategy_bp)
+    app.register_blueprint(chartink_bp_module.chartink_bp)
+    client = app.test_client()
+
+    # The last mapping, which the old per-alert scan reached last
+    tv_bodies = [{"symbol": symbols[-1], "action": "BUY"}] * alerts
+    ck_bodies = [{"scan_name": "BUY scan", "stocks": symbols[-1]}] * alerts
+    cases = (
+        ("tradingview", f"/strategy/webhook/{tv_webhook}", tv_bodies),
+        ("chartink", f"/chartink/webhook/{ck_webhook}", ck_bodies),
+    )
+
+    print(f"{alerts} alerts per run, {mapping_count} symbol mappings per strategy\n")
+    print(f"{'webhook':<14}{'cold':>12}{'cached':>12}{'speedup':>10}")
+    for label, url, bodies in cases:
+        _run(client, url, bodies[:50], cold=False)  # warm up
+        cold = _run(client, url, bodies, cold=True)
+        cached = _run(client, url, bodies, cold=False)
+        print(f"{label:<14}{cold:>8.0f}/sec{cached:>8.0f}/sec{cached / cold:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 import copy
 import importlib
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from database.auth_db import get_auth_token_broker
@@ -16,6 +15,7 @@ from utils.constants import (
 )
 from utils.event_bus import bus
 from utils.logging import get_logger
+from utils.order_dispatcher import dispatch
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -193,7 +193,6 @@ def process_basket_order_with_auth(
     if get_analyze_mode():
         from services.sandbox_service import sandbox_place_order
 
-        analyze_results = []
         total_orders = len(basket_data["orders"])
 
         # Sort orders to prioritize BUY orders before SELL orders (same as live mode)
@@ -236,7 +235,7 @@ def process_basket_order_with_auth(
         except Exception as e:
             logger.debug(f"Multiquotes pre-fetch failed, falling back to per-order fetch: {e}")
 
-        for i, order in enumerate(sorted_orders):
+        def place_in_sandbox(i: int, order: dict[str, Any]) -> dict[str, Any]:
             # Create order data with common fields from basket order
             order_with_auth = order.copy()
             order_with_auth["apikey"] = api_key
@@ -245,14 +244,11 @@ def process_basket_order_with_auth(
             # Validate order
             is_valid, error_message = validate_order(order_with_auth)
             if not is_valid:
-                analyze_results.append(
-                    {
-                        "symbol": order.get("symbol", "Unknown"),
-                        "status": "error",
-                        "message": error_message,
-                    }
-                )
-                continue
+                return {
+                    "symbol": order.get("symbol", "Unknown"),
+                    "status": "error",
+                    "message": error_message,
+                }
 
             # Look up pre-fetched quote for this symbol
             prefetched = quote_cache.get(
@@ -266,25 +262,32 @@ def process_basket_order_with_auth(
             )
 
             if success:
-                analyze_results.append(
-                    {
-                        "symbol": order.get("symbol", "Unknown"),
-                        "exchange": order.get("exchange", ""),
-                        "product": order.get("product", ""),
-                        "status": "success",
-                        "orderid": response.get("orderid"),
-                        "batch_order": True,
-                        "is_last_order": i == total_orders - 1,
-                    }
-                )
-            else:
-                analyze_results.append(
-                    {
-                        "symbol": order.get("symbol", "Unknown"),
-                        "status": "error",
-                        "message": response.get("message", "Order placement failed"),
-                    }
-                )
+                return {
+                    "symbol": order.get("symbol", "Unknown"),
+                    "exchange": order.get("exchange", ""),
+                    "product": order.get("product", ""),
+                    "status": "success",
+                    "orderid": response.get("orderid"),
+                    "batch_order": True,
+                    "is_last_order": i == total_orders - 1,
+                }
+            return {
+                "symbol": order.get("symbol", "Unknown"),
+                "status": "error",
+                "message": response.get("message", "Order placement failed"),
+            }
+
+        # Sandbox orders reach no broker, so no rate limit; BUY legs still
+        # complete before SELL legs are placed
+        analyze_results = dispatch(
+            [
+                [partial(place_in_sandbox, i, order) for i, order in enumerate(buy_orders)],
+                [
+                    partial(place_in_sandbox, len(buy_orders) + i, order)
+                    for i, order in enumerate(sell_orders)
+                ],
+            ]
+        )
 
         response_data = {"mode": "analyze", "status": "success", "results": analyze_results}
 
@@ -332,34 +335,21 @@ def process_basket_order_with_auth(
 
     total_orders = len(sorted_orders)
 
-    # Prepare all orders with auth fields (BUY first, then SELL)
-    orders_with_auth = [
-        {**order, "apikey": api_key, "strategy": basket_data["strategy"]}
-        for order in sorted_orders
-    ]
-
-    # Place orders concurrently in batches of 10 with 1s delay between batches
-    BATCH_SIZE = 10
-    results = []
-
-    for batch_start in range(0, total_orders, BATCH_SIZE):
-        if batch_start > 0:
-            time.sleep(1.0)  # Rate limit delay between batches
-
-        batch = orders_with_auth[batch_start : batch_start + BATCH_SIZE]
-
-        with ThreadPoolExecutor(max_workers=len(batch)) as executor:
-            future_to_order = {
-                executor.submit(
-                    place_single_order, order_data, broker_module, auth_token, total_orders, batch_start + idx
-                ): order_data
-                for idx, order_data in enumerate(batch)
-            }
-
-            for future in as_completed(future_to_order):
-                result = future.result()
-                if result:
-                    results.append(result)
+    def place_live(index: int, order: dict[str, Any]):
+        order_data = {**order, "apikey": api_key, "strategy": basket_data["strategy"]}
+        return partial(
+            place_single_order, order_data, broker_module, auth_token, total_orders, index
+        )
+
+    # Place orders concurrently under the broker's rate limit, all BUY orders
+    # before the first SELL order; results come back in that order
+    results = dispatch(
+        [
+            [place_live(i, order) for i, order in enumerate(buy_orders)],
+            [place_live(len(buy_orders) + i, order) for i, order in enumerate(sell_orders)],
+        ],
+        rate_key=broker,
+    )
 
     # Log the basket order results
     response_data = {"status": "success", "results": results}
@@ -13,15 +13,13 @@ Tracks cumulative PnL across days and returns a time series + trade log.
 from collections import defaultdict
 from datetime import datetime, timedelta
 
-import pandas as pd
 import pytz
 
 from database.token_db_enhanced import fno_search_symbols
-from services.history_service import get_history
+from services.history_batch_service import fetch_history_frames, nearest_strikes
 from services.option_symbol_service import (
     construct_crypto_option_symbol,
     construct_option_symbol,
-    find_atm_strike_from_actual,
     get_available_strikes,
     get_option_exchange,
 )
@@ -31,7 +29,6 @@ from services.straddle_chart_service import (
     NO_SPOT_EXCHANGES,
     NSE_INDEX_SYMBOLS,
     _calculate_days_to_expiry,
-    _convert_timestamp_to_ist,
     _get_quote_exchange,
     resolve_underlying_quote,
 )
@@ -113,82 +110,66 @@ def get_custom_straddle_simulation(
             }, 404
 
         # Fetch underlying history
-        success_u, resp_u, _ = get_history(
-            symbol=underlying_quote_symbol, exchange=quote_exchange,
-            interval=interval, start_date=start_date_str,
-            end_date=end_date_str, api_key=api_key,
+        underlying_key = (underlying_quote_symbol, quote_exchange)
+        frames, errors = fetch_history_frames(
+            [underlying_key], interval, start_date_str, end_date_str, api_key
         )
-        if not success_u:
+        if underlying_key in errors:
             return False, {
                 "status": "error",
-                "message": f"Failed to fetch underlying history: {resp_u.get('message', 'Unknown')}",
+                "message": f"Failed to fetch underlying history: {errors[underlying_key]}",
             }, 400
 
-        df_underlying = pd.DataFrame(resp_u.get("data", []))
+        df_underlying = frames[underlying_key].dropna(subset=["close"])
         if df_underlying.empty:
             return False, {"status": "error", "message": "No underlying history data"}, 404
 
-        df_underlying = _convert_timestamp_to_ist(df_underlying)
-        if df_underlying is None:
-            return False, {"status": "error", "message": "Failed to parse timestamps"}, 500
-
         # Compute ATM per candle
-        atm_per_row = []
-        for _, row in df_underlying.iterrows():
-            atm = find_atm_strike_from_actual(float(row["close"]), available_strikes)
-            atm_per_row.append(atm)
-        df_underlying["atm_strike"] = atm_per_row
+        df_underlying["atm_strike"] = nearest_strikes(
+            df_underlying["close"].to_numpy(), available_strikes
+        )
 
-        unique_strikes = set(s for s in atm_per_row if s is not None)
+        unique_strikes = set(df_underlying["atm_strike"].dropna())
         if not unique_strikes:
             return False, {"status": "error", "message": "Could not determine ATM strikes"}, 400
 
-        # Fetch option history for all unique ATM strikes
+        # Fetch option history for all unique ATM strikes in one batch
         _build_sym = (
             construct_crypto_option_symbol
             if exchange.upper() in CRYPTO_EXCHANGES
             else construct_option_symbol
         )
-        strike_data = {}
-        for strike in sorted(unique_strikes):
-            ce_symbol = _build_sym(base_symbol, expiry_date.upper(), strike, "CE")
-            pe_symbol = _build_sym(base_symbol, expiry_date.upper(), strike, "PE")
-
-            ce_lookup, pe_lookup = {}, {}
-
-            success_ce, resp_ce, _ = get_history(
-                symbol=ce_symbol, exchange=options_exchange,
-                interval=interval, start_date=start_date_str,
-                end_date=end_date_str, api_key=api_key,
-            )
-            if success_ce:
-                df_ce = pd.DataFrame(resp_ce.get("data", []))
-                if not df_ce.empty:
-                    df_ce = _convert_timestamp_to_ist(df_ce)
-                    if df_ce is not None:
-                        for ts, row in df_ce.iterrows():
-                            ce_lookup[ts] = float(row["close"])
-
-            success_pe, resp_pe, _ = get_history(
-                symbol=pe_symbol, exchange=options_exchange,
-                interval=interval, start_date=start_date_str,
-                end_date=end_date_str, api_key=api_key,
-            )
-            if success_pe:
-                df_pe = pd.DataFrame(resp_pe.get("data", []))
-                if not df_pe.empty:
-                    df_pe = _convert_timestamp_to_ist(df_pe)
-                    if df_pe is not None:
-                        for ts, row in df_pe.iterrows():
-                            pe_lookup[ts] = float(row["close"])
-
-            strike_data[strike] = {"ce": ce_lookup, "pe": pe_lookup}
+        legs = {
+            (strike, option_type): _build_sym(base_symbol, expiry_date.upper(), strike, option_type)
+            for strike in sorted(unique_strikes)
+            for option_type in ("CE", "PE")
+        }
+        frames, _ = fetch_history_frames(
+            [(symbol, options_exchange) for symbol in legs.values()],
+            interval,
+            start_date_str,
+            end_date_str,
+            api_key,
+        )
+        strike_data = {strike: {"ce": {}, "pe": {}} for strike in unique_strikes}
+        for (strike, option_type), symbol in legs.items():
+            frame = frames.get((symbol, options_exchange))
+            if frame is not None:
+                closes = frame["close"].dropna()
+                strike_data[strike][option_type.lower()] = dict(
+                    zip(closes.index, closes.astype(float).tolist(), strict=True)
+                )
 
         # ── Simulation ──────────────────────────────────────────────
         # Group candles by trading day
         daily_candles = defaultdict(list)
-        for ts, row in df_underlying.iterrows():
-            daily_candles[ts.date()].append((ts, row))
+        for ts, close, atm in zip(
+            df_underlying.index,
+            df_underlying["close"].tolist(),
+            df_underlying["atm_strike"].tolist(),
+            strict=True,
+        ):
+            daily_candles[ts.date()].append((ts, {"close": close, "atm_strike": atm}))
 
         cumulative_realized = 0.0
         total_adjustments = 0
@@ -2,10 +2,24 @@
 """
 Flow Price Monitor Service
 Real-time price monitoring for Price Alert triggers (Flask/sync version)
-Uses polling instead of WebSocket for simplicity in Flask context
+
+Driven by the live tick feed: the monitor holds its own connection to the
+WebSocket proxy (services/websocket_client.py), subscribed in LTP mode to
+every symbol with an alert, and each tick evaluates only the alerts whose
+price level lies between the symbol's previous price and this one. Levels
+are kept per symbol in a sorted list, so a tick costs a bisect rather than
+a pass over every alert.
+
+The old poll loop remains as the fallback and for what ticks cannot do:
+every poll interval it expires watches, evaluates the moving_* conditions
+(which compare against the price one interval ago) and fetches one REST quote
+per symbol whose feed is down or has not ticked for
+FLOW_PRICE_FEED_STALE_SECONDS. Previously it fetched a quote per alert every
+5 seconds.
 """
 
 import atexit
+import bisect
 import logging
 import threading
 import time
@@ -28,6 +42,30 @@ _WORKFLOW_POOL = ThreadPoolExecutor(
     thread_name_prefix="flow-price-alert",
 )
 
+# A symbol without a tick for this long is priced by REST quote until the feed
+# catches up. Quiet contracts land here too, at one quote per poll interval.
+FEED_STALE_SECONDS = env_int("FLOW_PRICE_FEED_STALE_SECONDS", 10, minimum=1)
+# After a failed connect, wait this long before trying the proxy again. A
+# connect attempt blocks the monitor thread for up to 20s.
+FEED_RETRY_SECONDS = 60
+FEED_MODE = "LTP"
+
+# "crossing" fires within 0.1% of the target price.
+CROSSING_TOLERANCE = 0.001
+
+# Conditions relative to the previous price. Against consecutive ticks they
+# would compare prices milliseconds apart, so they keep the poll cadence.
+RELATIVE_CONDITIONS = {"moving_up", "moving_down", "moving_up_percent", "moving_down_percent"}
+
+
+def _symkey(symbol: str, exchange: str) -> str:
+    return f"{exchange}:{symbol}"
+
+
+def _feed_symbols(keys) -> list[dict]:
+    """_symkey keys as the feed's subscription entries."""
+    return [dict(zip(("exchange", "symbol"), k.split(":", 1), strict=True)) for k in keys]
+
 
 @dataclass
 class PriceAlert:
@@ -51,6 +89,67 @@ class PriceAlert:
     expiration: str = "none"
 
 
+def alert_levels(alert: PriceAlert) -> tuple[float, ...]:
+    """The prices at which an alert's condition can change.
+
+    A price move that does not pass one of these cannot change the outcome of
+    _evaluate_condition, so the tick path evaluates an alert only when a level
+    lies between the symbol's previous price and the new one. Relative and
+    unrecognized conditions have none.
+    """
+    condition = FlowPriceMonitor.normalize_condition(alert.condition)
+    target = alert.target_price
+    if condition in ("greater_than", "less_than", "crossing_up", "crossing_down"):
+        return (target,)
+    if condition == "crossing":
+        # abs(price - target) <= price * tolerance, solved for price
+        return (target / (1 + CROSSING_TOLERANCE), target / (1 - CROSSING_TOLERANCE))
+    if condition in ("entering_channel", "inside_channel", "exiting_channel", "outside_channel"):
+        return (alert.price_lower or target, alert.price_upper or target)
+    return ()
+
+
+class _SymbolIndex:
+    """One symbol's alerts by price level, plus its last price and tick time."""
+
+    __slots__ = ("levels", "fresh", "relative", "members", "last_price", "last_tick_at")
+
+    def __init__(self):
+        # Sorted (level, workflow_id) pairs
+        self.levels: list[tuple[float, int]] = []
+        # Alerts not yet evaluated against any price, whatever their levels
+        self.fresh: set[int] = set()
+        self.relative: set[int] = set()
+        self.members: dict[int, tuple[float, ...]] = {}
+        self.last_price: float | None = None
+        self.last_tick_at = 0.0
+
+    def add(self, alert: PriceAlert) -> None:
+        workflow_id = alert.workflow_id
+        levels = alert_levels(alert)
+        self.members[workflow_id] = levels
+        for level in levels:
+            bisect.insort(self.levels, (level, workflow_id))
+        if FlowPriceMonitor.normalize_condition(alert.condition) in RELATIVE_CONDITIONS:
+            self.relative.add(workflow_id)
+        self.fresh.add(workflow_id)
+
+    def remove(self, workflow_id: int) -> None:
+        for level in self.members.pop(workflow_id, ()):
+            i = bisect.bisect_left(self.levels, (level, workflow_id))
+            if i < len(self.levels) and self.levels[i] == (level, workflow_id):
+                del self.levels[i]
+        self.relative.discard(workflow_id)
+        self.fresh.discard(workflow_id)
+
+    def crossed(self, previous: float, current: float) -> set[int]:
+        """Alerts with a level in [previous, current], either way round."""
+        low, high = min(previous, current), max(previous, current)
+        start = bisect.bisect_left(self.levels, (low,))
+        end = bisect.bisect_right(self.levels, (high, float("inf")))
+        return {workflow_id for _, workflow_id in self.levels[start:end]}
+
+
 class FlowPriceMonitor:
     """
     Singleton service that monitors prices using polling
@@ -72,6 +171,15 @@ class FlowPriceMonitor:
     # thread itself, so they must not interleave. RLock because _check_alert
     # re-enters through remove_alert from inside the loop.
     _alerts_lock = threading.RLock()
+    # Per-symbol level index over _alerts, guarded by _alerts_lock. Re-arming a
+    # one-shot from _trigger_workflow marks it fresh here.
+    _index: dict[str, _SymbolIndex] = {}
+    # Tick feed state, reached from _stop_monitoring and get_status.
+    _feed = None
+    _feed_subscribed: set[str] = set()
+    _feed_retry_at = 0.0
+    _wake = threading.Event()
+    _last_poll = 0.0
 
     def __new__(cls):
         with cls._lock:
@@ -96,6 +204,12 @@ class FlowPriceMonitor:
         self._pending = set()
         self._pending_lock = threading.Lock()
         self._alerts_lock = threading.RLock()
+        self._index = {}
+        # Tick feed, connected and subscribed from the monitor thread only
+        self._feed = None
+        self._feed_subscribed = set()
+        # Wakes the monitor thread early to resubscribe after an alert change
+        self._wake = threading.Event()
         logger.info("FlowPriceMonitor initialized")
 
     # The editor and this monitor grew separate vocabularies for the same four
@@ -151,7 +265,9 @@ class FlowPriceMonitor:
         )
 
         with self._alerts_lock:
+            self._unindex(workflow_id)
             self._alerts[workflow_id] = alert
+            self._index.setdefault(_symkey(symbol, exchange), _SymbolIndex()).add(alert)
             logger.info(
                 f"Added price alert for workflow {workflow_id}: "
                 f"{symbol}@{exchange} {condition} {target_price}"
@@ -160,22 +276,41 @@ class FlowPriceMonitor:
             if not self._running:
                 self._start_monitoring()
 
+        self._wake.set()
         return True
 
     def remove_alert(self, workflow_id: int) -> bool:
         """Remove a price alert for a workflow"""
+        feed = None
         with self._alerts_lock:
             if workflow_id not in self._alerts:
                 return False
 
+            self._unindex(workflow_id)
             del self._alerts[workflow_id]
             logger.info(f"Removed price alert for workflow {workflow_id}")
 
             if not self._alerts and self._running:
-                self._stop_monitoring()
+                feed = self._stop_monitoring()
 
+        # Disconnecting waits on the feed's socket thread; not under the lock
+        self._disconnect_feed(feed)
+        self._wake.set()
         return True
 
+    def _unindex(self, workflow_id: int) -> None:
+        """Drop an alert's levels from its symbol's index. Caller holds _alerts_lock."""
+        alert = self._alerts.get(workflow_id)
+        if alert is None:
+            return
+        key = _symkey(alert.symbol, alert.exchange)
+        index = self._index.get(key)
+        if index is None:
+            return
+        index.remove(workflow_id)
+        if not index.members:
+            del self._index[key]
+
     def get_alert(self, workflow_id: int) -> PriceAlert | None:
         """Get alert for a workflow"""
         return self._alerts.get(workflow_id)
@@ -202,14 +337,20 @@ class FlowPriceMonitor:
         logger.info(f"Price monitoring started with {len(self._alerts)} alerts")
 
     def _stop_monitoring(self):
-        """Stop the price monitoring thread"""
+        """Stop the price monitoring thread.
+
+        Returns the detached tick feed, for the caller to pass to
+        _disconnect_feed once it no longer holds _alerts_lock.
+        """
         if not self._running:
-            return
+            return None
 
         # Signals only this generation. A later start creates its own event, so
         # this loop can never be un-stopped by a restart.
         self._stop_event.set()
+        self._wake.set()
         self._running = False
+        feed = self._detach_feed()
 
         # Clear only the generation this call is stopping. A concurrent
         # _start_monitoring may already have installed a newer thread here, and
@@ -225,19 +366,25 @@ class FlowPriceMonitor:
             thread.join(timeout=5)
 
         logger.info("Price monitoring stopped")
+        return feed
 
     def _monitoring_loop(self, stop_event: threading.Event | None = None):
-        """Main monitoring loop that polls prices.
+        """Main monitoring loop: feed subscriptions, then the poll-interval checks.
 
-        Watches the event it was started with, not whatever the instance
-        currently holds, so a restart cannot resurrect it.
+        Woken early by alert changes so a new symbol is subscribed at once; the
+        checks themselves still run once per poll interval. Watches the event it
+        was started with, not whatever the instance currently holds, so a
+        restart cannot resurrect it.
         """
         from utils.db_sessions import remove_all_scoped_sessions
 
         stop_event = stop_event or self._stop_event
         while not stop_event.is_set():
             try:
-                self._check_all_alerts()
+                self._sync_feed()
+                if time.monotonic() - self._last_poll >= self._poll_interval:
+                    self._last_poll = time.monotonic()
+                    self._check_all_alerts()
             except Exception as e:
                 logger.exception(f"Error in monitoring loop: {e}")
             finally:
@@ -246,22 +393,240 @@ class FlowPriceMonitor:
                 # alone they accumulate a connection per generation of this loop.
                 remove_all_scoped_sessions()
 
-            # Wait for next poll interval
-            stop_event.wait(timeout=self._poll_interval)
+            if stop_event.is_set():
+                break
+            wait = self._poll_interval - (time.monotonic() - self._last_poll)
+            self._wake.wait(timeout=max(wait, 0))
+            self._wake.clear()
 
     def _check_all_alerts(self):
-        """Check all active alerts against current prices"""
+        """The poll-interval pass: expiry, relative conditions and stale symbols.
+
+        Symbols whose feed is live are left to the tick path, apart from their
+        moving_* alerts, evaluated here against the latest tick. A stale symbol
+        is priced by one REST quote, fed through the same level index.
+        """
         with self._alerts_lock:
-            workflow_ids = list(self._alerts.keys())
+            alerts = list(self._alerts.values())
+
+        by_symbol: dict[str, list[PriceAlert]] = {}
+        for alert in alerts:
+            if alert.triggered:
+                continue
+            if self._is_expired(alert):
+                logger.info(
+                    f"Price alert for workflow {alert.workflow_id} expired after "
+                    f"{alert.expiration}; no longer watching."
+                )
+                self._remove_if_current(alert)
+                continue
+            by_symbol.setdefault(_symkey(alert.symbol, alert.exchange), []).append(alert)
+
+        for key, symbol_alerts in by_symbol.items():
+            try:
+                price = self._feed_price(key)
+                if price is None:
+                    price = self._quote_price(symbol_alerts)
+                    if price is None:
+                        continue
+                    self._on_price(key, price)
+                for alert in symbol_alerts:
+                    if self.normalize_condition(alert.condition) in RELATIVE_CONDITIONS:
+                        with self._alerts_lock:
+                            if self._alerts.get(alert.workflow_id) is alert:
+                                self._apply_price(alert, price)
+            except Exception as e:
+                logger.exception(f"Error checking price alerts for {key}: {e}")
 
-        for workflow_id in workflow_ids:
-            alert = self._alerts.get(workflow_id)
-            if alert and not alert.triggered:
+    def _remove_if_current(self, alert: PriceAlert) -> None:
+        with self._alerts_lock:
+            if self._alerts.get(alert.workflow_id) is alert:
+                self.remove_alert(alert.workflow_id)
+
+    def _feed_price(self, key: str) -> float | None:
+        """The symbol's last tick price, or None if the feed is down or stale."""
+        feed = self._feed
+        if feed is None or not getattr(feed, "connected", False):
+            return None
+        with self._alerts_lock:
+            index = self._index.get(key)
+            if index is None or not index.last_tick_at:
+                return None
+            if time.monotonic() - index.last_tick_at > FEED_STALE_SECONDS:
+                return None
+            return index.last_price
+
+    def _quote_price(self, alerts: list[PriceAlert]) -> float | None:
+        """One REST quote for a symbol, with the first alert that has an API key."""
+        alert = next((a for a in alerts if a.api_key), None)
+        if alert is None:
+            logger.warning(f"No API key for alert workflow {alerts[0].workflow_id}")
+            return None
+        result = get_flow_client(alert.api_key).get_quotes(
+            symbol=alert.symbol, exchange=alert.exchange
+        )
+        if result.get("status") != "success":
+            logger.debug(f"Failed to get quote for {alert.symbol}: {result}")
+            return None
+        data = result.get("data", {})
+        price = float(data.get("ltp", 0) if data else 0)
+        return price if price > 0 else None
+
+    def _on_price(self, key: str, price: float) -> None:
+        """Evaluate a symbol's alerts whose levels the move to ``price`` crossed.
+
+        Also evaluates alerts never checked against a price, so one registered
+        while the price already meets its condition still fires. Each crossed
+        alert is evaluated with the symbol's previous price as its last price,
+        which is what crossing_up/crossing_down compare against.
+        """
+        with self._alerts_lock:
+            index = self._index.get(key)
+            if index is None:
+                return
+            previous = index.last_price
+            index.last_price = price
+            if previous is None:
+                candidates = set(index.members)
+            else:
+                candidates = index.crossed(previous, price) | index.fresh
+            candidates -= index.relative
+
+            for workflow_id in candidates:
+                alert = self._alerts.get(workflow_id)
+                if alert is None or alert.triggered or self._is_expired(alert):
+                    continue
+                if workflow_id in index.fresh:
+                    index.fresh.discard(workflow_id)
+                else:
+                    alert.last_price = previous
                 try:
-                    self._check_alert(alert)
+                    self._apply_price(alert, price)
                 except Exception as e:
                     logger.exception(f"Error checking alert for workflow {workflow_id}: {e}")
 
+    def _on_tick(self, data: dict) -> None:
+        """market_data callback from the feed; runs on the client's event loop thread."""
+        try:
+            inner = data.get("data") or {}
+            ltp = inner.get("ltp")
+            if ltp is None:
+                ltp = inner.get("last_price")
+            symbol, exchange = data.get("symbol"), data.get("exchange")
+            if symbol is None or exchange is None or ltp is None:
+                return
+            price = float(ltp)
+        except (TypeError, ValueError):
+            return
+        if price <= 0:
+            return
+
+        key = _symkey(symbol, exchange)
+        with self._alerts_lock:
+            index = self._index.get(key)
+            if index is None:
+                return
+            index.last_tick_at = time.monotonic()
+            self._on_price(key, price)
+
+    # ------------------------------------------------------------------ tick feed
+    def _sync_feed(self) -> None:
+        """Subscribe the feed to exactly the symbols with alerts. Monitor thread only.
+
+        Subscribe and unsubscribe block for the proxy's ack, so they never run
+        under _alerts_lock or on a request thread.
+        """
+        with self._alerts_lock:
+            wanted = set(self._index)
+            api_key = next((a.api_key for a in self._alerts.values() if a.api_key), None)
+
+        if not wanted or not api_key:
+            self._close_feed()
+            return
+        if not self._ensure_feed(api_key):
+            return
+
+        feed = self._feed
+        to_add = wanted - self._feed_subscribed
+        to_remove = self._feed_subscribed - wanted
+        if to_add:
+            symbols = _feed_symbols(to_add)
+            result = feed.subscribe(symbols, mode=FEED_MODE)
+            accepted = {
+                _symkey(entry.get("symbol"), entry.get("exchange"))
+                for entry in result.get("subscriptions", []) or []
+                if entry.get("status") == "success"
+            }
+            self._feed_subscribed |= accepted & to_add
+            if result.get("status") != "success":
+                logger.warning(
+                    f"Price alert feed subscribe: {result.get('message', result.get('status'))}; "
+                    "symbols not subscribed are priced by quote"
+                )
+        if to_remove:
+            symbols = _feed_symbols(to_remove)
+            try:
+                feed.unsubscribe(symbols, mode=FEED_MODE)
+            except Exception as e:
+                logger.debug(f"Price alert feed unsubscribe failed: {e}")
+            self._feed_subscribed -= to_remove
+
+    def _ensure_feed(self, api_key: str) -> bool:
+        feed = self._feed
+        if feed is not None and getattr(feed, "connected", False) and feed.api_key == api_key:
+            return True
+        if time.monotonic() < self._feed_retry_at:
+            return False
+        self._close_feed()
+
+        # A connection of its own rather than the shared per-key client: the
+        # proxy tracks subscriptions per connection, so unsubscribing a symbol
+        # here would otherwise also cut the scalping risk monitor's ticks.
+        try:
+            from services.websocket_client import WebSocketClient
+
+            feed = WebSocketClient(api_key)
+            connected = feed.connect()
+        except Exception as e:
+            connected = False
+            logger.debug(f"Price alert feed not available: {e}")
+        if not connected:
+            self._feed_retry_at = time.monotonic() + FEED_RETRY_SECONDS
+            logger.info(
+                f"Price alerts falling back to quotes; retrying the feed in {FEED_RETRY_SECONDS}s"
+            )
+            return False
+
+        feed.register_callback("market_data", self._on_tick)
+        feed.register_callback("auth", self._on_feed_auth)
+        self._feed = feed
+        self._feed_subscribed = set()
+        logger.info("Price alerts subscribed to the live tick feed")
+        return True
+
+    def _on_feed_auth(self, data: dict) -> None:
+        # The client re-authenticates after a reconnect but does not restore
+        # subscriptions; have the monitor thread subscribe everything again.
+        if data.get("status") == "success":
+            self._feed_subscribed = set()
+            self._wake.set()
+
+    def _close_feed(self) -> None:
+        self._disconnect_feed(self._detach_feed())
+
+    def _detach_feed(self):
+        feed, self._feed = self._feed, None
+        self._feed_subscribed = set()
+        return feed
+
+    @staticmethod
+    def _disconnect_feed(feed) -> None:
+        if feed is not None:
+            try:
+                feed.disconnect()
+            except Exception:
+                pass
+
     # Windows the editor offers for "expiration". A watch past its window is
     # removed rather than left running for the life of the process.
     _EXPIRATION_WINDOWS = {
@@ -278,7 +643,7 @@ class FlowPriceMonitor:
         return datetime.now() - alert.created_at >= window
 
     def _check_alert(self, alert: PriceAlert):
-        """Check a single alert against current price"""
+        """Check a single alert against a REST quote"""
         if not alert.api_key:
             logger.warning(f"No API key for alert workflow {alert.workflow_id}")
             return
@@ -292,49 +657,42 @@ class FlowPriceMonitor:
             return
 
         try:
-            client = get_flow_client(alert.api_key)
-            result = client.get_quotes(symbol=alert.symbol, exchange=alert.exchange)
-
-            if result.get("status") != "success":
-                logger.debug(f"Failed to get quote for {alert.symbol}: {result}")
-                return
-
-            data = result.get("data", {})
-            current_price = float(data.get("ltp", 0) if data else 0)
-
-            if current_price <= 0:
+            current_price = self._quote_price([alert])
+            if current_price is None:
                 return
+            self._apply_price(alert, current_price)
+        except Exception as e:
+            logger.exception(f"Error checking price for {alert.symbol}: {e}")
 
-            condition_met = self._evaluate_condition(alert, current_price)
+    def _apply_price(self, alert: PriceAlert, current_price: float):
+        """Evaluate one alert at ``current_price`` and queue its run if it fires."""
+        condition_met = self._evaluate_condition(alert, current_price)
 
-            if condition_met and not alert.triggered:
-                # `triggered` is the one-shot latch, and _check_all_alerts skips
-                # any alert carrying it. Setting it for an every_time alert left
-                # the watch registered but permanently ignored.
-                if alert.trigger != "every_time":
-                    alert.triggered = True
-                logger.info(
-                    f"Price alert triggered for workflow {alert.workflow_id}: "
-                    f"{alert.symbol}@{alert.exchange} {alert.condition} "
-                    f"(price: {current_price}, target: {alert.target_price})"
-                )
+        if condition_met and not alert.triggered:
+            # `triggered` is the one-shot latch, and _check_all_alerts skips
+            # any alert carrying it. Setting it for an every_time alert left
+            # the watch registered but permanently ignored.
+            if alert.trigger != "every_time":
+                alert.triggered = True
+            logger.info(
+                f"Price alert triggered for workflow {alert.workflow_id}: "
+                f"{alert.symbol}@{alert.exchange} {alert.condition} "
+                f"(price: {current_price}, target: {alert.target_price})"
+            )
 
-                if alert.trigger == "every_time":
-                    # Keep watching; record the price so an edge-triggered
-                    # crossing needs a fresh cross rather than re-firing.
-                    alert.last_price = current_price
-
-                # De-registration of a one-shot alert belongs to the run it
-                # launched, not to this thread. Removing it here raced the
-                # worker and lost: submit() usually keeps the GIL, so the alert
-                # was gone before the pool thread read it and the run was
-                # dropped as "no longer registered".
-                self._trigger_workflow(alert, current_price)
-            else:
+            if alert.trigger == "every_time":
+                # Keep watching; record the price so an edge-triggered
+                # crossing needs a fresh cross rather than re-firing.
                 alert.last_price = current_price
 
-        except Exception as e:
-            logger.exception(f"Error checking price for {alert.symbol}: {e}")
+            # De-registration of a one-shot alert belongs to the run it
+            # launched, not to this thread. Removing it here raced the
+            # worker and lost: submit() usually keeps the GIL, so the alert
+            # was gone before the pool thread read it and the run was
+            # dropped as "no longer registered".
+            self._trigger_workflow(alert, current_price)
+        else:
+            alert.last_price = current_price
 
     def _evaluate_condition(self, alert: PriceAlert, current_price: float) -> bool:
         """Evaluate if the price condition is met"""
@@ -342,7 +700,7 @@ class FlowPriceMonitor:
         target = alert.target_price
         last_price = alert.last_price
 
-        tolerance = current_price * 0.001
+        tolerance = current_price * CROSSING_TOLERANCE
 
         if condition == "greater_than":
             return current_price > target
@@ -480,7 +838,7 @@ class FlowPriceMonitor:
                         # colliding with an in-flight run -- or dropped by a
                         # guard above -- was silently spent and its workflow
                         # deactivated, with the event lost for good.
-                        alert.triggered = False
+                        self._rearm(alert)
                         logger.info(
                             f"Re-arming one-shot price alert for workflow {workflow_id}: "
                             "the run did not execute."
@@ -504,13 +862,25 @@ class FlowPriceMonitor:
             # latch has to come back off, or _check_all_alerts skips this alert
             # for the rest of the process and the trigger is dead.
             if one_shot:
-                alert.triggered = False
+                self._rearm(alert)
                 logger.error(
                     f"Could not queue the price-alert run for workflow {workflow_id}; "
                     "the alert stays armed."
                 )
             raise
 
+    def _rearm(self, alert: PriceAlert) -> None:
+        """Clear the one-shot latch and have the next price re-evaluate the alert.
+
+        Marked fresh because ticks only evaluate alerts whose level they cross,
+        and a re-armed alert whose condition still holds must fire again.
+        """
+        with self._alerts_lock:
+            alert.triggered = False
+            index = self._index.get(_symkey(alert.symbol, alert.exchange))
+            if index is not None and alert.workflow_id in index.members:
+                index.fresh.add(alert.workflow_id)
+
     def _retire_one_shot(self, alert: PriceAlert) -> None:
         """Consume a one-shot alert: drop the watch and clear the active flag.
 
@@ -565,10 +935,13 @@ class FlowPriceMonitor:
 
     def get_status(self) -> dict[str, Any]:
         """Get current monitor status"""
+        feed = self._feed
         return {
             "running": self._running,
             "alerts_count": len(self._alerts),
             "poll_interval": self._poll_interval,
+            "feed_connected": bool(feed is not None and getattr(feed, "connected", False)),
+            "feed_symbols": len(self._feed_subscribed),
             "alerts": [
                 {
                     "workflow_id": alert.workflow_id,
@@ -576,13 +949,21 @@ class FlowPriceMonitor:
                     "exchange": alert.exchange,
                     "condition": alert.condition,
                     "target_price": alert.target_price,
-                    "last_price": alert.last_price,
+                    "last_price": self._latest_price(alert),
                     "triggered": alert.triggered,
                 }
-                for alert in self._alerts.values()
+                for alert in list(self._alerts.values())
             ],
         }
 
+    def _latest_price(self, alert: PriceAlert) -> float | None:
+        # An alert's own last_price only moves when a tick crosses one of its
+        # levels; the symbol's index has the latest price seen.
+        index = self._index.get(_symkey(alert.symbol, alert.exchange))
+        if index is not None and index.last_price is not None:
+            return index.last_price
+        return alert.last_price
+
     def shutdown(self):
         """Stop polling and release the worker pool.
 
@@ -598,7 +979,7 @@ class FlowPriceMonitor:
             return
         self._shutdown_done = True
 
-        self._stop_monitoring()
+        self._disconnect_feed(self._stop_monitoring())
         with self._alerts_lock:
             self._alerts.clear()
         # Let an in-flight workflow finish rather than killing it mid-order; the
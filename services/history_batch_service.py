@@ -0,0 +1,242 @@
+"""
+History Batch Service
+
+Candle history for many symbols at once, for the option tools that chart a
+whole set of contracts: the straddle and custom straddle charts (CE and PE of
+every strike the ATM moved through), the IV chart and Multi Strike OI.
+
+Those services called get_history once per contract, one after another, and
+then walked each response with iterrows to build per-timestamp lookups. A
+5-day 1m straddle chart crossing 20 strikes is 40 round trips in a row.
+fetch_history_frames instead:
+
+- deduplicates the (symbol, exchange) keys;
+- serves a key from Historify (DuckDB) when it already holds candles for
+  every trading session of the window, through the close of the last one;
+- fetches the rest concurrently, HISTORY_BATCH_WORKERS at a time. Every broker
+  call still goes through get_history and its ~3 per second limiter, so the
+  rate the broker sees is unchanged; what the batch saves is the latency of
+  each call, which now overlaps with the next call's wait;
+- returns each symbol as a DataFrame on an IST DatetimeIndex with float
+  close/oi columns, deduplicated by timestamp, so callers align contracts
+  with joins instead of dict lookups.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from services.history_service import get_history
+from services.strategy_chart_service import _convert_timestamp_to_ist
+from utils.logging import get_logger
+from utils.order_dispatcher import dispatch
+
+logger = get_logger(__name__)
+
+IST = pytz.timezone("Asia/Kolkata")
+
+HISTORY_BATCH_WORKERS = max(1, int(os.getenv("HISTORY_BATCH_WORKERS", "4")))
+HISTORY_BATCH_USE_HISTORIFY = os.getenv("HISTORY_BATCH_USE_HISTORIFY", "true").lower() == "true"
+
+HistoryKey = tuple[str, str]
+
+
+def _session_exchange(exchange: str) -> str:
+    """Exchange whose calendar an instrument trades on (NSE_INDEX -> NSE)."""
+    exchange = exchange.upper()
+    return exchange[: -len("_INDEX")] if exchange.endswith("_INDEX") else exchange
+
+
+def _sessions(exchange: str, start_date: str, end_date: str) -> list[tuple[date, int]]:
+    """(date, session end epoch ms) for every day of the window the exchange trades."""
+    from database.market_calendar_db import get_effective_session_window
+
+    day = datetime.strptime(start_date, "%Y-%m-%d").date()
+    last = datetime.strptime(end_date, "%Y-%m-%d").date()
+    sessions = []
+    while day <= last:
+        window = get_effective_session_window(day, _session_exchange(exchange))
+        if window:
+            sessions.append((day, int(window["end_ms"])))
+        day += timedelta(days=1)
+    return sessions
+
+
+def _storage_interval(interval: str) -> str:
+    """The stored Historify interval ``interval`` is served from.
+
+    5m/15m/... are aggregated from stored 1m candles, W/M/... from D.
+    """
+    from database.historify_db import is_daily_aggregated_interval
+
+    return "D" if interval == "D" or is_daily_aggregated_interval(interval) else "1m"
+
+
+def _historify_covers(
+    symbol: str, exchange: str, interval: str, sessions: list[tuple[date, int]]
+) -> bool:
+    """Whether Historify's catalog spans every session in ``sessions``.
+
+    The first candle must be on or before the first session's date and the
+    last candle within one stored interval of the last session's close, so a
+    day downloaded mid-session does not count. A window whose last session is
+    still trading always goes to the broker: Historify is only as fresh as its
+    last download. Gaps inside the span are caught by _frame_covers.
+    """
+    from database.historify_db import get_data_range
+
+    if not sessions or sessions[-1][1] > datetime.now(IST).timestamp() * 1000:
+        return False
+
+    storage = _storage_interval(interval)
+    catalog = get_data_range(symbol, exchange, storage)
+    if not catalog or not catalog.get("record_count"):
+        return False
+
+    step_ms = (86400 if storage == "D" else 60) * 1000
+    first = datetime.fromtimestamp(catalog["first_timestamp"], IST).date()
+    return (
+        first <= sessions[0][0]
+        and catalog["last_timestamp"] * 1000 >= sessions[-1][1] - step_ms
+    )
+
+
+def _frame_covers(frame: pd.DataFrame, interval: str, sessions: list[tuple[date, int]]) -> bool:
+    """Whether a Historify frame has candles on every session date.
+
+    W/M/... candles are dated by period, not by session, so for those the
+    catalog check stands and the frame only has to be non-empty.
+    """
+    if frame.empty:
+        return False
+    if _storage_interval(interval) == "D" and interval != "D":
+        return True
+    return {day for day, _ in sessions} <= set(frame.index.date)
+
+
+def history_frame(records: list[dict[str, Any]]) -> pd.DataFrame | None:
+    """A history response's records as an IST-indexed frame, or None if unparseable.
+
+    close and oi are float (oi 0 where the broker sends none); a repeated
+    timestamp keeps its last candle.
+    """
+    df = pd.DataFrame(records)
+    if df.empty:
+        return pd.DataFrame(columns=["close", "oi"], index=pd.DatetimeIndex([], tz=IST))
+    df = _convert_timestamp_to_ist(df)
+    if df is None:
+        return None
+    if "close" not in df.columns:
+        logger.warning("No close field found in history data")
+        return None
+    df["close"] = pd.to_numeric(df["close"], errors="coerce")
+    df["oi"] = pd.to_numeric(df["oi"], errors="coerce").fillna(0.0) if "oi" in df else 0.0
+    return df[~df.index.duplicated(keep="last")]
+
+
+def fetch_history_frames(
+    keys: list[HistoryKey],
+    interval: str,
+    start_date: str,
+    end_date: str,
+    api_key: str,
+    max_workers: int | None = None,
+) -> tuple[dict[HistoryKey, pd.DataFrame], dict[HistoryKey, str]]:
+    """
+    Fetch history for every (symbol, exchange) key over one window.
+
+    Args:
+        keys: (symbol, exchange) pairs; repeats are fetched once
+        interval: Candle interval (e.g., "1m", "5m", "D")
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+        api_key: OpenAlgo API key
+        max_workers: Most broker requests in flight at once; defaults to
+            HISTORY_BATCH_WORKERS
+
+    Returns:
+        Tuple of (frames, errors). frames maps each key that was fetched to
+        its frame (see history_frame), empty when the broker has no candles
+        in the window; errors maps each key that failed to the message.
+    """
+    unique = list(dict.fromkeys(keys))
+    frames: dict[HistoryKey, pd.DataFrame] = {}
+    errors: dict[HistoryKey, str] = {}
+
+    def fetch(key: HistoryKey, source: str) -> tuple[bool, dict[str, Any]]:
+        symbol, exchange = key
+        success, response, _ = get_history(
+            symbol=symbol,
+            exchange=exchange,
+            interval=interval,
+            start_date=start_date,
+            end_date=end_date,
+            api_key=api_key,
+            source=source,
+        )
+        return success, response
+
+    def collect(key: HistoryKey, success: bool, response: dict[str, Any]) -> None:
+        if not success:
+            errors[key] = response.get("message", "Unknown error")
+            return
+        frame = history_frame(response.get("data", []))
+        if frame is None:
+            errors[key] = "Failed to parse history timestamps"
+        else:
+            frames[key] = frame
+
+    pending = unique
+    if HISTORY_BATCH_USE_HISTORIFY:
+        pending = []
+        sessions: dict[str, list[tuple[date, int]]] = {}
+        for key in unique:
+            frame = None
+            try:
+                exchange = _session_exchange(key[1])
+                if exchange not in sessions:
+                    sessions[exchange] = _sessions(exchange, start_date, end_date)
+                if _historify_covers(key[0], key[1], interval, sessions[exchange]):
+                    success, response = fetch(key, "db")
+                    if success:
+                        frame = history_frame(response.get("data", []))
+            except Exception as e:
+                logger.debug(f"Historify lookup failed for {key}: {e}")
+            # Anything short of every session goes to the broker instead
+            if frame is not None and _frame_covers(frame, interval, sessions[exchange]):
+                frames[key] = frame
+            else:
+                pending.append(key)
+
+    if pending:
+        results = dispatch(
+            [[lambda key=key: fetch(key, "api") for key in pending]],
+            max_workers=max_workers or HISTORY_BATCH_WORKERS,
+        )
+        for key, (success, response) in zip(pending, results, strict=True):
+            collect(key, success, response)
+
+    logger.debug(
+        f"History batch {interval} {start_date}..{end_date}: {len(unique)} symbols, "
+        f"{len(unique) - len(pending)} from Historify, {len(errors)} failed"
+    )
+    return frames, errors
+
+
+def nearest_strikes(prices: np.ndarray, strikes: list) -> list:
+    """The strike closest to each price, as find_atm_strike_from_actual picks it.
+
+    Ties go to the lower strike; a NaN price gets None. Vectorized with
+    searchsorted over the sorted strikes.
+    """
+    ordered = sorted(strikes)
+    values = np.asarray(ordered, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    right = np.clip(np.searchsorted(values, prices), 0, len(values) - 1)
+    left = np.clip(right - 1, 0, None)
+    pick = np.where(np.abs(prices - values[left]) <= np.abs(values[right] - prices), left, right)
+    return [None if np.isnan(p) else ordered[i] for p, i in zip(prices, pick, strict=True)]
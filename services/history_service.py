@@ -1,4 +1,5 @@
 import importlib
+import threading
 import time
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -16,16 +17,23 @@ logger = get_logger(__name__)
 # Uses minimum interval between calls to prevent burst requests
 _last_history_call: float = 0.0
 _MIN_HISTORY_INTERVAL = 0.35  # 350ms between calls (~3 req/sec, evenly spaced)
+_history_rate_lock = threading.Lock()
 
 
 def _enforce_rate_limit():
-    """Block until enough time has passed since the last request (~3 per second)."""
+    """Block until this request's slot comes up (~3 per second).
+
+    Each caller reserves the next free slot under the lock and sleeps outside
+    it, so concurrent callers (see services/history_batch_service.py) queue up
+    350ms apart instead of all passing the check at once.
+    """
     global _last_history_call
-    now = time.monotonic()
-    elapsed = now - _last_history_call
-    if elapsed < _MIN_HISTORY_INTERVAL:
-        time.sleep(_MIN_HISTORY_INTERVAL - elapsed)
-    _last_history_call = time.monotonic()
+    with _history_rate_lock:
+        slot = max(time.monotonic(), _last_history_call + _MIN_HISTORY_INTERVAL)
+        _last_history_call = slot
+    delay = slot - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
 
 
 def validate_symbol_exchange(symbol: str, exchange: str) -> tuple[bool, str | None]:
@@ -8,11 +8,10 @@ candle's close price. Returns IV time series suitable for charting.
 
 from datetime import datetime, timedelta
 
-import pandas as pd
 import pytz
 
 from database.token_db_enhanced import fno_search_symbols
-from services.history_service import get_history
+from services.history_batch_service import fetch_history_frames
 from services.option_greeks_service import (
     DEFAULT_INTEREST_RATES,
     parse_option_symbol,
@@ -97,43 +96,6 @@ def _get_quote_exchange(base_symbol, underlying_exchange):
     return underlying_exchange.upper()
 
 
-def _convert_timestamp_to_ist(df):
-    """
-    Convert timestamp column in a history DataFrame to IST datetime index.
-    Returns the dataframe with 'datetime' index in IST, or None on failure.
-    """
-    ist = pytz.timezone("Asia/Kolkata")
-
-    try:
-        if "timestamp" not in df.columns:
-            logger.warning("No timestamp field found in history data")
-            return None
-
-        # Try as Unix timestamp (seconds)
-        try:
-            df["datetime"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
-            df["datetime"] = df["datetime"].dt.tz_convert(ist)
-        except Exception:
-            # Try as milliseconds
-            try:
-                df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-                df["datetime"] = df["datetime"].dt.tz_convert(ist)
-            except Exception:
-                # Try as string datetime
-                df["datetime"] = pd.to_datetime(df["timestamp"])
-                if df["datetime"].dt.tz is None:
-                    df["datetime"] = df["datetime"].dt.tz_localize("UTC").dt.tz_convert(ist)
-                else:
-                    df["datetime"] = df["datetime"].dt.tz_convert(ist)
-
-        df.set_index("datetime", inplace=True)
-        df = df.sort_index()
-        return df
-    except Exception as e:
-        logger.warning(f"Error converting timestamps: {e}")
-        return None
-
-
 def get_iv_chart_data(
     underlying,
     exchange,
@@ -255,95 +217,68 @@ def get_iv_chart_data(
         interest_rate_decimal = interest_rate_pct / 100.0
 
         # Step 6: Fetch intraday history for underlying and both option symbols
-        # Underlying history - use the underlying exchange for index symbols
-        underlying_history_exchange = quote_exchange
-        # For index symbols like NIFTY on NSE_INDEX, the history service needs the right exchange
-        success_u, resp_u, _ = get_history(
-            symbol=underlying_quote_symbol,
-            exchange=underlying_history_exchange,
-            interval=interval,
-            start_date=start_date_str,
-            end_date=end_date_str,
-            api_key=api_key,
-        )
-
-        success_ce, resp_ce, _ = get_history(
-            symbol=ce_symbol,
-            exchange=options_exchange,
-            interval=interval,
-            start_date=start_date_str,
-            end_date=end_date_str,
-            api_key=api_key,
-        )
-
-        success_pe, resp_pe, _ = get_history(
-            symbol=pe_symbol,
-            exchange=options_exchange,
-            interval=interval,
-            start_date=start_date_str,
-            end_date=end_date_str,
-            api_key=api_key,
+        # in one batch. Underlying history uses the quote exchange, so index
+        # symbols like NIFTY are fetched from NSE_INDEX.
+        underlying_key = (underlying_quote_symbol, quote_exchange)
+        ce_key = (ce_symbol, options_exchange)
+        pe_key = (pe_symbol, options_exchange)
+        frames, errors = fetch_history_frames(
+            [underlying_key, ce_key, pe_key],
+            interval,
+            start_date_str,
+            end_date_str,
+            api_key,
         )
 
-        if not success_u:
+        if underlying_key in errors:
             return (
                 False,
-                {"status": "error", "message": f"Failed to fetch underlying history: {resp_u.get('message', 'Unknown error')}"},
+                {"status": "error", "message": f"Failed to fetch underlying history: {errors[underlying_key]}"},
                 400,
             )
 
-        # Step 7: Convert to DataFrames and align timestamps
-        df_underlying = pd.DataFrame(resp_u.get("data", []))
-        df_ce = pd.DataFrame(resp_ce.get("data", [])) if success_ce else pd.DataFrame()
-        df_pe = pd.DataFrame(resp_pe.get("data", [])) if success_pe else pd.DataFrame()
-
+        # Step 7: Take the frames, already on an IST index
+        df_underlying = frames[underlying_key]
         if df_underlying.empty:
             return False, {"status": "error", "message": "No underlying history data available for today"}, 404
 
-        # Convert timestamps to IST
-        df_underlying = _convert_timestamp_to_ist(df_underlying)
-        if df_underlying is None:
-            return False, {"status": "error", "message": "Failed to parse underlying timestamps"}, 500
-
         series_results = []
 
         # Step 8: Calculate IV for CE
-        if not df_ce.empty:
-            df_ce = _convert_timestamp_to_ist(df_ce)
-            if df_ce is not None:
-                ce_iv_data = _calculate_iv_series(
-                    df_option=df_ce,
-                    df_underlying=df_underlying,
-                    strike=strike,
-                    expiry_dt=expiry_dt,
-                    flag="c",
-                    interest_rate=interest_rate_decimal,
-                )
-                series_results.append({
-                    "symbol": ce_symbol,
-                    "option_type": "CE",
-                    "strike": strike,
-                    "iv_data": ce_iv_data,
-                })
+        df_ce = frames.get(ce_key)
+        if df_ce is not None and not df_ce.empty:
+            ce_iv_data = _calculate_iv_series(
+                df_option=df_ce,
+                df_underlying=df_underlying,
+                strike=strike,
+                expiry_dt=expiry_dt,
+                flag="c",
+                interest_rate=interest_rate_decimal,
+            )
+            series_results.append({
+                "symbol": ce_symbol,
+                "option_type": "CE",
+                "strike": strike,
+                "iv_data": ce_iv_data,
+            })
 
         # Step 9: Calculate IV for PE
-        if not df_pe.empty:
-            df_pe = _convert_timestamp_to_ist(df_pe)
-            if df_pe is not None:
-                pe_iv_data = _calculate_iv_series(
-                    df_option=df_pe,
-                    df_underlying=df_underlying,
-                    strike=strike,
-                    expiry_dt=expiry_dt,
-                    flag="p",
-                    interest_rate=interest_rate_decimal,
-                )
-                series_results.append({
-                    "symbol": pe_symbol,
-                    "option_type": "PE",
-                    "strike": strike,
-                    "iv_data": pe_iv_data,
-                })
+        df_pe = frames.get(pe_key)
+        if df_pe is not None and not df_pe.empty:
+            pe_iv_data = _calculate_iv_series(
+                df_option=df_pe,
+                df_underlying=df_underlying,
+                strike=strike,
+                expiry_dt=expiry_dt,
+                flag="p",
+                interest_rate=interest_rate_decimal,
+            )
+            series_results.append({
+                "symbol": pe_symbol,
+                "option_type": "PE",
+                "strike": strike,
+                "iv_data": pe_iv_data,
+            })
 
         if not series_results:
             return (
@@ -416,11 +351,16 @@ def _calculate_iv_series(df_option, df_underlying, strike, expiry_dt, flag, inte
     iv_data = []
 
     # Align on common timestamps using inner join
-    common_index = df_option.index.intersection(df_underlying.index)
+    aligned = df_option[["close"]].join(
+        df_underlying[["close"]], how="inner", lsuffix="_option", rsuffix="_underlying"
+    )
 
-    for ts in common_index:
-        option_close = float(df_option.loc[ts, "close"])
-        underlying_close = float(df_underlying.loc[ts, "close"])
+    for ts, option_close, underlying_close in zip(
+        aligned.index,
+        aligned["close_option"].astype(float).tolist(),
+        aligned["close_underlying"].astype(float).tolist(),
+        strict=True,
+    ):
 
         # Calculate time to expiry from this candle's timestamp
         # Remove timezone info for comparison with naive expiry_dt
@@ -13,8 +13,11 @@ Features:
 - Priority subscriber system (critical vs display)
 - Auto-reconnection awareness
 - Health status API
+- Sharded, copy-on-write tick cache: writers on different symbols never
+  contend and readers (get_ltp, get_multiple_ltps, ...) never take a lock
 """
 
+import sys
 import threading
 import time
 from collections import defaultdict
@@ -24,6 +27,7 @@ from datetime import datetime
 from enum import IntEnum
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+from services.tick_history import TickHistoryStore
 from utils.logging import get_logger
 
 # Initialize logger
@@ -92,12 +96,13 @@ class MarketDataValidator:
         self.last_known_prices: dict[str, float] = {}
         self.lock = threading.Lock()
 
-    def validate(self, data: dict[str, Any]) -> ValidationResult:
+    def validate(self, data: dict[str, Any], symbol_key: str | None = None) -> ValidationResult:
         """
         Validate incoming market data
 
         Args:
             data: Market data dictionary
+            symbol_key: Precomputed "EXCHANGE:SYMBOL" key (optional)
 
         Returns:
             ValidationResult with validation status
@@ -157,18 +162,20 @@ class MarketDataValidator:
                 if data_age > self.MAX_DATA_AGE_SECONDS:
                     warnings.append(f"Data is {data_age:.1f} seconds old")
 
-        # Circuit breaker check - large price changes
-        symbol_key = f"{exchange}:{symbol}"
-        with self.lock:
-            if symbol_key in self.last_known_prices:
-                last_price = self.last_known_prices[symbol_key]
-                if last_price > 0:
-                    change_percent = abs((ltp - last_price) / last_price) * 100
-                    if change_percent > self.MAX_PRICE_CHANGE_PERCENT:
-                        warnings.append(f"Large price change: {change_percent:.2f}%")
+        # Circuit breaker check - large price changes. Lock-free: a single
+        # dict get/set is atomic, and a race between two writers of the same
+        # symbol can at worst skip one advisory warning, so every ingest
+        # thread is not serialised on a global lock for it.
+        if symbol_key is None:
+            symbol_key = f"{exchange}:{symbol}"
+        last_price = self.last_known_prices.get(symbol_key)
+        if last_price and last_price > 0:
+            change_percent = abs((ltp - last_price) / last_price) * 100
+            if change_percent > self.MAX_PRICE_CHANGE_PERCENT:
+                warnings.append(f"Large price change: {change_percent:.2f}%")
 
-            # Update last known price
-            self.last_known_prices[symbol_key] = ltp
+        # Update last known price
+        self.last_known_prices[symbol_key] = ltp
 
         return ValidationResult(valid=True, warnings=warnings)
 
@@ -209,11 +216,16 @@ class ConnectionHealthMonitor:
 
     def record_data_received(self):
         """Record that data was received"""
+        # Called once per tick from every ingest thread: the timestamp store is
+        # atomic, so the lock is only taken on the rare STALE -> live transition.
+        self.last_data_timestamp = time.time()
+        if self.connection_status != ConnectionStatus.STALE:
+            return
+
         # Snapshot callback under the lock, invoke outside to avoid self-deadlock
         # if a callback ever calls back into this monitor (see issue #1274).
         callback = None
         with self.lock:
-            self.last_data_timestamp = time.time()
             if self.connection_status == ConnectionStatus.STALE:
                 self.connection_status = ConnectionStatus.AUTHENTICATED
                 callback = self.on_connection_restored
@@ -306,6 +318,28 @@ class ConnectionHealthMonitor:
         self._running = False
 
 
+class _CacheShard:
+    """One lock-protected partition of the market data cache.
+
+    The lock only serialises writers. Every tick replaces the entry's
+    "ltp"/"quote"/"depth" dict with a freshly built one instead of mutating
+    it, and single dict get/set operations are atomic, so readers look
+    entries up without locking and never see a half-written record.
+    """
+
+    __slots__ = ("lock", "entries", "updates")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.updates = 0
+
+
+# Number of cache shards (power of two). Writers only serialise with writers
+# of symbols hashing to the same shard.
+MARKET_DATA_CACHE_SHARDS = 16
+
+
 class MarketDataService:
     """
     Enhanced singleton service for managing market data across the application.
@@ -333,10 +367,19 @@ class MarketDataService:
             return
 
         self._initialized = True
+        # Guards the subscriber registries and user access tracking. The tick
+        # cache has its own per-shard locks and is read without locking.
         self.data_lock = threading.Lock()
 
-        # Market data cache structure
-        self.market_data_cache: dict[str, dict[str, Any]] = {}
+        # Market data cache: "EXCHANGE:SYMBOL" -> entry dict, sharded by key
+        self._shards = tuple(_CacheShard() for _ in range(MARKET_DATA_CACHE_SHARDS))
+        self._shard_mask = MARKET_DATA_CACHE_SHARDS - 1
+        # exchange -> symbol -> interned "EXCHANGE:SYMBOL" key, so the hot path
+        # never formats a key string for a symbol it has seen before
+        self._symbol_keys: dict[str, dict[str, str]] = {}
+
+        # Last N ticks per symbol for window queries (bounded, see tick_history)
+        self.tick_history = TickHistoryStore()
 
         # Enhanced subscriber system with priorities
         # {priority: {subscriber_id: {callback, filter, name}}}
@@ -346,6 +389,11 @@ class MarketDataService:
         # Legacy subscribers (for backward compatibility)
         self.subscribers = defaultdict(dict)
 
+        # Copy-on-write snapshots of the registries above, rebuilt under
+        # data_lock on (un)subscribe and read lock-free by the broadcast path.
+        self._priority_snapshot: tuple[dict, ...] = ()
+        self._legacy_snapshot: dict[str, tuple[dict, ...]] = {}
+
         # User-specific data tracking
         self.user_access_tracking = defaultdict(dict)
 
@@ -360,7 +408,6 @@ class MarketDataService:
 
         # Metrics
         self.metrics = {
-            "total_updates": 0,
             "cache_hits": 0,
             "cache_misses": 0,
             "validation_errors": 0,
@@ -390,8 +437,12 @@ class MarketDataService:
             bool: True if data was processed successfully
         """
         try:
+            symbol = data.get("symbol")
+            exchange = data.get("exchange")
+            symbol_key = self._symbol_key(symbol, exchange) if symbol and exchange else None
+
             # Validate data
-            validation_result = self.validator.validate(data)
+            validation_result = self.validator.validate(data, symbol_key)
 
             if not validation_result.valid:
                 self.metrics["validation_errors"] += 1
@@ -406,87 +457,89 @@ class MarketDataService:
             self.health_monitor.record_data_received()
 
             # Extract data
-            symbol = data.get("symbol")
-            exchange = data.get("exchange")
             mode = data.get("mode")
             market_data = data.get("data", {})
 
-            if not symbol or not exchange:
+            if not symbol_key:
                 return False
 
-            symbol_key = f"{exchange}:{symbol}"
             timestamp = int(time.time())
+            tick_timestamp = market_data.get("timestamp", timestamp)
+
+            # Build the new records before taking the shard lock
+            ltp = quote = depth = None
+            if mode == 1:  # LTP
+                ltp = {
+                    "value": market_data.get("ltp", 0),
+                    "timestamp": tick_timestamp,
+                    "volume": market_data.get("volume", 0),
+                }
+            elif mode == 2:  # Quote
+                quote = {
+                    "open": market_data.get("open", 0),
+                    "high": market_data.get("high", 0),
+                    "low": market_data.get("low", 0),
+                    "close": market_data.get("close", 0),
+                    "ltp": market_data.get("ltp", 0),
+                    "volume": market_data.get("volume", 0),
+                    "change": market_data.get("change", 0),
+                    "change_percent": market_data.get("change_percent", 0),
+                    "timestamp": tick_timestamp,
+                }
+                # Also update LTP from quote
+                ltp = {
+                    "value": market_data.get("ltp", 0),
+                    "timestamp": tick_timestamp,
+                    "volume": market_data.get("volume", 0),
+                }
+            elif mode == 3:  # Depth
+                depth_obj = market_data.get("depth") or {}
+                depth_buy = depth_obj.get("buy", []) if isinstance(depth_obj, dict) else []
+                depth_sell = depth_obj.get("sell", []) if isinstance(depth_obj, dict) else []
+                bids = market_data.get("bids", [])
+                asks = market_data.get("asks", [])
+
+                # Normalise broker payloads:
+                # - Standard format: depth.buy/depth.sell
+                # - Delta format: bids/asks
+                depth = {
+                    "buy": depth_buy or bids,
+                    "sell": depth_sell or asks,
+                    "ltp": market_data.get("ltp", 0),
+                    "timestamp": tick_timestamp,
+                }
+                # Depth packets carry valid LTP — mirror it into the ltp record
+                # so get_ltp()/get_ltp_value() consumers see fresh prices when a
+                # symbol is pooled in depth mode (issue #1453). Skip zero/None to
+                # preserve a previously-valid LTP when the depth-only validator
+                # path admits a packet without ltp.
+                depth_ltp = market_data.get("ltp")
+                if isinstance(depth_ltp, (int, float)) and depth_ltp > 0:
+                    ltp = {
+                        "value": depth_ltp,
+                        "timestamp": tick_timestamp,
+                        "volume": market_data.get("volume", 0),
+                    }
 
-            with self.data_lock:
-                # Initialize cache entry if needed
-                if symbol_key not in self.market_data_cache:
-                    self.market_data_cache[symbol_key] = {
+            shard = self._shards[hash(symbol_key) & self._shard_mask]
+            with shard.lock:
+                cache_entry = shard.entries.get(symbol_key)
+                if cache_entry is None:
+                    cache_entry = shard.entries[symbol_key] = {
                         "symbol": symbol,
                         "exchange": exchange,
                         "last_update": timestamp,
                     }
-
-                cache_entry = self.market_data_cache[symbol_key]
-
-                # Update based on mode
-                if mode == 1:  # LTP
-                    cache_entry["ltp"] = {
-                        "value": market_data.get("ltp", 0),
-                        "timestamp": market_data.get("timestamp", timestamp),
-                        "volume": market_data.get("volume", 0),
-                    }
-                elif mode == 2:  # Quote
-                    cache_entry["quote"] = {
-                        "open": market_data.get("open", 0),
-                        "high": market_data.get("high", 0),
-                        "low": market_data.get("low", 0),
-                        "close": market_data.get("close", 0),
-                        "ltp": market_data.get("ltp", 0),
-                        "volume": market_data.get("volume", 0),
-                        "change": market_data.get("change", 0),
-                        "change_percent": market_data.get("change_percent", 0),
-                        "timestamp": market_data.get("timestamp", timestamp),
-                    }
-                    # Also update LTP from quote
-                    cache_entry["ltp"] = {
-                        "value": market_data.get("ltp", 0),
-                        "timestamp": market_data.get("timestamp", timestamp),
-                        "volume": market_data.get("volume", 0),
-                    }
-                elif mode == 3:  # Depth
-                    depth_obj = market_data.get("depth") or {}
-                    depth_buy = depth_obj.get("buy", []) if isinstance(depth_obj, dict) else []
-                    depth_sell = depth_obj.get("sell", []) if isinstance(depth_obj, dict) else []
-                    bids = market_data.get("bids", [])
-                    asks = market_data.get("asks", [])
-
-                    # Normalise broker payloads:
-                    # - Standard format: depth.buy/depth.sell
-                    # - Delta format: bids/asks
-                    buy_levels = depth_buy or bids
-                    sell_levels = depth_sell or asks
-
-                    cache_entry["depth"] = {
-                        "buy": buy_levels,
-                        "sell": sell_levels,
-                        "ltp": market_data.get("ltp", 0),
-                        "timestamp": market_data.get("timestamp", timestamp),
-                    }
-                    # Depth packets carry valid LTP — mirror it into cache_entry["ltp"]
-                    # so get_ltp()/get_ltp_value() consumers see fresh prices when a
-                    # symbol is pooled in depth mode (issue #1453). Skip zero/None to
-                    # preserve a previously-valid LTP when the depth-only validator
-                    # path admits a packet without ltp.
-                    depth_ltp = market_data.get("ltp")
-                    if isinstance(depth_ltp, (int, float)) and depth_ltp > 0:
-                        cache_entry["ltp"] = {
-                            "value": depth_ltp,
-                            "timestamp": market_data.get("timestamp", timestamp),
-                            "volume": market_data.get("volume", 0),
-                        }
-
+                if quote is not None:
+                    cache_entry["quote"] = quote
+                if depth is not None:
+                    cache_entry["depth"] = depth
+                if ltp is not None:
+                    cache_entry["ltp"] = ltp
                 cache_entry["last_update"] = timestamp
-                self.metrics["total_updates"] += 1
+                shard.updates += 1
+
+            self.tick_history.record(symbol_key, mode, market_data)
 
             # Broadcast to subscribers by priority (critical first)
             self._broadcast_update_priority(symbol_key, mode, data)
@@ -500,6 +553,48 @@ class MarketDataService:
             logger.exception(f"Error processing market data: {e}")
             return False
 
+    def _symbol_key(self, symbol: str, exchange: str) -> str:
+        """Interned "EXCHANGE:SYMBOL" key; formatted once per symbol."""
+        by_symbol = self._symbol_keys.get(exchange)
+        if by_symbol is None:
+            by_symbol = self._symbol_keys.setdefault(exchange, {})
+        key = by_symbol.get(symbol)
+        if key is None:
+            key = by_symbol.setdefault(symbol, sys.intern(f"{exchange}:{symbol}"))
+        return key
+
+    def _get_entry(self, symbol: str, exchange: str) -> dict[str, Any] | None:
+        """Lock-free lookup of a symbol's cache slot."""
+        # Readers don't grow the key cache for symbols that never ticked
+        symbol_key = self._symbol_keys.get(exchange, {}).get(symbol) or f"{exchange}:{symbol}"
+        return self._shards[hash(symbol_key) & self._shard_mask].entries.get(symbol_key)
+
+    @property
+    def market_data_cache(self) -> dict[str, dict[str, Any]]:
+        """Read-only snapshot of every shard, for inspection and tests.
+
+        A new dict is built on each access, so writing to it does not reach
+        the cache. The entries are the live slots: treat them as read-only.
+        """
+        return {key: entry for shard in self._shards for key, entry in list(shard.entries.items())}
+
+    def _cache_size(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def _total_updates(self) -> int:
+        return sum(shard.updates for shard in self._shards)
+
+    def _rebuild_subscriber_snapshots(self) -> None:
+        """Rebuild the lock-free broadcast snapshots. Caller holds data_lock."""
+        self._priority_snapshot = tuple(
+            subscriber
+            for priority in sorted(self.priority_subscribers.keys())
+            for subscriber in self.priority_subscribers[priority].values()
+        )
+        self._legacy_snapshot = {
+            event_type: tuple(subs.values()) for event_type, subs in self.subscribers.items()
+        }
+
     def subscribe_with_priority(
         self,
         priority: SubscriberPriority,
@@ -532,6 +627,7 @@ class MarketDataService:
                 "name": name or f"subscriber_{subscriber_id}",
                 "created_at": time.time(),
             }
+            self._rebuild_subscriber_snapshots()
 
         logger.debug(
             f"Added priority subscriber {subscriber_id} ({name}) - priority={priority.name}, type={event_type}"
@@ -572,6 +668,7 @@ class MarketDataService:
                 if subscriber_id in self.priority_subscribers[priority]:
                     name = self.priority_subscribers[priority][subscriber_id].get("name", "")
                     del self.priority_subscribers[priority][subscriber_id]
+                    self._rebuild_subscriber_snapshots()
                     logger.info(f"Removed priority subscriber {subscriber_id} ({name})")
                     return True
 
@@ -600,6 +697,7 @@ class MarketDataService:
                 "callback": callback,
                 "filter": filter_symbols,
             }
+            self._rebuild_subscriber_snapshots()
 
         logger.info(f"Added subscriber {subscriber_id} for {event_type} updates")
         return subscriber_id
@@ -623,6 +721,7 @@ class MarketDataService:
             for event_type in self.subscribers:
                 if subscriber_id in self.subscribers[event_type]:
                     del self.subscribers[event_type][subscriber_id]
+                    self._rebuild_subscriber_snapshots()
                     logger.info(f"Removed subscriber {subscriber_id}")
                     return True
 
@@ -639,12 +738,10 @@ class MarketDataService:
         Returns:
             LTP data dictionary or None
         """
-        symbol_key = f"{exchange}:{symbol}"
-
-        with self.data_lock:
-            if symbol_key in self.market_data_cache:
-                self.metrics["cache_hits"] += 1
-                return self.market_data_cache[symbol_key].get("ltp")
+        entry = self._get_entry(symbol, exchange)
+        if entry is not None:
+            self.metrics["cache_hits"] += 1
+            return entry.get("ltp")
 
         self.metrics["cache_misses"] += 1
         return None
@@ -660,9 +757,13 @@ class MarketDataService:
         Returns:
             LTP value or None
         """
-        ltp_data = self.get_ltp(symbol, exchange)
-        if ltp_data:
-            return ltp_data.get("value")
+        entry = self._get_entry(symbol, exchange)
+        if entry is not None:
+            self.metrics["cache_hits"] += 1
+            ltp_data = entry.get("ltp")
+            return ltp_data.get("value") if ltp_data else None
+
+        self.metrics["cache_misses"] += 1
         return None
 
     def get_quote(self, symbol: str, exchange: str) -> dict[str, Any] | None:
@@ -676,12 +777,10 @@ class MarketDataService:
         Returns:
             Quote data dictionary or None
         """
-        symbol_key = f"{exchange}:{symbol}"
-
-        with self.data_lock:
-            if symbol_key in self.market_data_cache:
-                self.metrics["cache_hits"] += 1
-                return self.market_data_cache[symbol_key].get("quote")
+        entry = self._get_entry(symbol, exchange)
+        if entry is not None:
+            self.metrics["cache_hits"] += 1
+            return entry.get("quote")
 
         self.metrics["cache_misses"] += 1
         return None
@@ -697,12 +796,10 @@ class MarketDataService:
         Returns:
             Market depth data dictionary or None
         """
-        symbol_key = f"{exchange}:{symbol}"
-
-        with self.data_lock:
-            if symbol_key in self.market_data_cache:
-                self.metrics["cache_hits"] += 1
-                return self.market_data_cache[symbol_key].get("depth")
+        entry = self._get_entry(symbol, exchange)
+        if entry is not None:
+            self.metrics["cache_hits"] += 1
+            return entry.get("depth")
 
         self.metrics["cache_misses"] += 1
         return None
@@ -718,13 +815,57 @@ class MarketDataService:
         Returns:
             All market data for the symbol
         """
-        symbol_key = f"{exchange}:{symbol}"
+        entry = self._get_entry(symbol, exchange)
+        return dict(entry) if entry is not None else {}
 
-        with self.data_lock:
-            if symbol_key in self.market_data_cache:
-                return dict(self.market_data_cache[symbol_key])
+    def get_tick_history(
+        self,
+        symbol: str,
+        exchange: str,
+        seconds: float | None = None,
+        last_n: int | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Get recent ticks for a symbol from the in-memory tick history
 
-        return {}
+        Args:
+            symbol: Trading symbol
+            exchange: Exchange name
+            seconds: Only ticks received in the last N seconds
+            last_n: Only the last N ticks
+
+        Returns:
+            Column name -> NumPy array (ts, ltp, volume, oi, bid, ask), oldest
+            first, or None if no history is kept for the symbol
+        """
+        ring = self.tick_history.get(f"{exchange}:{symbol}")
+        if ring is None:
+            return None
+        return ring.columns(seconds, last_n)
+
+    def get_tick_stats(
+        self,
+        symbol: str,
+        exchange: str,
+        seconds: float | None = None,
+        last_n: int | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Get open/high/low/last, VWAP and traded volume over a recent window
+
+        Args:
+            symbol: Trading symbol
+            exchange: Exchange name
+            seconds: Window length in seconds (None = all retained ticks)
+            last_n: Only the last N ticks
+
+        Returns:
+            Window statistics, or None if there are no ticks in the window
+        """
+        ring = self.tick_history.get(f"{exchange}:{symbol}")
+        if ring is None:
+            return None
+        return ring.stats(seconds, last_n)
 
     def get_multiple_ltps(self, symbols: list[dict[str, str]]) -> dict[str, Any]:
         """
@@ -738,16 +879,18 @@ class MarketDataService:
         """
         result = {}
 
-        with self.data_lock:
-            for symbol_info in symbols:
-                symbol = symbol_info.get("symbol")
-                exchange = symbol_info.get("exchange")
-                if symbol and exchange:
-                    symbol_key = f"{exchange}:{symbol}"
-                    if symbol_key in self.market_data_cache:
-                        ltp_data = self.market_data_cache[symbol_key].get("ltp")
-                        if ltp_data:
-                            result[symbol_key] = ltp_data
+        shards = self._shards
+        mask = self._shard_mask
+        for symbol_info in symbols:
+            symbol = symbol_info.get("symbol")
+            exchange = symbol_info.get("exchange")
+            if symbol and exchange:
+                symbol_key = f"{exchange}:{symbol}"
+                entry = shards[hash(symbol_key) & mask].entries.get(symbol_key)
+                if entry is not None:
+                    ltp_data = entry.get("ltp")
+                    if ltp_data:
+                        result[symbol_key] = ltp_data
 
         return result
 
@@ -771,12 +914,10 @@ class MarketDataService:
 
         # If specific symbol requested, check its freshness
         if symbol and exchange:
-            symbol_key = f"{exchange}:{symbol}"
-            with self.data_lock:
-                if symbol_key in self.market_data_cache:
-                    last_update = self.market_data_cache[symbol_key].get("last_update", 0)
-                    return (time.time() - last_update) < max_age_seconds
-                return False
+            entry = self._get_entry(symbol, exchange)
+            if entry is not None:
+                return (time.time() - entry.get("last_update", 0)) < max_age_seconds
+            return False
 
         return True
 
@@ -826,10 +967,10 @@ class MarketDataService:
             last_data_timestamp=self.health_monitor.last_data_timestamp,
             last_data_age_seconds=health["last_data_age_seconds"] or 0,
             data_flow_healthy=health["data_flow_active"],
-            cache_size=len(self.market_data_cache),
+            cache_size=self._cache_size(),
             total_subscribers=total_subscribers,
             critical_subscribers=critical_subscribers,
-            total_updates_processed=self.metrics["total_updates"],
+            total_updates_processed=self._total_updates(),
             validation_errors=self.metrics["validation_errors"],
             stale_data_events=self.metrics["stale_data_events"],
             reconnect_count=health["reconnect_count"],
@@ -846,8 +987,10 @@ class MarketDataService:
             )
 
             return {
-                "total_symbols": len(self.market_data_cache),
-                "total_updates": self.metrics["total_updates"],
+                "total_symbols": self._cache_size(),
+                "total_updates": self._total_updates(),
+                "cache_shards": len(self._shards),
+                "tick_history": self.tick_history.memory_info(),
                 "cache_hits": self.metrics["cache_hits"],
                 "cache_misses": self.metrics["cache_misses"],
                 "hit_rate": round(hit_rate, 2),
@@ -898,17 +1041,22 @@ class MarketDataService:
             symbol: Specific symbol to clear (optional)
             exchange: Exchange for the symbol (optional)
         """
-        with self.data_lock:
-            if symbol and exchange:
-                symbol_key = f"{exchange}:{symbol}"
-                if symbol_key in self.market_data_cache:
-                    del self.market_data_cache[symbol_key]
-                    self.validator.clear_price_history(symbol_key)
-                    logger.info(f"Cleared cache for {symbol_key}")
-            else:
-                self.market_data_cache.clear()
-                self.validator.clear_price_history()
-                logger.info("Cleared entire market data cache")
+        if symbol and exchange:
+            symbol_key = self._symbol_key(symbol, exchange)
+            shard = self._shards[hash(symbol_key) & self._shard_mask]
+            with shard.lock:
+                removed = shard.entries.pop(symbol_key, None)
+            self.tick_history.discard(symbol_key)
+            if removed is not None:
+                self.validator.clear_price_history(symbol_key)
+                logger.info(f"Cleared cache for {symbol_key}")
+        else:
+            for shard in self._shards:
+                with shard.lock:
+                    shard.entries.clear()
+            self.tick_history.discard()
+            self.validator.clear_price_history()
+            logger.info("Cleared entire market data cache")
 
     @staticmethod
     def _mode_to_event_types(mode: int) -> list[str]:
@@ -938,29 +1086,25 @@ class MarketDataService:
         """
         event_types = self._mode_to_event_types(mode)
 
-        # Process subscribers by priority (CRITICAL first)
-        for priority in sorted(self.priority_subscribers.keys()):
-            with self.data_lock:
-                subscribers = list(self.priority_subscribers[priority].values())
-
-            for subscriber in subscribers:
-                try:
-                    # Check event type filter
-                    sub_event_type = subscriber.get("event_type", "all")
-                    if sub_event_type != "all" and sub_event_type not in event_types:
-                        continue
+        # Snapshot is pre-sorted by priority (CRITICAL first) and read lock-free
+        for subscriber in self._priority_snapshot:
+            try:
+                # Check event type filter
+                sub_event_type = subscriber.get("event_type", "all")
+                if sub_event_type != "all" and sub_event_type not in event_types:
+                    continue
 
-                    # Check symbol filter
-                    if subscriber["filter"] and symbol_key not in subscriber["filter"]:
-                        continue
+                # Check symbol filter
+                if subscriber["filter"] and symbol_key not in subscriber["filter"]:
+                    continue
 
-                    # Call the callback
-                    subscriber["callback"](data)
+                # Call the callback
+                subscriber["callback"](data)
 
-                except Exception as e:
-                    logger.exception(
-                        f"Error in priority subscriber callback ({subscriber.get('name', 'unknown')}): {e}"
-                    )
+            except Exception as e:
+                logger.exception(
+                    f"Error in priority subscriber callback ({subscriber.get('name', 'unknown')}): {e}"
+                )
 
     def _broadcast_update(self, symbol_key: str, mode: int, data: dict[str, Any]) -> None:
         """
@@ -975,10 +1119,10 @@ class MarketDataService:
 
         # Collect subscribers from every applicable event-type bucket plus "all".
         # Each subscriber_id lives in exactly one bucket, so no dedup needed.
-        with self.data_lock:
-            target_subscribers = []
-            for et in list(event_types) + ["all"]:
-                target_subscribers.extend(self.subscribers.get(et, {}).values())
+        snapshot = self._legacy_snapshot
+        target_subscribers = []
+        for et in list(event_types) + ["all"]:
+            target_subscribers.extend(snapshot.get(et, ()))
 
         for subscriber in target_subscribers:
             try:
@@ -1020,17 +1164,24 @@ class MarketDataService:
                 current_time = time.time()
                 stale_threshold = 3600  # 1 hour
 
-                with self.data_lock:
-                    # Clean up stale market data
-                    stale_symbols = []
-                    for symbol_key, data in self.market_data_cache.items():
-                        if current_time - data.get("last_update", 0) > stale_threshold:
-                            stale_symbols.append(symbol_key)
+                # Clean up stale market data, one shard at a time
+                stale_symbols = []
+                for shard in self._shards:
+                    with shard.lock:
+                        stale = [
+                            symbol_key
+                            for symbol_key, entry in shard.entries.items()
+                            if current_time - entry.get("last_update", 0) > stale_threshold
+                        ]
+                        for symbol_key in stale:
+                            del shard.entries[symbol_key]
+                    stale_symbols.extend(stale)
 
-                    for symbol_key in stale_symbols:
-                        del self.market_data_cache[symbol_key]
-                        self.validator.clear_price_history(symbol_key)
+                for symbol_key in stale_symbols:
+                    self.tick_history.discard(symbol_key)
+                    self.validator.clear_price_history(symbol_key)
 
+                with self.data_lock:
                     # Clean up old user access tracking
                     for user_id in list(self.user_access_tracking.keys()):
                         user_data = self.user_access_tracking[user_id]
@@ -1084,6 +1235,20 @@ def get_market_depth(symbol: str, exchange: str) -> dict[str, Any] | None:
     return _market_data_service.get_market_depth(symbol, exchange)
 
 
+def get_tick_history(
+    symbol: str, exchange: str, seconds: float | None = None, last_n: int | None = None
+) -> dict[str, Any] | None:
+    """Get recent ticks for a symbol as NumPy columns"""
+    return _market_data_service.get_tick_history(symbol, exchange, seconds, last_n)
+
+
+def get_tick_stats(
+    symbol: str, exchange: str, seconds: float | None = None, last_n: int | None = None
+) -> dict[str, Any] | None:
+    """Get OHLC/VWAP over the last N seconds (or ticks) for a symbol"""
+    return _market_data_service.get_tick_stats(symbol, exchange, seconds, last_n)
+
+
 def subscribe_to_market_updates(
     event_type: str, callback: Callable, filter_symbols: set[str] | None = None
 ) -> int:
@@ -14,12 +14,11 @@ all-zero leg series as "not available" in the UI.
 import pandas as pd
 import pytz
 
-from services.history_service import get_history
+from services.history_batch_service import fetch_history_frames
 from services.quotes_service import get_quotes
 from services.strategy_builder_reference_service import resolve_strategy_builder_reference
 from services.strategy_chart_service import (
     _cap_last_n_trading_dates,
-    _convert_timestamp_to_ist,
     _normalize_leg,
     _resolve_trading_window,
 )
@@ -28,6 +27,15 @@ from utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+def _points(values: pd.Series) -> list[dict]:
+    """A series on an IST index as chart points: unix seconds, value to 2 places."""
+    times = values.index.as_unit("s").asi8
+    return [
+        {"time": int(t), "value": round(v, 2)}
+        for t, v in zip(times.tolist(), values.astype(float).tolist(), strict=True)
+    ]
+
+
 def get_multi_strike_oi_data(
     underlying: str,
     exchange: str,
@@ -89,73 +97,40 @@ def get_multi_strike_oi_data(
             )
         underlying_quote_symbol, quote_exchange = resolved_reference
 
-        # ── Underlying history ────────────────────────────────────────
+        # ── Underlying and per-leg history, one batch ─────────────────
+        # Legs are deduped by (symbol, exchange) in the batch.
+        underlying_key = (underlying_quote_symbol, quote_exchange)
+        frames, errors = fetch_history_frames(
+            [underlying_key] + [(leg["symbol"], leg["exchange"]) for leg in normalized_legs],
+            interval,
+            start_date_str,
+            end_date_str,
+            api_key,
+        )
+
         # Some brokers (e.g., Zerodha) don't return intraday minute-level
         # candles for INDEX tokens. Fall through with an empty underlying
         # series so the OI overlays still render — the UI flags this.
         underlying_missing = False
         underlying_series: list[dict] = []
-        success_u, resp_u, _ = get_history(
-            symbol=underlying_quote_symbol,
-            exchange=quote_exchange,
-            interval=interval,
-            start_date=start_date_str,
-            end_date=end_date_str,
-            api_key=api_key,
-        )
-        if not success_u:
+        if underlying_key in errors:
             logger.info(
-                f"Multi-strike OI: underlying history fetch failed for {base_symbol}/{quote_exchange} @ {interval} — continuing with legs only. Reason: {resp_u.get('message')}"
+                f"Multi-strike OI: underlying history fetch failed for {base_symbol}/{quote_exchange} @ {interval} — continuing with legs only. Reason: {errors[underlying_key]}"
             )
             underlying_missing = True
         else:
-            df_u = pd.DataFrame(resp_u.get("data", []))
-            if df_u.empty:
+            closes = frames[underlying_key]["close"].dropna()
+            if closes.empty:
                 logger.info(
                     f"Multi-strike OI: empty underlying history for {base_symbol}/{quote_exchange} @ {interval} {start_date_str}..{end_date_str} — broker likely doesn't return {interval} candles for this symbol; continuing with legs only."
                 )
                 underlying_missing = True
             else:
-                df_u = _convert_timestamp_to_ist(df_u)
-                if df_u is None:
-                    return (
-                        False,
-                        {"status": "error", "message": "Failed to parse underlying timestamps"},
-                        500,
-                    )
-                for ts, row in df_u.iterrows():
-                    try:
-                        underlying_series.append(
-                            {"time": int(ts.timestamp()), "value": round(float(row["close"]), 2)}
-                        )
-                    except (KeyError, TypeError, ValueError):
-                        continue
-
-        # ── Per-leg OI history, deduped by (symbol, exchange) ─────────
-        oi_lookup: dict[tuple[str, str], list[dict]] = {}
-        unique_keys = {(leg["symbol"], leg["exchange"]) for leg in normalized_legs}
-        for symbol, leg_exchange in unique_keys:
-            success_l, resp_l, _ = get_history(
-                symbol=symbol,
-                exchange=leg_exchange,
-                interval=interval,
-                start_date=start_date_str,
-                end_date=end_date_str,
-                api_key=api_key,
-            )
-            series = []
-            if success_l:
-                df_l = pd.DataFrame(resp_l.get("data", []))
-                if not df_l.empty:
-                    df_l = _convert_timestamp_to_ist(df_l)
-                    if df_l is not None:
-                        for ts, row in df_l.iterrows():
-                            try:
-                                oi_val = float(row.get("oi", 0) or 0)
-                            except (TypeError, ValueError):
-                                oi_val = 0.0
-                            series.append({"time": int(ts.timestamp()), "value": round(oi_val, 2)})
-            oi_lookup[(symbol, leg_exchange)] = series
+                underlying_series = _points(closes)
+
+        oi_lookup: dict[tuple[str, str], list[dict]] = {
+            key: _points(frame["oi"]) for key, frame in frames.items()
+        }
 
         # ── Assemble per-leg response ─────────────────────────────────
         # We pass through the original leg fields the UI needs for labels
@@ -51,7 +51,7 @@ from typing import Any
 from database.auth_db import get_auth_token_broker
 from database.symbol import SymToken, db_session
 from database.token_db import get_br_symbol
-from database.token_db_enhanced import fno_search_symbols
+from database.token_db_enhanced import fno_search_symbols, get_option_chain_cached
 from services.option_greeks_service import (
     calculate_chain_greeks,
     calculate_time_to_expiry,
@@ -141,7 +141,8 @@ def get_option_symbols_for_chain(
     base_symbol: str, expiry_date: str, strikes_with_labels: list[dict[str, Any]], exchange: str
 ) -> list[dict[str, Any]]:
     """
-    Get CE and PE symbols for each strike from database.
+    Get CE and PE symbols for each strike from the symbol cache, or the database
+    when the cache is not loaded.
 
     Args:
         base_symbol: Base symbol (e.g., NIFTY)
@@ -158,6 +159,13 @@ def get_option_symbols_for_chain(
     # e.g., "28FEB25" -> "28-FEB-25"
     expiry_db_fmt = f"{expiry_date[:2]}-{expiry_date[2:5]}-{expiry_date[5:]}".upper()
 
+    # Whole chain from the cache in one call, keyed by strike (None: use the database)
+    cached_chain = None
+    if exchange.upper() not in CRYPTO_EXCHANGES:
+        chain = get_option_chain_cached(base_symbol, expiry_db_fmt, exchange)
+        if chain is not None:
+            cached_chain = {row["strike"]: row for row in chain}
+
     for strike_info in strikes_with_labels:
         strike = strike_info["strike"]
         ce_label = strike_info["ce_label"]
@@ -197,18 +205,29 @@ def get_option_symbols_for_chain(
             ce_symbol = construct_option_symbol(base_symbol, expiry_date, strike, "CE")
             pe_symbol = construct_option_symbol(base_symbol, expiry_date, strike, "PE")
 
-            # Query database for both CE and PE
-            ce_record = (
-                db_session.query(SymToken)
-                .filter(SymToken.symbol == ce_symbol, SymToken.exchange == exchange)
-                .first()
-            )
+            if cached_chain is not None:
+                # Same existence check as the query below: the listed contract
+                # at this strike, under the constructed symbol
+                row = cached_chain.get(strike, {})
+                ce_record = row.get("ce")
+                pe_record = row.get("pe")
+                if ce_record is not None and ce_record.symbol != ce_symbol:
+                    ce_record = None
+                if pe_record is not None and pe_record.symbol != pe_symbol:
+                    pe_record = None
+            else:
+                # Query database for both CE and PE
+                ce_record = (
+                    db_session.query(SymToken)
+                    .filter(SymToken.symbol == ce_symbol, SymToken.exchange == exchange)
+                    .first()
+                )
 
-            pe_record = (
-                db_session.query(SymToken)
-                .filter(SymToken.symbol == pe_symbol, SymToken.exchange == exchange)
-                .first()
-            )
+                pe_record = (
+                    db_session.query(SymToken)
+                    .filter(SymToken.symbol == pe_symbol, SymToken.exchange == exchange)
+                    .first()
+                )
 
         chain_symbols.append(
             {
@@ -40,6 +40,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from database.auth_db import get_auth_token_broker
 from database.symbol import SymToken, db_session
+from database.token_db_enhanced import get_option_chain_cached
 from services.quotes_service import get_quotes
 from utils.constants import CRYPTO_EXCHANGES
 from utils.logging import get_logger
@@ -438,6 +439,11 @@ def get_available_strikes(
             )
             strikes = [r.strike for r in results if r.strike is not None and r.strike > 0]
         else:
+            # Strikes of the cached chain when the symbol cache is loaded
+            side = option_type.lower()
+            chain = get_option_chain_cached(base_symbol, expiry_formatted.upper(), exchange.upper())
+            strikes = [row["strike"] for row in chain if row.get(side)] if chain else []
+        if not strikes and exchange.upper() not in CRYPTO_EXCHANGES:
             # Construct symbol pattern: BASE + EXPIRY (without hyphens) + % wildcard
             # e.g., "NIFTY" + "18NOV25" + "%" = "NIFTY18NOV25%"
             expiry_no_hyphen = expiry_date.upper()  # Already in DDMMMYY format
@@ -7,8 +7,7 @@ Supports split orders per leg if splitsize is specified.
 """
 
 import copy
-import os
-import time
+from functools import partial
 from typing import Any, Dict, List, Optional, Tuple
 
 from database.auth_db import get_auth_token_broker
@@ -19,6 +18,7 @@ from services.place_order_service import place_order
 from services.quotes_service import get_quotes
 from utils.event_bus import bus
 from utils.logging import get_logger
+from utils.order_dispatcher import dispatch, get_rate_bucket
 
 logger = get_logger(__name__)
 
@@ -26,17 +26,6 @@ logger = get_logger(__name__)
 MAX_SPLIT_ORDERS_PER_LEG = 100
 
 
-# Get rate limit from environment (default: 10 per second)
-def get_order_rate_limit():
-    """Parse ORDER_RATE_LIMIT and return delay in seconds between orders"""
-    rate_limit_str = os.getenv("ORDER_RATE_LIMIT", "10 per second")
-    try:
-        rate = int(rate_limit_str.split()[0])
-        return 1.0 / rate if rate > 0 else 0.1
-    except (ValueError, IndexError):
-        return 0.1  # Default 100ms delay
-
-
 def get_underlying_ltp(
     underlying: str, exchange: str, api_key: str
 ) -> tuple[bool, float | None, str]:
@@ -249,6 +238,9 @@ def resolve_and_place_leg(
         resolved_exchange = symbol_response.get("exchange")
         underlying_ltp = symbol_response.get("underlying_ltp")
 
+        # Sandbox orders reach no broker, so only live orders are rate limited
+        rate_key = None if get_analyze_mode() else broker
+
         # Check if split order is requested for this leg
         splitsize = leg_data.get("splitsize", 0) or 0
         total_quantity = int(leg_data.get("quantity", 0))
@@ -292,36 +284,24 @@ def resolve_and_place_leg(
                 "underlying_ltp": underlying_ltp,  # Pass LTP for execution reference
             }
 
-            # Process split orders sequentially with rate limiting
-            split_results = []
-            order_delay = get_order_rate_limit()
-
             # Look up pre-fetched quote for this resolved option symbol
             prefetched = (leg_quote_cache or {}).get((resolved_symbol, resolved_exchange))
 
-            # Place full-size orders
-            for i in range(num_full_orders):
-                if i > 0:
-                    time.sleep(order_delay)  # Rate limit delay between orders
+            def place_split(order_num: int, quantity: int):
                 order_data = copy.deepcopy(base_order_data)
-                order_data["quantity"] = splitsize
-                result = place_single_split_order_for_leg(
-                    order_data, api_key, i + 1, total_split_orders, auth_token, broker,
+                order_data["quantity"] = quantity
+                return partial(
+                    place_single_split_order_for_leg,
+                    order_data, api_key, order_num, total_split_orders, auth_token, broker,
                     prefetched_quote=prefetched,
                 )
-                split_results.append(result)
 
-            # Place remaining quantity order if any
+            # Full-size orders, then the remaining quantity if any, placed
+            # concurrently under the broker's rate limit
+            split_calls = [place_split(i + 1, splitsize) for i in range(num_full_orders)]
             if remaining_qty > 0:
-                if num_full_orders > 0:
-                    time.sleep(order_delay)  # Rate limit delay
-                order_data = copy.deepcopy(base_order_data)
-                order_data["quantity"] = remaining_qty
-                result = place_single_split_order_for_leg(
-                    order_data, api_key, total_split_orders, total_split_orders, auth_token, broker,
-                    prefetched_quote=prefetched,
-                )
-                split_results.append(result)
+                split_calls.append(place_split(total_split_orders, remaining_qty))
+            split_results = dispatch([split_calls], rate_key=rate_key)
 
             # Determine overall status
             successful_orders = sum(1 for r in split_results if r.get("status") == "success")
@@ -366,6 +346,8 @@ def resolve_and_place_leg(
         # A summary event is emitted at the end of all legs
         # Look up pre-fetched quote for this resolved option symbol
         prefetched = (leg_quote_cache or {}).get((resolved_symbol, resolved_exchange))
+        if rate_key:
+            get_rate_bucket(rate_key).acquire()
         success, order_response, status_code = place_order(
             order_data=order_data,
             api_key=api_key,
@@ -446,7 +428,6 @@ def process_multiorder_with_auth(
     buy_legs = [(i, leg) for i, leg in enumerate(legs) if leg.get("action", "").upper() == "BUY"]
     sell_legs = [(i, leg) for i, leg in enumerate(legs) if leg.get("action", "").upper() == "SELL"]
 
-    results = []
     underlying_ltp = None
 
     # Fetch underlying LTP once (single quote fetch for all legs)
@@ -460,10 +441,6 @@ def process_multiorder_with_auth(
         else:
             logger.warning(f"Failed to fetch underlying LTP: {error_msg}. Will retry per leg.")
 
-    # Check if any leg has splitsize > 0 (requires delay between orders)
-    has_split_orders = any(leg.get("splitsize", 0) > 0 for _, leg in buy_legs + sell_legs)
-    order_delay = get_order_rate_limit() if has_split_orders else 0
-
     # Pre-fetch quotes for all legs in sandbox mode via single multiquotes call.
     # Each leg has a different option symbol — without this, each leg would make
     # its own REST API quote call (~300-500ms each).
@@ -509,28 +486,26 @@ def process_multiorder_with_auth(
         except Exception as e:
             logger.debug(f"Multiquotes pre-fetch failed for multiorder, falling back to per-leg fetch: {e}")
 
-    # Process all legs sequentially (avoids ThreadPoolExecutor + eventlet hang)
-    # Process BUY legs first
-    for i, (orig_idx, leg) in enumerate(buy_legs):
-        if order_delay and i > 0:
-            time.sleep(order_delay)
-        result = resolve_and_place_leg(
+    # Place the legs concurrently, all BUY legs before the first SELL leg.
+    # Each leg takes its own rate limit token when it places an order, so the
+    # legs themselves are dispatched without one.
+    def place_leg(orig_idx: int, leg: dict[str, Any]):
+        return partial(
+            resolve_and_place_leg,
             leg, common_data, api_key, orig_idx, total_legs, auth_token, broker, underlying_ltp,
             leg_quote_cache=leg_quote_cache,
         )
-        if result:
-            results.append(result)
-
-    # Then process SELL legs
-    for i, (orig_idx, leg) in enumerate(sell_legs):
-        if order_delay and (i > 0 or buy_legs):
-            time.sleep(order_delay)
-        result = resolve_and_place_leg(
-            leg, common_data, api_key, orig_idx, total_legs, auth_token, broker, underlying_ltp,
-            leg_quote_cache=leg_quote_cache,
+
+    results = [
+        result
+        for result in dispatch(
+            [
+                [place_leg(orig_idx, leg) for orig_idx, leg in buy_legs],
+                [place_leg(orig_idx, leg) for orig_idx, leg in sell_legs],
+            ]
         )
-        if result:
-            results.append(result)
+        if result
+    ]
 
     # Sort results by leg number
     results.sort(key=lambda x: x.get("leg", 0))
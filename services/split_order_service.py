@@ -1,7 +1,6 @@
 import copy
 import importlib
-import os
-import time
+from functools import partial
 from typing import Any, Dict, List, Optional, Tuple
 
 from database.auth_db import get_auth_token_broker
@@ -16,6 +15,7 @@ from utils.constants import (
 )
 from utils.event_bus import bus
 from utils.logging import get_logger
+from utils.order_dispatcher import dispatch
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -24,17 +24,6 @@ logger = get_logger(__name__)
 MAX_ORDERS = 100
 
 
-# Get rate limit from environment (default: 10 per second)
-def get_order_rate_limit():
-    """Parse ORDER_RATE_LIMIT and return delay in seconds between orders"""
-    rate_limit_str = os.getenv("ORDER_RATE_LIMIT", "10 per second")
-    try:
-        rate = int(rate_limit_str.split()[0])
-        return 1.0 / rate if rate > 0 else 0.1
-    except (ValueError, IndexError):
-        return 0.1  # Default 100ms delay
-
-
 def emit_analyzer_error(request_data: dict[str, Any], error_message: str) -> dict[str, Any]:
     """
     Helper function to emit analyzer error events via the event bus.
@@ -202,6 +191,11 @@ def split_order_with_auth(
             ))
             return False, error_response, 400
 
+        # (order_num, quantity) of every child order
+        order_quantities = [(i + 1, split_size) for i in range(num_full_orders)]
+        if remaining_qty > 0:
+            order_quantities.append((total_orders, remaining_qty))
+
     except ValueError:
         error_message = "Invalid quantity or split size"
         if get_analyze_mode():
@@ -229,8 +223,6 @@ def split_order_with_auth(
                 400,
             )
 
-        analyze_results = []
-
         # Pre-fetch quote once for the symbol — all split orders share the
         # same symbol, so N individual REST calls are redundant.
         prefetched_quote = None
@@ -250,10 +242,9 @@ def split_order_with_auth(
         except Exception as e:
             logger.debug(f"Quote pre-fetch failed for split order, falling back to per-order fetch: {e}")
 
-        # Place full-size orders in sandbox
-        for i in range(num_full_orders):
+        def place_in_sandbox(order_num: int, quantity: int) -> dict[str, Any]:
             order_data = copy.deepcopy(split_data)
-            order_data["quantity"] = str(split_size)
+            order_data["quantity"] = str(quantity)
             order_data["apikey"] = api_key
 
             # Place order in sandbox with pre-fetched quote
@@ -263,53 +254,24 @@ def split_order_with_auth(
             )
 
             if success:
-                analyze_results.append(
-                    {
-                        "order_num": i + 1,
-                        "quantity": split_size,
-                        "status": "success",
-                        "orderid": response.get("orderid"),
-                    }
-                )
-            else:
-                analyze_results.append(
-                    {
-                        "order_num": i + 1,
-                        "quantity": split_size,
-                        "status": "error",
-                        "message": response.get("message", "Order placement failed"),
-                    }
-                )
-
-        # Place remaining quantity order if any
-        if remaining_qty > 0:
-            order_data = copy.deepcopy(split_data)
-            order_data["quantity"] = str(remaining_qty)
-            order_data["apikey"] = api_key
-
-            success, response, status_code = sandbox_place_order(
-                order_data, api_key, {"apikey": api_key, "order_type": "split"},
-                prefetched_quote=prefetched_quote,
-            )
+                return {
+                    "order_num": order_num,
+                    "quantity": quantity,
+                    "status": "success",
+                    "orderid": response.get("orderid"),
+                }
+            return {
+                "order_num": order_num,
+                "quantity": quantity,
+                "status": "error",
+                "message": response.get("message", "Order placement failed"),
+            }
 
-            if success:
-                analyze_results.append(
-                    {
-                        "order_num": num_full_orders + 1,
-                        "quantity": remaining_qty,
-                        "status": "success",
-                        "orderid": response.get("orderid"),
-                    }
-                )
-            else:
-                analyze_results.append(
-                    {
-                        "order_num": num_full_orders + 1,
-                        "quantity": remaining_qty,
-                        "status": "error",
-                        "message": response.get("message", "Order placement failed"),
-                    }
-                )
+        # Full-size orders, then the remaining quantity if any, placed
+        # concurrently; sandbox orders reach no broker, so no rate limit
+        analyze_results = dispatch(
+            [[partial(place_in_sandbox, num, qty) for num, qty in order_quantities]]
+        )
 
         response_data = {
             "mode": "analyze",
@@ -359,29 +321,17 @@ def split_order_with_auth(
         ))
         return False, error_response, 404
 
-    # Process orders sequentially with rate limiting
-    results = []
-    order_delay = get_order_rate_limit()
-
-    # Place full-size orders
-    for i in range(num_full_orders):
-        if i > 0:
-            time.sleep(order_delay)  # Rate limit delay between orders
-        order_data = copy.deepcopy(split_data)
-        order_data["quantity"] = str(split_size)
-        result = place_single_order(order_data, broker_module, auth_token, i + 1, total_orders)
-        results.append(result)
-
-    # Place remaining quantity order if any
-    if remaining_qty > 0:
-        if num_full_orders > 0:
-            time.sleep(order_delay)  # Rate limit delay
+    def place_live(order_num: int, quantity: int):
         order_data = copy.deepcopy(split_data)
-        order_data["quantity"] = str(remaining_qty)
-        result = place_single_order(
-            order_data, broker_module, auth_token, total_orders, total_orders
+        order_data["quantity"] = str(quantity)
+        return partial(
+            place_single_order, order_data, broker_module, auth_token, order_num, total_orders
         )
-        results.append(result)
+
+    # Place orders concurrently under the broker's rate limit
+    results = dispatch(
+        [[place_live(num, qty) for num, qty in order_quantities]], rate_key=broker
+    )
 
     # Log the split order results
     response_data = {
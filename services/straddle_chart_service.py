@@ -14,13 +14,12 @@ import pandas as pd
 import pytz
 
 from database.token_db_enhanced import fno_search_symbols
-from services.history_service import get_history
+from services.history_batch_service import fetch_history_frames, nearest_strikes
 from services.option_greeks_service import parse_option_symbol
 from services.option_symbol_service import (
     NO_SPOT_EXCHANGES,
     construct_crypto_option_symbol,
     construct_option_symbol,
-    find_atm_strike_from_actual,
     get_available_strikes,
     get_option_exchange,
     resolve_underlying_quote,
@@ -64,43 +63,6 @@ def _get_quote_exchange(base_symbol, underlying_exchange):
     return underlying_exchange.upper()
 
 
-def _convert_timestamp_to_ist(df):
-    """
-    Convert timestamp column in a history DataFrame to IST datetime index.
-    Returns the dataframe with 'datetime' index in IST, or None on failure.
-    """
-    ist = pytz.timezone("Asia/Kolkata")
-
-    try:
-        if "timestamp" not in df.columns:
-            logger.warning("No timestamp field found in history data")
-            return None
-
-        # Try as Unix timestamp (seconds)
-        try:
-            df["datetime"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
-            df["datetime"] = df["datetime"].dt.tz_convert(ist)
-        except Exception:
-            # Try as milliseconds
-            try:
-                df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-                df["datetime"] = df["datetime"].dt.tz_convert(ist)
-            except Exception:
-                # Try as string datetime
-                df["datetime"] = pd.to_datetime(df["timestamp"])
-                if df["datetime"].dt.tz is None:
-                    df["datetime"] = df["datetime"].dt.tz_localize("UTC").dt.tz_convert(ist)
-                else:
-                    df["datetime"] = df["datetime"].dt.tz_convert(ist)
-
-        df.set_index("datetime", inplace=True)
-        df = df.sort_index()
-        return df
-    except Exception as e:
-        logger.warning(f"Error converting timestamps: {e}")
-        return None
-
-
 def get_straddle_chart_data(
     underlying,
     exchange,
@@ -186,131 +148,87 @@ def get_straddle_chart_data(
             )
 
         # Step 3: Fetch underlying history
-        success_u, resp_u, _ = get_history(
-            symbol=underlying_quote_symbol,
-            exchange=quote_exchange,
-            interval=interval,
-            start_date=start_date_str,
-            end_date=end_date_str,
-            api_key=api_key,
+        underlying_key = (underlying_quote_symbol, quote_exchange)
+        frames, errors = fetch_history_frames(
+            [underlying_key], interval, start_date_str, end_date_str, api_key
         )
-        if not success_u:
+        if underlying_key in errors:
             return (
                 False,
                 {
                     "status": "error",
-                    "message": f"Failed to fetch underlying history: {resp_u.get('message', 'Unknown error')}",
+                    "message": f"Failed to fetch underlying history: {errors[underlying_key]}",
                 },
                 400,
             )
 
-        df_underlying = pd.DataFrame(resp_u.get("data", []))
+        df_underlying = frames[underlying_key].dropna(subset=["close"])
         if df_underlying.empty:
             return False, {"status": "error", "message": "No underlying history data available"}, 404
 
-        df_underlying = _convert_timestamp_to_ist(df_underlying)
-        if df_underlying is None:
-            return False, {"status": "error", "message": "Failed to parse underlying timestamps"}, 500
-
         # Step 4: For each candle, compute ATM strike
-        atm_per_row = []
-        for ts, row in df_underlying.iterrows():
-            close_price = float(row["close"])
-            atm = find_atm_strike_from_actual(close_price, available_strikes)
-            atm_per_row.append(atm)
-
-        df_underlying["atm_strike"] = atm_per_row
+        df_underlying["atm_strike"] = nearest_strikes(
+            df_underlying["close"].to_numpy(), available_strikes
+        )
 
         # Step 5: Collect unique ATM strikes
-        unique_strikes = set(s for s in atm_per_row if s is not None)
+        unique_strikes = set(df_underlying["atm_strike"].dropna())
         if not unique_strikes:
             return False, {"status": "error", "message": "Could not determine any ATM strikes"}, 400
 
         logger.debug(f"Straddle chart: {len(unique_strikes)} unique ATM strikes for {base_symbol}: {sorted(unique_strikes)}")
 
-        # Step 6: For each unique strike, fetch CE and PE history
-        # Build lookup: {strike: {timestamp: {ce_close, pe_close}}}
-        strike_data = {}
-
+        # Step 6: Fetch CE and PE history for every unique strike in one batch
         _build_sym = construct_crypto_option_symbol if exchange.upper() in CRYPTO_EXCHANGES else construct_option_symbol
-        for strike in sorted(unique_strikes):
-            ce_symbol = _build_sym(base_symbol, expiry_date.upper(), strike, "CE")
-            pe_symbol = _build_sym(base_symbol, expiry_date.upper(), strike, "PE")
-
-            # Fetch CE history
-            success_ce, resp_ce, _ = get_history(
-                symbol=ce_symbol,
-                exchange=options_exchange,
-                interval=interval,
-                start_date=start_date_str,
-                end_date=end_date_str,
-                api_key=api_key,
-            )
-
-            # Fetch PE history
-            success_pe, resp_pe, _ = get_history(
-                symbol=pe_symbol,
-                exchange=options_exchange,
-                interval=interval,
-                start_date=start_date_str,
-                end_date=end_date_str,
-                api_key=api_key,
-            )
-
-            ce_lookup = {}
-            pe_lookup = {}
-
-            if success_ce:
-                df_ce = pd.DataFrame(resp_ce.get("data", []))
-                if not df_ce.empty:
-                    df_ce = _convert_timestamp_to_ist(df_ce)
-                    if df_ce is not None:
-                        for ts, row in df_ce.iterrows():
-                            ce_lookup[ts] = float(row["close"])
-
-            if success_pe:
-                df_pe = pd.DataFrame(resp_pe.get("data", []))
-                if not df_pe.empty:
-                    df_pe = _convert_timestamp_to_ist(df_pe)
-                    if df_pe is not None:
-                        for ts, row in df_pe.iterrows():
-                            pe_lookup[ts] = float(row["close"])
-
-            strike_data[strike] = {"ce": ce_lookup, "pe": pe_lookup}
-
-        # Step 7: Merge — walk underlying candles, pick CE/PE from the correct strike
-        series = []
-        for ts, row in df_underlying.iterrows():
-            spot = float(row["close"])
-            atm_strike = row["atm_strike"]
-
-            if atm_strike is None or atm_strike not in strike_data:
-                continue
-
-            sd = strike_data[atm_strike]
-            ce_price = sd["ce"].get(ts)
-            pe_price = sd["pe"].get(ts)
-
-            if ce_price is None or pe_price is None:
-                continue
-
-            straddle = round(ce_price + pe_price, 2)
-            synthetic_future = round(atm_strike + ce_price - pe_price, 2)
-
-            # Convert timestamp to Unix seconds (UTC) for lightweight-charts
-            unix_seconds = int(ts.timestamp())
+        legs = {
+            (strike, option_type): _build_sym(base_symbol, expiry_date.upper(), strike, option_type)
+            for strike in sorted(unique_strikes)
+            for option_type in ("CE", "PE")
+        }
+        frames, _ = fetch_history_frames(
+            [(symbol, options_exchange) for symbol in legs.values()],
+            interval,
+            start_date_str,
+            end_date_str,
+            api_key,
+        )
 
-            series.append(
-                {
-                    "time": unix_seconds,
-                    "spot": round(spot, 2),
-                    "atm_strike": atm_strike,
-                    "ce_price": round(ce_price, 2),
-                    "pe_price": round(pe_price, 2),
-                    "straddle": straddle,
-                    "synthetic_future": synthetic_future,
-                }
+        # Step 7: Merge — join each underlying candle to the CE/PE close of
+        # its own ATM strike at the same timestamp
+        row_keys = pd.MultiIndex.from_arrays([df_underlying["atm_strike"], df_underlying.index])
+        for option_type in ("CE", "PE"):
+            closes = {
+                strike: frames[(symbol, options_exchange)]["close"]
+                for (strike, leg_type), symbol in legs.items()
+                if leg_type == option_type and (symbol, options_exchange) in frames
+            }
+            column = f"{option_type.lower()}_price"
+            if closes:
+                df_underlying[column] = pd.concat(closes).reindex(row_keys).to_numpy()
+            else:
+                df_underlying[column] = float("nan")
+
+        merged = df_underlying.dropna(subset=["ce_price", "pe_price"])
+        series = [
+            {
+                # Unix seconds (UTC) for lightweight-charts
+                "time": int(ts.timestamp()),
+                "spot": round(spot, 2),
+                "atm_strike": atm_strike,
+                "ce_price": round(ce_price, 2),
+                "pe_price": round(pe_price, 2),
+                "straddle": round(ce_price + pe_price, 2),
+                "synthetic_future": round(atm_strike + ce_price - pe_price, 2),
+            }
+            for ts, spot, atm_strike, ce_price, pe_price in zip(
+                merged.index,
+                merged["close"].tolist(),
+                merged["atm_strike"].tolist(),
+                merged["ce_price"].tolist(),
+                merged["pe_price"].tolist(),
+                strict=True,
             )
+        ]
 
         if not series:
             return (
@@ -0,0 +1,269 @@
+"""
+Recent tick history for MarketDataService.
+
+MarketDataService only keeps the last value per symbol. Consumers that need
+the last few minutes of ticks (scalping risk monitor, straddle chart, OI
+tracker) had to go back to the broker for them. This module keeps a short
+per-symbol history in memory instead:
+
+- TickRingBuffer: fixed-capacity, column-oriented NumPy ring
+  (ts, ltp, volume, oi, bid, ask) with vectorized window queries.
+- TickHistoryStore: one ring per "EXCHANGE:SYMBOL" key, with the number of
+  rings capped so total memory stays under TICK_HISTORY_MAX_MB. When full, the
+  symbols that have been quiet the longest are evicted to make room.
+
+``ts`` is the local arrival time (epoch seconds), not the broker timestamp:
+brokers disagree on seconds vs milliseconds and some omit it, and window
+queries ("the last 5 minutes") are about wall-clock time anyway. Fields a
+tick does not carry (oi on an LTP tick, bid/ask without depth) are NaN.
+
+A symbol subscribed in several modes gets an update per mode for one market
+move. A ring records only the richest mode (LTP=1 < QUOTE=2 < DEPTH=3) that
+is still ticking: interleaving them would double the tick count, and the NaN
+volume of the LTP ticks would blank every traded-volume difference.
+"""
+
+import os
+import threading
+import time
+from typing import Any
+
+import numpy as np
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Ticks kept per symbol (0 disables tick history)
+TICK_HISTORY_CAPACITY = int(os.getenv("TICK_HISTORY_CAPACITY", "512"))
+# Upper bound on memory used by all rings together
+TICK_HISTORY_MAX_MB = float(os.getenv("TICK_HISTORY_MAX_MB", "64"))
+
+COLUMNS = ("ts", "ltp", "volume", "oi", "bid", "ask")
+_TS, _LTP, _VOLUME, _OI, _BID, _ASK = range(len(COLUMNS))
+_NAN = float("nan")
+
+# A ring falls back to a poorer mode once its richer one has been silent this
+# long (the richer subscription was dropped)
+_MODE_FALLBACK_SECONDS = 5.0
+
+# Fraction of rings dropped at once when the store is full, so a stream of new
+# symbols does not pay an eviction scan per symbol.
+_EVICT_FRACTION = 0.1
+
+
+def _num(value) -> float:
+    """Coerce a tick field to float, NaN when missing or non-numeric."""
+    if value is None:
+        return _NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def _best_price(levels) -> float:
+    if levels and isinstance(levels, list) and isinstance(levels[0], dict):
+        return _num(levels[0].get("price"))
+    return _NAN
+
+
+class TickRingBuffer:
+    """Fixed-capacity ring of ticks for one symbol.
+
+    Stored as a single (len(COLUMNS), capacity) float64 array so one append is
+    one column write and window queries are plain array slices.
+    """
+
+    __slots__ = ("capacity", "_data", "_head", "_count", "_lock", "last_append", "mode")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.full((len(COLUMNS), capacity), np.nan)
+        self._head = 0  # next write position
+        self._count = 0
+        self._lock = threading.Lock()
+        self.last_append = 0.0
+        # Subscription mode the ring records (see the module docstring)
+        self.mode = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def append(
+        self,
+        ts: float,
+        ltp: float,
+        volume: float,
+        oi: float,
+        bid: float,
+        ask: float,
+        mode: int = 0,
+    ) -> bool:
+        """Append a tick of ``mode``; False when a richer mode is still recording."""
+        with self._lock:
+            if mode < self.mode and ts - self.last_append < _MODE_FALLBACK_SECONDS:
+                return False
+            self.mode = mode
+            self._data[:, self._head] = (ts, ltp, volume, oi, bid, ask)
+            self._head = (self._head + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+            self.last_append = ts
+            return True
+
+    def _ordered(self) -> np.ndarray:
+        """Copy of the stored ticks, oldest first. Caller holds the lock."""
+        if self._count < self.capacity:
+            return self._data[:, : self._count].copy()
+        return np.concatenate((self._data[:, self._head :], self._data[:, : self._head]), axis=1)
+
+    def window(
+        self, seconds: float | None = None, last_n: int | None = None, now: float | None = None
+    ) -> np.ndarray:
+        """Ticks from the last ``seconds`` and/or the last ``last_n`` ticks.
+
+        Returns:
+            (len(COLUMNS), n) array, oldest tick first
+        """
+        with self._lock:
+            data = self._ordered()
+        if seconds is not None:
+            cutoff = (time.time() if now is None else now) - seconds
+            data = data[:, np.searchsorted(data[_TS], cutoff, side="left") :]
+        if last_n is not None:
+            data = data[:, max(data.shape[1] - last_n, 0) :]
+        return data
+
+    def columns(
+        self, seconds: float | None = None, last_n: int | None = None
+    ) -> dict[str, np.ndarray]:
+        """Same as window(), keyed by column name."""
+        data = self.window(seconds, last_n)
+        return {name: data[i] for i, name in enumerate(COLUMNS)}
+
+    def stats(
+        self, seconds: float | None = None, last_n: int | None = None
+    ) -> dict[str, Any] | None:
+        """OHLC, VWAP and traded volume over a window; None when it is empty.
+
+        Tick volume is the broker's cumulative day volume, so traded volume
+        per tick is the positive difference between consecutive ticks. VWAP
+        is None when no volume traded in the window.
+        """
+        data = self.window(seconds, last_n)
+        if data.shape[1] == 0:
+            return None
+        ltp = data[_LTP]
+        priced = ~np.isnan(ltp)
+        if not priced.any():
+            return None
+
+        # Volume traded between consecutive ticks, attributed to the later
+        # tick's price. Resets (negative diffs) and unpriced ticks count as 0.
+        traded = np.diff(data[_VOLUME])
+        traded = np.where(np.isnan(traded) | (traded < 0) | ~priced[1:], 0.0, traded)
+        traded_volume = float(traded.sum())
+        vwap = None
+        if traded_volume > 0:
+            vwap = float(np.dot(np.where(priced[1:], ltp[1:], 0.0), traded) / traded_volume)
+
+        prices = ltp[priced]
+        return {
+            "ticks": int(data.shape[1]),
+            "from_ts": float(data[_TS, 0]),
+            "to_ts": float(data[_TS, -1]),
+            "open": float(prices[0]),
+            "high": float(prices.max()),
+            "low": float(prices.min()),
+            "last": float(prices[-1]),
+            "vwap": vwap,
+            "volume": traded_volume,
+        }
+
+
+class TickHistoryStore:
+    """Per-symbol tick rings with a total memory bound."""
+
+    def __init__(self, capacity: int = TICK_HISTORY_CAPACITY, max_mb: float = TICK_HISTORY_MAX_MB):
+        self.capacity = max(0, capacity)
+        ring_bytes = self.capacity * len(COLUMNS) * 8
+        self.max_symbols = int(max_mb * 1024 * 1024 // ring_bytes) if ring_bytes else 0
+        self._rings: dict[str, TickRingBuffer] = {}
+        self._lock = threading.Lock()  # guards ring creation/eviction only
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_symbols > 0
+
+    def get(self, symbol_key: str) -> TickRingBuffer | None:
+        return self._rings.get(symbol_key)
+
+    def record(
+        self, symbol_key: str, mode: int, market_data: dict[str, Any], ts: float | None = None
+    ):
+        """Append one tick. Called from MarketDataService.process_market_data."""
+        if not self.max_symbols:
+            return
+        ring = self._rings.get(symbol_key)
+        if ring is None:
+            ring = self._create(symbol_key)
+
+        get = market_data.get
+        bid = get("bid", _NAN)
+        ask = get("ask", _NAN)
+        if mode == 3 and "bid" not in market_data:
+            depth = get("depth")
+            if isinstance(depth, dict):
+                buy, sell = depth.get("buy"), depth.get("sell")
+            else:
+                buy, sell = get("bids"), get("asks")
+            bid = _best_price(buy)
+            ask = _best_price(sell)
+
+        values = (get("ltp", _NAN), get("volume", _NAN), get("oi", _NAN), bid, ask)
+        try:
+            ltp, volume, oi, bid, ask = map(float, values)
+        except (TypeError, ValueError):
+            ltp, volume, oi, bid, ask = map(_num, values)
+        ring.append(time.time() if ts is None else ts, ltp, volume, oi, bid, ask, mode)
+
+    def _create(self, symbol_key: str) -> TickRingBuffer:
+        with self._lock:
+            ring = self._rings.get(symbol_key)
+            if ring is not None:
+                return ring
+            if len(self._rings) >= self.max_symbols:
+                # Evict the symbols that have been quiet the longest
+                count = max(1, int(self.max_symbols * _EVICT_FRACTION))
+                victims = sorted(self._rings, key=lambda k: self._rings[k].last_append)[:count]
+                for victim in victims:
+                    del self._rings[victim]
+                self.evictions += len(victims)
+                logger.debug(f"Tick history full, evicted {len(victims)} quiet symbols")
+            ring = self._rings[symbol_key] = TickRingBuffer(self.capacity)
+            return ring
+
+    def discard(self, symbol_key: str | None = None):
+        """Drop one symbol's history, or everything when symbol_key is None."""
+        with self._lock:
+            if symbol_key is None:
+                self._rings.clear()
+            else:
+                self._rings.pop(symbol_key, None)
+
+    def memory_info(self) -> dict[str, Any]:
+        rings = list(self._rings.values())
+        return {
+            "symbols": len(rings),
+            "max_symbols": self.max_symbols,
+            "capacity_per_symbol": self.capacity,
+            "bytes": sum(ring.nbytes for ring in rings),
+            "max_bytes": self.max_symbols * self.capacity * len(COLUMNS) * 8,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,291 @@
+"""
+Webhook Order Scheduler
+
+Orders raised by TradingView and Chartink webhooks are queued here and placed
+in-process through the place order services, on one worker thread so alerts
+keep their arrival order. This replaces a polling thread per blueprint that
+POSTed every order back to the app's own /api/v1 endpoints, paying an HTTP
+round trip, API key check, rate limiter and JSON re-parse per alert.
+
+Pacing is by token bucket, per endpoint and per broker:
+- placeorder: ORDER_RATE_LIMIT (10 per second by default)
+- placesmartorder: WEBHOOK_SMART_ORDER_RATE_LIMIT (1 per second by default).
+  Smart orders size themselves from the position book, so back-to-back smart
+  orders need the gap for the previous fill to show up in it. The bucket is
+  emptied when each smart order returns, so the gap runs from its completion,
+  not its start, however long the broker took.
+- live orders also take a token from their broker's bucket in
+  utils.order_dispatcher, shared with basket, split and multi-leg orders.
+
+Smart orders go first whenever their bucket has a token, as before; a smart
+order waiting for its token no longer holds up regular orders that have one.
+The worker sleeps on a condition variable until an order arrives or the next
+token is due, instead of polling every 100ms.
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from database.auth_db import get_auth_token_broker
+from database.settings_db import get_analyze_mode
+from utils.logging import get_logger
+from utils.order_dispatcher import TokenBucket, get_rate_bucket, parse_rate_limit
+
+logger = get_logger(__name__)
+
+ORDER_RATE_LIMIT = os.getenv("ORDER_RATE_LIMIT", "10 per second")
+WEBHOOK_SMART_ORDER_RATE_LIMIT = os.getenv("WEBHOOK_SMART_ORDER_RATE_LIMIT", "1 per second")
+
+PlaceFunc = Callable[[dict[str, Any]], tuple[bool, dict[str, Any], int]]
+
+
+def place_webhook_order(payload: dict[str, Any]) -> tuple[bool, dict[str, Any], int]:
+    """Validate a webhook payload as /api/v1/placeorder does and place it."""
+    from marshmallow import ValidationError
+
+    from restx_api.schemas import OrderSchema
+    from services.place_order_service import place_order
+
+    try:
+        order_data = OrderSchema().load(payload)
+    except ValidationError as err:
+        return False, {"status": "error", "message": str(err.messages)}, 400
+    return place_order(order_data=order_data, api_key=order_data.get("apikey"))
+
+
+def place_webhook_smart_order(payload: dict[str, Any]) -> tuple[bool, dict[str, Any], int]:
+    """Validate a webhook payload as /api/v1/placesmartorder does and place it."""
+    from marshmallow import ValidationError
+
+    from events import OrderFailedEvent
+    from restx_api.schemas import SmartOrderSchema
+    from services.place_smart_order_service import emit_analyzer_error, place_smart_order
+    from utils.event_bus import bus
+
+    try:
+        order_data = SmartOrderSchema().load(payload)
+    except ValidationError as err:
+        # Logged and shown like an invalid /api/v1/placesmartorder request
+        error_message = str(err.messages)
+        if get_analyze_mode():
+            return False, emit_analyzer_error(payload, error_message), 400
+        error_response = {"status": "error", "message": error_message}
+        bus.publish(OrderFailedEvent(
+            mode="live",
+            api_type="placesmartorder",
+            request_data=payload,
+            response_data=error_response,
+            error_message=error_message,
+        ))
+        return False, error_response, 400
+    api_key = order_data.pop("apikey", None)
+    return place_smart_order(order_data=order_data, api_key=api_key)
+
+
+def broker_rate_key(api_key: str | None) -> str | None:
+    """The broker a live order counts against; None in analyze mode."""
+    if not api_key or get_analyze_mode():
+        return None
+    _, broker = get_auth_token_broker(api_key)
+    return broker
+
+
+class _Endpoint:
+    """One order endpoint: its queue, its token bucket and its counters."""
+
+    def __init__(self, name: str, rate_limit: str, place: PlaceFunc, spaced: bool = False):
+        self.name = name
+        self.rate_limit = rate_limit
+        self.bucket = TokenBucket(*parse_rate_limit(rate_limit))
+        self.place = place
+        # Next token one interval after the previous order completes
+        self.spaced = spaced
+        # Entries are (payload, enqueued_at)
+        self.queue: deque = deque()
+        self.high_water = 0
+        self.enqueued = 0
+        self.placed = 0
+        self.failed = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+
+class WebhookOrderScheduler:
+    """Queues webhook orders and places them in-process, paced per endpoint and broker.
+
+    ``endpoints`` are ``(name, rate_limit, place)`` in priority order: when
+    several endpoints have an order and a token, the first one goes.
+    ``rate_key`` maps an API key to the broker bucket the order counts against.
+    ``spaced`` names the endpoints whose orders are spaced from the previous
+    order's completion rather than its start.
+    """
+
+    def __init__(
+        self,
+        endpoints,
+        rate_key: Callable[[str | None], str | None] | None = None,
+        spaced: tuple[str, ...] = (),
+    ):
+        self._endpoints = {
+            name: _Endpoint(name, rate, place, spaced=name in spaced)
+            for name, rate, place in endpoints
+        }
+        self._rate_key = rate_key
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closing = False
+
+    def submit(self, endpoint: str, payload: dict[str, Any]) -> bool:
+        """Queue an order for ``endpoint``. Returns False once the scheduler is closed."""
+        target = self._endpoints[endpoint]
+        with self._cond:
+            if self._closing:
+                logger.warning(f"Webhook order scheduler closed; dropped {endpoint} order")
+                return False
+            target.queue.append((payload, time.monotonic()))
+            target.enqueued += 1
+            target.high_water = max(target.high_water, len(target.queue))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="webhook-orders", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+        return True
+
+    def _next_ready(self):
+        """The first endpoint with an order and a token, else the seconds until one has.
+
+        Returns ``(endpoint, None)`` or ``(None, delay)``, where delay is None
+        when every queue is empty. Caller holds the condition.
+        """
+        delay = None
+        for endpoint in self._endpoints.values():
+            if not endpoint.queue:
+                continue
+            wait = endpoint.bucket.wait_time()
+            if wait <= 0:
+                return endpoint, None
+            delay = wait if delay is None else min(delay, wait)
+        return None, delay
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    endpoint, delay = self._next_ready()
+                    if endpoint is not None:
+                        break
+                    if delay is None and self._closing:
+                        return
+                    self._cond.wait(delay)
+                payload, enqueued_at = endpoint.queue.popleft()
+                # This thread is the bucket's only consumer, so the token seen
+                # by _next_ready is still there
+                endpoint.bucket.acquire()
+            self._place(endpoint, payload, enqueued_at)
+
+    def _place(self, endpoint: _Endpoint, payload: dict[str, Any], enqueued_at: float) -> None:
+        symbol = payload.get("symbol")
+        strategy = payload.get("strategy")
+        success, response = False, None
+        try:
+            rate_key = self._rate_key(payload.get("apikey")) if self._rate_key else None
+            if rate_key:
+                get_rate_bucket(rate_key).acquire()
+            wait_ms = (time.monotonic() - enqueued_at) * 1000
+            success, response, _ = endpoint.place(dict(payload))
+        except Exception as e:
+            wait_ms = (time.monotonic() - enqueued_at) * 1000
+            logger.exception(f"Error placing {endpoint.name} webhook order for {symbol}: {e}")
+        if endpoint.spaced:
+            endpoint.bucket.drain()
+
+        with self._cond:
+            if success:
+                endpoint.placed += 1
+            else:
+                endpoint.failed += 1
+            endpoint.wait_ms_total += wait_ms
+            endpoint.wait_ms_max = max(endpoint.wait_ms_max, wait_ms)
+
+        if success:
+            logger.info(f"{endpoint.name} order placed for {symbol} in strategy {strategy}")
+        elif response is not None:
+            logger.error(
+                f"Error placing {endpoint.name} order for {symbol}: "
+                f"{response.get('message', response)}"
+            )
+
+    def close(self, timeout: float = 30) -> None:
+        """Stop taking orders and wait up to ``timeout`` for the queued ones to be placed."""
+        with self._cond:
+            self._closing = True
+            pending = sum(len(e.queue) for e in self._endpoints.values())
+            self._cond.notify()
+        if self._thread is not None and self._thread.is_alive():
+            if pending:
+                logger.info(f"Shutting down webhook order scheduler, draining {pending} orders...")
+            self._thread.join(timeout)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Queue depth, wait times and counters per endpoint.
+
+        Wait time is from the webhook queueing the order to the order being
+        handed to the place order service.
+        """
+        now = time.monotonic()
+        with self._cond:
+            stats = {}
+            for name, e in self._endpoints.items():
+                handled = e.placed + e.failed
+                stats[name] = {
+                    "pending": len(e.queue),
+                    "high_water": e.high_water,
+                    "enqueued": e.enqueued,
+                    "placed": e.placed,
+                    "failed": e.failed,
+                    "rate_limit": e.rate_limit,
+                    "avg_wait_ms": round(e.wait_ms_total / handled, 3) if handled else 0.0,
+                    "max_wait_ms": round(e.wait_ms_max, 3),
+                    "oldest_wait_ms": round((now - e.queue[0][1]) * 1000, 3) if e.queue else 0.0,
+                }
+            return stats
+
+
+_scheduler: WebhookOrderScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_webhook_scheduler() -> WebhookOrderScheduler:
+    """The process-wide scheduler for webhook orders, created on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = WebhookOrderScheduler(
+                [
+                    ("placesmartorder", WEBHOOK_SMART_ORDER_RATE_LIMIT, place_webhook_smart_order),
+                    ("placeorder", ORDER_RATE_LIMIT, place_webhook_order),
+                ],
+                rate_key=broker_rate_key,
+                spaced=("placesmartorder",),
+            )
+            atexit.register(_scheduler.close)
+        return _scheduler
+
+
+def queue_webhook_order(endpoint: str, payload: dict[str, Any]) -> bool:
+    """Queue a webhook order; ``endpoint`` is "placesmartorder" or "placeorder"."""
+    if endpoint != "placesmartorder":
+        endpoint = "placeorder"
+    return get_webhook_scheduler().submit(endpoint, payload)
+
+
+def webhook_order_stats() -> dict[str, dict[str, Any]]:
+    """Scheduler stats per endpoint; empty until the first webhook order."""
+    return _scheduler.stats() if _scheduler is not None else {}
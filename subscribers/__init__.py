@@ -11,7 +11,7 @@ from subscribers import (
     whatsapp_subscriber,
     wsproxy_subscriber,
 )
-from utils.event_bus import bus
+from utils.event_bus import PRIORITY_HIGH, PRIORITY_LOW, bus
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -20,6 +20,19 @@ logger = get_logger(__name__)
 def register_all():
     """Register all subscribers to the event bus. Call once at app startup."""
 
+    # --- lanes ---
+    # Each subscriber family runs on its own lane (queue + workers), picked by
+    # the "<lane>:" prefix of its subscription name, so a stalled Telegram or
+    # WhatsApp API can only back up and shed alerts - never the order-update
+    # relay, the UI refresh or the order log. The websocket relay gets one
+    # dedicated worker: it is latency-critical, and a single worker keeps
+    # updates for an order in the order they happened.
+    bus.add_lane("wsproxy", workers=1)
+    bus.add_lane("socketio", workers=2)
+    bus.add_lane("log", workers=2)
+    bus.add_lane("telegram", workers=2, max_pending=500)
+    bus.add_lane("whatsapp", workers=2, max_pending=500)
+
     # --- order.placed ---
     bus.subscribe("order.placed", log_subscriber.on_order_placed, "log:order_placed")
     bus.subscribe("order.placed", socketio_subscriber.on_order_placed, "socketio:order_placed")
@@ -73,8 +86,20 @@ def register_all():
     # API call — like sandbox.order_filled below, only socketio + the new
     # ZMQ relay are wired; there's no request/response pair for order_logs
     # or analyzer_logs to record, and it would be noise on Telegram.
-    bus.subscribe("order.update", socketio_subscriber.on_order_update, "socketio:order_update")
-    bus.subscribe("order.update", wsproxy_subscriber.on_order_update, "wsproxy:order_update")
+    # High priority: a fill or rejection must reach the UI ahead of queued
+    # refreshes, and is the last thing a full lane sheds.
+    bus.subscribe(
+        "order.update",
+        socketio_subscriber.on_order_update,
+        "socketio:order_update",
+        priority=PRIORITY_HIGH,
+    )
+    bus.subscribe(
+        "order.update",
+        wsproxy_subscriber.on_order_update,
+        "wsproxy:order_update",
+        priority=PRIORITY_HIGH,
+    )
 
     # --- position.closed ---
     bus.subscribe("position.closed", log_subscriber.on_position_closed, "log:position_closed")
@@ -137,20 +162,20 @@ def register_all():
     # Only the socketio subscriber is wired — these are engine-driven state
     # changes, not user API calls, so they don't belong in analyzer_logs and
     # would be noise on telegram.
-    bus.subscribe(
-        "sandbox.order_filled",
-        socketio_subscriber.on_sandbox_order_filled,
-        "socketio:sandbox_order_filled",
-    )
-    bus.subscribe(
-        "sandbox.auto_squareoff",
-        socketio_subscriber.on_sandbox_auto_squareoff,
-        "socketio:sandbox_auto_squareoff",
-    )
-    bus.subscribe(
-        "sandbox.t1_settlement",
-        socketio_subscriber.on_sandbox_t1_settlement,
-        "socketio:sandbox_t1_settlement",
-    )
+    # Each emits the same analyzer_update that makes the UI refetch, so a
+    # queued call covers any that arrive before it runs: coalesced, and shed
+    # first when the socketio lane is full.
+    for _topic, _handler in (
+        ("sandbox.order_filled", socketio_subscriber.on_sandbox_order_filled),
+        ("sandbox.auto_squareoff", socketio_subscriber.on_sandbox_auto_squareoff),
+        ("sandbox.t1_settlement", socketio_subscriber.on_sandbox_t1_settlement),
+    ):
+        bus.subscribe(
+            _topic,
+            _handler,
+            f"socketio:{_topic.split('.', 1)[1]}",
+            priority=PRIORITY_LOW,
+            coalesce=True,
+        )
 
     logger.debug("EventBus: all subscribers registered")
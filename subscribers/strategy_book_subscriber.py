@@ -150,8 +150,11 @@ def on_order_update(event) -> None:
 
 def register(bus) -> None:
     """Attach both handlers. Called once during app startup."""
-    bus.subscribe("order.placed", on_order_placed, name="StrategyBookTagger")
-    bus.subscribe("order.update", on_order_update, name="StrategyBookFills")
+    # One dedicated worker: fills for a strategy are applied one at a time, in
+    # the order they were published
+    bus.add_lane("strategy_book", workers=1)
+    bus.subscribe("order.placed", on_order_placed, name="StrategyBookTagger", lane="strategy_book")
+    bus.subscribe("order.update", on_order_update, name="StrategyBookFills", lane="strategy_book")
     # Batch nodes suppress per-leg order.placed, so their legs are tagged from
     # the single completion event each publishes.
     for topic in (
@@ -160,5 +163,7 @@ def register(bus) -> None:
         "split.completed",
         "options.completed",
     ):
-        bus.subscribe(topic, on_batch_completed, name="StrategyBookBatchTagger")
+        bus.subscribe(
+            topic, on_batch_completed, name="StrategyBookBatchTagger", lane="strategy_book"
+        )
     logger.debug("Strategy book subscriber registered")
@@ -0,0 +1,186 @@
+"""One polling cycle applies all of its fills in a single transaction.
+
+Per-order mode commits the trade and order, then the position, then each
+margin release - several SQLite transactions per fill, so a cycle filling 150
+orders ran 300+ commits. The batched cycle flushes per fill and commits once,
+while every fill still publishes its own events in fill order.
+"""
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+import pytz
+from sqlalchemy import event
+
+from database.sandbox_db import (
+    SandboxFunds,
+    SandboxOrders,
+    SandboxPositions,
+    SandboxTrades,
+    db_session,
+)
+from sandbox.execution_engine import ExecutionEngine
+from sandbox.fund_manager import FundManager
+
+IST = pytz.timezone("Asia/Kolkata")
+USER = "batched-fills-user"
+STRATEGY = "batched-fills"
+
+
+def _cleanup():
+    SandboxTrades.query.filter_by(user_id=USER).delete()
+    SandboxOrders.query.filter_by(user_id=USER).delete()
+    SandboxPositions.query.filter_by(user_id=USER).delete()
+    SandboxFunds.query.filter_by(user_id=USER).delete()
+    db_session.commit()
+
+
+@pytest.fixture
+def book():
+    """Seed resting LIMIT orders with their margin blocked, as placement does."""
+    _cleanup()
+    FundManager(USER).initialize_funds()
+
+    def _seed(specs):
+        now = datetime.now(IST)
+        orderids = []
+        for action, quantity, price, margin in specs:
+            if margin:
+                ok, message = FundManager(USER).block_margin(margin)
+                assert ok, message
+            orderid = uuid.uuid4().hex[:14]
+            db_session.add(
+                SandboxOrders(
+                    orderid=orderid,
+                    user_id=USER,
+                    symbol="RELIANCE",
+                    exchange="NSE",
+                    action=action,
+                    quantity=quantity,
+                    price=price,
+                    trigger_price=0,
+                    price_type="LIMIT",
+                    product="MIS",
+                    order_status="open",
+                    average_price=0,
+                    filled_quantity=0,
+                    pending_quantity=quantity,
+                    margin_blocked=Decimal(str(margin)),
+                    strategy=STRATEGY,
+                    order_timestamp=now,
+                    update_timestamp=now,
+                )
+            )
+            db_session.commit()
+            orderids.append(orderid)
+        return orderids
+
+    yield _seed
+
+    db_session.rollback()
+    _cleanup()
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """A batching engine quoting RELIANCE at 100, recording what it publishes."""
+    monkeypatch.setattr(
+        ExecutionEngine,
+        "_fetch_quotes_batch",
+        lambda self, syms: {s: {"ltp": 100, "bid": 0, "ask": 0} for s in syms},
+    )
+    monkeypatch.setattr(ExecutionEngine, "_check_pending_gtts", lambda self: None)
+    published = []
+    monkeypatch.setattr(
+        ExecutionEngine,
+        "_publish_fill_event",
+        lambda self, **kwargs: published.append(kwargs["orderid"]),
+    )
+    engine = ExecutionEngine()
+    engine.batch_fills = True
+    engine.published = published
+    return engine
+
+
+@pytest.fixture
+def commits():
+    """Count sandbox-session commits made while the test runs."""
+    count = []
+    session = db_session()
+
+    def _on_commit(_session):
+        count.append(1)
+
+    event.listen(session, "after_commit", _on_commit)
+    yield count
+    event.remove(session, "after_commit", _on_commit)
+
+
+def test_cycle_commits_once_and_publishes_every_fill(book, engine, commits):
+    """Opens, adds to and closes one position in a single commit."""
+    orderids = book(
+        [
+            ("BUY", 2, 101, 202),
+            ("BUY", 3, 102, 306),
+            ("SELL", 5, 99, 0),
+        ]
+    )
+    commits.clear()
+
+    engine.check_and_execute_pending_orders()
+
+    assert len(commits) == 1
+    assert [o for o in engine.published if o in orderids] == orderids
+
+    statuses = {
+        o.orderid: o.order_status for o in SandboxOrders.query.filter_by(user_id=USER)
+    }
+    assert set(statuses.values()) == {"complete"}
+    assert SandboxTrades.query.filter_by(user_id=USER).count() == 3
+
+    # The second BUY must have found the position the first one added in the
+    # same transaction, not created a duplicate.
+    positions = SandboxPositions.query.filter_by(user_id=USER).all()
+    assert len(positions) == 1
+    assert positions[0].quantity == 0
+
+    # The close released all 508 of margin through the staged path, and the
+    # realized P&L (5 @ 99 against an average of 101.6) landed with it.
+    funds = SandboxFunds.query.filter_by(user_id=USER).first()
+    assert funds.used_margin == Decimal("0")
+    assert funds.realized_pnl == Decimal("-13.00")
+
+
+def test_failed_fill_replays_the_cycle_per_order(book, engine, monkeypatch):
+    """One bad order is rejected alone; the rest of the cycle still fills."""
+    good, bad = book([("BUY", 1, 101, 101), ("BUY", 1, 101, 101)])
+
+    real_update = ExecutionEngine._update_position
+
+    def flaky_update(self, order, execution_price):
+        if order.orderid == bad:
+            raise RuntimeError("position write failed")
+        return real_update(self, order, execution_price)
+
+    monkeypatch.setattr(ExecutionEngine, "_update_position", flaky_update)
+
+    engine.check_and_execute_pending_orders()
+
+    # Events from the rolled-back batch attempt are never published.
+    assert [o for o in engine.published if o in (good, bad)] == [good]
+    assert SandboxOrders.query.filter_by(orderid=good).first().order_status == "complete"
+    assert SandboxOrders.query.filter_by(orderid=bad).first().order_status == "rejected"
+
+
+def test_cycle_does_not_yield_inside_its_transaction(book, engine, monkeypatch):
+    """A yield with sandbox.db's write lock held stalls eventlet writers."""
+    book([("BUY", 1, 101, 101)] * (engine.order_rate_limit + 1))
+    sleeps = []
+    monkeypatch.setattr("sandbox.execution_engine.time.sleep", sleeps.append)
+
+    engine.check_and_execute_pending_orders()
+
+    assert sleeps == []
+    assert SandboxTrades.query.filter_by(user_id=USER).count() == engine.order_rate_limit + 1
@@ -0,0 +1,98 @@
+"""Fills on one position from concurrent threads all land in it.
+
+Analyze-mode split and basket orders place their legs concurrently, and a
+MARKET leg fills inside sandbox_place_order. Each fill reads the position row,
+then inserts or updates it; unserialized, two fills both found no row, both
+inserted, and unique_position rejected one - its trade stayed recorded with no
+position behind it.
+"""
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+import pytz
+
+from database.sandbox_db import (
+    SandboxFunds,
+    SandboxOrders,
+    SandboxPositions,
+    SandboxTrades,
+    db_session,
+)
+from sandbox.execution_engine import ExecutionEngine
+from sandbox.fund_manager import FundManager
+from utils.order_dispatcher import dispatch
+
+IST = pytz.timezone("Asia/Kolkata")
+USER = "concurrent-fills-user"
+
+
+def _cleanup():
+    SandboxTrades.query.filter_by(user_id=USER).delete()
+    SandboxOrders.query.filter_by(user_id=USER).delete()
+    SandboxPositions.query.filter_by(user_id=USER).delete()
+    SandboxFunds.query.filter_by(user_id=USER).delete()
+    db_session.commit()
+
+
+@pytest.fixture
+def orderids(monkeypatch):
+    """Ten 10-qty MARKET BUYs on one position, ready to fill."""
+    monkeypatch.setattr(ExecutionEngine, "_publish_fill_event", lambda self, **kwargs: None)
+    monkeypatch.setattr(ExecutionEngine, "_after_position_update", lambda self, *args: None)
+    _cleanup()
+    FundManager(USER).initialize_funds()
+    now = datetime.now(IST)
+    ids = []
+    for _ in range(10):
+        orderid = uuid.uuid4().hex[:14]
+        db_session.add(
+            SandboxOrders(
+                orderid=orderid,
+                user_id=USER,
+                symbol="ZEEL",
+                exchange="NSE",
+                action="BUY",
+                quantity=10,
+                price=0,
+                trigger_price=0,
+                price_type="MARKET",
+                product="MIS",
+                order_status="open",
+                average_price=0,
+                filled_quantity=0,
+                pending_quantity=10,
+                margin_blocked=Decimal("200.00"),
+                order_timestamp=now,
+                update_timestamp=now,
+            )
+        )
+        ids.append(orderid)
+    db_session.commit()
+
+    yield ids
+
+    db_session.rollback()
+    _cleanup()
+
+
+def _fill(orderid):
+    try:
+        order = SandboxOrders.query.filter_by(orderid=orderid).one()
+        ExecutionEngine()._execute_order(order, Decimal("100.00"))
+        return order.order_status
+    finally:
+        db_session.remove()
+
+
+def test_concurrent_fills_on_one_symbol_sum_into_one_position(orderids):
+    statuses = dispatch([[lambda orderid=orderid: _fill(orderid) for orderid in orderids]])
+
+    assert statuses == ["complete"] * 10
+    positions = SandboxPositions.query.filter_by(user_id=USER).all()
+    assert len(positions) == 1
+    assert positions[0].quantity == 100
+    assert positions[0].margin_blocked == Decimal("2000.00")
+    assert SandboxTrades.query.filter_by(user_id=USER).count() == 10
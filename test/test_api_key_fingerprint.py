@@ -0,0 +1,103 @@
+"""Indexed API key verification.
+
+verify_api_key looks up the one api_keys row whose HMAC fingerprint matches
+the presented key and Argon2-verifies only that hash, instead of trying every
+stored hash. Keys stored before the fingerprint column existed are still found
+(by trying the rows without a fingerprint) and get their fingerprint recorded
+on first use.
+"""
+
+import atexit
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PasswordHasher = pytest.importorskip("argon2").PasswordHasher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Env must be set before importing auth_db (engine + PEPPER bind at import time).
+TEST_DB = Path(__file__).resolve().parents[1] / "tmp" / "test_api_key_fingerprint.db"
+TEST_DB.parent.mkdir(parents=True, exist_ok=True)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TEST_DB.as_posix()}")
+os.environ.setdefault("API_KEY_PEPPER", "a" * 64)
+atexit.register(lambda: TEST_DB.unlink(missing_ok=True))
+
+import database.auth_db as auth_db  # noqa: E402
+
+
+@pytest.fixture()
+def api_keys(monkeypatch):
+    auth_db.init_db()
+    auth_db.ApiKeys.query.delete()
+    auth_db.db_session.commit()
+    auth_db.verified_api_key_cache.clear()
+    auth_db.invalid_api_key_cache.clear()
+
+    verified = []
+
+    class CountingHasher(PasswordHasher):
+        def verify(self, hash, password):
+            verified.append(hash)
+            return super().verify(hash, password)
+
+    monkeypatch.setattr(auth_db, "ph", CountingHasher())
+    monkeypatch.setattr(
+        "database.traffic_db.InvalidAPIKeyTracker.track_invalid_api_key",
+        lambda ip, key_hash=None: None,
+    )
+    for n in range(5):
+        auth_db.upsert_api_key(f"user{n}", f"key-{n}")
+    verified.clear()
+    yield verified
+    auth_db.ApiKeys.query.delete()
+    auth_db.db_session.commit()
+
+
+def test_one_argon2_check_per_key(api_keys):
+    assert auth_db.verify_api_key("key-3") == "user3"
+    assert len(api_keys) == 1
+
+    # A wrong key matches no fingerprint: no Argon2 work at all
+    assert auth_db.verify_api_key("not-a-key") is None
+    assert len(api_keys) == 1
+
+
+def test_regenerated_key_replaces_the_fingerprint(api_keys):
+    auth_db.upsert_api_key("user2", "key-2b")
+    assert auth_db.verify_api_key("key-2") is None
+    assert auth_db.verify_api_key("key-2b") == "user2"
+
+
+def test_legacy_key_is_backfilled_on_first_use(api_keys):
+    row = auth_db.ApiKeys.query.filter_by(user_id="user4").first()
+    row.api_key_fingerprint = None
+    auth_db.db_session.commit()
+
+    assert auth_db.verify_api_key("key-4") == "user4"
+    assert auth_db.ApiKeys.query.filter_by(user_id="user4").first().api_key_fingerprint == (
+        auth_db.api_key_fingerprint("key-4")
+    )
+
+    auth_db.verified_api_key_cache.clear()
+    api_keys.clear()
+    assert auth_db.verify_api_key("key-4") == "user4"
+    assert len(api_keys) == 1
+
+
+def test_init_db_adds_the_column_to_an_old_table(api_keys):
+    from sqlalchemy import inspect, text
+
+    with auth_db.engine.connect() as conn:
+        conn.execute(text("DROP INDEX idx_api_keys_fingerprint"))
+        conn.execute(text("ALTER TABLE api_keys DROP COLUMN api_key_fingerprint"))
+        conn.commit()
+
+    auth_db.init_db()
+    inspector = inspect(auth_db.engine)
+    assert "api_key_fingerprint" in {c["name"] for c in inspector.get_columns("api_keys")}
+    assert "idx_api_keys_fingerprint" in {i["name"] for i in inspector.get_indexes("api_keys")}
+    # Existing keys are NULL until used, and still verify
+    assert auth_db.verify_api_key("key-1") == "user1"
@@ -150,3 +150,105 @@ def test_registry_does_not_retain_idle_workflows(flow_locks):
 
     retained = [wid for wid in range(9000, 9200) if wid in flow_locks._workflow_locks]
     assert not retained, f"{len(retained)} idle workflow locks were retained"
+
+
+# --- Lanes, priorities and coalescing ---------------------------------------
+
+
+def _drain(bus):
+    for lane in bus._lanes.values():
+        lane.executor.shutdown(wait=True)
+
+
+def test_a_stalled_lane_does_not_shed_another_lanes_work():
+    """A hung alert API fills its own lane; the order-update relay still runs."""
+    bus = EventBus(workers=2, max_pending=10)
+    bus.add_lane("telegram", workers=1, max_pending=5)
+    bus.add_lane("wsproxy", workers=1, max_pending=100)
+    gate = _Gate()
+    relayed = []
+    bus.subscribe("order.update", gate, "telegram:order_update")
+    bus.subscribe("order.update", relayed.append, "wsproxy:order_update")
+
+    try:
+        for _ in range(100):
+            bus.publish(Event(topic="order.update"))
+        deadline = time.monotonic() + 5
+        while len(relayed) < 100 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        stats = bus.stats()
+        assert len(relayed) == 100, stats["lanes"]["wsproxy"]
+        assert stats["lanes"]["wsproxy"]["dropped"] == 0
+        assert stats["lanes"]["telegram"]["dropped"] == 95
+        assert stats["subscribers"]["telegram:order_update"]["dropped"] == 95
+    finally:
+        gate.release.set()
+        _drain(bus)
+
+
+def test_a_full_lane_sheds_low_priority_work_first():
+    from utils.event_bus import PRIORITY_HIGH, PRIORITY_LOW
+
+    bus = EventBus(workers=1, max_pending=4)
+    gate = _Gate()
+    ran = []
+    bus.subscribe("block", gate)
+    bus.subscribe("refresh", lambda e: ran.append("refresh"), priority=PRIORITY_LOW)
+    bus.subscribe("fill", lambda e: ran.append("fill"), priority=PRIORITY_HIGH)
+
+    bus.publish(Event(topic="block"))
+    assert gate.started.acquire(timeout=5)
+    for _ in range(3):
+        bus.publish(Event(topic="refresh"))
+    # Full: each fill displaces a queued refresh rather than being dropped
+    bus.publish(Event(topic="fill"))
+    bus.publish(Event(topic="fill"))
+
+    gate.release.set()
+    _drain(bus)
+    # High priority runs first
+    assert ran == ["fill", "fill", "refresh"]
+    stats = bus.stats()
+    assert stats["dropped"] == 2 and stats["pending"] == 0
+    assert stats["subscribers"]["<lambda>"]["dropped"] == 2
+
+
+def test_coalesced_subscriber_runs_once_with_the_latest_event():
+    bus = EventBus(workers=1, max_pending=100)
+    gate = _Gate()
+    seen = []
+    bus.subscribe("block", gate)
+    bus.subscribe("refresh", lambda e: seen.append(e.topic), name="ui", coalesce=True)
+
+    bus.publish(Event(topic="block"))
+    assert gate.started.acquire(timeout=5)
+    for _ in range(20):
+        bus.publish(Event(topic="refresh"))
+
+    gate.release.set()
+    _drain(bus)
+    assert seen == ["refresh"]
+    ui = bus.stats()["subscribers"]["ui"]
+    assert ui["delivered"] == 1 and ui["coalesced"] == 19 and ui["queued"] == 0
+
+
+def test_subscriber_stats_report_latency_and_failures():
+    bus = EventBus(workers=1, max_pending=10)
+
+    def slow(event):
+        time.sleep(0.02)
+
+    def boom(event):
+        raise RuntimeError("subscriber blew up")
+
+    bus.subscribe("t", slow, "slow")
+    bus.subscribe("t", boom, "boom")
+    for _ in range(3):
+        bus.publish(Event(topic="t"))
+    _drain(bus)
+
+    stats = bus.stats()["subscribers"]
+    assert stats["slow"]["delivered"] == 3 and stats["slow"]["avg_latency_ms"] >= 20
+    assert stats["slow"]["max_latency_ms"] >= stats["slow"]["avg_latency_ms"]
+    assert stats["boom"]["failed"] == 3
@@ -0,0 +1,162 @@
+"""Flow price alerts driven by the live tick feed.
+
+The monitor polled a REST quote per alert every 5 seconds. Ticks now arrive
+from the WebSocket proxy and each one evaluates only the alerts whose price
+level it crossed, found by bisecting a sorted per-symbol index; the poll loop
+is left pricing stale symbols, one quote per symbol.
+"""
+
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.flow_price_monitor_service as fpm  # noqa: E402
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    """The monitor with no thread, no feed connection and runs recorded, not queued."""
+    monitor = fpm.get_flow_price_monitor()
+    monitor._alerts.clear()
+    monitor._index.clear()
+    monkeypatch.setattr(monitor, "_start_monitoring", lambda: None)
+    monkeypatch.setattr(monitor, "_stop_monitoring", lambda: None)
+    monkeypatch.setattr(monitor, "_feed", None)
+
+    monitor.fired = []
+    monkeypatch.setattr(
+        monitor, "_trigger_workflow", lambda alert, price: monitor.fired.append(alert.workflow_id)
+    )
+
+    evaluated = []
+    evaluate = monitor._evaluate_condition
+
+    def counting_evaluate(alert, price):
+        evaluated.append(alert.workflow_id)
+        return evaluate(alert, price)
+
+    monkeypatch.setattr(monitor, "_evaluate_condition", counting_evaluate)
+    monitor.evaluated = evaluated
+
+    yield monitor
+    monitor._alerts.clear()
+    monitor._index.clear()
+
+
+def _arm(monitor, workflow_id, target, condition="above", symbol="SBIN", trigger="once"):
+    monitor.add_alert(
+        workflow_id=workflow_id,
+        symbol=symbol,
+        exchange="NSE",
+        condition=condition,
+        target_price=target,
+        api_key="k",
+        trigger=trigger,
+    )
+    return monitor.get_alert(workflow_id)
+
+
+def _tick(monitor, price, symbol="SBIN"):
+    monitor.evaluated.clear()
+    monitor._on_tick({"symbol": symbol, "exchange": "NSE", "data": {"ltp": price}})
+
+
+def test_a_tick_evaluates_only_the_alerts_whose_level_it_crossed(monitor):
+    for n in range(100):
+        _arm(monitor, n, 100.5 + n, condition="crosses_above")
+
+    # The first price evaluates every alert: those already above their level fire
+    _tick(monitor, 150.0)
+    assert len(monitor.evaluated) == 100
+    assert sorted(monitor.fired) == list(range(50))
+
+    _tick(monitor, 152.0)
+    assert sorted(monitor.evaluated) == [50, 51]
+    assert sorted(monitor.fired) == list(range(52))
+
+    _tick(monitor, 152.4)
+    _tick(monitor, 151.9)
+    assert monitor.evaluated == []
+
+
+def test_every_time_alert_fires_on_each_entry_not_each_tick(monitor):
+    _arm(monitor, 1, 100.0, trigger="every_time")
+
+    for price in (99.0, 101.0, 102.0, 103.0, 99.5, 100.5):
+        _tick(monitor, price)
+
+    assert monitor.fired == [1, 1]
+
+
+def test_a_rearmed_one_shot_is_evaluated_by_the_next_tick(monitor):
+    alert = _arm(monitor, 1, 100.0)
+    _tick(monitor, 101.0)
+    assert monitor.fired == [1] and alert.triggered
+
+    # The run did not execute; the condition still holds at the next tick
+    monitor._rearm(alert)
+    _tick(monitor, 101.5)
+    assert monitor.fired == [1, 1]
+
+
+def test_removed_and_replaced_alerts_leave_no_levels_behind(monitor):
+    _arm(monitor, 1, 100.0)
+    _arm(monitor, 1, 200.0)
+    _arm(monitor, 2, 150.0, condition="inside_channel")
+    monitor.remove_alert(2)
+
+    assert monitor._index["NSE:SBIN"].levels == [(200.0, 1)]
+    monitor.remove_alert(1)
+    assert "NSE:SBIN" not in monitor._index
+
+
+def test_stale_symbols_are_priced_by_one_quote_each(monitor, monkeypatch):
+    quotes = []
+
+    class FakeClient:
+        def get_quotes(self, symbol, exchange):
+            quotes.append(symbol)
+            return {"status": "success", "data": {"ltp": 50.0}}
+
+    monkeypatch.setattr(fpm, "get_flow_client", lambda api_key: FakeClient())
+    for n in range(3):
+        _arm(monitor, n, 100.0 + n)
+    for n in range(3, 5):
+        _arm(monitor, n, 100.0 + n, symbol="INFY")
+    _arm(monitor, 5, 1.0, condition="moving_up_percent", symbol="INFY")
+    monitor.get_alert(5).percentage = 1.0
+
+    # No feed: one quote per symbol, not per alert
+    monitor._check_all_alerts()
+    assert sorted(quotes) == ["INFY", "SBIN"]
+    assert monitor.get_alert(5).last_price == 50.0
+
+    # Both symbols ticking: nothing to fetch, and the relative alert is
+    # evaluated at the poll against the latest tick
+    monkeypatch.setattr(monitor, "_feed", types.SimpleNamespace(connected=True))
+    _tick(monitor, 60.0)
+    _tick(monitor, 51.0, symbol="INFY")
+    quotes.clear()
+    monitor._check_all_alerts()
+    assert quotes == []
+    assert monitor.fired == [5]
+
+
+def test_removing_the_last_alert_disconnects_the_feed_outside_the_lock(monitor, monkeypatch):
+    _arm(monitor, 1, 100.0)
+    held = []
+    feed = types.SimpleNamespace(disconnect=lambda: held.append(monitor._alerts_lock._is_owned()))
+    stop = types.MethodType(fpm.FlowPriceMonitor._stop_monitoring, monitor)
+    monkeypatch.setattr(monitor, "_stop_monitoring", stop)
+    monkeypatch.setattr(monitor, "_running", True)
+    monkeypatch.setattr(monitor, "_stop_event", fpm.threading.Event())
+    monkeypatch.setattr(monitor, "_monitor_thread", None)
+    monkeypatch.setattr(monitor, "_feed", feed)
+
+    monitor.remove_alert(1)
+    assert held == [False]
+    assert monitor._feed is None
@@ -0,0 +1,154 @@
+"""Vectorized F&O filters and option chains behind BrokerSymbolCache.
+
+fno_search_symbols filters NumPy columns instead of walking rows, and a single
+chain is a strike-sorted slice. Results, and their order, must be what the
+row-by-row filter returned; get_option_chain returns one chain per call.
+"""
+
+import math
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from database.token_db_enhanced import BrokerSymbolCache, SymbolData
+
+
+def _rows():
+    rows = []
+    token = 1000
+    for underlying, exchange in (("NIFTY", "NFO"), ("BANKNIFTY", "NFO"), ("SENSEX", "BFO")):
+        for expiry in ("28MAR24", "25APR24"):
+            expiry_db = f"{expiry[:2]}-{expiry[2:5]}-{expiry[5:]}"
+            rows.append(
+                SymbolData(
+                    f"{underlying}{expiry}FUT", f"{underlying}{expiry}F", underlying,
+                    exchange, exchange, str(token), expiry=expiry_db, strike=-1.0,
+                )
+            )
+            token += 1
+            # Listed out of strike order, PE before CE, like a broker master
+            for strike in (22100, 21900, 22000, 21950.5):
+                for kind in ("PE", "CE"):
+                    rows.append(
+                        SymbolData(
+                            f"{underlying}{expiry}{strike}{kind}", f"{underlying}{strike}{kind}",
+                            underlying, exchange, exchange, str(token), expiry=expiry_db,
+                            strike=float(strike), lotsize=25, instrumenttype="OPTIDX",
+                        )
+                    )
+                    token += 1
+    rows += [
+        # A strike listed on one side only
+        SymbolData("NIFTY28MAR2422200CE", "N22200CE", "NIFTY", "NFO", "NFO", "9000",
+                   expiry="28-MAR-24", strike=22200.0),
+        SymbolData("BTCUSD.P", "BTCUSD", "BTCUSD", "CRYPTO", "DELTA", "139",
+                   instrumenttype="PERPFUT"),
+        SymbolData("RELIANCE", "RELIANCE-EQ", "RELIANCE INDUSTRIES", "NSE", "NSE", "2885"),
+    ]
+    return rows
+
+
+@pytest.fixture
+def cache():
+    cache = BrokerSymbolCache()
+    cache._load_records(_rows())
+    return cache
+
+
+def _reference(cache, query=None, exchange=None, expiry=None, instrumenttype=None,
+               strike_min=None, strike_max=None, underlying=None, limit=10000):
+    """The row-by-row filter fno_search_symbols used to run."""
+    terms = query.upper().split() if query else []
+    nums = []
+    for term in terms:
+        try:
+            nums.append(float(term))
+        except ValueError:
+            pass
+    ids = cache.ids_by_exchange.get(exchange) if exchange else None
+    ids = ids if ids is not None else cache._state.unique_ids
+    inst_type = instrumenttype.upper() if instrumenttype else None
+
+    matches = []
+    for row in ids.tolist():
+        s = cache._row(cache.store, row)
+        strike = math.nan if s.strike is None else s.strike
+        if underlying and s.underlying != underlying.upper():
+            continue
+        if expiry and s.expiry != expiry:
+            continue
+        if inst_type in ("CE", "PE", "FUT") and not s.symbol.upper().endswith(inst_type):
+            continue
+        if inst_type == "PERPFUT" and (s.instrumenttype or "").upper() != "PERPFUT":
+            continue
+        if strike_min is not None and not strike >= strike_min:
+            continue
+        if strike_max is not None and not strike <= strike_max:
+            continue
+        if terms:
+            ok = all(
+                t in s.symbol.upper() or t in s.brsymbol.upper()
+                or (s.name and t in s.name.upper()) or t in s.token
+                for t in terms
+            )
+            if not ok and not (s.strike and s.strike in nums):
+                continue
+        matches.append(s)
+    first = terms[0] if terms else None
+    matches.sort(
+        key=lambda s: (
+            0 if first and s.underlying == first else 1,
+            0 if first and s.underlying and s.underlying.startswith(first) else 1,
+            0 if first and s.symbol.upper().startswith(first) else 1,
+            s.symbol,
+        )
+    )
+    return matches[:limit]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"exchange": "NFO", "underlying": "NIFTY", "expiry": "28-MAR-24", "instrumenttype": "CE"},
+        {"exchange": "NFO", "underlying": "nifty", "expiry": "28-MAR-24", "instrumenttype": "pe",
+         "strike_min": 21950, "strike_max": 22100},
+        {"exchange": "NFO", "underlying": "NIFTY", "expiry": "28-MAR-24", "instrumenttype": "CE",
+         "strike_min": 30000},
+        {"exchange": "NFO", "underlying": "NIFTY", "expiry": "28-MAR-24"},
+        {"exchange": "NFO", "instrumenttype": "FUT"},
+        {"exchange": "BFO", "strike_min": 22000},
+        {"instrumenttype": "PERPFUT"},
+        {"instrumenttype": "OPTIDX", "exchange": "NFO"},
+        {"underlying": "SENSEX", "query": "22000"},
+        {"exchange": "NFO", "query": "BANKNIFTY CE", "limit": 3},
+        {"exchange": "MCX", "underlying": "NIFTY"},
+        {"underlying": "GOLD", "expiry": "28-MAR-24", "exchange": "NFO", "instrumenttype": "CE"},
+        {"strike_max": 1e9},
+        {},
+    ],
+)
+def test_filters_match_row_by_row(cache, filters):
+    assert cache.fno_search_symbols(**filters) == _reference(cache, **filters)
+
+
+def test_whole_chain(cache):
+    chain = cache.get_option_chain("NIFTY", "28-MAR-24", "NFO")
+    assert [row["strike"] for row in chain] == [21900.0, 21950.5, 22000.0, 22100.0, 22200.0]
+    assert chain[0]["ce"].symbol == "NIFTY28MAR2421900CE"
+    assert chain[0]["pe"].symbol == "NIFTY28MAR2421900PE"
+    assert chain[0]["pe"].lotsize == 25
+    assert chain[-1]["pe"] is None
+
+    window = cache.get_option_chain("nifty", "28-MAR-24", "NFO", strike_min=21950.5, strike_max=22100)
+    assert [row["strike"] for row in window] == [21950.5, 22000.0, 22100.0]
+
+    assert cache.get_option_chain("NIFTY", "28-MAR-24", "BFO") == []
+    assert cache.get_option_chain("NIFTY", "30-MAR-24", "NFO") == []
+
+
+def test_chain_survives_clear(cache):
+    cache.clear_cache()
+    assert cache.fno_index is None
+    assert cache.get_option_chain("NIFTY", "28-MAR-24", "NFO") == []
+    assert cache.fno_search_symbols(exchange="NFO") == []
@@ -0,0 +1,95 @@
+"""Historify's process-wide DuckDB connection manager.
+
+``get_connection`` used to open the database file on every call, which paid
+connection setup each time and dropped DuckDB's buffer cache whenever the last
+connection closed. The database is now opened once: writes are serialized
+through one writer cursor, reads get their own cursors and run concurrently.
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+import database.historify_db as historify_db
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(historify_db, "HISTORIFY_DB_PATH", str(tmp_path / "historify.duckdb"))
+    manager = historify_db._ConnectionManager()
+    monkeypatch.setattr(historify_db, "_manager", manager)
+    with historify_db.get_connection() as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+    yield manager
+    manager.close()
+
+
+def test_database_is_opened_once(manager):
+    for i in range(5):
+        with historify_db.get_connection() as conn:
+            conn.execute("INSERT INTO t VALUES (?)", [i])
+        with historify_db.get_read_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == i + 1
+
+    stats = historify_db.get_connection_stats()
+    assert stats["opens"] == 1
+    assert stats["writes"] == 6
+    assert stats["reads"] == 5
+    assert stats["active_reads"] == 0
+
+
+def test_writes_are_serialized_and_wait_is_measured(manager):
+    inside = threading.Event()
+
+    def slow_writer():
+        with historify_db.get_connection():
+            inside.set()
+            time.sleep(0.2)
+
+    thread = threading.Thread(target=slow_writer)
+    thread.start()
+    inside.wait(1)
+
+    with historify_db.get_connection() as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+    thread.join()
+
+    assert historify_db.get_connection_stats()["write_wait_max_ms"] >= 100
+
+
+def test_reads_do_not_wait_for_a_write(manager):
+    inside = threading.Event()
+    release = threading.Event()
+
+    def held_writer():
+        with historify_db.get_connection():
+            inside.set()
+            release.wait(2)
+
+    thread = threading.Thread(target=held_writer)
+    thread.start()
+    inside.wait(1)
+    try:
+        start = time.perf_counter()
+        with historify_db.get_read_connection() as conn:
+            conn.execute("SELECT COUNT(*) FROM t").fetchone()
+        assert time.perf_counter() - start < 1
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_failed_write_does_not_leak_its_transaction(manager):
+    with pytest.raises(RuntimeError):
+        with historify_db.get_connection() as conn:
+            conn.execute("BEGIN TRANSACTION")
+            conn.execute("INSERT INTO t VALUES (42)")
+            raise RuntimeError("boom")
+
+    with historify_db.get_connection() as conn:
+        conn.execute("INSERT INTO t VALUES (7)")
+    with historify_db.get_read_connection() as conn:
+        assert conn.execute("SELECT v FROM t").fetchall() == [(7,)]
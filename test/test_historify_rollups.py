@@ -0,0 +1,124 @@
+"""Materialized 5m/15m/30m/1h rollups in Historify.
+
+Standard computed intervals used to re-aggregate every 1m bar of the range on
+each request. They are now served from rollup tables that upsert_market_data
+refreshes for the touched candles only. Whatever the rollup serves must match
+on-the-fly aggregation exactly, including partial first and last candles when a
+range starts or ends mid-candle.
+"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+import database.historify_db as historify_db
+
+# 2025-01-06 09:15 IST, a Monday.
+SESSION_OPEN = 1736135100
+MINUTES_PER_SESSION = 375
+
+
+def _bars(days=3, start_minute=0, minutes=MINUTES_PER_SESSION, bump=0.0):
+    rows = []
+    for day in range(days):
+        for minute in range(start_minute, start_minute + minutes):
+            ts = SESSION_OPEN + day * 86400 + minute * 60
+            price = 100 + day + minute * 0.01 + bump
+            rows.append(
+                {
+                    "timestamp": ts,
+                    "open": price,
+                    "high": price + 0.5,
+                    "low": price - 0.5,
+                    "close": price + 0.1,
+                    "volume": 1000 + minute,
+                    "oi": minute,
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(historify_db, "HISTORIFY_DB_PATH", str(tmp_path / "historify.duckdb"))
+    manager = historify_db._ConnectionManager()
+    monkeypatch.setattr(historify_db, "_manager", manager)
+    monkeypatch.setattr(historify_db, "_get_market_open_seconds", lambda exchange: 33300)
+    historify_db.init_database()
+    historify_db.upsert_market_data(_bars(), "NIFTY", "NSE_INDEX", "1m")
+    yield
+    manager.close()
+
+
+def _both(monkeypatch, interval, start=None, end=None):
+    monkeypatch.setattr(historify_db, "HISTORIFY_ROLLUPS_ENABLED", True)
+    rolled = historify_db.get_ohlcv("NIFTY", "NSE_INDEX", interval, start, end)
+    monkeypatch.setattr(historify_db, "HISTORIFY_ROLLUPS_ENABLED", False)
+    direct = historify_db.get_ohlcv("NIFTY", "NSE_INDEX", interval, start, end)
+    return rolled, direct
+
+
+def _rollup_rows(interval):
+    with historify_db.get_read_connection() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM market_data_rollup WHERE interval = ?", [interval]
+        ).fetchone()[0]
+
+
+@pytest.mark.parametrize("interval", ["5m", "15m", "30m", "1h"])
+@pytest.mark.parametrize(
+    "start_offset, end_offset",
+    [
+        (None, None),
+        (0, 86400 + 6 * 3600),
+        (7 * 60, 86400 + 3600 + 17 * 60),  # starts and ends mid-candle
+        (3 * 60, 11 * 60),  # inside a single candle
+    ],
+)
+def test_rollup_matches_on_the_fly(db, monkeypatch, interval, start_offset, end_offset):
+    start = None if start_offset is None else SESSION_OPEN + start_offset
+    end = None if end_offset is None else SESSION_OPEN + end_offset
+
+    rolled, direct = _both(monkeypatch, interval, start, end)
+
+    assert not direct.empty
+    pd.testing.assert_frame_equal(rolled, direct)
+    assert _rollup_rows(interval) > 0
+
+
+def test_upsert_refreshes_only_touched_candles(db, monkeypatch):
+    before, _ = _both(monkeypatch, "15m")
+
+    # Rewrite 40 minutes in the middle of the second session.
+    historify_db.upsert_market_data(
+        _bars(days=1, start_minute=100, minutes=40, bump=5.0).assign(
+            timestamp=lambda df: df["timestamp"] + 86400
+        ),
+        "NIFTY",
+        "NSE_INDEX",
+        "1m",
+    )
+
+    rolled, direct = _both(monkeypatch, "15m")
+
+    pd.testing.assert_frame_equal(rolled, direct)
+    assert not rolled.equals(before)
+
+
+def test_custom_interval_is_not_materialized(db, monkeypatch):
+    rolled, direct = _both(monkeypatch, "25m")
+
+    pd.testing.assert_frame_equal(rolled, direct)
+    assert _rollup_rows("25m") == 0
+
+
+def test_deleting_1m_data_drops_rollups(db, monkeypatch):
+    _both(monkeypatch, "5m")
+    assert _rollup_rows("5m") > 0
+
+    historify_db.delete_market_data("NIFTY", "NSE_INDEX", "1m")
+
+    assert _rollup_rows("5m") == 0
+    rolled, _ = _both(monkeypatch, "5m")
+    assert rolled.empty
@@ -0,0 +1,220 @@
+"""Batched candle history for the straddle, IV chart and Multi Strike OI tools.
+
+These services fetched history one contract at a time (CE then PE for every
+strike the ATM passed through) and built per-timestamp lookups with iterrows.
+fetch_history_frames fetches the deduplicated set concurrently under the
+history rate limit, serving fully downloaded windows from Historify, and the
+services align the returned frames with joins.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.history_batch_service as batch  # noqa: E402
+import services.history_service as history_service  # noqa: E402
+import services.straddle_chart_service as straddle  # noqa: E402
+from services.option_symbol_service import find_atm_strike_from_actual  # noqa: E402
+
+# 2026-01-05 09:15 IST, then one candle a minute
+T0 = 1767584700
+
+
+def _candles(closes, oi=None, start=T0):
+    return [
+        {"timestamp": start + 60 * n, "close": close, "oi": (oi or {}).get(n, 0)}
+        for n, close in enumerate(closes)
+    ]
+
+
+@pytest.fixture()
+def broker(monkeypatch):
+    """A fake get_history serving canned candles by symbol and recording calls."""
+    monkeypatch.setattr(batch, "HISTORY_BATCH_USE_HISTORIFY", False)
+    fake = type("Broker", (), {})()
+    fake.data = {}
+    fake.calls = []
+    fake.delay = 0.0
+
+    def get_history(symbol, exchange, interval, start_date, end_date, api_key, source="api"):
+        fake.calls.append((symbol, source))
+        time.sleep(fake.delay)
+        if symbol not in fake.data:
+            return False, {"status": "error", "message": f"no data for {symbol}"}, 400
+        return True, {"status": "success", "data": fake.data[symbol]}, 200
+
+    monkeypatch.setattr(batch, "get_history", get_history)
+    return fake
+
+
+def test_nearest_strikes_matches_the_scalar_atm_lookup():
+    strikes = [float(s) for s in range(23000, 24050, 50)]
+    prices = [random.uniform(22800, 24300) for _ in range(500)]
+    # Exact strikes, midpoints (ties go to the lower strike) and the ends
+    prices += [23000.0, 23025.0, 23975.0, 24000.0, 100.0, 99999.0]
+
+    vectorized = batch.nearest_strikes(prices, strikes)
+    assert vectorized == [find_atm_strike_from_actual(p, strikes) for p in prices]
+    assert batch.nearest_strikes([float("nan"), 23010.0], strikes) == [None, 23000.0]
+    assert batch.nearest_strikes([1.0, 5.0], [3.0]) == [3.0, 3.0]
+
+
+def test_batch_dedupes_and_fetches_concurrently(broker):
+    symbols = [f"OPT{n}" for n in range(8)]
+    broker.data = {s: _candles([100.0, 101.0]) for s in symbols}
+    broker.delay = 0.1
+
+    start = time.monotonic()
+    frames, errors = batch.fetch_history_frames(
+        [(s, "NFO") for s in symbols + symbols], "1m", "2026-01-01", "2026-01-05", "key",
+        max_workers=4,
+    )
+    elapsed = time.monotonic() - start
+
+    assert sorted(symbol for symbol, _ in broker.calls) == symbols
+    assert errors == {}
+    # Eight 100ms calls four at a time, not one after another
+    assert elapsed < 0.6
+    frame = frames[("OPT0", "NFO")]
+    assert str(frame.index.tz) == "Asia/Kolkata"
+    assert frame["close"].tolist() == [100.0, 101.0]
+
+
+def test_frames_are_numeric_and_unique_by_timestamp(broker):
+    broker.data = {
+        "SBIN": [
+            {"timestamp": T0, "close": "10.5"},
+            {"timestamp": T0, "close": "11.0"},
+            {"timestamp": T0 + 60, "close": None},
+        ],
+        "EMPTY": [],
+    }
+    frames, errors = batch.fetch_history_frames(
+        [("SBIN", "NSE"), ("EMPTY", "NSE"), ("GONE", "NSE")],
+        "1m", "2026-01-01", "2026-01-05", "key",
+    )
+    sbin = frames[("SBIN", "NSE")]
+    assert sbin["close"].tolist()[0] == 11.0
+    assert sbin["oi"].tolist() == [0.0, 0.0]
+    assert frames[("EMPTY", "NSE")].empty
+    assert errors == {("GONE", "NSE"): "no data for GONE"}
+
+
+def test_covered_windows_are_served_from_historify(broker, monkeypatch):
+    monkeypatch.setattr(batch, "HISTORY_BATCH_USE_HISTORIFY", True)
+    monkeypatch.setattr(batch, "_sessions", lambda exchange, start, end: [(date(2026, 1, 5), 0)])
+    monkeypatch.setattr(
+        batch, "_historify_covers", lambda symbol, exchange, interval, sessions: symbol == "NIFTY"
+    )
+    broker.data = {"NIFTY": _candles([23000.0]), "OPT": _candles([100.0])}
+
+    frames, _ = batch.fetch_history_frames(
+        [("NIFTY", "NSE_INDEX"), ("OPT", "NFO")], "5m", "2026-01-01", "2026-01-05", "key"
+    )
+    assert sorted(broker.calls) == [("NIFTY", "db"), ("OPT", "api")]
+    assert set(frames) == {("NIFTY", "NSE_INDEX"), ("OPT", "NFO")}
+
+
+def test_historify_data_missing_a_session_goes_to_the_broker(broker, monkeypatch):
+    monkeypatch.setattr(batch, "HISTORY_BATCH_USE_HISTORIFY", True)
+    sessions = [(date(2026, 1, 2), 0), (date(2026, 1, 5), 0)]
+    monkeypatch.setattr(batch, "_sessions", lambda exchange, start, end: sessions)
+    monkeypatch.setattr(batch, "_historify_covers", lambda *args: True)
+    # The catalog spans both sessions but only 2026-01-05 has candles
+    broker.data = {"NIFTY": _candles([23000.0])}
+
+    frames, _ = batch.fetch_history_frames(
+        [("NIFTY", "NSE_INDEX")], "1m", "2026-01-01", "2026-01-05", "key"
+    )
+    assert broker.calls == [("NIFTY", "db"), ("NIFTY", "api")]
+    assert not frames[("NIFTY", "NSE_INDEX")].empty
+
+
+def test_historify_coverage_needs_every_finished_session(monkeypatch):
+    import database.historify_db as historify_db
+
+    catalog = {}
+    monkeypatch.setattr(historify_db, "get_data_range", lambda s, e, i: catalog.get(i))
+    # 2026-01-02 and 2026-01-05, 15:30 IST
+    sessions = [(date(2026, 1, 2), 1767347999000), (date(2026, 1, 5), 1767607199000)]
+
+    # Through the 15:29 candle of the last session
+    catalog["1m"] = {"first_timestamp": T0 - 3 * 86400, "last_timestamp": T0 + 22440,
+                     "record_count": 750}
+    assert batch._historify_covers("NIFTY", "NSE_INDEX", "5m", sessions)
+    # Daily intervals read the D catalog, which has nothing
+    assert not batch._historify_covers("NIFTY", "NSE_INDEX", "D", sessions)
+
+    # The last session downloaded only up to 10:00
+    catalog["1m"]["last_timestamp"] = T0 + 2700
+    assert not batch._historify_covers("NIFTY", "NSE_INDEX", "1m", sessions)
+    catalog["1m"]["last_timestamp"] = T0 + 22440
+
+    # Downloaded from the second session only
+    catalog["1m"]["first_timestamp"] = T0
+    assert not batch._historify_covers("NIFTY", "NSE_INDEX", "1m", sessions)
+
+    # A session still trading always goes to the broker
+    catalog["1m"]["first_timestamp"] = T0 - 3 * 86400
+    live = sessions[:1] + [(date(2099, 1, 5), 4102444800000)]
+    assert not batch._historify_covers("NIFTY", "NSE_INDEX", "1m", live)
+
+
+def test_history_rate_limit_spaces_concurrent_callers(monkeypatch):
+    monkeypatch.setattr(history_service, "_MIN_HISTORY_INTERVAL", 0.05)
+    monkeypatch.setattr(history_service, "_last_history_call", 0.0)
+    stamps = []
+
+    def call():
+        history_service._enforce_rate_limit()
+        stamps.append(time.monotonic())
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stamps.sort()
+    gaps = [b - a for a, b in zip(stamps, stamps[1:], strict=False)]
+    assert min(gaps) >= 0.04
+
+
+def test_straddle_joins_each_candle_to_its_own_strike(broker, monkeypatch):
+    monkeypatch.setattr(straddle, "get_available_strikes", lambda *a: [100.0, 110.0, 120.0])
+    monkeypatch.setattr(straddle, "get_quotes", lambda **kw: (True, {"data": {"ltp": 111}}, 200))
+    monkeypatch.setattr(
+        straddle, "_resolve_trading_window", lambda days, ist: ("2026-01-01", "2026-01-05")
+    )
+    # ATM 100, 110, 110, 120; the 120 PE has no candle at the last minute
+    broker.data = {
+        "XYZ": _candles([101.0, 108.0, 112.0, 119.0]),
+        "XYZ27JAN26100CE": _candles([5.0, 9.0, 12.0, 18.0]),
+        "XYZ27JAN26100PE": _candles([4.0, 2.0, 1.0, 0.5]),
+        "XYZ27JAN26110CE": _candles([1.0, 3.0, 5.0, 10.0]),
+        "XYZ27JAN26110PE": _candles([9.0, 6.0, 4.0, 1.0]),
+        "XYZ27JAN26120CE": _candles([0.1, 0.5, 1.0, 3.0]),
+        "XYZ27JAN26120PE": _candles([19.0, 13.0, 9.0]),
+    }
+
+    ok, response, status = straddle.get_straddle_chart_data(
+        "XYZ", "NSE", "27JAN26", "1m", "key", days=5
+    )
+    assert ok, response
+    series = response["data"]["series"]
+    assert [(p["time"], p["atm_strike"], p["straddle"]) for p in series] == [
+        (T0, 100.0, 9.0),
+        (T0 + 60, 110.0, 9.0),
+        (T0 + 120, 110.0, 9.0),
+    ]
+    assert series[1]["synthetic_future"] == 107.0
+    # The underlying, then the six options in one batch
+    assert broker.calls[0] == ("XYZ", "api")
+    assert len(broker.calls) == 7
@@ -0,0 +1,141 @@
+"""Latency dashboard statistics from incrementally maintained digests.
+
+OrderLatency.get_latency_stats used to fetch every total_latency_ms in the
+percentile window and run np.percentile over it. Each write now folds its rows
+into a latency_digest row per (UTC day, broker, order type) holding counters
+and a LatencySketch, and the stats are read from those. Counts, averages and
+SLA shares must be exactly what the row scan gave; percentiles within the
+sketch's 1% relative accuracy.
+"""
+
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database.latency_db as latency_db  # noqa: E402
+from database.latency_sketch import LatencySketch  # noqa: E402
+
+LatencyDigest = latency_db.LatencyDigest
+OrderLatency = latency_db.OrderLatency
+
+
+def _close(estimate, exact, accuracy=0.01):
+    assert abs(estimate - exact) <= accuracy * exact + 1e-9, (estimate, exact)
+
+
+def test_sketch_quantiles_are_within_the_relative_accuracy():
+    values = np.random.default_rng(3).lognormal(mean=4.5, sigma=0.8, size=50_000)
+    sketch = LatencySketch()
+    for v in values:
+        sketch.add(float(v))
+
+    assert sketch.count == len(values)
+    for q in (0.5, 0.9, 0.95, 0.99, 0.999):
+        _close(sketch.quantile(q), float(np.percentile(values, q * 100, method="nearest")))
+
+
+def test_sketches_merge_and_round_trip():
+    rng = np.random.default_rng(5)
+    a, b, both = LatencySketch(), LatencySketch(), LatencySketch()
+    for v in rng.exponential(80, 2000):
+        a.add(float(v))
+        both.add(float(v))
+    for v in list(rng.exponential(200, 1000)) + [0.0, 0.0]:
+        b.add(float(v))
+        both.add(float(v))
+
+    merged = LatencySketch.from_dict(a.to_dict()).merge(LatencySketch.from_dict(b.to_dict()))
+    assert merged.count == both.count == 3002
+    assert merged.zero_count == both.zero_count >= 2
+    assert merged.buckets == both.buckets
+    assert LatencySketch().quantile(0.5) == 0.0
+
+
+@pytest.fixture()
+def latency_rows():
+    latency_db.init_latency_db()
+    OrderLatency.query.delete()
+    LatencyDigest.query.delete()
+    latency_db.latency_session.commit()
+    latency_db._stats_cache.clear()
+
+    rng = np.random.default_rng(11)
+    records = []
+    for n in range(600):
+        total = float(rng.lognormal(4.8, 0.5))
+        rtt = float(total * 0.8) if n % 7 else 0.0
+        records.append(
+            {
+                "order_id": str(n),
+                "user_id": None,
+                "broker": (None, "zerodha", "angel")[n % 3],
+                "symbol": "SBIN",
+                "order_type": ("PLACE", "QUOTES")[n % 2],
+                "latencies": {"rtt": rtt, "overhead": total - rtt, "total": total},
+                "request_body": None,
+                "response_body": None,
+                "status": "FAILED" if n % 11 == 0 else "SUCCESS",
+                "error": None,
+            }
+        )
+    # Written in several batches, as the log sink does
+    for start in range(0, len(records), 200):
+        OrderLatency.log_latencies(records[start : start + 200])
+    yield records
+
+    OrderLatency.query.delete()
+    LatencyDigest.query.delete()
+    latency_db.latency_session.commit()
+    latency_db.latency_session.remove()
+    latency_db._stats_cache.clear()
+
+
+def test_stats_match_a_scan_of_the_rows(latency_rows):
+    stats = OrderLatency.get_latency_stats()
+
+    totals = np.array([r["latencies"]["total"] for r in latency_rows])
+    rtts = np.array([r["latencies"]["rtt"] for r in latency_rows])
+    assert stats["total_orders"] == 600
+    assert stats["failed_orders"] == sum(r["status"] == "FAILED" for r in latency_rows)
+    assert stats["avg_total"] == pytest.approx(totals.mean())
+    assert stats["avg_rtt"] == pytest.approx(rtts.mean())
+    assert stats["sla_150ms"] == pytest.approx((totals < 150).mean() * 100)
+    for key, q in (("p50_total", 50), ("p90_total", 90), ("p99_total", 99)):
+        _close(stats[key], float(np.percentile(totals, q, method="nearest")))
+
+    # Rows without a broker count overall but are not a broker of their own
+    assert set(stats["broker_stats"]) == {"zerodha", "angel"}
+    zerodha = [r["latencies"]["total"] for r in latency_rows if r["broker"] == "zerodha"]
+    assert stats["broker_stats"]["zerodha"]["total_orders"] == len(zerodha)
+    _close(
+        stats["broker_stats"]["zerodha"]["p50_total"],
+        float(np.percentile(zerodha, 50, method="nearest")),
+    )
+
+
+def test_rebuild_reproduces_the_incremental_digests(latency_rows):
+    def snapshot():
+        return {
+            (d.broker, d.order_type): (d.count, d.failed, d.under_150, round(d.sum_total, 6),
+                                       d.min_rtt, d.max_rtt, d.total_sketch, d.rtt_sketch)
+            for d in LatencyDigest.query.all()
+        }
+
+    incremental = snapshot()
+    assert len(incremental) == 6
+    assert latency_db.rebuild_latency_digests() == 6
+    assert snapshot() == incremental
+
+
+def test_rtt_distribution(latency_rows):
+    distribution = LatencyDigest.rtt_distribution("angel")
+    rtts = [r["latencies"]["rtt"] for r in latency_rows if r["broker"] == "angel"]
+    assert distribution["sketch"].count == len(rtts)
+    assert distribution["min_rtt"] == min(rtts) == 0.0
+    assert distribution["max_rtt"] == pytest.approx(max(rtts))
+    assert distribution["avg_rtt"] == pytest.approx(np.mean(rtts))
@@ -0,0 +1,152 @@
+"""Batched group-commit writer for the high-volume log tables.
+
+Traffic, latency, API order and analyzer logs used to be committed one row per
+transaction from several executors at once. They now go through a ``LogSink``:
+a bounded queue drained by one writer thread, committed in batches of up to
+``batch_size`` rows or after ``flush_ms``. A full queue drops records rather
+than blocking the request that produced them, and counts the drop.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log_sink import LogSink  # noqa: E402
+
+
+class _Recorder:
+    """A write_batch that records batch sizes, optionally held shut by a gate."""
+
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def __call__(self, batch):
+        if self.gate is not None:
+            self.gate.wait(timeout=30)
+        self.batches.append(list(batch))
+
+
+def test_full_batches_commit_without_waiting_for_the_interval():
+    writes = _Recorder()
+    sink = LogSink("size", writes, batch_size=50, flush_ms=60_000, max_queue=1000)
+    for n in range(120):
+        assert sink.submit(n)
+
+    deadline = time.monotonic() + 5
+    while len(writes.batches) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [len(b) for b in writes.batches] == [50, 50]
+
+    # flush() commits the partial batch instead of waiting out the minute
+    assert sink.flush()
+    assert [len(b) for b in writes.batches] == [50, 50, 20]
+    assert [n for batch in writes.batches for n in batch] == list(range(120))
+
+    stats = sink.stats()
+    assert stats["written"] == 120 and stats["batches"] == 3 and stats["largest_batch"] == 50
+    sink.close()
+
+
+def test_partial_batch_commits_after_the_interval():
+    writes = _Recorder()
+    sink = LogSink("interval", writes, batch_size=1000, flush_ms=50, max_queue=1000)
+    for n in range(3):
+        sink.submit(n)
+
+    deadline = time.monotonic() + 5
+    while not writes.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writes.batches == [[0, 1, 2]]
+    sink.close()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    gate = threading.Event()
+    writes = _Recorder(gate)
+    sink = LogSink("full", writes, batch_size=1, flush_ms=0, max_queue=5)
+
+    start = time.monotonic()
+    results = [sink.submit(n) for n in range(50)]
+    assert time.monotonic() - start < 1
+
+    stats = sink.stats()
+    assert results.count(False) == stats["dropped"] > 0
+    assert stats["high_water"] == 5
+
+    gate.set()
+    assert sink.flush()
+    assert sink.stats()["written"] == results.count(True)
+    sink.close()
+
+
+def test_failed_batch_is_counted_and_the_sink_keeps_going():
+    calls = []
+
+    def write_batch(batch):
+        calls.append(list(batch))
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+
+    sink = LogSink("failing", write_batch, batch_size=2, flush_ms=60_000, max_queue=100)
+    for n in range(4):
+        sink.submit(n)
+    assert sink.flush()
+
+    stats = sink.stats()
+    assert stats["failed"] == 2 and stats["written"] == 2
+    assert calls == [[0, 1], [2, 3]]
+    sink.close()
+
+
+@pytest.fixture()
+def apilog_database(tmp_path, monkeypatch):
+    """Point apilog_db at a temporary database."""
+    import database.apilog_db as apilog_db
+
+    test_engine = create_engine(
+        f"sqlite:///{tmp_path / 'apilog.db'}",
+        poolclass=NullPool,
+        connect_args={"check_same_thread": False},
+    )
+    session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=test_engine))
+    query = apilog_db.Base.__dict__["query"]
+    monkeypatch.setattr(apilog_db, "engine", test_engine)
+    monkeypatch.setattr(apilog_db, "db_session", session)
+    apilog_db.Base.query = session.query_property()
+    apilog_db.Base.metadata.create_all(bind=test_engine)
+
+    yield apilog_db
+
+    session.remove()
+    apilog_db.Base.query = query
+    test_engine.dispose()
+
+
+def test_order_logs_are_committed_in_one_transaction(apilog_database):
+    from sqlalchemy import event
+
+    from utils.log_sink import get_sink
+
+    apilog_db = apilog_database
+    commits = []
+    listener = lambda conn: commits.append(conn)  # noqa: E731
+    event.listen(apilog_db.engine, "commit", listener)
+    try:
+        # Queued well inside one flush interval, so they share a transaction
+        for n in range(10):
+            apilog_db.async_log_order("placeorder", {"n": n}, {"status": "success"})
+        assert get_sink("order_logs", apilog_db._write_order_logs).flush()
+    finally:
+        event.remove(apilog_db.engine, "commit", listener)
+
+    assert apilog_db.OrderLog.query.count() == 10
+    assert len(commits) == 1
@@ -0,0 +1,143 @@
+"""MarketDataService's sharded tick cache.
+
+The cache used to be one dict behind the service-wide data_lock, so every
+ingest thread and every reader (strategies, sandbox, Flow) serialised on it.
+It is now split into shards with their own writer locks, readers take no lock,
+and subscriber broadcasts read copy-on-write snapshots of the registries. The
+public getters must keep returning exactly what they returned before.
+"""
+
+import threading
+
+import pytest
+
+from services.market_data_service import (
+    MARKET_DATA_CACHE_SHARDS,
+    SubscriberPriority,
+    get_market_data_service,
+)
+
+
+@pytest.fixture
+def service():
+    svc = get_market_data_service()
+    svc.clear_cache()
+    yield svc
+    svc.clear_cache()
+
+
+def tick(symbol, mode, exchange="NSE", **data):
+    return {"symbol": symbol, "exchange": exchange, "mode": mode, "data": data}
+
+
+def test_quote_tick_fills_quote_and_ltp(service):
+    assert service.process_market_data(
+        tick("SBIN", 2, ltp=812.5, open=800, high=815, low=799, close=805, volume=10)
+    )
+
+    assert service.get_ltp_value("SBIN", "NSE") == 812.5
+    assert service.get_quote("SBIN", "NSE")["high"] == 815
+    assert service.get_market_depth("SBIN", "NSE") is None
+
+    all_data = service.get_all_data("SBIN", "NSE")
+    assert set(all_data) == {"symbol", "exchange", "last_update", "ltp", "quote"}
+    assert all_data["ltp"]["value"] == 812.5
+
+
+def test_depth_tick_mirrors_ltp_but_never_zeroes_it(service):
+    service.process_market_data(tick("INFY", 1, ltp=1500.0))
+    service.process_market_data(
+        tick("INFY", 3, ltp=1501.0, depth={"buy": [{"price": 1500.9}], "sell": []})
+    )
+    assert service.get_ltp_value("INFY", "NSE") == 1501.0
+    assert service.get_market_depth("INFY", "NSE")["buy"] == [{"price": 1500.9}]
+
+    # Delta-format depth without an LTP keeps the last good price
+    service.process_market_data(tick("INFY", 3, bids=[{"price": 1500}], asks=[]))
+    assert service.get_ltp_value("INFY", "NSE") == 1501.0
+    assert service.get_market_depth("INFY", "NSE")["buy"] == [{"price": 1500}]
+
+
+def test_readers_get_a_replaced_record_not_a_mutated_one(service):
+    service.process_market_data(tick("TCS", 1, ltp=4000.0))
+    before = service.get_ltp("TCS", "NSE")
+    service.process_market_data(tick("TCS", 1, ltp=4001.0))
+
+    assert before["value"] == 4000.0
+    assert service.get_ltp("TCS", "NSE")["value"] == 4001.0
+
+
+def test_multiple_ltps_and_merged_view_span_shards(service):
+    symbols = [f"SYM{i}" for i in range(MARKET_DATA_CACHE_SHARDS * 4)]
+    for i, symbol in enumerate(symbols):
+        service.process_market_data(tick(symbol, 1, exchange="NFO", ltp=100.0 + i))
+
+    ltps = service.get_multiple_ltps(
+        [{"symbol": s, "exchange": "NFO"} for s in symbols] + [{"symbol": "NOPE", "exchange": "NFO"}]
+    )
+    assert len(ltps) == len(symbols)
+    assert ltps["NFO:SYM3"]["value"] == 103.0
+    assert set(service.market_data_cache) == {f"NFO:{s}" for s in symbols}
+    assert service.get_cache_metrics()["total_symbols"] == len(symbols)
+
+
+def test_clear_cache_single_symbol_and_all(service):
+    service.process_market_data(tick("A", 1, ltp=1.0))
+    service.process_market_data(tick("B", 1, ltp=2.0))
+
+    service.clear_cache("A", "NSE")
+    assert service.get_ltp("A", "NSE") is None
+    assert service.get_ltp_value("B", "NSE") == 2.0
+
+    service.clear_cache()
+    assert service.get_all_data("B", "NSE") == {}
+    assert service.get_health_status().cache_size == 0
+
+
+def test_concurrent_writers_and_readers(service):
+    n_writers, n_symbols, rounds = 4, 200, 20
+    start_updates = service.get_cache_metrics()["total_updates"]
+    errors = []
+    stop = threading.Event()
+
+    def writer(idx):
+        for r in range(rounds):
+            for i in range(idx, n_symbols, n_writers):
+                service.process_market_data(tick(f"C{i}", 1, exchange="NFO", ltp=float(r + 1)))
+
+    def reader():
+        lookups = [{"symbol": f"C{i}", "exchange": "NFO"} for i in range(n_symbols)]
+        while not stop.is_set():
+            for ltp in service.get_multiple_ltps(lookups).values():
+                if not ltp["value"] or "timestamp" not in ltp:
+                    errors.append(ltp)
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(n_writers)]
+    for t in readers + writers:
+        t.start()
+    for t in writers:
+        t.join()
+    stop.set()
+    for t in readers:
+        t.join()
+
+    assert not errors
+    assert service.get_cache_metrics()["total_updates"] - start_updates == n_symbols * rounds
+    assert all(service.get_ltp_value(f"C{i}", "NFO") == float(rounds) for i in range(n_symbols))
+
+
+def test_broadcast_follows_subscribe_and_unsubscribe(service):
+    received = []
+    sub_id = service.subscribe_with_priority(
+        SubscriberPriority.CRITICAL, "ltp", received.append, {"NSE:HDFC"}, name="test"
+    )
+    try:
+        service.process_market_data(tick("HDFC", 1, ltp=1600.0))
+        service.process_market_data(tick("ICICI", 1, ltp=1200.0))
+        assert [d["symbol"] for d in received] == ["HDFC"]
+    finally:
+        assert service.unsubscribe_priority(sub_id)
+
+    service.process_market_data(tick("HDFC", 1, ltp=1601.0))
+    assert len(received) == 1
@@ -0,0 +1,185 @@
+"""Diff-based master contract refresh.
+
+sync_master_contract must leave symtoken holding exactly the downloaded rows,
+as the old delete-and-insert did, while writing only what changed. A loaded
+symbol cache is patched with the same diff and must then answer exactly like
+one loaded from the refreshed table.
+"""
+
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+
+from sqlalchemy import Column, Float, Integer, String, create_engine, event
+from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+
+import database.token_db_enhanced as token_db_enhanced
+from database.master_contract_sync import diff_master_contract, sync_master_contract
+from database.token_db_enhanced import BrokerSymbolCache
+
+Base = declarative_base()
+COLUMNS = ["symbol", "brsymbol", "name", "exchange", "brexchange", "token", "expiry",
+           "strike", "lotsize", "instrumenttype", "tick_size"]
+
+
+class SymToken(Base):
+    __tablename__ = "symtoken"
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    brsymbol = Column(String, nullable=False)
+    name = Column(String)
+    exchange = Column(String)
+    brexchange = Column(String)
+    token = Column(String)
+    expiry = Column(String)
+    strike = Column(Float)
+    lotsize = Column(Integer)
+    instrumenttype = Column(String)
+    tick_size = Column(Float)
+
+
+def _master(day: int) -> pd.DataFrame:
+    """A broker download; ``day`` 2 expires, lists and changes a few contracts."""
+    rows = [
+        ("RELIANCE-EQ", "RELIANCE-EQ", "RELIANCE", "NSE", "NSE", "2885", None, -1.0, 1, "EQ", 0.05),
+        ("RELIANCE", "RELIANCE", "RELIANCE", "BSE", "BSE", "2885", None, -1.0, 1, "EQ", 0.05),
+        ("TCS", "TCS-EQ", "TCS", "NSE", "NSE", "11536", None, -1.0, 1, "EQ", 0.05),
+        # Same token listed twice on one exchange: both rows are kept
+        ("DUP", "DUP-A", "DUP", "NSE", "NSE", "777", None, -1.0, 1, "EQ", 0.05),
+        ("DUP", "DUP-B", "DUP", "NSE", "NSE", "777", None, -1.0, 1, "EQ", 0.05),
+    ]
+    expiries = ("28MAR24", "25APR24") if day == 1 else ("25APR24", "30MAY24")
+    token = 40000
+    for expiry in expiries:
+        for strike in range(21000, 23000, 100):
+            for kind in ("CE", "PE"):
+                # Broker names carry the contract description, not the root
+                rows.append(
+                    (f"NIFTY{expiry}{strike}{kind}", f"NIFTY {expiry} {strike} {kind}",
+                     f"NIFTY {expiry} {strike} {kind}", "NFO", "NFO",
+                     str(token + int(expiry[:2]) * 1000 + strike // 100 * 2 + (kind == "PE")),
+                     f"{expiry[:2]}-{expiry[2:5]}-{expiry[5:]}", float(strike),
+                     50 if day == 1 else 25, kind, 0.05)
+                )
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    if day == 2:
+        df.loc[df["symbol"] == "TCS", "tick_size"] = 0.1
+    return df
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, sql, params, context, many: statements.append(sql))
+    Base.metadata.create_all(engine)
+    session = scoped_session(sessionmaker(bind=engine))
+    session.statements = statements
+    yield session
+    session.remove()
+
+
+def _table(session) -> list[tuple]:
+    rows = session.query(*(getattr(SymToken, c) for c in COLUMNS)).all()
+    return sorted(tuple(r) for r in rows)
+
+
+def _expected(df) -> list[tuple]:
+    from database.master_contract_sync import normalize_underlying_names
+
+    frame = normalize_underlying_names(df).astype(object)
+    frame = frame.where(frame.notna(), None)
+    return sorted(tuple(r) for r in frame.itertuples(index=False))
+
+
+def _load(session) -> BrokerSymbolCache:
+    cache = BrokerSymbolCache()
+    cache._load_records(session.query(SymToken).order_by(SymToken.id).all())
+    cache.cache_loaded = True
+    cache.session_start = datetime.now()
+    return cache
+
+
+def test_first_download_inserts_everything(db):
+    diff = sync_master_contract(_master(1), SymToken, db)
+    assert diff.full_replace
+    assert _table(db) == _expected(_master(1))
+
+
+def test_refresh_writes_only_the_delta(db, monkeypatch):
+    sync_master_contract(_master(1), SymToken, db)
+    monkeypatch.setattr(token_db_enhanced, "_cache_instance", None)
+    db.statements.clear()
+
+    # Unchanged download: nothing written
+    diff = sync_master_contract(_master(1), SymToken, db)
+    assert (diff.changes, diff.full_replace) == (0, False)
+    assert not any(s.startswith(("INSERT", "UPDATE", "DELETE")) for s in db.statements)
+
+    old = _master(1)
+    new = _master(2)
+    # Half the expiries moved on: above the full-replace ratio
+    assert diff_master_contract(
+        pd.DataFrame(_table(db), columns=COLUMNS).assign(id=range(len(old))), new
+    ).full_replace
+
+
+def test_small_refresh_patches_table_and_cache(db, monkeypatch):
+    first = _master(1)
+    sync_master_contract(first, SymToken, db)
+    cache = _load(db)
+    monkeypatch.setattr(token_db_enhanced, "_cache_instance", cache)
+    before = cache._state
+    tcs_token = cache.get_token("TCS", "NSE")
+
+    second = first[first["symbol"] != "NIFTY28MAR2421000CE"].copy()
+    second.loc[second["symbol"] == "TCS", "tick_size"] = 0.1
+    second.loc[second["brsymbol"] == "DUP-B", "lotsize"] = 5
+    extra = second.iloc[[0]].assign(symbol="INFY", brsymbol="INFY-EQ", name="INFY", token="1594")
+    second = pd.concat([second, extra], ignore_index=True)
+
+    diff = sync_master_contract(second, SymToken, db)
+    assert (len(diff.added), len(diff.changed), len(diff.removed)) == (1, 2, 1)
+    assert _table(db) == _expected(second)
+
+    # The patched cache answers like a fresh load of the refreshed table
+    fresh = _load(db)
+    assert cache._refreshed_in_place
+    assert cache.store.symbol == fresh.store.symbol
+    assert [cache._row(cache.store, r) for r in range(len(cache.store))] == [
+        fresh._row(fresh.store, r) for r in range(len(fresh.store))
+    ]
+    assert cache.get_token("INFY", "NSE") == "1594"
+    assert cache.get_symbol_info("TCS", "NSE").tick_size == 0.1
+    assert cache.get_token("NIFTY28MAR2421000CE", "NFO") is None
+    assert cache.get_option_chain("NIFTY", "28-MAR-24", "NFO")[0]["pe"].strike == 21000.0
+
+    # The refresh built a new state: one taken before it still pairs its own
+    # row ids with its own columns
+    assert cache._state is not before
+    row = before.symbol_ids["NSE"]["TCS"]
+    assert before.store.token[row] == tcs_token
+    assert "NIFTY28MAR2421000CE" in before.symbol_ids["NFO"]
+
+    # ...so the load that follows the download does not read symtoken again
+    monkeypatch.setattr("database.symbol.SymToken", None)
+    monkeypatch.setattr(BrokerSymbolCache, "_snapshot_key", lambda self, broker: None)
+    assert cache.load_all_symbols("zerodha")
+    assert not cache._refreshed_in_place
+    assert cache.get_token("INFY", "NSE") == "1594"
+
+
+def test_cache_not_matching_the_table_is_left_alone(db, monkeypatch):
+    first = _master(1)
+    sync_master_contract(first, SymToken, db)
+    cache = _load(db)
+    cache._load_records(list(db.query(SymToken).all())[:-1])
+    cache.cache_loaded = True
+    monkeypatch.setattr(token_db_enhanced, "_cache_instance", cache)
+
+    sync_master_contract(first.iloc[1:], SymToken, db)
+    assert not cache._refreshed_in_place
@@ -0,0 +1,157 @@
+"""Concurrent placement of basket, split and options multi-order child orders.
+
+The three services used to place their child orders one after another (or, for
+live baskets, in unordered batches of 10 with a 1s pause). They now go through
+utils.order_dispatcher.dispatch: calls of one ordering group run concurrently,
+a group starts only when the previous one is done (BUY before SELL), live
+orders take a token from their broker's bucket, and results keep call order.
+"""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.order_dispatcher as order_dispatcher  # noqa: E402
+from utils.order_dispatcher import TokenBucket, dispatch, parse_rate_limit  # noqa: E402
+
+
+class _Tracker:
+    """Callables that sleep, recording how many ran at once and when each started."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.events = []
+
+    def call(self, label):
+        def run():
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+                self.events.append(("start", label))
+            time.sleep(self.delay)
+            with self.lock:
+                self.running -= 1
+                self.events.append(("end", label))
+            return label
+
+        return run
+
+
+def test_groups_run_in_order_and_results_keep_call_order():
+    tracker = _Tracker()
+    buys = [tracker.call(f"B{i}") for i in range(4)]
+    sells = [tracker.call(f"S{i}") for i in range(3)]
+
+    start = time.perf_counter()
+    results = dispatch([buys, [], sells])
+    elapsed = time.perf_counter() - start
+
+    assert results == ["B0", "B1", "B2", "B3", "S0", "S1", "S2"]
+    first_sell = min(n for n, (_, label) in enumerate(tracker.events) if label[0] == "S")
+    assert [e for e, label in tracker.events[:first_sell]].count("end") == 4
+    # Two concurrent rounds, not seven sequential calls
+    assert elapsed < 0.05 * 4
+
+
+def test_concurrency_is_bounded():
+    tracker = _Tracker(delay=0.02)
+    dispatch([[tracker.call(i) for i in range(12)]], max_workers=3)
+    assert tracker.peak == 3
+
+
+def test_nested_dispatch_runs_inline():
+    tracker = _Tracker(delay=0.01)
+
+    def leg(n):
+        return lambda: dispatch([[tracker.call((n, i)) for i in range(4)]])
+
+    results = dispatch([[leg(n) for n in range(3)]], max_workers=3)
+    assert results == [[(n, i) for i in range(4)] for n in range(3)]
+    assert tracker.peak <= 3
+
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    bucket = TokenBucket(capacity=5, period=0.25)  # 20 per second
+    waits = [bucket.acquire() for _ in range(8)]
+    assert waits[:5] == [0.0] * 5
+    assert all(w > 0 for w in waits[5:])
+    assert sum(waits) < 0.25
+    assert 0 < bucket.wait_time() <= 0.05
+
+
+def test_rate_limit_is_shared_per_broker(monkeypatch):
+    monkeypatch.setattr(order_dispatcher, "_buckets", {})
+    monkeypatch.setenv("ORDER_RATE_LIMIT", "4 per second")
+    tracker = _Tracker(delay=0)
+
+    start = time.perf_counter()
+    dispatch([[tracker.call(i) for i in range(4)]], rate_key="zerodha")
+    burst = time.perf_counter() - start
+    dispatch([[tracker.call(i) for i in range(2)]], rate_key="zerodha")
+    limited = time.perf_counter() - start - burst
+    dispatch([[tracker.call(i) for i in range(4)]], rate_key="angel")
+
+    assert burst < 0.1
+    # The second request found zerodha's bucket empty: two tokens at 4/s
+    assert limited >= 0.4
+
+
+def test_parse_rate_limit():
+    assert parse_rate_limit("10 per second") == (10, 1.0)
+    assert parse_rate_limit("40 per minute;10 per second") == (40, 60.0)
+    assert parse_rate_limit("garbage") == (10, 1.0)
+    assert parse_rate_limit("0 per second") == (10, 1.0)
+
+
+def test_live_split_order_places_children_concurrently(monkeypatch):
+    import services.split_order_service as split_service
+
+    monkeypatch.setattr(order_dispatcher, "_buckets", {})
+    monkeypatch.setenv("ORDER_RATE_LIMIT", "100 per second")
+    placed = []
+
+    def place_order_api(order_data, auth_token):
+        time.sleep(0.05)
+        placed.append(order_data["quantity"])
+        return SimpleNamespace(status=200), {}, f"OID{len(placed)}"
+
+    published = []
+    monkeypatch.setattr(split_service, "get_analyze_mode", lambda: False)
+    monkeypatch.setattr(
+        split_service, "import_broker_module", lambda broker: SimpleNamespace(
+            place_order_api=place_order_api
+        )
+    )
+    monkeypatch.setattr(split_service.bus, "publish", published.append)
+
+    split_data = {
+        "symbol": "SBIN",
+        "exchange": "NSE",
+        "action": "BUY",
+        "quantity": "105",
+        "splitsize": "10",
+        "pricetype": "MARKET",
+        "product": "MIS",
+    }
+    start = time.perf_counter()
+    ok, response, status = split_service.split_order_with_auth(
+        split_data, "token", "testbroker", dict(split_data)
+    )
+    elapsed = time.perf_counter() - start
+
+    assert ok and status == 200
+    results = response["results"]
+    assert [r["order_num"] for r in results] == list(range(1, 12))
+    assert [r["quantity"] for r in results] == [10] * 10 + [5]
+    assert all(r["status"] == "success" for r in results)
+    assert sorted(placed) == sorted(["10"] * 10 + ["5"])
+    # 11 orders of 50ms each, 10 at a time
+    assert elapsed < 11 * 0.05 / 2
+    assert published[-1].successful == 11
@@ -0,0 +1,168 @@
+"""Tests for websocket_proxy.fanout (bounded per-client send queues).
+
+Loads the module under a stub parent package so websocket_proxy/__init__.py
+(which imports every broker adapter) is not executed.
+"""
+
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import types
+
+import websockets
+
+_PKG_DIR = pathlib.Path(__file__).resolve().parent.parent / "websocket_proxy"
+_PKG_NAME = "_wsproxy_fanout_under_test"
+
+
+def _load_fanout():
+    pkg = types.ModuleType(_PKG_NAME)
+    pkg.__path__ = [str(_PKG_DIR)]
+    sys.modules.setdefault(_PKG_NAME, pkg)
+    spec = importlib.util.spec_from_file_location(f"{_PKG_NAME}.fanout", _PKG_DIR / "fanout.py")
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+fanout = _load_fanout()
+
+
+class _RecordingWebSocket:
+    def __init__(self, gate=None):
+        self.messages = []
+        self.gate = gate
+
+    async def send(self, message):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.messages.append(message)
+
+
+class _ClosedWebSocket:
+    async def send(self, message):
+        raise websockets.exceptions.ConnectionClosed(None, None)
+
+
+async def _drain(queue):
+    while queue.depth:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+def test_messages_are_delivered_in_order():
+    async def run():
+        ws = _RecordingWebSocket()
+        q = fanout.ClientSendQueue(1, ws, maxsize=10)
+        q.start()
+        for i in range(5):
+            q.offer(f"m{i}")
+        await _drain(q)
+        q.close()
+        return ws.messages, q.sent, q.dropped
+
+    messages, sent, dropped = asyncio.run(run())
+    assert messages == ["m0", "m1", "m2", "m3", "m4"]
+    assert (sent, dropped) == (5, 0)
+
+
+def test_full_queue_drops_oldest_and_keeps_newest():
+    async def run():
+        gate = asyncio.Event()
+        ws = _RecordingWebSocket(gate)
+        q = fanout.ClientSendQueue(1, ws, maxsize=3)
+        q.start()
+        q.offer("m0")
+        await asyncio.sleep(0)  # writer takes m0 and blocks on the gate
+        for i in range(1, 7):
+            q.offer(f"m{i}")
+        gate.set()
+        await _drain(q)
+        q.close()
+        return ws.messages, q.dropped
+
+    messages, dropped = asyncio.run(run())
+    assert messages == ["m0", "m4", "m5", "m6"]
+    assert dropped == 3
+
+
+def test_slow_client_does_not_block_others():
+    async def run():
+        slow = _RecordingWebSocket(asyncio.Event())  # never released
+        fast = _RecordingWebSocket()
+        qs = fanout.ClientSendQueue(1, slow, maxsize=2)
+        qf = fanout.ClientSendQueue(2, fast, maxsize=2)
+        qs.start()
+        qf.start()
+        for i in range(3):
+            qs.offer(f"m{i}")
+            qf.offer(f"m{i}")
+            await asyncio.sleep(0)
+        await _drain(qf)
+        qs.close()
+        qf.close()
+        return fast.messages
+
+    assert asyncio.run(run()) == ["m0", "m1", "m2"]
+
+
+def test_writer_stops_on_closed_connection():
+    async def run():
+        q = fanout.ClientSendQueue(1, _ClosedWebSocket(), maxsize=2)
+        q.start()
+        q.offer("m0")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        done = q._task.done()
+        q.close()
+        return done, q.sent
+
+    done, sent = asyncio.run(run())
+    assert done
+    assert sent == 0
+
+
+def test_conflation_keeps_only_newest_tick_per_key():
+    async def run():
+        ws = _RecordingWebSocket()
+        q = fanout.ClientSendQueue(1, ws, maxsize=10, conflate_ms=20)
+        q.start()
+        for i in range(5):
+            q.offer(f"nifty{i}", ("NIFTY", "NSE_INDEX", 1))
+        q.offer("rel0", ("RELIANCE", "NSE", 1))
+        q.offer("nifty5", ("NIFTY", "NSE_INDEX", 1))
+        assert ws.messages == []
+        await asyncio.sleep(0.05)
+        await _drain(q)
+        q.close()
+        return ws.messages, q.conflated, q.flushes
+
+    messages, conflated, flushes = asyncio.run(run())
+    assert messages == ["nifty5", "rel0"]
+    assert conflated == 5
+    assert flushes == 1
+
+
+def test_disabling_conflation_flushes_pending_ticks():
+    async def run():
+        ws = _RecordingWebSocket()
+        q = fanout.ClientSendQueue(1, ws, maxsize=10, conflate_ms=1000)
+        q.start()
+        q.offer("a0", ("A", "NSE", 1))
+        q.offer("a1", ("A", "NSE", 1))
+        q.set_conflation(0)
+        q.offer("a2", ("A", "NSE", 1))
+        await _drain(q)
+        q.close()
+        return ws.messages
+
+    assert asyncio.run(run()) == ["a1", "a2"]
+
+
+def test_conflation_interval_is_clamped():
+    q = fanout.ClientSendQueue(1, _RecordingWebSocket(), conflate_ms=10**9)
+    assert q.conflate_interval == fanout.MAX_CONFLATE_MS / 1000
+    q.set_conflation(-5)
+    assert q.conflate_interval == 0
@@ -0,0 +1,110 @@
+"""Tests for websocket_proxy.routing (pre-parsed topic routing table).
+
+Loads the routing module under a stub parent package so its relative import of
+mode_utils works without importing websocket_proxy/__init__.py (which pulls in
+every broker adapter).
+"""
+
+import importlib.util
+import pathlib
+import sys
+import types
+from collections import defaultdict
+
+import pytest
+
+_PKG_DIR = pathlib.Path(__file__).resolve().parent.parent / "websocket_proxy"
+_PKG_NAME = "_wsproxy_routing_under_test"
+
+
+def _load_routing():
+    pkg = types.ModuleType(_PKG_NAME)
+    pkg.__path__ = [str(_PKG_DIR)]
+    sys.modules.setdefault(_PKG_NAME, pkg)
+    spec = importlib.util.spec_from_file_location(f"{_PKG_NAME}.routing", _PKG_DIR / "routing.py")
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+routing = _load_routing()
+
+
+@pytest.mark.parametrize(
+    "topic, expected",
+    [
+        ("NSE_RELIANCE_LTP", ("RELIANCE", "NSE", 1)),
+        ("NFO_NIFTY28OCT2625000CE_QUOTE", ("NIFTY28OCT2625000CE", "NFO", 2)),
+        ("NSE_INDEX_NIFTY_DEPTH", ("NIFTY", "NSE_INDEX", 3)),
+        ("GLOBAL_INDEX_DJI_LTP", ("DJI", "GLOBAL_INDEX", 1)),
+        ("CRYPTO_SOL_INR_LTP", ("SOL_INR", "CRYPTO", 1)),
+        ("NSE_RELIANCE_ltp", ("RELIANCE", "NSE", 1)),
+    ],
+)
+def test_parse_topic(topic, expected):
+    assert routing.parse_topic(topic) == expected
+
+
+@pytest.mark.parametrize("topic", ["NSE_LTP", "NSE_RELIANCE_FULL", "NSE_INDEX__LTP", "garbage"])
+def test_parse_topic_rejects_malformed(topic):
+    assert routing.parse_topic(topic) is None
+
+
+def _router():
+    index = defaultdict(set)
+    return index, routing.TopicRouter(index)
+
+
+def test_recipients_include_lower_mode_subscribers():
+    index, router = _router()
+    index[("RELIANCE", "NSE", 1)].add(10)
+    index[("RELIANCE", "NSE", 2)].add(20)
+    index[("RELIANCE", "NSE", 3)].add(30)
+
+    depth = router.add(b"NSE_RELIANCE_DEPTH", "NSE_RELIANCE_DEPTH")
+    ltp = router.add(b"NSE_RELIANCE_LTP", "NSE_RELIANCE_LTP")
+
+    assert router.recipients(depth) == {10: 1, 20: 2, 30: 3}
+    assert router.recipients(ltp) == {10: 1}
+
+
+def test_client_on_several_modes_is_tagged_with_highest_eligible_mode():
+    index, router = _router()
+    index[("RELIANCE", "NSE", 1)].add(1)
+    index[("RELIANCE", "NSE", 2)].add(1)
+    route = router.add(b"NSE_RELIANCE_QUOTE", "NSE_RELIANCE_QUOTE")
+    assert router.recipients(route) == {1: 2}
+
+
+def test_lookup_hits_after_add_and_misses_for_unknown_topics():
+    _, router = _router()
+    assert router.lookup(b"NSE_RELIANCE_LTP") is None
+    route = router.add(b"NSE_RELIANCE_LTP", "NSE_RELIANCE_LTP")
+    assert router.lookup(b"NSE_RELIANCE_LTP") is route
+    assert router.add(b"bad", "bad") is None
+    assert router.stats()["cached_topics"] == 1
+
+
+def test_invalidate_rebuilds_recipients_only_for_that_instrument():
+    index, router = _router()
+    rel = router.add(b"NSE_RELIANCE_LTP", "NSE_RELIANCE_LTP")
+    tcs = router.add(b"NSE_TCS_LTP", "NSE_TCS_LTP")
+    assert router.recipients(rel) == {}
+    assert router.recipients(tcs) == {}
+
+    index[("RELIANCE", "NSE", 1)].add(7)
+    index[("TCS", "NSE", 1)].add(8)
+    router.invalidate("RELIANCE", "NSE")
+
+    assert router.recipients(rel) == {7: 1}
+    # TCS was not invalidated, so its cached (stale) recipients are kept
+    assert router.recipients(tcs) == {}
+
+
+def test_route_cache_is_bounded():
+    index = defaultdict(set)
+    router = routing.TopicRouter(index, max_routes=2)
+    for sym in ("A", "B", "C"):
+        router.add(f"NSE_{sym}_LTP".encode(), f"NSE_{sym}_LTP")
+    assert router.stats()["cached_topics"] == 1
@@ -0,0 +1,162 @@
+"""Price-sorted trigger books of the sandbox WebSocket execution engine.
+
+Every tick used to load every resting order of the symbol and every GTT leg
+from the database, even when the price was nowhere near any trigger. The
+engine now keeps per-symbol sorted books and only evaluates what a tick
+actually crossed.
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from sandbox.trigger_book import (
+    ABOVE,
+    ALWAYS,
+    BELOW,
+    TriggerBook,
+    leg_trigger,
+    order_trigger,
+)
+
+
+def order(orderid="O1", action="BUY", price_type="LIMIT", status="open", price=100, trigger=0):
+    return SimpleNamespace(
+        orderid=orderid,
+        user_id="u1",
+        symbol="SBIN",
+        exchange="NSE",
+        action=action,
+        price_type=price_type,
+        order_status=status,
+        price=Decimal(str(price)),
+        trigger_price=Decimal(str(trigger)),
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({"action": "BUY", "price_type": "LIMIT", "price": 100}, (BELOW, 100.0)),
+        ({"action": "SELL", "price_type": "LIMIT", "price": 100}, (ABOVE, 100.0)),
+        (
+            {"action": "BUY", "price_type": "SL-M", "status": "trigger pending", "trigger": 105},
+            (ABOVE, 105.0),
+        ),
+        (
+            {"action": "SELL", "price_type": "SL", "status": "trigger pending", "trigger": 95},
+            (BELOW, 95.0),
+        ),
+        # SL released to the regular book keeps its trigger gate
+        ({"action": "BUY", "price_type": "SL", "price": 110, "trigger": 105}, (ABOVE, 105.0)),
+        ({"action": "BUY", "price_type": "MARKET", "price": 0}, (ALWAYS, None)),
+        ({"action": "BUY", "price_type": "LIMIT", "price": 0}, (ALWAYS, None)),
+    ],
+)
+def test_order_trigger_side(kwargs, expected):
+    assert order_trigger(order(**kwargs)) == expected
+
+
+def test_leg_trigger_matches_leg_direction():
+    assert leg_trigger("above", Decimal("120.5")) == (ABOVE, 120.5)
+    assert leg_trigger("below", 90) == (BELOW, 90.0)
+    assert leg_trigger("below", None) == (ALWAYS, None)
+
+
+def test_crossed_is_inclusive_and_only_returns_reached_levels():
+    book = TriggerBook()
+    book.add("buy99", BELOW, 99.0)
+    book.add("buy100", BELOW, 100.0)
+    book.add("sell101", ABOVE, 101.0)
+    book.add("sell105", ABOVE, 105.0)
+    book.add("market", ALWAYS)
+
+    assert book.crossed(100.5) == ["market"]
+    assert sorted(book.crossed(100.0)) == ["buy100", "market"]
+    assert sorted(book.crossed(101.0)) == ["market", "sell101"]
+    assert sorted(book.crossed(98.0)) == ["buy100", "buy99", "market"]
+
+
+def test_add_rekeys_and_remove_handles_equal_levels():
+    book = TriggerBook()
+    book.add("a", BELOW, 100.0)
+    book.add("b", BELOW, 100.0)
+    book.add("a", ABOVE, 110.0)  # modify: moves, does not duplicate
+
+    assert len(book) == 2
+    assert book.crossed(100.0) == ["b"]
+    assert book.crossed(200.0) == ["a"]
+
+    assert book.remove("b") and not book.remove("b")
+    assert book.crossed(0.0) == [] and book.refs() == ["a"]
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    from sandbox.websocket_execution_engine import WebSocketExecutionEngine
+
+    eng = WebSocketExecutionEngine()
+    eng._running = True
+    monkeypatch.setattr(eng, "_subscribe_ws_symbols", lambda *a: None)
+    monkeypatch.setattr(eng, "_unsubscribe_ws_symbols", lambda *a: None)
+    checked = []
+    monkeypatch.setattr(
+        eng, "_check_and_execute_order", lambda oid, ltp: checked.append((oid, ltp))
+    )
+    eng.checked = checked
+    return eng
+
+
+def tick(ltp):
+    return {"symbol": "SBIN", "exchange": "NSE", "data": {"ltp": ltp}}
+
+
+def test_engine_only_checks_crossed_orders(engine):
+    engine.notify_order_placed(order("B1", "BUY", price=100))
+    engine.notify_order_placed(order("S1", "SELL", price=110))
+
+    engine._on_market_data(tick(105))
+    assert engine.checked == []
+
+    engine._on_market_data(tick(99.5))
+    assert engine.checked == [("B1", Decimal("99.5"))]
+
+    engine.notify_order_completed("B1", "NSE:SBIN", "u1")
+    engine.checked.clear()
+    engine._on_market_data(tick(99.5))
+    assert engine.checked == []
+    assert "NSE:SBIN" in engine._trigger_books
+
+
+def test_engine_modify_rekeys_order(engine):
+    resting = order("B1", "BUY", price=100)
+    engine.notify_order_placed(resting)
+
+    resting.price = Decimal("106")
+    engine.notify_order_modified(resting)
+    engine._on_market_data(tick(105))
+    assert [oid for oid, _ in engine.checked] == ["B1"]
+
+
+def test_engine_gtt_leg_uses_memory_state(engine, monkeypatch):
+    from sandbox import gtt_manager
+
+    claims = []
+    monkeypatch.setattr(
+        gtt_manager, "try_claim_trigger", lambda leg_id: claims.append(leg_id) or True
+    )
+    monkeypatch.setattr(gtt_manager, "fire_leg", lambda leg_id, execution_price=None: True)
+
+    leg = SimpleNamespace(
+        id=7, leg_status="pending", trigger_direction="above", trigger_price=Decimal("120")
+    )
+    gtt = SimpleNamespace(gtt_id="G1", user_id="u1", symbol="SBIN", exchange="NSE", legs=[leg])
+    engine.notify_gtt_placed(gtt)
+
+    engine._on_market_data(tick(119.95))
+    assert claims == []
+
+    engine._on_market_data(tick(120))
+    assert claims == [7]
+    assert 7 not in engine._gtt_legs and "NSE:SBIN" not in engine._trigger_books
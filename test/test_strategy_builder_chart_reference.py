@@ -5,6 +5,7 @@ from unittest.mock import Mock
 import pytest
 
 from services import (
+    history_batch_service,
     multi_strike_oi_service,
     strategy_builder_reference_service,
     strategy_chart_service,
@@ -23,6 +24,16 @@ LEG = {
 }
 
 
+def patch_history(monkeypatch, module, history):
+    """Route the service's broker history calls to ``history``, in call order."""
+    if module is multi_strike_oi_service:
+        # Fetched as one batch; one worker and no Historify keep the order
+        module = history_batch_service
+        monkeypatch.setattr(module, "HISTORY_BATCH_WORKERS", 1)
+        monkeypatch.setattr(module, "HISTORY_BATCH_USE_HISTORIFY", False)
+    monkeypatch.setattr(module, "get_history", history)
+
+
 def history_response(*, symbol, exchange, **_kwargs):
     row = {"timestamp": 1_700_000_000, "close": 100}
     if symbol == LEG["symbol"]:
@@ -40,7 +51,7 @@ def history_response(*, symbol, exchange, **_kwargs):
 def test_mcx_latest_quote_uses_the_same_resolved_future_as_history(monkeypatch, module, service):
     history = Mock(side_effect=history_response)
     quote = Mock(return_value=(True, {"data": {"ltp": 101}}, 200))
-    monkeypatch.setattr(module, "get_history", history)
+    patch_history(monkeypatch, module, history)
     monkeypatch.setattr(module, "get_quotes", quote)
     monkeypatch.setattr(
         strategy_builder_reference_service,
@@ -77,7 +88,7 @@ def test_mcx_latest_quote_uses_the_same_resolved_future_as_history(monkeypatch,
 def test_crypto_uses_option_chain_canonical_reference(monkeypatch, module, service):
     history = Mock(side_effect=history_response)
     quote = Mock(return_value=(True, {"data": {"ltp": 101}}, 200))
-    monkeypatch.setattr(module, "get_history", history)
+    patch_history(monkeypatch, module, history)
     monkeypatch.setattr(module, "get_quotes", quote)
 
     success, _response, status = service(
@@ -112,7 +123,7 @@ def test_crypto_without_canonical_fields_resolves_perpetual_reference(monkeypatc
     history = Mock(side_effect=history_response)
     quote = Mock(return_value=(True, {"data": {"ltp": 101}}, 200))
     perpetual_search = Mock(return_value=[{"symbol": "BTCUSDFUT", "exchange": "CRYPTO"}])
-    monkeypatch.setattr(module, "get_history", history)
+    patch_history(monkeypatch, module, history)
     monkeypatch.setattr(module, "get_quotes", quote)
     monkeypatch.setattr(
         strategy_builder_reference_service,
@@ -0,0 +1,103 @@
+"""Trigram index behind BrokerSymbolCache.search_symbols.
+
+The index only narrows which rows search_symbols checks; every candidate still
+goes through the original per-row match and ranking. So for any query the
+results, and their order, must be exactly what scanning every row returns.
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from database.token_db_enhanced import BrokerSymbolCache, SymbolData
+
+
+def _rows():
+    rows = []
+    token = 1000
+    for underlying in ("NIFTY", "BANKNIFTY", "FINNIFTY", "RELIANCE"):
+        for expiry in ("28MAR24", "25APR24"):
+            for strike in range(21000, 23000, 100):
+                for kind in ("CE", "PE"):
+                    symbol = f"{underlying}{expiry}{strike}{kind}"
+                    rows.append(
+                        SymbolData(
+                            symbol=symbol,
+                            brsymbol=symbol.lower(),
+                            name=underlying,
+                            exchange="NFO",
+                            brexchange="NFO",
+                            token=str(token),
+                            strike=float(strike),
+                            expiry=expiry,
+                        )
+                    )
+                    token += 1
+    rows += [
+        SymbolData("NIFTY", "Nifty 50", "NIFTY", "NSE_INDEX", "NSE", "26000"),
+        SymbolData("NIFTYIT", "Nifty IT", "NIFTY IT", "NSE_INDEX", "NSE", "26008"),
+        SymbolData("RELIANCE", "RELIANCE-EQ", "RELIANCE INDUSTRIES", "NSE", "NSE", "2885"),
+        # Same token as the NSE row: it replaces it in cache.ids_by_token, so an
+        # unfiltered search sees only this one while an NSE search sees the other.
+        SymbolData("RELIANCE", "RELIANCE", "RELIANCE INDUSTRIES", "BSE", "BSE", "2885"),
+        SymbolData("TCS", "TCS-EQ", None, "NSE", "NSE", "tcs11536"),
+    ]
+    return rows
+
+
+@pytest.fixture
+def cache():
+    cache = BrokerSymbolCache()
+    cache._load_records(_rows())
+    assert cache.search_index is not None
+    return cache
+
+
+def _scan(cache, *args, **kwargs):
+    index, cache.search_index = cache.search_index, None
+    try:
+        return cache.search_symbols(*args, **kwargs)
+    finally:
+        cache.search_index = index
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "NIFTY",
+        "nifty 22000 ce",
+        "BANKNIFTY 25APR 21500",
+        "22000",
+        "22000.0",
+        "reliance",
+        "RELIANCE-EQ",
+        "26000",
+        "TCS11536",  # token matching is case-sensitive
+        "tcs",
+        "CE",  # too short to narrow: scanned
+        "NIFTY IT",
+        "XYZ",
+    ],
+)
+@pytest.mark.parametrize("exchange", [None, "NFO", "NSE", "NSE_INDEX", "MCX"])
+def test_index_matches_full_scan(cache, query, exchange):
+    expected = _scan(cache, query, exchange)
+    assert cache.search_symbols(query, exchange) == expected
+
+
+def test_limit_keeps_ranking(cache):
+    assert cache.search_symbols("NIFTY", limit=5) == _scan(cache, "NIFTY", limit=5)
+    assert cache.search_symbols("NIFTY", limit=5)[0].symbol == "NIFTY"
+
+
+def test_duplicate_token_follows_primary_dict(cache):
+    unfiltered = cache.search_symbols("RELIANCE INDUSTRIES")
+    assert [(r.exchange, r.token) for r in unfiltered] == [("BSE", "2885")]
+    nse = cache.search_symbols("RELIANCE INDUSTRIES", "NSE")
+    assert [(r.exchange, r.token) for r in nse] == [("NSE", "2885")]
+
+
+def test_clear_cache_drops_index(cache):
+    cache.clear_cache()
+    assert cache.search_index is None
+    assert cache.search_symbols("NIFTY") == []
@@ -0,0 +1,122 @@
+"""On-disk snapshot of the symbol cache.
+
+load_all_symbols writes a snapshot after reading symtoken and maps it on the
+next load of the same master contract instead of querying again. A cache
+restored from a snapshot must answer exactly like the one that wrote it, and a
+new download (a different key) must go back to the database.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import database.symbol_snapshot as symbol_snapshot
+from database.token_db_enhanced import BrokerSymbolCache, SymbolData
+
+
+def _rows():
+    rows = [
+        SymbolData("RELIANCE", "RELIANCE-EQ", "RELIANCE INDUSTRIES", "NSE", "NSE", "2885", lotsize=1),
+        SymbolData("NIFTY", "Nifty 50", None, "NSE_INDEX", "NSE", "26000"),
+        SymbolData(
+            "CRUDEOIL17APR99FUT", "CRUDEOIL99APRFUT", "CRUDEOIL", "MCX", "MCX", "4001",
+            expiry="17-APR-99", lotsize=100, instrumenttype="FUTCOM", tick_size=1.0,
+        ),
+    ]
+    for strike in range(21000, 23000, 100):
+        for kind in ("CE", "PE"):
+            rows.append(
+                SymbolData(
+                    f"NIFTY28MAR24{strike}{kind}", f"NIFTY24MAR{strike}{kind}", "NIFTY",
+                    "NFO", "NFO", str(50000 + strike + (kind == "PE")), expiry="28-MAR-24",
+                    strike=float(strike), lotsize=50, instrumenttype="OPTIDX", tick_size=0.05,
+                )
+            )
+    return rows
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(symbol_snapshot, "SNAPSHOT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def master(monkeypatch):
+    """symtoken as seen by load_all_symbols, counting queries."""
+    state = SimpleNamespace(rows=_rows(), queries=0, downloaded=datetime(2024, 3, 20, 8, 45))
+
+    def all_rows():
+        state.queries += 1
+        return state.rows
+
+    monkeypatch.setattr(
+        "database.symbol.SymToken", SimpleNamespace(query=SimpleNamespace(all=all_rows))
+    )
+    monkeypatch.setattr(
+        BrokerSymbolCache,
+        "_snapshot_key",
+        lambda self, broker: symbol_snapshot.snapshot_key(broker, state.downloaded),
+    )
+    return state
+
+
+def _answers(cache):
+    return (
+        [cache.get_symbol_info(r.symbol, r.exchange) for r in _rows()],
+        cache.get_symbols_bulk([("2885", "NSE"), ("4001", "MCX")]),
+        cache.search_symbols("nifty 22000"),
+        cache.search_symbols("ce", "NFO", limit=5),
+        cache.fno_search_symbols(exchange="NFO", strike_min=22500, instrumenttype="PE"),
+        dict(cache.tradable_underlyings_by_exchange),
+        dict(cache.expiries_by_exchange_underlying),
+        cache.stats.total_symbols,
+    )
+
+
+def test_second_load_maps_the_snapshot(snapshot_dir, master):
+    first = BrokerSymbolCache()
+    assert first.load_all_symbols("angel")
+    assert master.queries == 1
+    assert [p.name for p in snapshot_dir.iterdir()] == ["angel-20240320T084500000000-v1"]
+
+    second = BrokerSymbolCache()
+    assert second.load_all_symbols("angel")
+    assert master.queries == 1
+    assert second.search_index is not None
+    assert _answers(second) == _answers(first)
+
+
+def test_new_download_replaces_the_snapshot(snapshot_dir, master):
+    BrokerSymbolCache().load_all_symbols("angel")
+
+    master.downloaded = datetime(2024, 3, 21, 8, 45)
+    master.rows = master.rows[:3]
+    cache = BrokerSymbolCache()
+    assert cache.load_all_symbols("angel")
+
+    assert master.queries == 2
+    assert cache.stats.total_symbols == 3
+    assert [p.name for p in snapshot_dir.iterdir()] == ["angel-20240321T084500000000-v1"]
+
+
+def test_unreadable_snapshot_falls_back_to_database(snapshot_dir, master):
+    BrokerSymbolCache().load_all_symbols("angel")
+    (snapshot_dir / "angel-20240320T084500000000-v1" / "symbol.blob.npy").write_bytes(b"junk")
+
+    cache = BrokerSymbolCache()
+    assert cache.load_all_symbols("angel")
+    assert master.queries == 2
+    assert cache.get_token("RELIANCE", "NSE") == "2885"
+
+
+def test_disabled(snapshot_dir, master, monkeypatch):
+    monkeypatch.setattr("database.token_db_enhanced.SYMBOL_CACHE_SNAPSHOT_ENABLED", False)
+    BrokerSymbolCache().load_all_symbols("angel")
+    BrokerSymbolCache().load_all_symbols("angel")
+
+    assert master.queries == 2
+    assert list(snapshot_dir.iterdir()) == []
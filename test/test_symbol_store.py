@@ -0,0 +1,114 @@
+"""Columnar symbol master behind BrokerSymbolCache.
+
+Rows live in SymbolStore columns and the lookup maps hold row ids; SymbolData
+is only built for what a lookup returns. Callers must get back exactly the
+values that were loaded, including NULLs, and get_cache_info reports the
+measured footprint.
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from database.symbol_store import NO_EXPIRY, expiry_to_int
+from database.token_db_enhanced import BrokerSymbolCache, SymbolData
+
+ROWS = [
+    SymbolData(
+        symbol="NIFTY28MAR2422000CE",
+        brsymbol="NIFTY24MAR22000CE",
+        name="NIFTY",
+        exchange="NFO",
+        brexchange="NFO",
+        token="43210",
+        expiry="28-MAR-24",
+        strike=22000.0,
+        lotsize=50,
+        instrumenttype="OPTIDX",
+        tick_size=0.05,
+    ),
+    SymbolData(
+        symbol="NIFTY28MAR24FUT",
+        brsymbol="NIFTY24MARFUT",
+        name="NIFTY",
+        exchange="NFO",
+        brexchange="NFO",
+        token="43200",
+        expiry="28-MAR-24",
+        strike=-1.0,
+        lotsize=50,
+        instrumenttype="FUTIDX",
+        tick_size=0.05,
+    ),
+    SymbolData("RELIANCE", "RELIANCE-EQ", "RELIANCE INDUSTRIES", "NSE", "NSE", "2885"),
+    SymbolData(
+        symbol="BTCUSD.P",
+        brsymbol="BTCUSD",
+        name="BTCUSD",
+        exchange="CRYPTO",
+        brexchange="DELTA",
+        token="139",
+        lotsize=1,
+        instrumenttype="PERPFUT",
+        tick_size=0.5,
+        contract_value=0.001,
+    ),
+]
+
+
+@pytest.fixture
+def cache():
+    cache = BrokerSymbolCache()
+    cache._load_records(ROWS)
+    return cache
+
+
+def test_symbol_info_round_trips_every_field(cache):
+    for row in ROWS:
+        info = cache.get_symbol_info(row.symbol, row.exchange)
+        expected = SymbolData(**{**vars(row), "underlying": info.underlying})
+        assert info == expected
+    assert cache.get_symbol_info("NIFTY28MAR2422000CE", "NFO").underlying == "NIFTY"
+    assert cache.get_symbol_info("RELIANCE", "NSE").strike is None
+    assert cache.get_symbol_info("RELIANCE", "NSE").lotsize is None
+
+
+def test_lookups(cache):
+    assert cache.get_token("RELIANCE", "NSE") == "2885"
+    assert cache.get_symbol("43210", "NFO") == "NIFTY28MAR2422000CE"
+    assert cache.get_br_symbol("NIFTY28MAR24FUT", "NFO") == "NIFTY24MARFUT"
+    assert cache.get_oa_symbol("BTCUSD", "CRYPTO") == "BTCUSD.P"
+    assert cache.get_brexchange("BTCUSD.P", "CRYPTO") == "DELTA"
+    assert cache.get_symbol_data("139").symbol == "BTCUSD.P"
+    assert cache.get_token("RELIANCE", "BSE") is None
+    assert cache.get_tokens_bulk([("RELIANCE", "NSE"), ("TCS", "NSE")]) == ["2885", None]
+    assert cache.get_symbols_bulk([("2885", "NSE"), ("2885", "BSE")]) == ["RELIANCE", None]
+
+
+def test_fno_filters_read_columns(cache):
+    options = cache.fno_search_symbols(exchange="NFO", instrumenttype="CE", strike_min=21000)
+    assert [s.symbol for s in options] == ["NIFTY28MAR2422000CE"]
+    futures = cache.fno_search_symbols(exchange="NFO", expiry="28-MAR-24", instrumenttype="FUT")
+    assert [s.symbol for s in futures] == ["NIFTY28MAR24FUT"]
+    assert [s.symbol for s in cache.fno_search_symbols(instrumenttype="PERPFUT")] == ["BTCUSD.P"]
+    # Rows without a strike never pass a strike bound
+    assert cache.fno_search_symbols(exchange="NSE", strike_max=1e9) == []
+
+
+def test_expiry_column():
+    assert expiry_to_int("28-MAR-24") == 20240328
+    assert expiry_to_int("28-MAR-2024") == 20240328
+    assert expiry_to_int(None) == NO_EXPIRY
+    assert expiry_to_int("garbage") == NO_EXPIRY
+
+
+def test_memory_report(cache):
+    memory = cache.get_cache_info()["memory"]
+    assert memory["total_mb"] > 0
+    assert memory["bytes_per_symbol"] > 0
+    for part in ("string_columns", "interned_columns", "numeric_columns", "lookup_indexes"):
+        assert f"{part}_mb" in memory
+
+    cache.clear_cache()
+    assert cache.get_cache_info()["memory"] == {}
+    assert cache.get_token("RELIANCE", "NSE") is None
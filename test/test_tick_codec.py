@@ -0,0 +1,117 @@
+"""Tests for websocket_proxy.tick_codec (binary tick wire format).
+
+Loads tick_codec.py directly so the tests don't import the websocket_proxy
+package (which pulls in every broker adapter).
+"""
+
+import importlib.util
+import json
+import pathlib
+from decimal import Decimal
+
+import pytest
+
+_MODULE_PATH = (
+    pathlib.Path(__file__).resolve().parent.parent
+    / "websocket_proxy"
+    / "tick_codec.py"
+)
+
+
+def _load_tick_codec():
+    spec = importlib.util.spec_from_file_location("_tick_codec_under_test", _MODULE_PATH)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+codec = _load_tick_codec()
+
+requires_msgpack = pytest.mark.skipif(
+    not codec.binary_available(), reason="msgpack not installed"
+)
+
+QUOTE = {
+    "symbol": "RELIANCE",
+    "exchange": "NSE",
+    "mode": "quote",
+    "ltp": 2950.5,
+    "open": 2900.0,
+    "volume": 123456,
+    "timestamp": 1760000000000,
+}
+DEPTH = {
+    **QUOTE,
+    "mode": "full",
+    "depth": {
+        "buy": [{"price": 2950.4, "quantity": 10, "orders": 2}],
+        "sell": [{"price": 2950.6, "quantity": 12, "orders": 3}],
+    },
+}
+
+
+def test_json_is_the_default_and_unchanged():
+    payload = codec.encode_tick("NSE_RELIANCE_QUOTE", QUOTE)
+    assert payload == json.dumps(QUOTE).encode("utf-8")
+    assert codec.decode_tick(payload) == QUOTE
+
+
+@requires_msgpack
+@pytest.mark.parametrize(
+    "topic, data",
+    [
+        ("NSE_RELIANCE_LTP", {"symbol": "RELIANCE", "exchange": "NSE", "ltp": 2950.5}),
+        ("NSE_RELIANCE_QUOTE", QUOTE),
+        ("NSE_RELIANCE_DEPTH", DEPTH),
+        # Unknown mode suffix -> schema 0, all keys kept as strings
+        ("NSE_RELIANCE_CUSTOM", QUOTE),
+        # Multi-segment exchange and underscores in the symbol
+        ("CRYPTO_SOL_INR_LTP", {"symbol": "SOL_INR", "ltp": 1.0, "flag": True, "x": None}),
+    ],
+)
+def test_msgpack_round_trip_matches_json(topic, data):
+    payload = codec.encode_tick(topic, data, codec.WIRE_MSGPACK)
+    assert codec.is_binary_payload(payload)
+    assert codec.decode_tick(payload) == json.loads(json.dumps(data))
+
+
+@requires_msgpack
+def test_msgpack_payload_is_smaller_than_json():
+    binary = codec.encode_tick("NSE_RELIANCE_DEPTH", DEPTH, codec.WIRE_MSGPACK)
+    assert len(binary) < len(json.dumps(DEPTH))
+
+
+@requires_msgpack
+def test_unencodable_values_fall_back_to_json():
+    # msgpack cannot represent integers wider than 64 bits; JSON can.
+    data = {"ltp": 1.0, "volume": 2**70}
+    payload = codec.encode_tick("NSE_X_QUOTE", data, codec.WIRE_MSGPACK)
+    assert not codec.is_binary_payload(payload)
+    assert codec.decode_tick(payload) == data
+
+    payload = codec.encode_tick("NSE_X_LTP", {"ltp": Decimal("101.25")}, codec.WIRE_MSGPACK)
+    assert not codec.is_binary_payload(payload)
+    assert codec.decode_tick(payload) == {"ltp": 101.25}
+
+
+def test_unknown_binary_schema_raises_value_error():
+    with pytest.raises(ValueError):
+        codec.decode_tick(bytes((0xB7, 99)) + b"\x80")
+
+
+def test_malformed_json_raises_value_error():
+    with pytest.raises(ValueError):
+        codec.decode_tick(b"{not json")
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, "json"),
+        ("json", "json"),
+        ("bogus", "json"),
+        (" MsgPack ", "msgpack" if codec.binary_available() else "json"),
+    ],
+)
+def test_resolve_wire_format(value, expected):
+    assert codec.resolve_wire_format(value) == expected
@@ -0,0 +1,142 @@
+"""Per-symbol tick history rings behind MarketDataService window queries."""
+
+import math
+
+import numpy as np
+import pytest
+
+from services.market_data_service import get_market_data_service, get_tick_history, get_tick_stats
+from services.tick_history import COLUMNS, TickHistoryStore, TickRingBuffer
+
+
+def fill(ring, n, start_ts=1000.0, ltp=100.0, volume=0.0):
+    for i in range(n):
+        ring.append(start_ts + i, ltp + i, volume + 10 * i, math.nan, math.nan, math.nan)
+
+
+def test_ring_keeps_last_capacity_ticks_in_order():
+    ring = TickRingBuffer(4)
+    fill(ring, 6)
+
+    assert len(ring) == 4
+    cols = ring.columns()
+    np.testing.assert_array_equal(cols["ts"], [1002.0, 1003.0, 1004.0, 1005.0])
+    np.testing.assert_array_equal(cols["ltp"], [102.0, 103.0, 104.0, 105.0])
+
+
+def test_window_by_seconds_and_last_n():
+    ring = TickRingBuffer(16)
+    fill(ring, 10)
+
+    assert ring.window(seconds=3, now=1009.0).shape == (len(COLUMNS), 4)
+    assert ring.window(last_n=2)[1].tolist() == [108.0, 109.0]
+    assert ring.window(seconds=100, last_n=3, now=1009.0).shape[1] == 3
+    assert ring.window(seconds=1, now=2000.0).shape[1] == 0
+
+
+def test_stats_vwap_uses_traded_volume_between_ticks():
+    ring = TickRingBuffer(8)
+    # cumulative day volume 1000 -> 1010 at 101 -> 1040 at 102, then a reset
+    ring.append(1.0, 100.0, 1000.0, math.nan, math.nan, math.nan)
+    ring.append(2.0, 101.0, 1010.0, math.nan, math.nan, math.nan)
+    ring.append(3.0, 102.0, 1040.0, math.nan, math.nan, math.nan)
+    ring.append(4.0, 99.0, 5.0, math.nan, math.nan, math.nan)
+
+    stats = ring.stats()
+    assert stats["ticks"] == 4
+    assert (stats["open"], stats["high"], stats["low"], stats["last"]) == (100.0, 102.0, 99.0, 99.0)
+    assert stats["volume"] == 40.0
+    assert stats["vwap"] == pytest.approx((101.0 * 10 + 102.0 * 30) / 40)
+
+
+def test_stats_without_volume_or_ticks():
+    ring = TickRingBuffer(8)
+    assert ring.stats() is None
+    ring.append(1.0, 50.0, math.nan, math.nan, math.nan, math.nan)
+    assert ring.stats()["vwap"] is None
+
+
+def test_symbol_in_several_modes_records_the_richest():
+    store = TickHistoryStore(capacity=16)
+    for i in range(4):
+        # One market move arrives once per subscribed mode
+        store.record("NSE:M", 2, {"ltp": 100.0 + i, "volume": 1000 + 10 * i}, ts=10.0 + i)
+        store.record("NSE:M", 1, {"ltp": 100.0 + i}, ts=10.0 + i)
+
+    stats = store.get("NSE:M").stats()
+    assert stats["ticks"] == 4
+    assert stats["volume"] == 30.0
+    assert stats["vwap"] == pytest.approx((101.0 + 102.0 + 103.0) / 3)
+
+    # The QUOTE subscription went away: LTP ticks take over once it is quiet
+    store.record("NSE:M", 1, {"ltp": 104.0}, ts=14.0)
+    store.record("NSE:M", 1, {"ltp": 105.0}, ts=20.0)
+    assert store.get("NSE:M").columns()["ltp"].tolist() == [100.0, 101.0, 102.0, 103.0, 105.0]
+
+
+def test_store_memory_bound_evicts_quietest_symbol():
+    # 4 ticks * 6 columns * 8 bytes = 192 bytes per ring -> 2 rings fit
+    store = TickHistoryStore(capacity=4, max_mb=400 / (1024 * 1024))
+    assert store.max_symbols == 2
+
+    store.record("NSE:A", 1, {"ltp": 1}, ts=10.0)
+    store.record("NSE:B", 1, {"ltp": 2}, ts=20.0)
+    store.record("NSE:A", 1, {"ltp": 3}, ts=30.0)
+    store.record("NSE:C", 1, {"ltp": 4}, ts=40.0)
+
+    assert store.get("NSE:B") is None
+    assert store.get("NSE:A") is not None and store.get("NSE:C") is not None
+    info = store.memory_info()
+    assert info["symbols"] == 2 and info["evictions"] == 1
+    assert info["bytes"] <= info["max_bytes"]
+
+
+def test_store_disabled_with_zero_capacity():
+    store = TickHistoryStore(capacity=0)
+    assert not store.enabled
+    store.record("NSE:A", 1, {"ltp": 1})
+    assert store.get("NSE:A") is None
+
+
+def test_depth_ticks_record_best_bid_ask():
+    store = TickHistoryStore(capacity=4, max_mb=1)
+    store.record(
+        "NFO:X",
+        3,
+        {"ltp": 10, "oi": 500, "depth": {"buy": [{"price": 9.95}], "sell": [{"price": 10.05}]}},
+    )
+    store.record("NFO:X", 3, {"ltp": 11, "bids": [{"price": 10.9}], "asks": []})
+
+    cols = store.get("NFO:X").columns()
+    assert cols["bid"].tolist() == [9.95, 10.9]
+    assert cols["ask"][0] == 10.05 and math.isnan(cols["ask"][1])
+    assert cols["oi"][0] == 500
+
+
+def test_market_data_service_feeds_history():
+    service = get_market_data_service()
+    service.clear_cache()
+    try:
+        for i in range(5):
+            service.process_market_data(
+                {
+                    "symbol": "HIST",
+                    "exchange": "NSE",
+                    "mode": 2,
+                    "data": {"ltp": 200.0 + i, "volume": 100 * i},
+                }
+            )
+
+        history = service.get_tick_history("HIST", "NSE", last_n=3)
+        assert history["ltp"].tolist() == [202.0, 203.0, 204.0]
+        stats = service.get_tick_stats("HIST", "NSE", seconds=60)
+        assert stats["ticks"] == 5 and stats["high"] == 204.0
+        assert service.get_cache_metrics()["tick_history"]["symbols"] == 1
+        # The module-level accessors take the same windows
+        assert get_tick_history("HIST", "NSE", last_n=2)["ltp"].tolist() == [203.0, 204.0]
+        assert get_tick_stats("HIST", "NSE", last_n=2)["ticks"] == 2
+
+        service.clear_cache("HIST", "NSE")
+        assert service.get_tick_history("HIST", "NSE") is None
+    finally:
+        service.clear_cache()
@@ -0,0 +1,184 @@
+"""In-process placement of TradingView and Chartink webhook orders.
+
+The strategy and chartink blueprints each ran a thread polling two queues every
+100ms and POSTing orders back to /api/v1/placeorder and placesmartorder, with
+a hard 1s sleep after every smart order. WebhookOrderScheduler calls the place
+order services directly from one worker, paced by a token bucket per endpoint
+and per broker, woken by a condition variable.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.webhook_order_scheduler as webhook_order_scheduler  # noqa: E402
+import utils.order_dispatcher as order_dispatcher  # noqa: E402
+from events import AnalyzerErrorEvent, OrderFailedEvent  # noqa: E402
+from services.webhook_order_scheduler import WebhookOrderScheduler  # noqa: E402
+from utils.event_bus import bus  # noqa: E402
+
+
+class _Placer:
+    """A place function recording what it placed and when."""
+
+    def __init__(self, name, log, fail_symbols=()):
+        self.name = name
+        self.log = log
+        self.fail_symbols = fail_symbols
+
+    def __call__(self, payload):
+        self.log.append((self.name, payload["symbol"], time.monotonic()))
+        if payload["symbol"] in self.fail_symbols:
+            return False, {"status": "error", "message": "rejected"}, 400
+        return True, {"status": "success", "orderid": "1"}, 200
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture()
+def placed():
+    return []
+
+
+def test_orders_are_placed_in_arrival_order_per_endpoint(placed):
+    scheduler = WebhookOrderScheduler(
+        [
+            ("placesmartorder", "100 per second", _Placer("smart", placed)),
+            ("placeorder", "100 per second", _Placer("regular", placed)),
+        ]
+    )
+    for n in range(20):
+        scheduler.submit("placeorder", {"symbol": f"R{n}"})
+    _wait_for(lambda: len(placed) == 20)
+    assert [symbol for _, symbol, _ in placed] == [f"R{n}" for n in range(20)]
+    scheduler.close()
+
+
+def test_smart_order_pacing_does_not_hold_up_regular_orders(placed):
+    scheduler = WebhookOrderScheduler(
+        [
+            ("placesmartorder", "2 per second", _Placer("smart", placed)),
+            ("placeorder", "100 per second", _Placer("regular", placed)),
+        ]
+    )
+    start = time.monotonic()
+    for n in range(3):
+        scheduler.submit("placesmartorder", {"symbol": f"S{n}"})
+    for n in range(5):
+        scheduler.submit("placeorder", {"symbol": f"R{n}"})
+    _wait_for(lambda: len(placed) == 8)
+
+    smart = [t - start for name, _, t in placed if name == "smart"]
+    regular = [t - start for name, _, t in placed if name == "regular"]
+    # Two smart orders go at once (the bucket's burst), the third waits for
+    # its token; the regular orders go in the meantime rather than after it
+    assert smart[2] >= 0.45
+    assert max(regular) < smart[2]
+
+    stats = scheduler.stats()
+    assert stats["placesmartorder"]["placed"] == 3
+    assert stats["placesmartorder"]["max_wait_ms"] >= 450
+    assert stats["placeorder"]["pending"] == 0
+    scheduler.close()
+
+
+def test_spaced_endpoint_waits_an_interval_after_each_order_completes(placed):
+    def slow(payload):
+        time.sleep(0.2)
+        return _Placer("smart", placed)(payload)
+
+    scheduler = WebhookOrderScheduler(
+        [("placesmartorder", "10 per second", slow)], spaced=("placesmartorder",)
+    )
+    for n in range(3):
+        scheduler.submit("placesmartorder", {"symbol": f"S{n}"})
+    _wait_for(lambda: len(placed) == 3)
+
+    # Each order returns at (start + 0.2s); the next starts 0.1s after that,
+    # although the bucket's burst of 10 would otherwise let it go at once
+    starts = [t - 0.2 for _, _, t in placed]
+    assert min(b - a for a, b in zip(starts, starts[1:], strict=False)) >= 0.28
+    scheduler.close()
+
+
+def test_broker_bucket_paces_live_orders(monkeypatch, placed):
+    monkeypatch.setattr(order_dispatcher, "_buckets", {})
+    monkeypatch.setenv("ORDER_RATE_LIMIT", "5 per second")
+    scheduler = WebhookOrderScheduler(
+        [("placeorder", "100 per second", _Placer("regular", placed))],
+        rate_key=lambda api_key: "zerodha" if api_key == "live" else None,
+    )
+    start = time.monotonic()
+    for n in range(7):
+        scheduler.submit("placeorder", {"symbol": f"L{n}", "apikey": "live"})
+    _wait_for(lambda: len(placed) == 7)
+    # Five from the broker bucket's burst, then 5 per second
+    assert placed[-1][2] - start >= 0.35
+    scheduler.close()
+
+
+def test_failures_are_counted_and_do_not_stop_the_worker(placed):
+    def explode(payload):
+        raise RuntimeError("broker down")
+
+    scheduler = WebhookOrderScheduler(
+        [
+            ("placesmartorder", "100 per second", explode),
+            ("placeorder", "100 per second", _Placer("regular", placed, fail_symbols={"BAD"})),
+        ]
+    )
+    scheduler.submit("placesmartorder", {"symbol": "X"})
+    scheduler.submit("placeorder", {"symbol": "BAD"})
+    scheduler.submit("placeorder", {"symbol": "GOOD"})
+    _wait_for(lambda: len(placed) == 2)
+    _wait_for(lambda: scheduler.stats()["placesmartorder"]["failed"] == 1)
+
+    stats = scheduler.stats()
+    assert stats["placeorder"]["placed"] == 1
+    assert stats["placeorder"]["failed"] == 1
+    scheduler.close()
+
+
+def test_close_drains_the_queue(placed):
+    gate = threading.Event()
+
+    def slow(payload):
+        gate.wait(5)
+        return _Placer("regular", placed)(payload)
+
+    scheduler = WebhookOrderScheduler([("placeorder", "100 per second", slow)])
+    for n in range(3):
+        scheduler.submit("placeorder", {"symbol": f"D{n}"})
+    gate.set()
+    scheduler.close(timeout=5)
+
+    assert [symbol for _, symbol, _ in placed] == ["D0", "D1", "D2"]
+    assert scheduler.submit("placeorder", {"symbol": "late"}) is False
+
+
+@pytest.mark.parametrize(
+    ("analyze", "event_type"), [(False, OrderFailedEvent), (True, AnalyzerErrorEvent)]
+)
+def test_invalid_smart_order_is_published_like_the_api(monkeypatch, analyze, event_type):
+    published = []
+    monkeypatch.setattr(webhook_order_scheduler, "get_analyze_mode", lambda: analyze)
+    monkeypatch.setattr(bus, "publish", published.append)
+
+    success, response, status = webhook_order_scheduler.place_webhook_smart_order(
+        {"apikey": "key", "strategy": "Test", "symbol": "SBIN"}
+    )
+
+    assert (success, status) == (False, 400)
+    assert [type(event) for event in published] == [event_type]
+    assert published[0].api_type == "placesmartorder"
+    assert published[0].response_data == response
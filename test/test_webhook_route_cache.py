@@ -0,0 +1,200 @@
+"""Cached webhook routing for TradingView and Chartink strategies.
+
+Every alert looked up its strategy, scanned the strategy's symbol mappings and
+decrypted the user's API key. get_webhook_route serves all of that from one
+immutable snapshot per webhook id, rebuilt after any strategy, mapping or API
+key change; the old strategy cache kept serving a toggled-off strategy as
+active for up to five minutes.
+"""
+
+import os
+import sys
+import uuid
+from datetime import time as dt_time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database.auth_db as auth_db  # noqa: E402
+import database.chartink_db as chartink_db  # noqa: E402
+import database.strategy_db as strategy_db  # noqa: E402
+from database.webhook_route_cache import (  # noqa: E402
+    SymbolRoute,
+    WebhookRoute,
+    WebhookRouteCache,
+    invalidate_webhook_routes,
+)
+
+
+def _route(webhook_id, **overrides):
+    fields = {
+        "id": 1,
+        "name": webhook_id,
+        "user_id": "alice",
+        "is_active": True,
+        "is_intraday": True,
+        "trading_mode": "LONG",
+        "start_time": "09:15",
+        "end_time": "15:00",
+        "squareoff_time": "15:15",
+        "mappings": {"SBIN": SymbolRoute("SBIN", "NSE", 1, "MIS")},
+        "api_key": "key",
+    }
+    fields.update(overrides)
+    return WebhookRoute(**fields)
+
+
+@pytest.fixture()
+def strategy_databases(tmp_path, monkeypatch):
+    """Point strategy_db and chartink_db at a temporary database."""
+    test_engine = create_engine(
+        f"sqlite:///{tmp_path / 'strategies.db'}",
+        poolclass=NullPool,
+        connect_args={"check_same_thread": False},
+    )
+    modules = (strategy_db, chartink_db)
+    sessions = []
+    queries = [module.Base.__dict__["query"] for module in modules]
+    for module in modules:
+        session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=test_engine))
+        sessions.append(session)
+        monkeypatch.setattr(module, "engine", test_engine)
+        monkeypatch.setattr(module, "db_session", session)
+        module.Base.query = session.query_property()
+        module.Base.metadata.create_all(bind=test_engine)
+    strategy_db.clear_strategy_cache()
+    chartink_db.webhook_routes.clear()
+
+    yield
+
+    for module, session, query in zip(modules, sessions, queries, strict=True):
+        session.remove()
+        module.Base.query = query
+    test_engine.dispose()
+    strategy_db.clear_strategy_cache()
+    chartink_db.webhook_routes.clear()
+
+
+@pytest.fixture()
+def decrypts(monkeypatch):
+    """Count API key decrypts; routes are built with a fixed key."""
+    calls = []
+
+    def fake_get_api_key(user_id):
+        calls.append(user_id)
+        return f"key-{user_id}"
+
+    monkeypatch.setattr(auth_db, "get_api_key_for_tradingview", fake_get_api_key)
+    return calls
+
+
+def test_route_is_a_parsed_immutable_snapshot():
+    route = _route("w1", squareoff_time=None)
+    assert route.start_at == dt_time(9, 15)
+    assert route.end_at == dt_time(15, 0)
+    assert route.squareoff_at is None
+    assert "key" not in repr(route)
+    with pytest.raises(TypeError):
+        route.mappings["INFY"] = SymbolRoute("INFY", "NSE", 1, "MIS")
+
+
+def test_cache_rebuilds_after_invalidation_and_skips_unknown_ids():
+    loads = []
+
+    def loader(webhook_id):
+        loads.append(webhook_id)
+        return None if webhook_id == "missing" else _route(webhook_id)
+
+    cache = WebhookRouteCache(loader)
+    assert cache.get("w1") is cache.get("w1")
+    assert loads == ["w1"]
+
+    invalidate_webhook_routes()
+    cache.get("w1")
+    assert loads == ["w1", "w1"]
+
+    # Unknown ids are looked up each time, so a new strategy is found at once
+    cache.get("missing")
+    cache.get("missing")
+    assert loads.count("missing") == 2
+    assert cache.stats()["size"] == 1
+
+
+def test_route_built_across_an_invalidation_is_stale():
+    builds = []
+
+    def loader(webhook_id):
+        builds.append(webhook_id)
+        if len(builds) == 1:
+            # An edit commits while the first build is still reading
+            invalidate_webhook_routes()
+        return _route(webhook_id, is_active=len(builds) > 1)
+
+    cache = WebhookRouteCache(loader)
+    assert cache.get("w1").is_active is False
+    assert cache.get("w1").is_active is True
+    assert cache.get("w1").is_active is True
+    assert len(builds) == 2
+
+
+def test_strategy_edits_reach_the_next_alert(decrypts, strategy_databases):
+    webhook_id = str(uuid.uuid4())
+    strategy = strategy_db.create_strategy("route-test", webhook_id, "alice")
+    try:
+        strategy_db.add_symbol_mapping(strategy.id, "SBIN", "NSE", 10, "MIS")
+        route = strategy_db.get_webhook_route(webhook_id)
+        assert route.is_active and route.api_key == "key-alice"
+        assert route.mappings["SBIN"] == SymbolRoute("SBIN", "NSE", 10, "MIS")
+
+        # Served from memory: no second decrypt
+        assert strategy_db.get_webhook_route(webhook_id) is route
+        assert decrypts == ["alice"]
+
+        strategy_db.toggle_strategy(strategy.id)
+        assert strategy_db.get_webhook_route(webhook_id).is_active is False
+
+        strategy_db.update_strategy_times(strategy.id, start_time="09:30")
+        assert strategy_db.get_webhook_route(webhook_id).start_at == dt_time(9, 30)
+
+        mapping = strategy_db.add_symbol_mapping(strategy.id, "INFY", "NSE", 5, "CNC")
+        assert "INFY" in strategy_db.get_webhook_route(webhook_id).mappings
+        strategy_db.delete_symbol_mapping(mapping.id)
+        assert "INFY" not in strategy_db.get_webhook_route(webhook_id).mappings
+
+        # A regenerated API key invalidates routes too
+        auth_db.invalidate_user_cache("alice")
+        strategy_db.get_webhook_route(webhook_id)
+        assert len(decrypts) == 6
+    finally:
+        strategy_db.delete_strategy(strategy.id)
+    assert strategy_db.get_webhook_route(webhook_id) is None
+
+
+def test_chartink_routes_are_keyed_by_chartink_symbol(decrypts, strategy_databases):
+    webhook_id = str(uuid.uuid4())
+    strategy = chartink_db.create_strategy(
+        "route-test",
+        webhook_id,
+        "bob",
+        start_time="09:15",
+        end_time="15:00",
+        squareoff_time="15:15",
+    )
+    try:
+        chartink_db.bulk_add_symbol_mappings(
+            strategy.id,
+            [{"chartink_symbol": "TCS", "exchange": "NSE", "quantity": 2, "product_type": "MIS"}],
+        )
+        route = chartink_db.get_webhook_route(webhook_id)
+        assert route.mappings["TCS"] == SymbolRoute("TCS", "NSE", 2, "MIS")
+        assert route.squareoff_at == dt_time(15, 15)
+
+        chartink_db.toggle_strategy(strategy.id)
+        assert chartink_db.get_webhook_route(webhook_id).is_active is False
+    finally:
+        chartink_db.delete_strategy(strategy.id)
+    assert chartink_db.get_webhook_route(webhook_id) is None
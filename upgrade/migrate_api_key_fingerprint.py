@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Migration script for indexed API key verification.
+
+verify_api_key used to Argon2-verify a presented key against every stored
+hash in turn. It now looks up the one row whose api_key_fingerprint
+(HMAC-SHA256 of the key, keyed with API_KEY_PEPPER) matches and verifies only
+that hash.
+
+This script:
+1. Adds the 'api_key_fingerprint' column to the api_keys table
+2. Creates the idx_api_keys_fingerprint index
+3. Backfills the fingerprint of every existing key from api_key_encrypted
+
+Rows it cannot decrypt are left NULL; verify_api_key still finds those by
+trying each one, and records the fingerprint the first time the key is used.
+
+Usage:
+    cd upgrade
+    uv run migrate_api_key_fingerprint.py
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Register the app's SQLite pragmas on this process's engines, so a migration
+# waits the same 15s for a write lock the running app does instead of the
+# sqlite3 default of 5s (GitHub issue #1726).
+import _pragmas  # noqa: F401,E402
+
+# auth_db needs API_KEY_PEPPER/FERNET_SALT from .env, and a relative
+# DATABASE_URL must resolve against the project root as it does for app.py.
+load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+os.chdir(PROJECT_ROOT)
+
+from sqlalchemy import inspect, text  # noqa: E402
+
+from utils.logging import get_logger  # noqa: E402
+
+logger = get_logger(__name__)
+
+
+def add_fingerprint_column(engine):
+    """Add the api_key_fingerprint column and its index"""
+    columns = [col["name"] for col in inspect(engine).get_columns("api_keys")]
+    with engine.connect() as conn:
+        if "api_key_fingerprint" in columns:
+            logger.info("api_key_fingerprint column already exists in api_keys table")
+        else:
+            logger.info("Adding api_key_fingerprint column to api_keys table...")
+            conn.execute(text("ALTER TABLE api_keys ADD COLUMN api_key_fingerprint VARCHAR(64)"))
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_api_keys_fingerprint "
+                "ON api_keys (api_key_fingerprint)"
+            )
+        )
+        conn.commit()
+
+
+def backfill_fingerprints(engine, api_key_fingerprint, decrypt_token):
+    """Fingerprint every key that does not have one yet"""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT id, user_id, api_key_encrypted FROM api_keys "
+                "WHERE api_key_fingerprint IS NULL"
+            )
+        ).fetchall()
+
+        updated = 0
+        for row_id, user_id, encrypted in rows:
+            api_key = decrypt_token(encrypted)
+            if not api_key:
+                logger.warning(
+                    f"API key of user {user_id} does not decrypt with the current pepper, "
+                    "leaving it to be fingerprinted on first use"
+                )
+                continue
+            conn.execute(
+                text("UPDATE api_keys SET api_key_fingerprint = :fp WHERE id = :id"),
+                {"fp": api_key_fingerprint(api_key), "id": row_id},
+            )
+            updated += 1
+        conn.commit()
+
+    logger.info(f"Fingerprinted {updated} of {len(rows)} API keys")
+    return updated == len(rows)
+
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("API Key Fingerprint Migration")
+    print("=" * 60)
+
+    try:
+        from database.auth_db import api_key_fingerprint, decrypt_token, engine
+    except Exception as e:
+        logger.error(f"Could not load the auth database: {e}")
+        return False
+
+    if "api_keys" not in inspect(engine).get_table_names():
+        logger.info("api_keys table doesn't exist. It will be created on first run.")
+        return True
+
+    try:
+        add_fingerprint_column(engine)
+        complete = backfill_fingerprints(engine, api_key_fingerprint, decrypt_token)
+    except Exception as e:
+        logger.error(f"Error migrating API key fingerprints: {e}")
+        return False
+
+    print()
+    print("Migration completed successfully!" if complete else "Migration completed with warnings")
+    print("  - API key verification now runs one Argon2 check per uncached key")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
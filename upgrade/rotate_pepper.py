@@ -43,8 +43,9 @@ Columns rotated:
     - apikeys.api_key_encrypted
     - users.totp_secret    (was plaintext for some installs)
     - flow_workflows.api_key   (was plaintext for some installs)
-  apikeys.api_key_hash:
-    - re-derived from the decrypted api_key plaintext (Argon2 + new pepper)
+  apikeys.api_key_hash, apikeys.api_key_fingerprint:
+    - re-derived from the decrypted api_key plaintext (Argon2 + new pepper,
+      HMAC-SHA256 keyed with the new pepper)
   telegram_db Fernet (PBKDF2-SHA256, salt=TELEGRAM_KEY_SALT):
     - telegram_users.encrypted_api_key
     - bot_config.token     (was plaintext for some installs)
@@ -59,6 +60,8 @@ because every run rotates to a *new* random pepper.
 
 import argparse
 import base64
+import hashlib
+import hmac
 import os
 import re
 import secrets
@@ -328,6 +331,10 @@ class Rotator:
 
         # ---- apikeys: decrypt with old, re-encrypt with new, RE-HASH ----
         if self._table_exists("api_keys"):
+            # The lookup fingerprint is keyed with the pepper too
+            has_fingerprint = "api_key_fingerprint" in {
+                row[1] for row in self.conn.execute("PRAGMA table_info(api_keys)")
+            }
             cur = self.conn.execute(
                 "SELECT id, api_key_encrypted, api_key_hash FROM api_keys"
             )
@@ -346,6 +353,14 @@ class Rotator:
                     "UPDATE api_keys SET api_key_encrypted = ?, api_key_hash = ? WHERE id = ?",
                     (new_ct, new_hash, row_id),
                 )
+                if has_fingerprint:
+                    fingerprint = hmac.new(
+                        self.new_pepper.encode(), pt.encode(), hashlib.sha256
+                    ).hexdigest()
+                    self.conn.execute(
+                        "UPDATE api_keys SET api_key_fingerprint = ? WHERE id = ?",
+                        (fingerprint, row_id),
+                    )
                 self.stats["api_keys.api_key_encrypted"] += 1
                 self.stats["api_keys.api_key_hash"] += 1
 
@@ -474,7 +489,7 @@ def main():
     print("  This will:")
     print("    1. Re-encrypt every PEPPER-derived ciphertext in the DB.")
     print("    2. Encrypt previously-plaintext credential columns.")
-    print("    3. Re-hash apikeys.api_key_hash (Argon2 needs new pepper).")
+    print("    3. Re-hash apikeys.api_key_hash (Argon2 needs new pepper) and its fingerprint.")
     print("    4. Replace API_KEY_PEPPER in .env atomically.")
     print()
     print("  After this runs, you must:")
@@ -1,19 +1,33 @@
 """
 Event Bus - Lightweight in-process pub/sub for decoupling order side-effects.
 
-Single thread pool dispatches all subscriber callbacks asynchronously.
-Subscribers are registered at app startup and fire for every published event.
+Subscriber callbacks run asynchronously on lanes: each lane is a bounded,
+priority-ordered queue with its own worker threads, so a slow subscriber (a
+Telegram API call timing out) can only fill its own lane and never delays or
+sheds another's work (the order-update relay to websocket_proxy). Subscribers
+are registered at app startup and fire for every published event.
 """
 
+import heapq
 import threading
+import time
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+#: Subscription priorities; lower runs first within a lane. When a lane is full
+#: a new callback displaces a queued one of lower priority instead of being
+#: dropped itself.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+DEFAULT_LANE = "default"
+
 
 @dataclass
 class Event:
@@ -22,113 +36,282 @@ class Event:
     topic: str = ""
 
 
+@dataclass
+class _SubscriberStats:
+    """Lifetime counters of one subscriber name, across the topics it is on."""
+
+    queued: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    failed: int = 0
+    latency_ms_total: float = 0.0
+    latency_ms_max: float = 0.0
+
+
+@dataclass(eq=False)
+class _Subscription:
+    topic: str
+    callback: object
+    name: str
+    lane: "_Lane"
+    priority: int
+    coalesce: bool
+    stats: _SubscriberStats
+    #: The entry this subscription has waiting in its lane, when coalescing
+    queued_entry: list | None = field(default=None, repr=False)
+
+
+class _Lane:
+    """A bounded priority queue of callbacks and the workers that run them."""
+
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"eventbus-{name}"
+        )
+        # Entries are [priority, seq, subscription, event, enqueued_at]; seq is
+        # unique, so entries never compare past it.
+        self.heap: list[list] = []
+        self.running = 0
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self.heap) + self.running
+
+
 class EventBus:
     """
     In-process event bus with topic-based routing and async dispatch.
 
-    All subscriber callbacks run in a shared thread pool, never blocking the publisher.
-    Thread-safe for concurrent subscribe/unsubscribe/publish.
+    Callbacks run on the lane their subscription names, never blocking the
+    publisher. Thread-safe for concurrent subscribe/unsubscribe/publish.
     """
 
-    #: Cap on callbacks queued-or-running at once. ThreadPoolExecutor's own work
-    #: queue is unbounded (queue.SimpleQueue), so without this a publisher that
-    #: outruns its subscribers grows the queue until the process is OOM-killed.
-    #: Production is a single gunicorn worker that never restarts, so there is
-    #: nothing to reclaim that memory (issue #1739).
+    #: Cap on callbacks queued-or-running at once in a lane. ThreadPoolExecutor's
+    #: own work queue is unbounded (queue.SimpleQueue), so without this a
+    #: publisher that outruns its subscribers grows the queue until the process
+    #: is OOM-killed. Production is a single gunicorn worker that never
+    #: restarts, so there is nothing to reclaim that memory (issue #1739).
     DEFAULT_MAX_PENDING = 1000
 
     def __init__(self, workers: int = 10, max_pending: int = DEFAULT_MAX_PENDING):
-        self._subscribers: dict[str, list] = defaultdict(list)
+        self._subscribers: dict[str, list[_Subscription]] = defaultdict(list)
         self._lock = threading.Lock()
-        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eventbus")
-        self._max_pending = max_pending
-        self._pending = 0
-        self._dropped = 0
+        self._lanes: dict[str, _Lane] = {}
+        self._subscriber_stats: dict[str, _SubscriberStats] = {}
+        self._seq = 0
+        default = self.add_lane(DEFAULT_LANE, workers=workers, max_pending=max_pending)
+        self._executor = default.executor
 
-    def subscribe(self, topic: str, callback, name: str = "") -> None:
-        """Register a callback for a topic. Callback receives the Event object."""
+    def add_lane(
+        self, name: str, workers: int = 1, max_pending: int = DEFAULT_MAX_PENDING
+    ) -> _Lane:
+        """Create a lane with its own workers; returns the existing one if already added.
+
+        Subscriptions whose name starts with ``"<lane>:"`` run on it unless
+        they name a lane explicitly.
+        """
         with self._lock:
-            self._subscribers[topic].append(callback)
+            lane = self._lanes.get(name)
+            if lane is None:
+                lane = _Lane(name, workers, max_pending)
+                self._lanes[name] = lane
+            return lane
+
+    def subscribe(
+        self,
+        topic: str,
+        callback,
+        name: str = "",
+        lane: str | None = None,
+        priority: int = PRIORITY_NORMAL,
+        coalesce: bool = False,
+    ) -> None:
+        """Register a callback for a topic. Callback receives the Event object.
+
+        ``coalesce`` is for idempotent callbacks (UI refresh emits): while one
+        call is still queued, newer events replace its event instead of
+        queueing another call.
+        """
         cb_name = name or getattr(callback, "__name__", str(callback))
-        logger.debug(f"EventBus: subscribed '{cb_name}' to '{topic}'")
+        with self._lock:
+            lane_name = lane or cb_name.split(":", 1)[0]
+            target = self._lanes.get(lane_name) or self._lanes[DEFAULT_LANE]
+            stats = self._subscriber_stats.setdefault(cb_name, _SubscriberStats())
+            self._subscribers[topic].append(
+                _Subscription(topic, callback, cb_name, target, priority, coalesce, stats)
+            )
+        logger.debug(f"EventBus: subscribed '{cb_name}' to '{topic}' on lane '{target.name}'")
 
     def unsubscribe(self, topic: str, callback) -> None:
         """Remove a callback from a topic."""
         with self._lock:
-            try:
-                self._subscribers[topic].remove(callback)
-            except ValueError:
-                pass
+            subs = self._subscribers.get(topic, [])
+            for sub in subs:
+                if sub.callback == callback:
+                    subs.remove(sub)
+                    break
 
     def publish(self, event: Event) -> None:
         """Publish an event to all subscribers of its topic.
 
-        Never blocks the publisher, and never grows without bound: once
-        ``max_pending`` callbacks are queued-or-running, further ones are
-        dropped rather than queued. Shedding load is the right trade here -
-        subscribers are best-effort side effects (logging, Socket.IO refreshes,
-        alert delivery), so losing some beats losing the process. Blocking
-        instead would push the stall back into the order path that published
-        the event.
+        Never blocks the publisher, and never grows without bound: once a
+        lane has ``max_pending`` callbacks queued-or-running, a further one
+        displaces the newest queued callback of lower priority, or is dropped
+        if there is none. Shedding load is the right trade here - subscribers
+        are best-effort side effects (logging, Socket.IO refreshes, alert
+        delivery), so losing some beats losing the process. Blocking instead
+        would push the stall back into the order path that published the
+        event.
         """
         with self._lock:
-            callbacks = list(self._subscribers.get(event.topic, []))
+            subs = list(self._subscribers.get(event.topic, []))
 
-        for cb in callbacks:
+        for sub in subs:
+            lane = sub.lane
             with self._lock:
-                if self._pending >= self._max_pending:
-                    self._dropped += 1
-                    dropped = self._dropped
-                    admitted = False
-                else:
-                    self._pending += 1
-                    admitted = True
-
-            if not admitted:
-                # Log the first drop and then sparsely: a saturated bus would
+                outcome = self._enqueue(sub, event)
+                dropped = lane.dropped
+
+            if outcome == "dropped":
+                # Log the first drop and then sparsely: a saturated lane would
                 # otherwise turn one incident into a second one in the log file.
                 if dropped == 1 or dropped % 100 == 0:
                     logger.warning(
-                        f"EventBus at capacity ({self._max_pending} pending); dropped "
-                        f"'{event.topic}' callback. {dropped} dropped since start."
+                        f"EventBus lane '{lane.name}' at capacity ({lane.max_pending} pending); "
+                        f"dropped '{sub.name}' on '{event.topic}'. {dropped} dropped since start."
                     )
                 continue
+            if outcome != "queued":
+                # Coalesced into a queued call, or displaced one: the number of
+                # entries is unchanged, so no new task.
+                continue
 
-            # The slot is reserved above, so it must be returned on every path
-            # that fails to hand work to the executor - not just the expected
-            # RuntimeError from a shut-down pool. A slot leaked here is
-            # permanent, and enough of them wedge the bus closed for the life of
-            # the worker.
+            # Every queued entry has exactly one task to run it; if the task
+            # cannot be handed to the executor, the entry must come back out.
+            # An entry left behind is permanent, and enough of them wedge the
+            # lane shut for the life of the worker.
             submitted = False
             try:
-                self._executor.submit(self._safe_call, cb, event)
+                lane.executor.submit(self._run_next, lane)
                 submitted = True
             except RuntimeError:
                 pass  # Executor already shut down (interpreter teardown).
             finally:
                 if not submitted:
                     with self._lock:
-                        self._pending -= 1
+                        self._discard_one(lane)
+
+    def _enqueue(self, sub: _Subscription, event: Event) -> str:
+        """Queue a call of ``sub`` for ``event``. Caller holds the lock."""
+        lane = sub.lane
+        if sub.coalesce and sub.queued_entry is not None:
+            sub.queued_entry[3] = event
+            sub.stats.coalesced += 1
+            return "coalesced"
+
+        displaced = False
+        if lane.pending >= lane.max_pending:
+            victim = max(lane.heap, default=None)
+            if victim is None or victim[0] <= sub.priority:
+                lane.dropped += 1
+                sub.stats.dropped += 1
+                return "dropped"
+            lane.heap.remove(victim)
+            heapq.heapify(lane.heap)
+            self._forget(victim)
+            lane.dropped += 1
+            victim[2].stats.dropped += 1
+            displaced = True
+
+        self._seq += 1
+        entry = [sub.priority, self._seq, sub, event, time.monotonic()]
+        heapq.heappush(lane.heap, entry)
+        sub.stats.queued += 1
+        if sub.coalesce:
+            sub.queued_entry = entry
+        return "displaced" if displaced else "queued"
+
+    @staticmethod
+    def _forget(entry: list) -> None:
+        sub = entry[2]
+        sub.stats.queued -= 1
+        if sub.queued_entry is entry:
+            sub.queued_entry = None
+
+    def _discard_one(self, lane: _Lane) -> None:
+        """Remove the lowest-priority queued entry. Caller holds the lock."""
+        if lane.heap:
+            victim = max(lane.heap)
+            lane.heap.remove(victim)
+            heapq.heapify(lane.heap)
+            self._forget(victim)
+
+    def _run_next(self, lane: _Lane) -> None:
+        """Run the highest-priority queued callback of a lane, with error isolation."""
+        with self._lock:
+            if not lane.heap:
+                return
+            entry = heapq.heappop(lane.heap)
+            self._forget(entry)
+            lane.running += 1
+        _, _, sub, event, enqueued_at = entry
 
-    def _safe_call(self, cb, event: Event) -> None:
-        """Execute a callback with error isolation."""
         try:
-            cb(event)
+            sub.callback(event)
         except Exception:
-            cb_name = getattr(cb, "__name__", str(cb))
-            logger.exception(f"EventBus subscriber '{cb_name}' failed on '{event.topic}'")
+            with self._lock:
+                sub.stats.failed += 1
+            logger.exception(f"EventBus subscriber '{sub.name}' failed on '{event.topic}'")
         finally:
+            latency_ms = (time.monotonic() - enqueued_at) * 1000
             with self._lock:
-                self._pending -= 1
+                lane.running -= 1
+                sub.stats.delivered += 1
+                sub.stats.latency_ms_total += latency_ms
+                if latency_ms > sub.stats.latency_ms_max:
+                    sub.stats.latency_ms_max = latency_ms
 
     def stats(self) -> dict:
-        """Current queue depth and lifetime drop count, for health reporting."""
+        """Queue depths and lifetime counters, overall, per lane and per subscriber.
+
+        Subscriber latency is from publish to the callback returning.
+        """
         with self._lock:
-            return {
-                "pending": self._pending,
-                "max_pending": self._max_pending,
-                "dropped": self._dropped,
+            lanes = {
+                name: {
+                    "workers": lane.workers,
+                    "pending": lane.pending,
+                    "max_pending": lane.max_pending,
+                    "dropped": lane.dropped,
+                }
+                for name, lane in self._lanes.items()
+            }
+            subscribers = {
+                name: {
+                    "queued": s.queued,
+                    "delivered": s.delivered,
+                    "dropped": s.dropped,
+                    "coalesced": s.coalesced,
+                    "failed": s.failed,
+                    "avg_latency_ms": round(s.latency_ms_total / s.delivered, 3)
+                    if s.delivered
+                    else 0.0,
+                    "max_latency_ms": round(s.latency_ms_max, 3),
+                }
+                for name, s in self._subscriber_stats.items()
             }
+        return {
+            "pending": sum(lane["pending"] for lane in lanes.values()),
+            "max_pending": sum(lane["max_pending"] for lane in lanes.values()),
+            "dropped": sum(lane["dropped"] for lane in lanes.values()),
+            "lanes": lanes,
+            "subscribers": subscribers,
+        }
 
 
 # Global singleton
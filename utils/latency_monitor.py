@@ -1,5 +1,4 @@
 import time
-from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 
 from flask import g, request
@@ -8,16 +7,11 @@ from flask_restx import Resource
 from database.auth_db import db_session as auth_db_session
 from database.auth_db import get_broker_name
 from database.latency_db import OrderLatency, init_latency_db, latency_session, purge_old_data_logs
+from utils.log_sink import get_sink
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
-# Shared single-worker executor: the latency record commit (SQLite fsync) runs
-# off the request thread so it never delays the order response. One worker
-# keeps writes serialized and bounds the scoped sessions to a single
-# long-lived thread.
-_latency_log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="latency-log")
-
 #: Latency records of these types are kept forever; everything else is a data
 #: query and is purged after a week. Must stay in step with the set in
 #: ``database.latency_db.purge_old_data_logs``, which does the deleting -- a
@@ -45,10 +39,10 @@ KEEP_FOREVER_TYPES = frozenset(
 )
 
 
-def _log_latency_async(
-    api_key, order_id, user_id, symbol, order_type, latencies, status, error, broker=None
-):
-    """Resolve broker name and persist the latency record. Runs on the executor thread.
+def _write_latency_records(records):
+    """Resolve broker names and persist a batch of latency records in one
+    transaction. Runs on the log sink thread, so neither the broker-name lookup
+    nor the SQLite commit delays the order response.
 
     ``broker`` is resolved by the caller when the request carried no API key --
     session-authenticated UI routes (the scalping terminal, the Positions close
@@ -56,21 +50,21 @@ def _log_latency_async(
     readable from this thread.
     """
     try:
-        broker_name = broker or (get_broker_name(api_key) if api_key else None)
-        OrderLatency.log_latency(
-            order_id=order_id,
-            user_id=user_id,
-            broker=broker_name,
-            symbol=symbol,
-            order_type=order_type,
-            latencies=latencies,
-            request_body=None,  # Not storing to save database space
-            response_body=None,  # Not storing to save database space
-            status=status,
-            error=error,
-        )
-    except Exception as e:
-        logger.exception(f"Error logging latency asynchronously: {e}")
+        brokers = {}
+        rows = []
+        for record in records:
+            api_key = record.pop("api_key")
+            if not record["broker"] and api_key:
+                if api_key not in brokers:
+                    # One failed lookup must not cost the rest of the batch
+                    try:
+                        brokers[api_key] = get_broker_name(api_key)
+                    except Exception as e:
+                        logger.warning(f"Could not resolve broker for latency record: {e}")
+                        brokers[api_key] = None
+                record["broker"] = brokers[api_key]
+            rows.append(record)
+        OrderLatency.log_latencies(rows)
     finally:
         # Both sessions must be removed on this thread: an unremoved scoped
         # session keeps its read transaction (and SQLite lock) open.
@@ -78,6 +72,27 @@ def _log_latency_async(
         auth_db_session.remove()
 
 
+def _queue_latency(
+    api_key, order_id, user_id, symbol, order_type, latencies, status, error, broker=None
+):
+    """Queue a latency record for the ``order_latency`` log sink."""
+    get_sink("order_latency", _write_latency_records).submit(
+        {
+            "api_key": api_key,
+            "order_id": order_id,
+            "user_id": user_id,
+            "broker": broker,
+            "symbol": symbol,
+            "order_type": order_type,
+            "latencies": latencies,
+            "request_body": None,  # Not storing to save database space
+            "response_body": None,  # Not storing to save database space
+            "status": status,
+            "error": error,
+        }
+    )
+
+
 def _response_payload(response):
     """The JSON body of a view's return value, as a dict.
 
@@ -109,7 +124,7 @@ def _session_broker():
 
     Session-authenticated UI routes have no ``apikey`` in the body, so the record
     would otherwise land with an empty broker and never group under the broker it
-    was actually sent to. Read here, on the request thread -- the executor thread
+    was actually sent to. Read here, on the request thread -- the log sink thread
     that writes the record has no session.
     """
     try:
@@ -268,10 +283,9 @@ def track_latency(api_type):
                 if order_id is None:
                     order_id = response_data.get("request_id", "unknown")
 
-                # Persist off the request thread: broker-name lookup and the
+                # Persisted by the log sink thread: broker-name lookup and the
                 # SQLite commit must not delay the order response.
-                _latency_log_executor.submit(
-                    _log_latency_async,
+                _queue_latency(
                     request_data.get("apikey"),
                     order_id,
                     g.get("user_id"),
@@ -307,8 +321,7 @@ def track_latency(api_type):
                     overhead = tracker.get_overhead()
 
                 has_request_data = "request_data" in locals()
-                _latency_log_executor.submit(
-                    _log_latency_async,
+                _queue_latency(
                     request_data.get("apikey") if has_request_data else None,
                     "error",
                     g.get("user_id"),
@@ -0,0 +1,211 @@
+# utils/log_sink.py
+"""Batched, group-commit writer for the high-volume log tables.
+
+Traffic logs, order latency records, API order logs and analyzer logs are
+written on every request. Committed one row per transaction, a webhook storm
+turns into thousands of SQLite fsyncs a second, with several executor threads
+fighting over the same file lock. A ``LogSink`` instead buffers records in a
+bounded queue and has one writer thread persist them in batches: a batch is
+committed as soon as it holds ``LOG_SINK_BATCH_SIZE`` records, or when the
+oldest record in it has waited ``LOG_SINK_FLUSH_MS``.
+
+``submit`` never blocks the caller. When the queue is full the record is
+dropped and counted - these are best-effort logs, and stalling the order path
+to keep one would be the wrong trade. The counters of every sink are exposed
+through ``sink_stats()`` on /health/check.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+LOG_SINK_BATCH_SIZE = int(os.getenv("LOG_SINK_BATCH_SIZE", "200"))
+LOG_SINK_FLUSH_MS = int(os.getenv("LOG_SINK_FLUSH_MS", "250"))
+LOG_SINK_QUEUE_SIZE = int(os.getenv("LOG_SINK_QUEUE_SIZE", "10000"))
+
+_STOP = object()
+
+_sinks: dict[str, "LogSink"] = {}
+_sinks_lock = threading.Lock()
+
+
+class LogSink:
+    """A bounded queue of log records and the thread that writes them in batches.
+
+    ``write_batch`` receives a list of submitted records and must persist them
+    in one transaction, raising if it could not. It always runs on the sink's
+    own thread, so it owns whatever scoped sessions it uses and must remove
+    them before returning.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write_batch,
+        batch_size: int = LOG_SINK_BATCH_SIZE,
+        flush_ms: int = LOG_SINK_FLUSH_MS,
+        max_queue: int = LOG_SINK_QUEUE_SIZE,
+    ):
+        self.name = name
+        self._write_batch = write_batch
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = max(0, flush_ms) / 1000
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+        self._submitted = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+        self._largest_batch = 0
+        self._high_water = 0
+
+    def submit(self, record) -> bool:
+        """Queue a record for the next batch. Returns False if it was dropped."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+                dropped = self._dropped
+            # Log the first drop and then sparsely, as the EventBus does.
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(
+                    f"Log sink '{self.name}' is full ({self._queue.maxsize} queued); "
+                    f"dropped a record. {dropped} dropped since start."
+                )
+            return False
+
+        depth = self._queue.qsize()
+        with self._lock:
+            self._submitted += 1
+            if depth > self._high_water:
+                self._high_water = depth
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything submitted so far is written (or has failed).
+
+        Returns False if that did not happen within ``timeout`` seconds.
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is queued and stop the writer thread."""
+        with self._lock:
+            if self._closed or self._thread is None:
+                self._closed = True
+                return
+            self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning(f"Log sink '{self.name}' did not drain before shutdown")
+            return
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """Counters since start, plus the current queue depth."""
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "capacity": self._queue.maxsize,
+                "high_water": self._high_water,
+                "submitted": self._submitted,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "batches": self._batches,
+                "largest_batch": self._largest_batch,
+            }
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            thread = threading.Thread(target=self._run, name=f"log-sink-{self.name}", daemon=True)
+            thread.start()
+            self._thread = thread
+        # Records still queued at interpreter exit are written, not lost.
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch, waiters, stop = [], [], False
+            deadline = time.monotonic() + self._flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def _write(self, batch: list) -> None:
+        try:
+            self._write_batch(batch)
+        except Exception:
+            logger.exception(f"Log sink '{self.name}' failed to write {len(batch)} records")
+            with self._lock:
+                self._failed += len(batch)
+            return
+        with self._lock:
+            self._written += len(batch)
+            self._batches += 1
+            if len(batch) > self._largest_batch:
+                self._largest_batch = len(batch)
+
+
+def get_sink(name: str, write_batch) -> LogSink:
+    """The process-wide sink called ``name``, created on first use."""
+    sink = _sinks.get(name)
+    if sink is None:
+        with _sinks_lock:
+            sink = _sinks.get(name)
+            if sink is None:
+                sink = LogSink(name, write_batch)
+                _sinks[name] = sink
+    return sink
+
+
+def sink_stats() -> dict:
+    """Counters of every sink created so far, keyed by sink name."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    return {sink.name: sink.stats() for sink in sinks}
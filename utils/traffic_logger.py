@@ -1,27 +1,23 @@
 import time
-from concurrent.futures import ThreadPoolExecutor
 
 from flask import g, has_request_context, request
 
 from database.traffic_db import TrafficLog, logs_session
 from utils.ip_helper import get_real_ip
+from utils.log_sink import get_sink
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
-# Shared single-worker executor: traffic-log commits run off the request
-# thread so the SQLite fsync never delays the HTTP response. One worker keeps
-# writes serialized (no lock contention) and bounds the scoped session to a
-# single long-lived thread.
-_traffic_log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="traffic-log")
 
+def _write_traffic_logs(payloads):
+    """Persist a batch of traffic log entries. Runs on the log sink thread.
 
-def _write_traffic_log(payload):
-    """Persist one traffic log entry. Runs on the executor thread."""
+    Entries are committed in batches off the request thread, so neither the
+    SQLite fsync nor lock contention ever delays the HTTP response.
+    """
     try:
-        TrafficLog.log_request(**payload)
-    except Exception as e:
-        logger.exception(f"Error writing traffic log: {e}")
+        TrafficLog.log_requests(payloads)
     finally:
         logs_session.remove()
 
@@ -55,7 +51,7 @@ class TrafficLoggerMiddleware:
             try:
                 duration_ms = (time.time() - start_time) * 1000
                 # Capture request-context values now; the DB write happens on
-                # the executor thread where the Flask context is gone.
+                # the log sink thread where the Flask context is gone.
                 payload = {
                     "client_ip": get_real_ip(),
                     "method": request.method,
@@ -66,7 +62,7 @@ class TrafficLoggerMiddleware:
                     "error": error,
                     "user_id": getattr(g, "user_id", None),
                 }
-                _traffic_log_executor.submit(_write_traffic_log, payload)
+                get_sink("traffic_logs", _write_traffic_logs).submit(payload)
             except Exception as e:
                 logger.exception(f"Error logging traffic: {e}")
 
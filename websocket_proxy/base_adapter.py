@@ -1,4 +1,3 @@
-import json
 import os
 import random
 import socket
@@ -9,6 +8,8 @@ import zmq
 
 from utils.logging import get_logger
 
+from .tick_codec import DEFAULT_TICK_WIRE_FORMAT, encode_tick
+
 # Initialize logger
 logger = get_logger(__name__)
 
@@ -107,6 +108,12 @@ class BaseBrokerWebSocketAdapter(ABC):
     _context_lock = threading.Lock()
     _instance_count = 0  # Track active adapter instances for cleanup decisions
 
+    # Payload encoding on the internal ZMQ bus ("json" or "msgpack"). Adapters
+    # opt in per class or per instance; the proxy sniffs the format of every
+    # frame, so adapters on different formats can share one bus.
+    # See websocket_proxy/tick_codec.py.
+    tick_wire_format = DEFAULT_TICK_WIRE_FORMAT
+
     def __init__(self, use_shared_zmq: bool = False, shared_publisher=None):
         """
         Initialize the base broker adapter.
@@ -394,13 +401,14 @@ class BaseBrokerWebSocketAdapter(ABC):
             data: Market data dictionary
         """
         try:
+            wire_format = self.tick_wire_format
             if self._uses_shared_zmq and self._shared_publisher:
                 # Use shared publisher (connection pooling mode)
-                self._shared_publisher.publish(topic, data)
+                self._shared_publisher.publish(topic, data, wire_format=wire_format)
             elif self.socket:
                 # Use own socket
                 self.socket.send_multipart(
-                    [topic.encode("utf-8"), json.dumps(data).encode("utf-8")]
+                    [topic.encode("utf-8"), encode_tick(topic, data, wire_format)]
                 )
             else:
                 self.logger.warning("No ZMQ socket available for publishing")
@@ -10,7 +10,6 @@ Configuration:
     MAX_WEBSOCKET_CONNECTIONS: Maximum WebSocket connections per user/broker (default: 3)
 """
 
-import json
 import os
 import threading
 from collections import defaultdict
@@ -21,6 +20,8 @@ import zmq
 
 from utils.logging import get_logger
 
+from .tick_codec import DEFAULT_TICK_WIRE_FORMAT, encode_tick
+
 logger = get_logger(__name__)
 
 # Thread-local storage for pooled adapter creation context
@@ -148,7 +149,7 @@ class SharedZmqPublisher:
             self.logger.debug(f"Shared ZMQ publisher connected to {endpoint}")
             return zmq_port
 
-    def publish(self, topic: str, data: dict):
+    def publish(self, topic: str, data: dict, wire_format: str | None = None):
         """
         Publish market data to ZeroMQ subscribers.
         Thread-safe publishing.
@@ -156,16 +157,18 @@ class SharedZmqPublisher:
         Args:
             topic: Topic string for subscriber filtering
             data: Market data dictionary
+            wire_format: Payload encoding ("json" or "msgpack"); defaults to
+                ZMQ_TICK_WIRE_FORMAT. Pooled adapters pass their own format.
         """
         if not self._connected:
             self.logger.error("Cannot publish: ZMQ publisher not connected")
             return
 
+        # Encode outside the lock: only the socket send needs serialising.
+        payload = encode_tick(topic, data, wire_format or DEFAULT_TICK_WIRE_FORMAT)
         with self._publish_lock:
             try:
-                self.socket.send_multipart(
-                    [topic.encode("utf-8"), json.dumps(data).encode("utf-8")]
-                )
+                self.socket.send_multipart([topic.encode("utf-8"), payload])
             except Exception as e:
                 self.logger.exception(f"Error publishing to ZMQ: {e}")
 
@@ -290,9 +293,12 @@ class ConnectionPool:
             # BaseBrokerWebSocketAdapter will detect the context and skip ZMQ socket creation
             adapter = self.adapter_class()
 
-            # Override the adapter's publish method to use shared publisher
+            # Override the adapter's publish method to use shared publisher,
+            # keeping the adapter's own tick wire format
             def shared_publish(topic: str, data: dict):
-                self.shared_publisher.publish(topic, data)
+                self.shared_publisher.publish(
+                    topic, data, wire_format=getattr(adapter, "tick_wire_format", None)
+                )
 
             adapter.publish_market_data = shared_publish
 
@@ -962,7 +968,9 @@ class ConnectionPool:
 
     def publish_market_data(self, topic: str, data: dict):
         """Publish market data through shared publisher"""
-        self.shared_publisher.publish(topic, data)
+        self.shared_publisher.publish(
+            topic, data, wire_format=getattr(self.adapter_class, "tick_wire_format", None)
+        )
 
 
 def create_pooled_adapter(
@@ -0,0 +1,163 @@
+"""Per-client bounded send queues for market-data fan-out.
+
+The ZMQ listener used to build one message dict per recipient, serialize it
+per recipient inside send_message, and asyncio.gather one send task per client
+for every tick - so one slow browser held up the whole batch and 50 tabs on
+NIFTY meant 50 JSON encodes of the same payload.
+
+Now the listener serializes each (mode, broker) variant of a tick once and
+hands the same string to every matching client's ClientSendQueue. Each queue
+is drained by its own writer task, so delivery to one client never waits on
+another. When a client cannot keep up its queue fills, and the OLDEST pending
+message is dropped to make room: a lagging client sees the newest prices
+instead of an ever-growing backlog.
+
+Optional conflation (trailing-edge coalescing): with a conflation interval set,
+a client keeps one latest-value slot per (symbol, exchange, mode). The first
+tick into an empty slot set arms a flush timer; ticks arriving before it fires
+overwrite their slot, and the flush enqueues whatever is newest. Intermediate
+ticks are skipped but the final price of a burst is always delivered, unlike
+the old time-based LTP throttle which dropped it.
+"""
+
+import asyncio as aio
+import os
+
+import websockets
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Pending market-data messages per client before the oldest are dropped.
+CLIENT_SEND_QUEUE_SIZE = int(os.getenv("WS_CLIENT_SEND_QUEUE", "1000"))
+
+# Default conflation interval for new clients in milliseconds (0 = off, every
+# tick is forwarded). Clients can override it with {"action": "conflate"}.
+DEFAULT_CONFLATE_MS = int(os.getenv("WS_CONFLATE_MS", "0"))
+MAX_CONFLATE_MS = 5000
+
+
+class ClientSendQueue:
+    """Bounded, drop-oldest outbound queue with a dedicated writer task and
+    optional per-key conflation."""
+
+    __slots__ = (
+        "client_id",
+        "websocket",
+        "_queue",
+        "_task",
+        "_slots",
+        "_flush_handle",
+        "conflate_interval",
+        "sent",
+        "dropped",
+        "conflated",
+        "flushes",
+    )
+
+    def __init__(
+        self,
+        client_id,
+        websocket,
+        maxsize: int = CLIENT_SEND_QUEUE_SIZE,
+        conflate_ms: int = DEFAULT_CONFLATE_MS,
+    ):
+        self.client_id = client_id
+        self.websocket = websocket
+        self._queue: aio.Queue = aio.Queue(maxsize=max(1, maxsize))
+        self._task: aio.Task | None = None
+        # (symbol, exchange, mode) -> latest pending payload, while conflating
+        self._slots: dict[tuple, str] = {}
+        self._flush_handle: aio.TimerHandle | None = None
+        self.conflate_interval = 0.0
+        self.sent = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.flushes = 0
+        self.set_conflation(conflate_ms)
+
+    def start(self):
+        """Start the writer task. Must be called from the proxy's event loop."""
+        if self._task is None:
+            self._task = aio.get_running_loop().create_task(self._writer())
+
+    def set_conflation(self, interval_ms: int):
+        """Enable (interval_ms > 0) or disable (0) conflation for this client.
+
+        Disabling flushes any pending slots immediately so no final tick is lost.
+        """
+        interval_ms = max(0, min(int(interval_ms), MAX_CONFLATE_MS))
+        self.conflate_interval = interval_ms / 1000.0
+        if not self.conflate_interval:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush()
+
+    def offer(self, payload: str, key: tuple | None = None):
+        """Queue a pre-serialized message without blocking the caller.
+
+        Args:
+            payload: The serialized message
+            key: Conflation key (symbol, exchange, mode); when conflation is on,
+                a newer payload for the same key replaces the pending one.
+        """
+        if self.conflate_interval and key is not None:
+            if key in self._slots:
+                self.conflated += 1
+            self._slots[key] = payload
+            if self._flush_handle is None:
+                self._flush_handle = aio.get_running_loop().call_later(
+                    self.conflate_interval, self._flush
+                )
+            return
+        self._enqueue(payload)
+
+    def _flush(self):
+        """Trailing edge: move the newest payload of every slot to the send queue."""
+        self._flush_handle = None
+        slots, self._slots = self._slots, {}
+        if slots:
+            self.flushes += 1
+        for payload in slots.values():
+            self._enqueue(payload)
+
+    def _enqueue(self, payload: str):
+        try:
+            self._queue.put_nowait(payload)
+        except aio.QueueFull:
+            try:
+                self._queue.get_nowait()
+            except aio.QueueEmpty:
+                pass
+            self.dropped += 1
+            self._queue.put_nowait(payload)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() + len(self._slots)
+
+    async def _writer(self):
+        try:
+            while True:
+                payload = await self._queue.get()
+                try:
+                    await self.websocket.send(payload)
+                    self.sent += 1
+                except websockets.exceptions.ConnectionClosed:
+                    logger.info(f"Connection closed while sending market data to client {self.client_id}")
+                    return
+                except Exception as e:
+                    logger.warning(f"Error sending market data to client {self.client_id}: {e}")
+        except aio.CancelledError:
+            pass
+
+    def close(self):
+        """Cancel the writer task; pending messages are discarded."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._slots.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
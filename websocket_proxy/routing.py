@@ -0,0 +1,145 @@
+"""Pre-parsed topic routing table for the WebSocket proxy ZMQ listener.
+
+Market-data topics published by the adapters have the form
+EXCHANGE_SYMBOL_MODE. Parsing them (split, multi-segment exchange detection,
+mode normalisation) and collecting the recipients across modes 1..N used to
+happen for every single tick. The same few thousand topics repeat millions of
+times a day, so both results are cached here:
+
+    raw topic bytes -> Route(symbol, exchange, mode, recipients)
+
+``recipients`` maps client_id -> the mode that client subscribed at, for every
+client subscribed to the instrument at a mode <= the tick's mode (higher
+modes carry all lower-mode data). It is rebuilt lazily from the proxy's
+subscription_index after subscribe/unsubscribe invalidates the instrument, so
+the hot path is one dict lookup plus an attribute read.
+"""
+
+from .mode_utils import normalize_mode_or_none
+
+# Two-segment exchange prefixes (NSE_INDEX, BSE_INDEX, ...). Add new
+# index/multi-segment exchanges here when introducing them.
+MULTI_SEGMENT_EXCHANGE_PREFIXES = (
+    ("NSE", "INDEX"),
+    ("BSE", "INDEX"),
+    ("MCX", "INDEX"),
+    ("GLOBAL", "INDEX"),
+)
+
+# Hard cap on cached topics. Adapters only publish subscribed instruments, so
+# this is never reached in normal operation; it bounds memory if a misbehaving
+# publisher floods the bus with unique topics.
+MAX_CACHED_ROUTES = 50_000
+
+
+def parse_topic(topic_str: str) -> tuple[str, str, int] | None:
+    """Split an EXCHANGE_SYMBOL_MODE topic into (symbol, exchange, mode).
+
+    Mode (LTP/QUOTE/DEPTH) is always the LAST segment. Exchange is the first
+    segment (NSE, BSE, NFO, MCX, CRYPTO, ...) except the multi-segment index
+    exchanges. Symbol is everything in between and may itself contain
+    underscores (e.g. CRYPTO_SOL_INR_LTP).
+
+    Returns:
+        (symbol, exchange, numeric_mode), or None for a malformed topic.
+    """
+    parts = topic_str.split("_")
+    if len(parts) < 3:
+        return None
+
+    remaining = parts[:-1]
+    if len(remaining) >= 2 and (remaining[0], remaining[1]) in MULTI_SEGMENT_EXCHANGE_PREFIXES:
+        exchange = f"{remaining[0]}_{remaining[1]}"
+        symbol = "_".join(remaining[2:])
+    else:
+        exchange = remaining[0]
+        symbol = "_".join(remaining[1:])
+    if not symbol:
+        return None
+
+    normalized = normalize_mode_or_none(parts[-1])
+    if normalized is None:
+        return None
+    return symbol, exchange, normalized[0]
+
+
+class Route:
+    """Cached routing entry for one market-data topic."""
+
+    __slots__ = ("symbol", "exchange", "mode", "sub_key", "recipients")
+
+    def __init__(self, symbol: str, exchange: str, mode: int):
+        self.symbol = symbol
+        self.exchange = exchange
+        self.mode = mode
+        self.sub_key = (symbol, exchange, mode)
+        # client_id -> subscribed mode; None until (re)built
+        self.recipients: dict[int, int] | None = None
+
+
+class TopicRouter:
+    """Topic -> Route cache with per-instrument invalidation.
+
+    Not thread-safe: owned by the proxy's event loop, like subscription_index.
+    """
+
+    def __init__(self, subscription_index: dict, max_routes: int = MAX_CACHED_ROUTES):
+        self._subscription_index = subscription_index
+        self._max_routes = max_routes
+        self._routes: dict[bytes, Route] = {}
+        # (symbol, exchange) -> routes for that instrument (one per mode/topic spelling)
+        self._by_instrument: dict[tuple[str, str], list[Route]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+    def lookup(self, topic: bytes) -> Route | None:
+        """Return the cached route for a raw topic, or None if not seen yet."""
+        route = self._routes.get(topic)
+        if route is not None:
+            self.hits += 1
+        return route
+
+    def add(self, topic: bytes, topic_str: str) -> Route | None:
+        """Parse a topic and cache its route. Returns None for malformed topics
+        (not cached, so the caller keeps logging them)."""
+        parsed = parse_topic(topic_str)
+        if parsed is None:
+            return None
+        self.misses += 1
+        if len(self._routes) >= self._max_routes:
+            self._routes.clear()
+            self._by_instrument.clear()
+        route = Route(*parsed)
+        self._routes[topic] = route
+        self._by_instrument.setdefault((route.symbol, route.exchange), []).append(route)
+        return route
+
+    def recipients(self, route: Route) -> dict[int, int]:
+        """client_id -> subscribed mode for every client that should get this tick."""
+        recipients = route.recipients
+        if recipients is None:
+            recipients = {}
+            for m in range(1, route.mode + 1):
+                for cid in self._subscription_index.get((route.symbol, route.exchange, m), ()):
+                    recipients[cid] = m
+            route.recipients = recipients
+            self.rebuilds += 1
+        return recipients
+
+    def invalidate(self, symbol: str, exchange: str):
+        """Drop precomputed recipients after a subscription change for an instrument."""
+        for route in self._by_instrument.get((symbol, exchange), ()):
+            route.recipients = None
+
+    def invalidate_all(self):
+        for route in self._routes.values():
+            route.recipients = None
+
+    def stats(self) -> dict:
+        return {
+            "cached_topics": len(self._routes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recipient_rebuilds": self.rebuilds,
+        }
@@ -20,12 +20,15 @@ from utils.logging import get_logger, highlight_url
 
 from .base_adapter import BaseBrokerWebSocketAdapter
 from .broker_factory import create_broker_adapter
+from .fanout import MAX_CONFLATE_MS, ClientSendQueue
 from .mode_utils import (
     MODE_BY_UPPER_LABEL as _MODE_BY_UPPER_LABEL,
     normalize_mode,
     normalize_mode_or_none,
 )
 from .port_check import find_available_port, is_port_in_use
+from .routing import TopicRouter
+from .tick_codec import decode_tick
 
 # Initialize logger
 logger = get_logger("websocket_proxy")
@@ -64,6 +67,8 @@ class WebSocketProxy:
             raise RuntimeError(error_msg)
 
         self.clients = {}  # Maps client_id to websocket connection
+        # Maps client_id to its bounded market-data send queue (see fanout.py)
+        self.client_queues: dict[int, ClientSendQueue] = {}
         self.subscriptions = {}  # Maps client_id to set of subscriptions
         self.broker_adapters = {}  # Maps user_id to broker adapter
         self.user_mapping = {}  # Maps client_id to user_id
@@ -75,6 +80,11 @@ class WebSocketProxy:
         # This eliminates the need for nested loops in zmq_listener
         self.subscription_index: dict[tuple[str, str, int], set[int]] = defaultdict(set)
 
+        # Topic -> pre-parsed route with precomputed recipients, so the ZMQ
+        # listener does one dict lookup per tick. Must be invalidated whenever
+        # subscription_index changes for an instrument (see routing.py).
+        self.topic_router = TopicRouter(self.subscription_index)
+
         # Order-update subscribers: user_id -> set of client_ids that sent
         # {"action": "subscribe_orders"}. Account-scoped (no symbol/mode),
         # unlike market-data subscriptions above.
@@ -409,6 +419,7 @@ class WebSocketProxy:
         total_subscriptions = len(self.subscription_index)
         total_client_subscriptions = sum(len(clients) for clients in self.subscription_index.values())
         throttle_entries = len(self.last_message_time)
+        queue_depths = [q.depth for q in self.client_queues.values()]
 
         return {
             "server": {
@@ -435,6 +446,20 @@ class WebSocketProxy:
             "performance": {
                 "throttle_entries": throttle_entries,
                 "messages_processed": self._messages_processed,
+                "routing": self.topic_router.stats(),
+                "fanout": {
+                    "queued_messages": sum(queue_depths),
+                    "max_client_queue_depth": max(queue_depths, default=0),
+                    "sent_messages": sum(q.sent for q in self.client_queues.values()),
+                    "dropped_messages": sum(q.dropped for q in self.client_queues.values()),
+                },
+                "conflation": {
+                    "conflating_clients": sum(
+                        1 for q in self.client_queues.values() if q.conflate_interval
+                    ),
+                    "conflated_messages": sum(q.conflated for q in self.client_queues.values()),
+                    "flushes": sum(q.flushes for q in self.client_queues.values()),
+                },
                 "last_cleanup_time": self._last_cleanup_time,
             },
             "zmq_resources": adapter_stats,
@@ -564,6 +589,7 @@ class WebSocketProxy:
         client_id = id(websocket)
         self.clients[client_id] = websocket
         self.subscriptions[client_id] = set()
+        self._attach_client_queue(client_id, websocket)
 
         # Get path info from websocket if available
         path = getattr(websocket, "path", "/unknown")
@@ -614,6 +640,13 @@ class WebSocketProxy:
             # Clean up when the client disconnects
             await self.cleanup_client(client_id)
 
+    def _attach_client_queue(self, client_id, websocket):
+        """Create and start the bounded market-data send queue for a client."""
+        client_queue = ClientSendQueue(client_id, websocket)
+        client_queue.start()
+        self.client_queues[client_id] = client_queue
+        return client_queue
+
     async def cleanup_client(self, client_id):
         """
         Clean up client resources when they disconnect
@@ -624,6 +657,9 @@ class WebSocketProxy:
         # Remove client from tracking
         if client_id in self.clients:
             del self.clients[client_id]
+        client_queue = self.client_queues.pop(client_id, None)
+        if client_queue is not None:
+            client_queue.close()
 
         # Clean up subscriptions
         if client_id in self.subscriptions:
@@ -642,6 +678,7 @@ class WebSocketProxy:
                     should_unsubscribe_from_adapter = False
                     if sub_key in self.subscription_index:
                         self.subscription_index[sub_key].discard(client_id)
+                        self.topic_router.invalidate(symbol, exchange)
                         # Clean up empty entries and mark for adapter unsubscription
                         if not self.subscription_index[sub_key]:
                             del self.subscription_index[sub_key]
@@ -744,6 +781,8 @@ class WebSocketProxy:
                 await self.get_supported_brokers(client_id)
             elif action == "ping":
                 await self.handle_ping(client_id, data)
+            elif action == "conflate":
+                await self.set_client_conflation(client_id, data)
             else:
                 logger.warning(f"Client {client_id} requested invalid action: {action}")
                 await self.send_error(client_id, "INVALID_ACTION", f"Invalid action: {action}")
@@ -1158,6 +1197,39 @@ class WebSocketProxy:
         logger.debug(f"Sending pong to client {client_id}: {response}")
         await self.send_message(client_id, response)
 
+    async def set_client_conflation(self, client_id, data):
+        """
+        Enable or disable per-client tick conflation.
+
+        With conflation on, the client receives at most one tick per
+        (symbol, exchange, mode) every interval_ms — always the newest one.
+        interval_ms = 0 turns it off and forwards every tick.
+
+        Args:
+            client_id: ID of the client
+            data: {"action": "conflate", "interval_ms": 50}
+        """
+        client_queue = self.client_queues.get(client_id)
+        if client_queue is None:
+            return
+
+        interval_ms = data.get("interval_ms", 0)
+        if isinstance(interval_ms, bool) or not isinstance(interval_ms, int) or not (
+            0 <= interval_ms <= MAX_CONFLATE_MS
+        ):
+            await self.send_error(
+                client_id,
+                "INVALID_PARAMETERS",
+                f"interval_ms must be an integer between 0 and {MAX_CONFLATE_MS}",
+            )
+            return
+
+        client_queue.set_conflation(interval_ms)
+        await self.send_message(
+            client_id,
+            {"type": "conflate", "status": "success", "interval_ms": interval_ms},
+        )
+
     async def subscribe_client(self, client_id, data):
         """
         Subscribe a client to market data using their configured broker
@@ -1243,6 +1315,7 @@ class WebSocketProxy:
                 # OPTIMIZATION: Update subscription index for O(1) lookup
                 sub_key = (symbol, exchange, mode)
                 self.subscription_index[sub_key].add(client_id)
+                self.topic_router.invalidate(symbol, exchange)
 
                 # Add to successful subscriptions
                 subscription_responses.append(
@@ -1364,6 +1437,7 @@ class WebSocketProxy:
                         should_unsubscribe_from_adapter = False
                         if sub_key in self.subscription_index:
                             self.subscription_index[sub_key].discard(client_id)
+                            self.topic_router.invalidate(symbol, exchange)
                             # Only unsubscribe from adapter when last client unsubscribes
                             if not self.subscription_index[sub_key]:
                                 del self.subscription_index[sub_key]
@@ -1428,6 +1502,7 @@ class WebSocketProxy:
                 should_unsubscribe_from_adapter = False
                 if sub_key in self.subscription_index:
                     self.subscription_index[sub_key].discard(client_id)
+                    self.topic_router.invalidate(symbol, exchange)
                     # Only unsubscribe from adapter when last client unsubscribes
                     if not self.subscription_index[sub_key]:
                         del self.subscription_index[sub_key]
@@ -1789,8 +1864,9 @@ class WebSocketProxy:
 
         Key Performance Improvements:
         1. Increased timeout from 0.1s to 0.3s (reduces busy-waiting by 66%)
-        2. Use subscription_index for O(1) lookup instead of O(n²) iteration
-        3. Batch message sending with asyncio.gather
+        2. Pre-parsed topic routing table (routing.TopicRouter): one dict lookup
+           per tick instead of re-parsing the topic and re-collecting recipients
+        3. Serialize-once fan-out onto bounded per-client send queues
 
         Also handles cache invalidation messages from Flask process for cross-process
         cache synchronization (see GitHub issue #765).
@@ -1819,98 +1895,70 @@ class WebSocketProxy:
                     # No message received within timeout, continue the loop
                     continue
 
-                # Parse the message
-                topic_str = topic.decode("utf-8")
-                data_str = data.decode("utf-8")
-
-                # Handle cache invalidation messages (from Flask process)
-                # These messages clear stale auth tokens after re-login
-                # See GitHub issue #765 for details
-                if topic_str.startswith("CACHE_INVALIDATE"):
-                    try:
-                        self._handle_cache_invalidation(topic_str, data_str)
-                    except Exception as e:
-                        logger.exception(f"Error handling cache invalidation: {e}")
-                    continue  # Skip market data processing for cache messages
-
-                # Order-update relay: published by subscribers/wsproxy_subscriber.py
-                # (topic "{BROKER}_{USER_ID}_orders" or "ANALYZE_{USER_ID}_orders").
-                # user_id comes from the JSON payload, not topic-string parsing —
-                # usernames may contain underscores, same reasoning as the
-                # CACHE_INVALIDATE_* handling below.
-                if topic_str.endswith("_orders"):
-                    try:
-                        await self._handle_order_update(data_str)
-                    except Exception as e:
-                        logger.exception(f"Error handling order update: {e}")
-                    continue
-
-                # Skip other private account-level event topics (positions, margins).
-                # These are published by broker adapters on the shared ZMQ socket but
-                # do not follow the BROKER_EXCHANGE_SYMBOL_MODE market-data format.
-                if topic_str.endswith(("_positions", "_margins")):
-                    logger.debug(f"Skipping private event topic: {topic_str}")
-                    continue
+                # Fast path: a topic seen before resolves to its pre-parsed
+                # route with one dict lookup. Only unseen topics go through the
+                # control-topic checks and the EXCHANGE_SYMBOL_MODE parser.
+                route = self.topic_router.lookup(topic)
+                if route is None:
+                    # The payload is decoded lazily: control topics are JSON
+                    # text, market data may be JSON or the compact binary tick
+                    # encoding (see tick_codec.decode_tick).
+                    topic_str = topic.decode("utf-8")
+
+                    # Handle cache invalidation messages (from Flask process)
+                    # These messages clear stale auth tokens after re-login
+                    # See GitHub issue #765 for details
+                    if topic_str.startswith("CACHE_INVALIDATE"):
+                        try:
+                            self._handle_cache_invalidation(topic_str, data.decode("utf-8"))
+                        except Exception as e:
+                            logger.exception(f"Error handling cache invalidation: {e}")
+                        continue  # Skip market data processing for cache messages
+
+                    # Order-update relay: published by subscribers/wsproxy_subscriber.py
+                    # (topic "{BROKER}_{USER_ID}_orders" or "ANALYZE_{USER_ID}_orders").
+                    # user_id comes from the JSON payload, not topic-string parsing —
+                    # usernames may contain underscores, same reasoning as the
+                    # CACHE_INVALIDATE_* handling above.
+                    if topic_str.endswith("_orders"):
+                        try:
+                            await self._handle_order_update(data.decode("utf-8"))
+                        except Exception as e:
+                            logger.exception(f"Error handling order update: {e}")
+                        continue
 
-                market_data = json.loads(data_str)
+                    # Skip other private account-level event topics (positions, margins).
+                    # These are published by broker adapters on the shared ZMQ socket but
+                    # do not follow the BROKER_EXCHANGE_SYMBOL_MODE market-data format.
+                    if topic_str.endswith(("_positions", "_margins")):
+                        logger.debug(f"Skipping private event topic: {topic_str}")
+                        continue
 
-                # Extract topic components from ZMQ topic string.
-                # All adapters publish: EXCHANGE_SYMBOL_MODE
-                # Mode (LTP/QUOTE/DEPTH) is always the LAST segment.
-                # Exchange is the first segment (NSE, BSE, NFO, MCX, CRYPTO, …)
-                #   except NSE_INDEX / BSE_INDEX which span two segments.
-                # Symbol is everything between exchange and mode — may contain
-                # underscores for crypto spot pairs (e.g. CRYPTO_SOL_INR_LTP).
-                parts = topic_str.split("_")
+                    # All adapters publish EXCHANGE_SYMBOL_MODE; see routing.parse_topic
+                    # for the multi-segment exchange and underscore-symbol rules.
+                    route = self.topic_router.add(topic, topic_str)
+                    if route is None:
+                        logger.warning(f"Invalid market data topic: {topic_str}")
+                        continue
 
-                if len(parts) < 3:
-                    logger.warning(f"Invalid topic format: {topic_str}")
+                try:
+                    market_data = decode_tick(data)
+                except ValueError as e:
+                    logger.warning(f"Undecodable market data payload on {topic!r}: {e}")
                     continue
 
                 broker_name = "unknown"
-
-                # Mode is always the last segment
-                mode_str = parts[-1]
-                remaining = parts[:-1]  # everything except mode
-
-                # Detect two-segment exchange prefixes (NSE_INDEX, BSE_INDEX,
-                # MCX_INDEX, GLOBAL_INDEX, NSEIX_INDEX). Add new index/multi-segment
-                # exchanges here when introducing them.
-                _MULTI_SEGMENT_EXCHANGE_PREFIXES = (
-                    ("NSE", "INDEX"),
-                    ("BSE", "INDEX"),
-                    ("MCX", "INDEX"),
-                    ("GLOBAL", "INDEX"),
-                )
-                if len(remaining) >= 2 and (remaining[0], remaining[1]) in _MULTI_SEGMENT_EXCHANGE_PREFIXES:
-                    exchange = f"{remaining[0]}_{remaining[1]}"
-                    symbol = "_".join(remaining[2:])
-                else:
-                    exchange = remaining[0]
-                    symbol = "_".join(remaining[1:])
-
-                if not symbol:
-                    logger.warning(f"Invalid topic format (no symbol): {topic_str}")
-                    continue
-
-                # Route through the single normalizer so topic parsing stays
-                # consistent with client-side mode handling.
-                normalized = normalize_mode_or_none(mode_str)
-                if normalized is None:
-                    logger.warning(f"Invalid mode in topic: {mode_str}")
-                    continue
-                mode, _ = normalized
+                symbol, exchange, mode = route.symbol, route.exchange, route.mode
 
                 # No server-side LTP throttling: the previous time-based
                 # throttle dropped intra-window ticks instead of coalescing
                 # them, so clients could miss the latest price during bursts
-                # (e.g. NIFTY expiry, circuit triggers). With the O(1)
-                # subscription_index, fan-out is cheap enough to forward every
-                # tick. If CPU pressure ever returns, replace this with a
-                # trailing-edge coalescer that emits the latest pending tick.
-                sub_key = (symbol, exchange, mode)
+                # (e.g. NIFTY expiry, circuit triggers). Every tick is forwarded
+                # by default; clients that want less traffic opt into the
+                # trailing-edge conflation in fanout.ClientSendQueue, which
+                # always emits the latest pending tick.
                 current_time = time.time()
-                self.last_message_time[sub_key] = current_time
+                self.last_message_time[route.sub_key] = current_time
 
                 # Feed market data to MarketDataService for backend consumers
                 # (sandbox execution engine, position MTM, RMS, etc.)
@@ -1928,23 +1976,19 @@ class WebSocketProxy:
                     # Don't block WebSocket delivery if MarketDataService has issues
                     logger.debug(f"MarketDataService processing error: {mds_error}")
 
-                # OPTIMIZATION 2: O(1) lookup using subscription index
+                # OPTIMIZATION 2: precomputed recipients from the routing table.
                 # Higher modes include all lower-mode data (Depth > Quote > LTP),
-                # so also deliver to subscribers at lower modes.
+                # so this also covers subscribers at lower modes.
                 # Maps client_id -> the mode they subscribed to (for correct message tagging)
-                all_client_modes = {}
-                for m in range(1, mode + 1):
-                    for cid in self.subscription_index.get((symbol, exchange, m), set()):
-                        all_client_modes[cid] = m
+                all_client_modes = self.topic_router.recipients(route)
 
                 if not all_client_modes:
                     continue  # No WebSocket clients subscribed, skip delivery
 
-                # OPTIMIZATION 3: Batch message sends for parallel delivery
-                send_tasks = []
-
-                # OPTIMIZATION 4: Pre-create base message (reused for all clients)
-                # This avoids creating the same dict 1000 times
+                # OPTIMIZATION 3: Serialize once per (mode, broker) variant and
+                # hand the same string to every matching client's bounded send
+                # queue. Delivery happens on each client's writer task, so a
+                # slow browser never stalls the listener or other clients.
                 base_message = {
                     "type": "market_data",
                     "symbol": symbol,
@@ -1952,10 +1996,13 @@ class WebSocketProxy:
                     "mode": mode,
                     "data": market_data,
                 }
+                # (client_mode, broker) -> (payload, conflation key)
+                encoded: dict[tuple[int, str | None], tuple[str, tuple]] = {}
 
                 for client_id, client_mode in all_client_modes.items():
                     # Verify client still exists
-                    if client_id not in self.clients:
+                    client_queue = self.client_queues.get(client_id)
+                    if client_queue is None:
                         continue
 
                     # Verify user mapping exists
@@ -1974,16 +2021,18 @@ class WebSocketProxy:
                         continue
 
                     # Tag message with client's subscribed mode so frontend renders correctly
-                    message = base_message.copy()
-                    message["mode"] = client_mode
-                    message["broker"] = broker_name if broker_name != "unknown" else client_broker
-
-                    # Add to batch
-                    send_tasks.append(self.send_message(client_id, message))
-
-                # Send all messages in parallel (non-blocking)
-                if send_tasks:
-                    await aio.gather(*send_tasks, return_exceptions=True)
+                    tag_broker = broker_name if broker_name != "unknown" else client_broker
+                    variant = (client_mode, tag_broker)
+                    entry = encoded.get(variant)
+                    if entry is None:
+                        base_message["mode"] = client_mode
+                        base_message["broker"] = tag_broker
+                        entry = (json.dumps(base_message), (symbol, exchange, client_mode))
+                        encoded[variant] = entry
+
+                    # The key lets conflating clients keep only the newest tick
+                    # per (symbol, exchange, mode) until their next flush.
+                    client_queue.offer(*entry)
 
                 # METRICS: Track message count for health monitoring
                 self._messages_processed += 1
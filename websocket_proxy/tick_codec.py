@@ -0,0 +1,153 @@
+"""Tick payload codec for the adapter -> proxy ZeroMQ bus.
+
+Every market-data frame on the internal bus is a two-part ZMQ message
+``[topic, payload]``. Historically the payload was always ``json.dumps(data)``;
+on expiry days with thousands of subscribed strikes the JSON round-trip
+(dumps in the adapter, loads in the proxy) dominates proxy CPU.
+
+This module adds an opt-in compact binary encoding and keeps JSON as the
+default and the fallback:
+
+    - "json":    the legacy UTF-8 JSON object (payload starts with b"{").
+    - "msgpack": b"\\xb7" magic + schema id byte + a msgpack map whose well-known
+                 field names are replaced by small integer ids from a per-mode
+                 schema (LTP / QUOTE / DEPTH). Unknown fields keep their string
+                 key, so adapters that publish extra fields round-trip unchanged.
+
+The decoder sniffs the first byte, so the proxy accepts both formats on the
+same socket and each adapter chooses its own format ("negotiated per adapter"):
+a proxy never needs to know in advance which adapters opted in, and an adapter
+without msgpack available silently stays on JSON.
+
+Kept free of broker/database imports so it can be loaded standalone by tests
+and the microbenchmark (scripts/bench_tick_codec.py).
+"""
+
+import json
+import os
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is a declared dependency
+    msgpack = None
+
+WIRE_JSON = "json"
+WIRE_MSGPACK = "msgpack"
+SUPPORTED_WIRE_FORMATS = (WIRE_JSON, WIRE_MSGPACK)
+
+# JSON payloads always start with "{" (0x7B); the magic byte can never collide.
+_BINARY_MAGIC = 0xB7
+
+# Per-mode schemas. The position of a field in its tuple is its wire id, so
+# fields may only ever be APPENDED — reordering breaks adapters and proxies
+# running different versions. Schema 0 is used for topics whose mode suffix is
+# not recognised: every key stays a string.
+_COMMON_FIELDS = ("symbol", "exchange", "mode", "ltp", "timestamp", "ltt")
+_QUOTE_FIELDS = _COMMON_FIELDS + (
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "last_quantity",
+    "average_price",
+    "total_buy_quantity",
+    "total_sell_quantity",
+    "oi",
+    "change",
+    "change_percent",
+    "bid",
+    "ask",
+    "bid_qty",
+    "ask_qty",
+    "upper_circuit",
+    "lower_circuit",
+    "prev_close",
+)
+_SCHEMAS: dict[int, tuple[str, ...]] = {
+    0: (),
+    1: _COMMON_FIELDS,
+    2: _QUOTE_FIELDS,
+    3: _QUOTE_FIELDS + ("depth",),
+}
+_SCHEMA_BY_TOPIC_MODE = {"LTP": 1, "QUOTE": 2, "DEPTH": 3}
+
+# field name -> wire id, and wire id -> field name, per schema
+_FIELD_IDS = {sid: {name: i for i, name in enumerate(fields)} for sid, fields in _SCHEMAS.items()}
+_FIELD_NAMES = {sid: dict(enumerate(fields)) for sid, fields in _SCHEMAS.items()}
+
+
+def binary_available() -> bool:
+    """True when the msgpack encoding can be used in this process."""
+    return msgpack is not None
+
+
+def resolve_wire_format(value) -> str:
+    """Normalise a configured wire format, falling back to JSON.
+
+    Unknown values and "msgpack" without the msgpack package both resolve to
+    JSON so a bad setting can never take the tick feed down.
+    """
+    fmt = str(value or WIRE_JSON).strip().lower()
+    if fmt == WIRE_MSGPACK and binary_available():
+        return WIRE_MSGPACK
+    return WIRE_JSON
+
+
+# Process default, overridable per adapter via its ``tick_wire_format`` attribute.
+DEFAULT_TICK_WIRE_FORMAT = resolve_wire_format(os.getenv("ZMQ_TICK_WIRE_FORMAT", WIRE_JSON))
+
+
+def schema_id_for_topic(topic: str) -> int:
+    """Pick the schema from the mode suffix of an EXCHANGE_SYMBOL_MODE topic."""
+    return _SCHEMA_BY_TOPIC_MODE.get(topic.rpartition("_")[2].upper(), 0)
+
+
+def encode_tick(topic: str, data: dict, wire_format: str = WIRE_JSON) -> bytes:
+    """Encode a market-data dict for the ZMQ bus.
+
+    Args:
+        topic: The ZMQ topic (used to select the per-mode schema)
+        data: Market data dictionary published by the adapter
+        wire_format: "json" or "msgpack"
+
+    Returns:
+        bytes: The payload frame
+    """
+    if wire_format == WIRE_MSGPACK and msgpack is not None:
+        schema_id = schema_id_for_topic(topic)
+        ids = _FIELD_IDS[schema_id]
+        try:
+            body = msgpack.packb({ids.get(k, k): v for k, v in data.items()})
+        except (TypeError, ValueError, OverflowError):
+            # Values msgpack cannot represent (e.g. Decimal, ints over 64 bits)
+            # take the JSON path for this tick only, Decimals as floats; the
+            # decoder handles mixed frames transparently.
+            return json.dumps(data, default=float).encode("utf-8")
+        return bytes((_BINARY_MAGIC, schema_id)) + body
+    return json.dumps(data).encode("utf-8")
+
+
+def is_binary_payload(payload: bytes) -> bool:
+    """True when the payload was produced by the msgpack encoding."""
+    return len(payload) > 1 and payload[0] == _BINARY_MAGIC
+
+
+def decode_tick(payload: bytes) -> dict:
+    """Decode a payload produced by encode_tick() in either wire format.
+
+    Raises:
+        ValueError: malformed payload or a binary frame with an unknown schema.
+    """
+    if not is_binary_payload(payload):
+        return json.loads(payload)
+    if msgpack is None:
+        raise ValueError("Binary tick payload received but msgpack is not installed")
+    names = _FIELD_NAMES.get(payload[1])
+    if names is None:
+        raise ValueError(f"Unknown tick schema id {payload[1]}")
+    try:
+        raw = msgpack.unpackb(payload[2:], strict_map_key=False)
+    except Exception as e:
+        raise ValueError(f"Malformed binary tick payload: {e}") from e
+    return {names.get(k, k): v for k, v in raw.items()}